@@ -0,0 +1,92 @@
+"""
+Aho-Corasick multi-pattern automaton.
+
+Matches every pattern of a (possibly very large) set in a single pass over
+the input, so scan cost depends on input length plus match count rather
+than on the number of patterns.
+"""
+
+from collections import deque
+from typing import Any, Iterable, Iterator, Tuple
+
+
+class Automaton:
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Payloads of patterns ending exactly at a state, and a link to the
+        # nearest state on the failure chain that has payloads of its own.
+        self._out: list[list[Tuple[int, Any]]] = [[]]
+        self._out_link: list[int] = [-1]
+        self._built = False
+        self.max_length = 0
+        self.pattern_count = 0
+
+    def add(self, pattern: str, value: Any = None) -> None:
+        if self._built:
+            raise RuntimeError("Automaton is already built")
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._out_link.append(-1)
+            state = nxt
+        self._out[state].append((len(pattern), pattern if value is None else value))
+        self.max_length = max(self.max_length, len(pattern))
+        self.pattern_count += 1
+
+    def build(self) -> "Automaton":
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out_link[nxt] = fail[nxt] if out[fail[nxt]] else out_link[fail[nxt]]
+        self._built = True
+        return self
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def tables(self) -> Tuple[list, list, list, list]:
+        """The goto, fail, output and output-link tables, for serialization."""
+        if not self._built:
+            self.build()
+        return self._goto, self._fail, self._out, self._out_link
+
+    def iter_matches(self, stream: Iterable[Tuple[str, int]]) -> Iterator[Tuple[int, int, Any]]:
+        """Scan ``(char, position)`` pairs and yield ``(start, end, value)``.
+
+        ``start`` is the position of the first matched char and ``end`` the
+        position just past the last one, so callers can feed a normalized
+        stream while reporting offsets into the original text.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        positions: deque[int] = deque(maxlen=max(self.max_length, 1))
+        state = 0
+        for ch, pos in stream:
+            positions.append(pos)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if out[state] else out_link[state]
+            while hit > 0:
+                for length, value in out[hit]:
+                    yield positions[-length], pos + 1, value
+                hit = out_link[hit]
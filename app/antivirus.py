@@ -0,0 +1,230 @@
+"""
+Antivirus stage — clamd INSTREAM scanning over pooled session sockets.
+
+Uploads are streamed to clamd in length-prefixed chunks over long-lived
+IDSESSION connections (Unix socket or TCP). Verdicts are cached by the
+SHA-256 of the file so re-uploads of the same resume skip the scan.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import socket
+import struct
+from functools import lru_cache
+from typing import Optional, NamedTuple
+
+from .cache import TTLCache
+from .config import AntivirusConfig, config
+
+
+class ClamdError(Exception):
+    pass
+
+
+class ScanVerdict(NamedTuple):
+    status: str  # clean | infected | error | skipped
+    signature: Optional[str] = None
+    detail: Optional[str] = None
+    cached: bool = False
+
+
+def parse_reply(reply: str) -> ScanVerdict:
+    """Parse a clamd INSTREAM reply such as ``stream: OK`` or ``stream: Eicar FOUND``."""
+    body = reply.split(": ", 1)[1] if reply.startswith("stream: ") else reply
+    if body == "OK":
+        return ScanVerdict("clean")
+    if body.endswith(" FOUND"):
+        return ScanVerdict("infected", signature=body[: -len(" FOUND")])
+    return ScanVerdict("error", detail=reply)
+
+
+class _Session:
+    """One clamd connection in IDSESSION mode; replies are prefixed with a command id."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 1
+        self.loop = asyncio.get_running_loop()
+
+    async def instream(self, data: bytes, chunk_bytes: int) -> str:
+        self.writer.write(b"zINSTREAM\0")
+        view = memoryview(data)
+        for offset in range(0, len(view), chunk_bytes):
+            chunk = view[offset : offset + chunk_bytes]
+            self.writer.write(struct.pack("!I", len(chunk)))
+            self.writer.write(chunk)
+            await self.writer.drain()
+        self.writer.write(struct.pack("!I", 0))
+        await self.writer.drain()
+
+        raw = await self.reader.readuntil(b"\0")
+        command_id = self.next_id
+        self.next_id += 1
+        reply = raw[:-1].decode("utf-8", errors="replace").strip()
+        prefix = f"{command_id}: "
+        return reply[len(prefix):] if reply.startswith(prefix) else reply
+
+    async def close(self) -> None:
+        try:
+            self.writer.write(b"zEND\0")
+            await self.writer.drain()
+        except Exception:
+            pass
+        self.abort()
+
+    def abort(self) -> None:
+        self.writer.close()
+
+    def discard(self) -> None:
+        """Drop the session from outside the loop that opened it.
+
+        The socket is shut down directly, since a closed loop will never run
+        the transport's close callbacks; clamd then ends its side of the session.
+        """
+        sock = self.writer.get_extra_info("socket")
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.abort)
+
+
+class ClamdClient:
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 3310,
+        pool_size: int = 4,
+        chunk_bytes: int = 64 * 1024,
+        timeout_seconds: float = 10.0,
+    ):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.pool_size = max(1, pool_size)
+        self.chunk_bytes = max(1, chunk_bytes)
+        self.timeout_seconds = timeout_seconds
+        self._idle: list[_Session] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, av: AntivirusConfig) -> "ClamdClient":
+        return cls(
+            socket_path=av.clamd_socket,
+            host=av.clamd_host,
+            port=av.clamd_port,
+            pool_size=av.pool_size,
+            chunk_bytes=av.chunk_bytes,
+            timeout_seconds=av.timeout_seconds,
+        )
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        # Streams belong to the loop that opened them; start a fresh pool per loop.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._slots is None:
+            self._loop = loop
+            idle, self._idle = self._idle, []
+            for session in idle:
+                session.discard()
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    async def _connect(self) -> _Session:
+        if self.socket_path:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(b"zIDSESSION\0")
+        await writer.drain()
+        return _Session(reader, writer)
+
+    async def instream(self, data: bytes) -> str:
+        slots = self._bind_loop()
+        async with slots:
+            for attempt in range(2):
+                session = self._idle.pop() if self._idle and attempt == 0 else None
+                fresh = session is None
+                try:
+                    if session is None:
+                        session = await asyncio.wait_for(self._connect(), self.timeout_seconds)
+                    reply = await asyncio.wait_for(session.instream(data, self.chunk_bytes), self.timeout_seconds)
+                except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                    if session is not None:
+                        session.abort()
+                    if fresh:
+                        raise ClamdError(f"clamd unavailable: {exc!r}") from exc
+                    # A pooled session may have been dropped by clamd's idle timeout.
+                    continue
+                if reply.endswith("ERROR"):
+                    session.abort()
+                else:
+                    self._idle.append(session)
+                return reply
+        raise ClamdError("clamd unavailable")  # pragma: no cover
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await session.close()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AntivirusScanner:
+    def __init__(self, av: AntivirusConfig = config.antivirus, client: Optional[ClamdClient] = None):
+        self.provider = av.provider
+        self.fail_open = av.fail_open
+        if client is None and av.provider == "clamav":
+            client = ClamdClient.from_config(av)
+        self.client = client
+        self.cache: TTLCache[ScanVerdict] = TTLCache(maxsize=av.cache_size, ttl_seconds=av.cache_ttl_seconds)
+
+    async def scan(self, data: bytes) -> ScanVerdict:
+        if self.client is None:
+            return ScanVerdict("skipped", detail=self.provider)
+
+        # Hashing a multi-megabyte upload would stall the event loop.
+        key = await asyncio.to_thread(_digest, data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached._replace(cached=True)
+
+        try:
+            verdict = parse_reply(await self.client.instream(data))
+        except ClamdError as exc:
+            return ScanVerdict("error", detail=str(exc))
+        if verdict.status in {"clean", "infected"}:
+            self.cache.set(key, verdict)
+        return verdict
+
+    def blocks(self, verdict: ScanVerdict) -> bool:
+        if verdict.status == "infected":
+            return True
+        return verdict.status == "error" and not self.fail_open
+
+    def field(self, verdict: ScanVerdict) -> dict:
+        """Render a verdict as the v1 ``fields.antivirus`` entry."""
+        if verdict.status == "skipped":
+            return {"value": "pending", "confidence": 0.5, "scan_status": "not_implemented", "note": "stub"}
+        if verdict.status == "clean":
+            return {"value": "clean", "confidence": 1.0, "scan_status": "scanned", "engine": self.provider, "cached": verdict.cached}
+        if verdict.status == "infected":
+            return {"value": "infected", "confidence": 1.0, "scan_status": "blocked", "engine": self.provider, "note": verdict.signature}
+        return {
+            "value": "unscanned" if self.fail_open else "failed",
+            "confidence": 0.5,
+            "scan_status": "error",
+            "engine": self.provider,
+            "note": verdict.detail,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_antivirus() -> AntivirusScanner:
+    return AntivirusScanner()
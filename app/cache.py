@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Small in-process LRU cache with a per-entry time-to-live.
+
+    ``ttl_seconds`` is the default; ``set`` can give one entry a shorter
+    life, e.g. a fallback value that should be retried soon.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at or None, value)
+        self._data: "OrderedDict[Hashable, tuple[Optional[float], V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _expired(expires_at: Optional[float]) -> bool:
+        return expires_at is not None and time.monotonic() > expires_at
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry[0]):
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (None if ttl is None else time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._expired(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -17,11 +17,157 @@ class OcrConfig(BaseModel):
 class AntivirusConfig(BaseModel):
     provider: str = os.getenv("AV_PROVIDER", "stub")
     api_key_env: str = os.getenv("AV_API_KEY_ENV", "AV_API_KEY")
+    # clamd endpoint: a Unix socket path wins over host/port when set.
+    clamd_socket: str | None = os.getenv("CLAMD_SOCKET") or None
+    clamd_host: str = os.getenv("CLAMD_HOST", "127.0.0.1")
+    clamd_port: int = int(os.getenv("CLAMD_PORT", "3310"))
+    pool_size: int = int(os.getenv("CLAMD_POOL_SIZE", "4"))
+    chunk_bytes: int = int(os.getenv("CLAMD_CHUNK_BYTES", str(64 * 1024)))
+    timeout_seconds: float = float(os.getenv("CLAMD_TIMEOUT_SECONDS", "10"))
+    cache_size: int = int(os.getenv("AV_CACHE_SIZE", "4096"))
+    cache_ttl_seconds: float = float(os.getenv("AV_CACHE_TTL_SECONDS", "86400"))
+    fail_open: bool = os.getenv("AV_FAIL_OPEN", "0") == "1"
+
+class SafetyConfig(BaseModel):
+    patterns_path: str | None = os.getenv("INJECTION_PATTERNS_PATH") or None
+    block_severity: str = os.getenv("INJECTION_BLOCK_SEVERITY", "medium")
+
+class SandboxConfig(BaseModel):
+    enabled: bool = os.getenv("EXTRACT_SANDBOX", "1") == "1"
+    # forkserver/spawn: forking the threaded server can deadlock the child on copied locks.
+    start_method: str = os.getenv("EXTRACT_SANDBOX_START_METHOD", "forkserver")
+    # Address-space headroom on top of what the child already maps at start.
+    memory_mb: int = int(os.getenv("EXTRACT_MEMORY_MB", "512"))
+    cpu_seconds: int = int(os.getenv("EXTRACT_CPU_SECONDS", "10"))
+    wall_seconds: float = float(os.getenv("EXTRACT_WALL_SECONDS", "15"))
+    max_strikes: int = int(os.getenv("EXTRACT_MAX_STRIKES", "2"))
+    blacklist_size: int = int(os.getenv("EXTRACT_BLACKLIST_SIZE", "10000"))
+    blacklist_ttl_seconds: float = float(os.getenv("EXTRACT_BLACKLIST_TTL_SECONDS", "86400"))
+
+class CanonicalizerConfig(BaseModel):
+    # auto: call the LLM only when the heuristic parse scores below min_quality.
+    routing: str = os.getenv("CANONICALIZER_ROUTING", "auto")
+    min_quality: float = float(os.getenv("CANONICALIZER_MIN_QUALITY", "0.8"))
+    section_routing: bool = os.getenv("CANONICALIZER_SECTION_ROUTING", "1") == "1"
+    # Split LLM canonicalization into concurrent per-section calls.
+    sharding: bool = os.getenv("CANONICALIZER_SHARDING", "0") == "1"
+    shard_roles: int = int(os.getenv("CANONICALIZER_SHARD_ROLES", "3"))
+    shard_max_tokens: int = int(os.getenv("CANONICALIZER_SHARD_MAX_TOKENS", "4096"))
+
+class IncrementalConfig(BaseModel):
+    enabled: bool = os.getenv("INCREMENTAL_ANALYSIS", "1") == "1"
+    store_size: int = int(os.getenv("INCREMENTAL_STORE_SIZE", "10000"))
+    ttl_seconds: float = float(os.getenv("INCREMENTAL_TTL_SECONDS", str(7 * 86400)))
+
+class SkillsConfig(BaseModel):
+    taxonomy_source: str = os.getenv("SKILLS_TAXONOMY_SOURCE", os.path.join(os.path.dirname(__file__), "v2", "data", "skills_taxonomy.json"))
+    taxonomy_path: str = os.getenv("SKILLS_TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "v2", "data", "skills_taxonomy.bin"))
+
+class SignalCacheConfig(BaseModel):
+    enabled: bool = os.getenv("SIGNAL_CACHE", "1") == "1"
+    impact_size: int = int(os.getenv("SIGNAL_CACHE_IMPACT_SIZE", "200000"))
+    ownership_size: int = int(os.getenv("SIGNAL_CACHE_OWNERSHIP_SIZE", "50000"))
+    ttl_seconds: float = float(os.getenv("SIGNAL_CACHE_TTL_SECONDS", str(30 * 86400)))
+
+class OwnershipConfig(BaseModel):
+    # Roles whose heuristic ownership confidence is below this go to the LLM.
+    min_confidence: float = float(os.getenv("OWNERSHIP_MIN_CONFIDENCE", "0.75"))
+
+class BulletModelConfig(BaseModel):
+    # Local impact classifier artifact; unset keeps every uncached bullet on the LLM.
+    path: str = os.getenv("BULLET_MODEL_PATH", "")
+    min_confidence: float = float(os.getenv("BULLET_MODEL_MIN_CONFIDENCE", "0.9"))
+    # JSONL file LLM impact labels are appended to, for training.
+    label_log: str = os.getenv("BULLET_LABEL_LOG", "")
+
+class AnalysisStoreConfig(BaseModel):
+    # Finished analyses kept for /v2/simulate.
+    enabled: bool = os.getenv("ANALYSIS_STORE", "1") == "1"
+    size: int = int(os.getenv("ANALYSIS_STORE_SIZE", "10000"))
+    ttl_seconds: float = float(os.getenv("ANALYSIS_STORE_TTL_SECONDS", str(86400)))
+
+class JobDescriptionConfig(BaseModel):
+    # Extracted requirement profiles, keyed by JD content hash.
+    cache_size: int = int(os.getenv("JD_CACHE_SIZE", "5000"))
+    cache_ttl_seconds: float = float(os.getenv("JD_CACHE_TTL_SECONDS", str(7 * 86400)))
+    # Heuristic profiles from a failed LLM call are retried after this long.
+    fallback_ttl_seconds: float = float(os.getenv("JD_FALLBACK_TTL_SECONDS", "300"))
+    max_chars: int = int(os.getenv("JD_MAX_CHARS", "20000"))
+
+class SearchIndexConfig(BaseModel):
+    enabled: bool = os.getenv("SEARCH_INDEX", "1") == "1"
+    # Compiled segment file; empty keeps the index in memory only.
+    path: str = os.getenv("SEARCH_INDEX_PATH", "")
+    compact_at: int = int(os.getenv("SEARCH_INDEX_COMPACT_AT", "2000"))
+
+class SemanticMatchConfig(BaseModel):
+    role_profiles_path: str = os.getenv("ROLE_PROFILES_PATH", os.path.join(os.path.dirname(__file__), "v2", "data", "role_profiles.json"))
+    # Profiles built for job descriptions and uncatalogued titles.
+    profile_cache_size: int = int(os.getenv("ROLE_PROFILE_CACHE_SIZE", "5000"))
+    profile_cache_ttl_seconds: float = float(os.getenv("ROLE_PROFILE_CACHE_TTL_SECONDS", str(7 * 86400)))
+
+class AlignmentConfig(BaseModel):
+    # profile: cached per-role profile plus a local comparison; full: one LLM call per resume.
+    mode: str = os.getenv("ALIGNMENT_MODE", "profile")
+    # Let the LLM write the narrative of a locally scored alignment.
+    narrative_llm: bool = os.getenv("ALIGNMENT_NARRATIVE_LLM", "1") == "1"
+    profile_cache_size: int = int(os.getenv("ALIGNMENT_PROFILE_CACHE_SIZE", "2000"))
+    profile_cache_ttl_seconds: float = float(os.getenv("ALIGNMENT_PROFILE_CACHE_TTL_SECONDS", str(7 * 86400)))
+    # Heuristic profiles from a failed LLM call are retried after this long.
+    profile_fallback_ttl_seconds: float = float(os.getenv("ALIGNMENT_PROFILE_FALLBACK_TTL_SECONDS", "300"))
+
+class GuidanceConfig(BaseModel):
+    # One batched LLM call rewording templated recommendations and interview questions.
+    polish: bool = os.getenv("GUIDANCE_POLISH", "1") == "1"
+
+class RoleConfig(BaseModel):
+    role_titles_path: str = os.getenv("ROLE_TITLES_PATH", os.path.join(os.path.dirname(__file__), "v2", "data", "role_titles.json"))
+    # Minimum token-overlap (Dice) score for a fuzzy title match.
+    fuzzy_cutoff: float = float(os.getenv("ROLE_FUZZY_CUTOFF", "0.6"))
+
+class LlmBatchConfig(BaseModel):
+    # Pack same-stage extractor calls from concurrent pipelines into one prompt.
+    enabled: bool = os.getenv("LLM_BATCHING", "0") == "1"
+    stages: list[str] = [s.strip() for s in os.getenv("LLM_BATCH_STAGES", "impact,ownership,skills").split(",") if s.strip()]
+    # Longest a call waits for others to join its batch; trades latency for throughput.
+    window_ms: float = float(os.getenv("LLM_BATCH_WINDOW_MS", "5"))
+    max_docs: int = int(os.getenv("LLM_BATCH_MAX_DOCS", "16"))
+    max_input_tokens: int = int(os.getenv("LLM_BATCH_MAX_TOKENS", "24000"))
+    max_output_tokens: int = int(os.getenv("LLM_BATCH_MAX_OUTPUT_TOKENS", "65536"))
+
+class BulkConfig(BaseModel):
+    # Job state, request files and results for offline bulk runs (python -m app.v2.bulk).
+    directory: str = os.getenv("BULK_DIR", "bulk_jobs")
+    # gemini: Gemini batch mode. The file-based local backend is built in code with a responder.
+    backend: str = os.getenv("BULK_BACKEND", "gemini")
+    poll_seconds: float = float(os.getenv("BULK_POLL_SECONDS", "60"))
+    max_rounds: int = int(os.getenv("BULK_MAX_ROUNDS", "8"))
+    # Payloads replayed at once; each holds a pipeline's state and, on its first round, an ingest.
+    concurrency: int = int(os.getenv("BULK_CONCURRENCY", "32"))
+    # Request files are split to stay under the batch API's inline request size.
+    max_request_bytes: int = int(os.getenv("BULK_MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
 
 class AppConfig(BaseModel):
     env: str = os.getenv("APP_ENV", "dev")
     gemini: GeminiConfig = GeminiConfig()
     ocr: OcrConfig = OcrConfig()
     antivirus: AntivirusConfig = AntivirusConfig()
+    safety: SafetyConfig = SafetyConfig()
+    sandbox: SandboxConfig = SandboxConfig()
+    canonicalizer: CanonicalizerConfig = CanonicalizerConfig()
+    incremental: IncrementalConfig = IncrementalConfig()
+    skills: SkillsConfig = SkillsConfig()
+    signal_cache: SignalCacheConfig = SignalCacheConfig()
+    bullet_model: BulletModelConfig = BulletModelConfig()
+    ownership: OwnershipConfig = OwnershipConfig()
+    analysis_store: AnalysisStoreConfig = AnalysisStoreConfig()
+    job_description: JobDescriptionConfig = JobDescriptionConfig()
+    search_index: SearchIndexConfig = SearchIndexConfig()
+    semantic_match: SemanticMatchConfig = SemanticMatchConfig()
+    roles: RoleConfig = RoleConfig()
+    alignment: AlignmentConfig = AlignmentConfig()
+    guidance: GuidanceConfig = GuidanceConfig()
+    llm_batch: LlmBatchConfig = LlmBatchConfig()
+    bulk: BulkConfig = BulkConfig()
 
 config = AppConfig()
@@ -1,13 +1,19 @@
 from fastapi import FastAPI, HTTPException, APIRouter
 from fastapi.responses import JSONResponse
+import time
 from uuid import uuid4
 from datetime import datetime, timezone
 
 from .schemas import ParseRequest, ParseResponse, StatusResponse, Telemetry, RESUME_OUTPUT_SCHEMA
-from .pipeline import run_pipeline
+from .pipeline import run_pipeline, IngestError
 from .config import config
-from .v2.types import V2AnalyzeRequest
+from .v2.types import V2AnalyzeRequest, V2SearchRequest, V2SimulateRequest
 from .v2.pipeline import run_v2_pipeline
+from .v2.alignment_profiles import get_alignment_profiles
+from .v2.analysis_store import get_analysis_store
+from .v2.simulation import SimulationError, simulate
+from .v2.job_description import extract_requirements
+from .v2.search_index import get_search_index
 
 app = FastAPI(title="resume-parser", version="0.1.0")
 router = APIRouter(prefix="/svc/resume-parser")
@@ -80,10 +86,65 @@ v2_router = APIRouter(prefix="/svc/resume-parser/v2")
 
 @v2_router.post("/analyze")
 async def analyze_v2(req: V2AnalyzeRequest):
-    result = await run_v2_pipeline(req.model_dump(by_alias=False))
+    try:
+        result = await run_v2_pipeline(req.model_dump(by_alias=False))
+    except IngestError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
     return result
 
 
+@v2_router.post("/simulate")
+async def simulate_v2(req: V2SimulateRequest):
+    """Re-score a stored analysis under hypothetical edits, without LLM calls."""
+    store = get_analysis_store()
+    analysis = store.get(req.analysis_id) if store else None
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    try:
+        return simulate(analysis, req.edits)
+    except SimulationError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@v2_router.post("/search")
+async def search_v2(req: V2SearchRequest):
+    """Top-k analyzed resumes for a query or job description, with facet filters."""
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index disabled")
+    skills, optional_skills, titles = list(req.skills), [], list(req.titles)
+    requirements = None
+    if req.job_description and req.job_description.strip():
+        requirements = await extract_requirements(req.job_description)
+        skills += requirements.required_skills
+        optional_skills = requirements.optional_skills
+        titles += [requirements.title] if requirements.title else []
+    t = time.perf_counter()
+    hits = index.search(
+        text=req.query,
+        skills=skills,
+        optional_skills=optional_skills,
+        titles=titles,
+        companies=req.companies,
+        must_skills=req.must_skills,
+        min_tenure_months=req.min_tenure_months,
+        max_tenure_months=req.max_tenure_months,
+        tiers=req.tiers,
+        min_score=req.min_score,
+        k=req.k,
+    )
+    return {
+        "hits": [hit._asdict() for hit in hits],
+        "indexed": len(index),
+        "job_requirements": requirements.model_dump() if requirements else None,
+        "took_ms": round((time.perf_counter() - t) * 1000, 2),
+    }
+
+
+@v2_router.get("/alignment/stats")
+async def alignment_stats_v2():
+    """How alignments were served since startup, and the role-profile cache hit rate."""
+    return get_alignment_profiles().stats()
 
 
 from pydantic import BaseModel, Field as PydanticField
@@ -107,14 +168,14 @@ async def rewrite_v2(req: V2RewriteRequest):
     canonicalize → extract signals → enhance bullets → compose → validate
     """
     import asyncio
-    import base64
     import time
 
-    from .pipeline import _extract_text, _is_safe_text
+    from .pipeline import ingest_file
     from .v2.canonicalizer import canonicalize
     from .v2.extractors import extract_impact, extract_ownership, extract_skills
     from .v2.enhancer import enhance_bullets, enhance_summary
     from .v2.composer import compose_resume
+    from .v2.features import BulletFeatureIndex
     from .v2.validator import validate_rewrite
 
     t0 = time.perf_counter()
@@ -123,11 +184,11 @@ async def rewrite_v2(req: V2RewriteRequest):
 
     # 1. Ingest
     t = time.perf_counter()
-    file_bytes = base64.b64decode(req.file_base64)
-    text = _extract_text(file_bytes, req.mime_type, req.file_name)
-    is_safe, reason = _is_safe_text(text)
-    if not is_safe:
-        raise HTTPException(status_code=422, detail=reason or "Unsafe content")
+    try:
+        ingested = await ingest_file(req.file_base64, req.mime_type, req.file_name)
+    except IngestError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc) or "Unsafe content")
+    text = ingested.text
     step_durations["ingest"] = int((time.perf_counter() - t) * 1000)
 
     # 2. Canonicalize
@@ -138,10 +199,11 @@ async def rewrite_v2(req: V2RewriteRequest):
     # 3. Extract signals (parallel)
     t = time.perf_counter()
     intake_data = req.intake_data or {}
+    features = BulletFeatureIndex.from_canonical(canonical)
     impact, ownership, skills = await asyncio.gather(
-        extract_impact(canonical, model=models.get("impact"), intake_data=intake_data),
-        extract_ownership(canonical, model=models.get("ownership"), intake_data=intake_data),
-        extract_skills(canonical, model=models.get("skills"), intake_data=intake_data),
+        extract_impact(canonical, model=models.get("impact"), intake_data=intake_data, features=features),
+        extract_ownership(canonical, model=models.get("ownership"), intake_data=intake_data, features=features),
+        extract_skills(canonical, model=models.get("skills"), intake_data=intake_data, features=features),
     )
     step_durations["extractors"] = int((time.perf_counter() - t) * 1000)
 
@@ -166,7 +228,7 @@ async def rewrite_v2(req: V2RewriteRequest):
 
     # 6. Validate
     t = time.perf_counter()
-    validation = validate_rewrite(canonical, enhanced_summary, enhanced_bullets)
+    validation = validate_rewrite(canonical, enhanced_summary, enhanced_bullets, features=features)
     step_durations["validate"] = int((time.perf_counter() - t) * 1000)
 
     total_ms = int((time.perf_counter() - t0) * 1000)
@@ -1,10 +1,17 @@
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+import asyncio
 import base64
 import binascii
 import re
+import threading
+import time
 from io import BytesIO
 from .schemas import PIPELINE_STEPS, RESUME_OUTPUT_SCHEMA
 from .llm import extract_fields_llm
+from . import sniff
+from .antivirus import get_antivirus
+from .sandbox import ExtractionError, get_sandbox
+from .safety import INJECTION_PATTERNS, first_blocking_match  # noqa: F401 (INJECTION_PATTERNS re-exported)
 
 try:
     import fitz  # PyMuPDF
@@ -31,18 +38,6 @@ SECTION_HEADINGS = [
 
 MAX_FILE_BYTES = 5 * 1024 * 1024
 
-INJECTION_PATTERNS = [
-    "ignore previous instructions",
-    "system prompt",
-    "you are now",
-    "critical system instruction",
-    "simulated terminal",
-    "override all rules",
-    "disregard previous",
-    "stop being",
-    "act as a",  # common for persona injection
-]
-
 
 def _is_safe_text(text: str) -> Tuple[bool, Optional[str]]:
     """
@@ -52,15 +47,22 @@ def _is_safe_text(text: str) -> Tuple[bool, Optional[str]]:
     """
     if not text:
         return True, None
-    
-    lower_text = text.lower()
-    for pattern in INJECTION_PATTERNS:
-        if pattern in lower_text:
-            return False, f"Detected potential prompt injection: '{pattern}'"
-    
+
+    match = first_blocking_match(text)
+    if match:
+        return False, f"Detected potential prompt injection: '{match.pattern}'"
+
     return True, None
 
 
+class UnsupportedFormatError(ValueError):
+    """Raised when the upload's content is not a format we can extract text from."""
+
+    def __init__(self, kind: str, detail: Optional[str] = None):
+        self.kind = kind
+        super().__init__(detail or f"Unsupported file format: {kind}")
+
+
 def _extract_pdf_text(data: bytes) -> str:
     if not fitz:
         return ""
@@ -78,27 +80,96 @@ def _extract_docx_text(data: bytes) -> str:
     return "\n".join([p.text for p in doc.paragraphs]).strip()
 
 
-def _extract_text(file_bytes: bytes, mime_type: Optional[str], file_name: Optional[str]) -> str:
-    lower_name = (file_name or "").lower()
-    lower_mime = (mime_type or "").lower()
-
-    if ("pdf" in lower_mime) or lower_name.endswith(".pdf"):
-        return _extract_pdf_text(file_bytes)
-    if ("word" in lower_mime) or lower_name.endswith(".docx"):
-        return _extract_docx_text(file_bytes)
-    if lower_name.endswith(".doc"):
-        # legacy doc not supported yet
-        return ""
-
-    # plain text uploads (txt/rtf/markdown/unknown text mime)
-    if lower_name.endswith((".txt", ".md", ".rtf")) or lower_mime.startswith("text/"):
-        return file_bytes.decode("utf-8", errors="ignore").strip()
-
-    # fallback: attempt utf-8 decode first, then PDF parser
-    decoded = file_bytes.decode("utf-8", errors="ignore").strip()
-    if decoded:
-        return decoded
-    return _extract_pdf_text(file_bytes)
+RTF_CONTROL_RE = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\([^a-z])|([{}])|[\r\n]+|[^\\{}\r\n]+", re.I)
+RTF_SKIP_DESTINATIONS = {"fonttbl", "colortbl", "stylesheet", "info", "pict", "header", "footer", "listtable", "listoverridetable", "themedata", "datastore", "latentstyles"}
+RTF_BREAKS = {"par", "line", "row", "sect", "page"}
+
+
+def _extract_rtf_text(data: bytes) -> str:
+    raw = data.decode("latin-1")
+    out = []
+    stack = []
+    skip = False
+    uc_skip = 0
+    for match in RTF_CONTROL_RE.finditer(raw):
+        word, arg, hex_code, symbol, brace = match.groups()
+        token = match.group(0)
+        if brace == "{":
+            stack.append(skip)
+        elif brace == "}":
+            skip = stack.pop() if stack else False
+        elif word:
+            word = word.lower()
+            if word in RTF_SKIP_DESTINATIONS:
+                skip = True
+            elif skip:
+                continue
+            elif word in RTF_BREAKS:
+                out.append("\n")
+            elif word == "tab":
+                out.append("\t")
+            elif word == "u" and arg:
+                out.append(chr(int(arg) % 65536))
+                uc_skip = 1
+        elif hex_code:
+            if uc_skip:
+                uc_skip -= 1
+            elif not skip:
+                out.append(bytes([int(hex_code, 16)]).decode("cp1252", errors="ignore"))
+        elif symbol:
+            if symbol == "*":
+                skip = True
+            elif skip:
+                continue
+            elif symbol in "\r\n":
+                out.append("\n")
+            elif symbol in "\\{}":
+                out.append(symbol)
+        elif token[0] in "\r\n":
+            continue
+        elif not skip:
+            if uc_skip:
+                token = token[uc_skip:]
+                uc_skip = 0
+            out.append(token)
+    return "".join(out).strip()
+
+
+def _decode_text(data: bytes) -> str:
+    return data.decode(sniff.text_encoding(data), errors="ignore").strip()
+
+
+def _extract_text(
+    file_bytes: bytes,
+    mime_type: Optional[str],
+    file_name: Optional[str],
+    cancel: Optional[threading.Event] = None,
+) -> str:
+    """Route to an extractor based on the sniffed content, not the client's claims.
+
+    ``mime_type`` and ``file_name`` are only used to describe the upload in
+    the error raised for formats we cannot extract. Setting ``cancel`` kills
+    a sandboxed parser. Raises UnsupportedFormatError or ExtractionError.
+    """
+    kind = sniff.sniff_file_type(file_bytes)
+
+    # Third-party parsers run in a resource-limited child (see app/sandbox.py).
+    if kind == sniff.PDF:
+        return get_sandbox().run(_extract_pdf_text, file_bytes, cancel)
+    if kind == sniff.DOCX:
+        return get_sandbox().run(_extract_docx_text, file_bytes, cancel)
+    if kind == sniff.RTF:
+        return _extract_rtf_text(file_bytes)
+    if kind == sniff.TEXT:
+        return _decode_text(file_bytes)
+
+    declared = mime_type or file_name
+    detail = f"Unsupported file format: {kind}"
+    if kind == sniff.IMAGE:
+        detail = f"Unsupported file format: image/{sniff.sniff_image_format(file_bytes)} (OCR required)"
+    if declared:
+        detail += f" (declared as {declared})"
+    raise UnsupportedFormatError(kind, detail)
 
 
 def _count_headings(text: str) -> int:
@@ -163,29 +234,30 @@ def _bucket_experience(years: int) -> str:
     return "10+"
 
 
+def _map_function_area(role: str) -> str | None:
+    # Imported here: app.v2 imports this module at package load.
+    from app.v2.roles import normalize_role
+
+    return normalize_role(role).function_area
 
 
-def _map_function_area(role: str) -> str | None:
-    role_lower = role.lower()
-    if any(k in role_lower for k in ["engineer", "developer", "software", "frontend", "backend", "fullstack", "devops", "sre"]):
-        return "engineering"
-    if any(k in role_lower for k in ["product", "pm", "product manager"]):
-        return "product"
-    if any(k in role_lower for k in ["design", "ux", "ui"]):
-        return "design"
-    if any(k in role_lower for k in ["data", "analytics", "ml", "ai", "analyst"]):
-        return "data"
-    if any(k in role_lower for k in ["sales", "bd", "business development"]):
-        return "sales"
-    if any(k in role_lower for k in ["marketing", "growth"]):
-        return "marketing"
-    if any(k in role_lower for k in ["operations", "ops"]):
-        return "operations"
-    if any(k in role_lower for k in ["finance", "accounting"]):
-        return "finance"
-    if any(k in role_lower for k in ["hr", "people"]):
-        return "hr"
-    return None
+def _looks_like_name(value: str) -> bool:
+    words = value.split()
+    if len(words) < 2 or len(words) > 4:
+        return False
+    if any(any(char.isdigit() for char in word) for word in words):
+        return False
+    if "," in value:
+        return False
+    return all(word[:1].isupper() and word[1:].islower() for word in words)
+
+
+def _looks_like_location(value: str) -> bool:
+    if "," in value:
+        return True
+    markers = ["india", "usa", "uk", "remote", "singapore", "canada", "australia"]
+    return any(marker in value.lower() for marker in markers)
+
 
 def _extract_fields(text: str) -> Dict[str, Any]:
     emails = EMAIL_RE.findall(text)
@@ -194,22 +266,6 @@ def _extract_fields(text: str) -> Dict[str, Any]:
     location = None
     lines = [line.strip() for line in text.splitlines() if line.strip()]
 
-    def _looks_like_name(value: str) -> bool:
-        words = value.split()
-        if len(words) < 2 or len(words) > 4:
-            return False
-        if any(any(char.isdigit() for char in word) for word in words):
-            return False
-        if "," in value:
-            return False
-        return all(word[:1].isupper() and word[1:].islower() for word in words)
-
-    def _looks_like_location(value: str) -> bool:
-        if "," in value:
-            return True
-        markers = ["india", "usa", "uk", "remote", "singapore", "canada", "australia"]
-        return any(marker in value.lower() for marker in markers)
-
     fields: Dict[str, Any] = {}
 
     if lines:
@@ -254,70 +310,108 @@ def _extract_fields(text: str) -> Dict[str, Any]:
     return fields
 
 
-async def run_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Basic extraction + scoring pipeline."""
-    file_base64 = payload.get("file_base64") or payload.get("fileBase64")
-    file_name = payload.get("file_name") or payload.get("fileName")
-    mime_type = payload.get("mime_type") or payload.get("mimeType")
-    target_role = payload.get("target_role") or payload.get("targetRole")
+class IngestError(ValueError):
+    """An upload rejected during ingest; ``fields`` is the v1 blocked-result payload."""
+
+    def __init__(self, message: str, fields: Dict[str, Any], status_code: int = 422):
+        self.fields = fields
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class IngestResult(NamedTuple):
+    file_bytes: bytes
+    text: str
+    antivirus: Dict[str, Any]
+    step_durations: Dict[str, int]
+
+
+def _blocked_fields(note: Optional[str], antivirus: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "needsOcr": {"value": False, "confidence": 1.0, "ocr_status": "blocked"},
+        "antivirus": antivirus or {"value": "failed", "confidence": 1.0, "scan_status": "blocked", "note": note},
+    }
+
+
+async def ingest_file(file_base64: Any, mime_type: Optional[str], file_name: Optional[str]) -> IngestResult:
+    """Decode, scan, extract and safety-check an upload once.
+
+    Shared by the v1 and v2 pipelines so a combined request pays for each
+    of these steps a single time. Raises IngestError.
+    """
+    step_durations: Dict[str, int] = {}
+    t = time.perf_counter()
 
     if not isinstance(file_base64, str) or not file_base64.strip():
-        return {
-            "steps": PIPELINE_STEPS,
-            "schema": RESUME_OUTPUT_SCHEMA,
-            "text": None,
-            "scores": {"readability": 0, "ats": 0, "match": 0},
-            "fields": {
-                "needsOcr": {"value": False, "confidence": 1.0, "ocr_status": "blocked"},
-                "antivirus": {"value": "failed", "confidence": 1.0, "scan_status": "blocked", "note": "Missing file payload"},
-            },
-            "error": "Missing file payload",
-        }
+        raise IngestError("Missing file payload", _blocked_fields("Missing file payload"), status_code=400)
 
     try:
         file_bytes = base64.b64decode(file_base64, validate=True)
     except (binascii.Error, ValueError):
-        return {
-            "steps": PIPELINE_STEPS,
-            "schema": RESUME_OUTPUT_SCHEMA,
-            "text": None,
-            "scores": {"readability": 0, "ats": 0, "match": 0},
-            "fields": {
-                "needsOcr": {"value": False, "confidence": 1.0, "ocr_status": "blocked"},
-                "antivirus": {"value": "failed", "confidence": 1.0, "scan_status": "blocked", "note": "Invalid base64 payload"},
-            },
-            "error": "Invalid base64 payload",
-        }
+        raise IngestError("Invalid base64 payload", _blocked_fields("Invalid base64 payload"), status_code=400)
 
     if len(file_bytes) > MAX_FILE_BYTES:
-        return {
-            "steps": PIPELINE_STEPS,
-            "schema": RESUME_OUTPUT_SCHEMA,
-            "text": None,
-            "scores": {"readability": 0, "ats": 0, "match": 0},
-            "fields": {
-                "needsOcr": {"value": False, "confidence": 1.0, "ocr_status": "blocked"},
-                "antivirus": {"value": "failed", "confidence": 1.0, "scan_status": "blocked", "note": "File exceeds 5MB limit"},
-            },
-            "error": "File exceeds 5MB limit",
-        }
-
-    text = _extract_text(file_bytes, mime_type, file_name)
+        raise IngestError("File exceeds 5MB limit", _blocked_fields("File exceeds 5MB limit"), status_code=413)
+
+    # Extraction runs alongside the AV scan; its result is only used once the scan passes.
+    # Cancelling the future cannot stop its worker thread, so ``cancel`` also
+    # tells the sandbox to kill the parser child.
+    antivirus = get_antivirus()
+    cancel = threading.Event()
+    extraction = asyncio.ensure_future(asyncio.to_thread(_extract_text, file_bytes, mime_type, file_name, cancel))
+    try:
+        verdict = await antivirus.scan(file_bytes)
+        av_field = antivirus.field(verdict)
+        if antivirus.blocks(verdict):
+            reason = f"Antivirus scan failed: {verdict.signature or verdict.detail}"
+            raise IngestError(reason, _blocked_fields(reason, av_field))
+        text = await extraction
+    except UnsupportedFormatError as exc:
+        needs_ocr = exc.kind == sniff.IMAGE
+        fields = _blocked_fields(str(exc), av_field)
+        # Images need OCR, but nothing here enqueues it; callers must submit the file themselves.
+        fields["needsOcr"] = {"value": needs_ocr, "confidence": 1.0, "ocr_status": "not_queued" if needs_ocr else "unsupported"}
+        fields["fileType"] = {"value": exc.kind, "confidence": 1.0}
+        raise IngestError(str(exc), fields, status_code=415)
+    except ExtractionError as exc:
+        fields = _blocked_fields(str(exc), av_field)
+        fields["extraction"] = {"value": "failed", "confidence": 1.0, "reason": exc.reason, "note": exc.detail}
+        raise IngestError(str(exc), fields)
+    finally:
+        if not extraction.done():
+            cancel.set()
+            extraction.cancel()
+    step_durations["ingest_extract_text"] = int((time.perf_counter() - t) * 1000)
 
     # Safety Check: Prompt Injection
+    t = time.perf_counter()
     is_safe, reason = _is_safe_text(text)
     if not is_safe:
+        raise IngestError(reason or "Unsafe resume text", _blocked_fields(reason, av_field))
+    step_durations["safety_check"] = int((time.perf_counter() - t) * 1000)
+
+    return IngestResult(file_bytes=file_bytes, text=text, antivirus=av_field, step_durations=step_durations)
+
+
+async def run_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Basic extraction + scoring pipeline."""
+    file_base64 = payload.get("file_base64") or payload.get("fileBase64")
+    file_name = payload.get("file_name") or payload.get("fileName")
+    mime_type = payload.get("mime_type") or payload.get("mimeType")
+    target_role = payload.get("target_role") or payload.get("targetRole")
+
+    try:
+        ingested = await ingest_file(file_base64, mime_type, file_name)
+    except IngestError as exc:
         return {
             "steps": PIPELINE_STEPS,
             "schema": RESUME_OUTPUT_SCHEMA,
             "text": None,
             "scores": {"readability": 0, "ats": 0, "match": 0},
-            "fields": {
-                "needsOcr": {"value": False, "confidence": 1.0, "ocr_status": "blocked"},
-                "antivirus": {"value": "failed", "confidence": 1.0, "scan_status": "blocked", "note": reason},
-            },
-            "error": reason,
+            "fields": exc.fields,
+            "error": str(exc),
         }
+    text = ingested.text
 
     fields = _extract_fields(text)
 
@@ -343,7 +437,7 @@ async def run_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
     else:
         fields["needsOcr"] = {"value": False, "confidence": 0.9, "ocr_status": "not_required"}
 
-    fields["antivirus"] = {"value": "pending", "confidence": 0.5, "scan_status": "not_implemented", "note": "stub"}
+    fields["antivirus"] = ingested.antivirus
 
     return {
         "steps": PIPELINE_STEPS,
@@ -0,0 +1,182 @@
+"""
+Prompt-injection scanner.
+
+Text is normalized on the fly (NFKC, case folding, homoglyph folding,
+zero-width removal, whitespace collapse) and fed through a compiled
+Aho-Corasick automaton in one pass, so look-alike evasions are caught and
+scan cost stays flat as the pattern set grows.
+"""
+
+import json
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .ahocorasick import Automaton
+from .config import config
+
+INJECTION_PATTERNS = [
+    "ignore previous instructions",
+    "system prompt",
+    "you are now",
+    "critical system instruction",
+    "simulated terminal",
+    "override all rules",
+    "disregard previous",
+    "stop being",
+    "act as a",  # common for persona injection
+]
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+ZERO_WIDTH = {"\u200b", "\u200c", "\u200d", "\u2060", "\ufeff", "\u00ad", "\u180e"}
+
+# Cyrillic/Greek letters that render like Latin ones.
+HOMOGLYPHS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j",
+    "ѕ": "s", "ԁ": "d", "ɡ": "g", "һ": "h", "ӏ": "l", "ԛ": "q", "ԝ": "w",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "γ": "y", "ω": "w",
+    "ı": "i", "ȷ": "j", "ℓ": "l",
+}
+
+
+class InjectionPattern(NamedTuple):
+    pattern: str
+    severity: str = "high"
+
+
+class InjectionMatch(NamedTuple):
+    pattern: str
+    severity: str
+    start: int
+    end: int
+
+
+def _fold_char(ch: str) -> str:
+    """Normalize one non-ASCII char; returns "" for chars that should vanish."""
+    if ch in ZERO_WIDTH:
+        return ""
+    out = []
+    for c in unicodedata.normalize("NFKC", ch).casefold():
+        if unicodedata.category(c) in {"Mn", "Me", "Cf"}:
+            continue
+        out.append(HOMOGLYPHS.get(c, c))
+    return "".join(out)
+
+
+_ASCII_SEPARATORS = frozenset(" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f_")
+
+
+def normalize_stream(text: str) -> Iterator[Tuple[str, int]]:
+    """Yield ``(normalized_char, original_index)`` pairs.
+
+    Runs of whitespace (and ``_``) collapse to a single space, which is
+    attributed to the first whitespace char of the run.
+    """
+    pending_space = -1
+    emitted = False
+    if text.isascii():
+        # Fast path: lowercasing ASCII never changes length, so do it in C.
+        for i, ch in enumerate(text.lower()):
+            if ch in _ASCII_SEPARATORS:
+                if pending_space < 0:
+                    pending_space = i
+                continue
+            if pending_space >= 0:
+                if emitted:
+                    yield " ", pending_space
+                pending_space = -1
+            yield ch, i
+            emitted = True
+        return
+
+    for i, ch in enumerate(text):
+        if ch < "\x80":
+            if ch in _ASCII_SEPARATORS:
+                if pending_space < 0:
+                    pending_space = i
+                continue
+            folded = ch.lower()
+        else:
+            if ch.isspace():
+                if pending_space < 0:
+                    pending_space = i
+                continue
+            folded = _fold_char(ch)
+            if not folded:
+                continue
+        if pending_space >= 0:
+            if emitted:
+                yield " ", pending_space
+            pending_space = -1
+        for c in folded:
+            yield c, i
+        emitted = True
+
+
+def normalize_text(text: str) -> str:
+    return "".join(c for c, _ in normalize_stream(text))
+
+
+def load_patterns(path: str) -> List[InjectionPattern]:
+    """Load patterns from a JSON file.
+
+    Accepts a list whose items are either plain strings (severity high) or
+    objects with ``pattern`` and optional ``severity`` keys.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    patterns: List[InjectionPattern] = []
+    for item in raw:
+        if isinstance(item, str):
+            patterns.append(InjectionPattern(item))
+        elif isinstance(item, dict) and item.get("pattern"):
+            severity = str(item.get("severity") or "high").lower()
+            if severity not in SEVERITY_RANK:
+                raise ValueError(f"Unknown severity {severity!r} for pattern {item['pattern']!r}")
+            patterns.append(InjectionPattern(str(item["pattern"]), severity))
+    return patterns
+
+
+class InjectionScanner:
+    def __init__(self, patterns: Iterable[InjectionPattern]):
+        self._automaton = Automaton()
+        for p in patterns:
+            key = normalize_text(p.pattern)
+            if key:
+                self._automaton.add(key, p)
+        self._automaton.build()
+
+    @property
+    def pattern_count(self) -> int:
+        return self._automaton.pattern_count
+
+    def iter_matches(self, text: str) -> Iterator[InjectionMatch]:
+        """Yield matches in order of their end offset in ``text``."""
+        for start, end, p in self._automaton.iter_matches(normalize_stream(text)):
+            yield InjectionMatch(p.pattern, p.severity, start, end)
+
+    def scan(self, text: str) -> List[InjectionMatch]:
+        return list(self.iter_matches(text)) if text else []
+
+
+def default_patterns() -> List[InjectionPattern]:
+    patterns = [InjectionPattern(p) for p in INJECTION_PATTERNS]
+    if config.safety.patterns_path:
+        patterns.extend(load_patterns(config.safety.patterns_path))
+    return patterns
+
+
+@lru_cache(maxsize=1)
+def get_scanner() -> InjectionScanner:
+    return InjectionScanner(default_patterns())
+
+
+def first_blocking_match(text: str, min_severity: Optional[str] = None) -> Optional[InjectionMatch]:
+    threshold = SEVERITY_RANK[(min_severity or config.safety.block_severity).lower()]
+    for match in get_scanner().iter_matches(text):
+        if SEVERITY_RANK.get(match.severity, 2) >= threshold:
+            return match
+    return None
@@ -0,0 +1,166 @@
+"""
+Sandboxed extraction — run document parsers in a resource-limited child.
+
+PyMuPDF and python-docx run in a short-lived subprocess with RLIMIT_AS and
+RLIMIT_CPU applied, plus a hard wall-clock kill from the parent, so a
+malformed PDF or zip-bomb DOCX only takes down its own child. Files that
+repeatedly fail are blacklisted by SHA-256 and rejected without a retry.
+
+Children start from a forkserver by default rather than a fork of the
+(multithreaded) server, which could copy a lock some other thread held at
+fork time and deadlock the child.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+from .cache import TTLCache
+from .config import SandboxConfig, config
+
+try:
+    import resource
+except Exception:  # pragma: no cover
+    resource = None
+
+TIMEOUT = "timeout"
+MEMORY = "memory"
+CPU = "cpu"
+CRASH = "crash"
+BLACKLISTED = "blacklisted"
+CANCELLED = "cancelled"
+# How often a waiting parent checks for cancellation.
+CANCEL_POLL_SECONDS = 0.05
+
+
+class ExtractionError(Exception):
+    def __init__(self, reason: str, detail: Optional[str] = None):
+        self.reason = reason
+        self.detail = detail
+        super().__init__(f"Extraction failed ({reason})" + (f": {detail}" if detail else ""))
+
+
+def _mapped_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _apply_limits(memory_mb: int, cpu_seconds: int) -> None:
+    if resource is None:
+        return
+    if memory_mb > 0:
+        limit = _mapped_bytes() + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds > 0:
+        # Soft limit delivers SIGXCPU; the hard limit one second later is SIGKILL.
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def _child(conn, fn: Callable[[bytes], str], data: bytes, memory_mb: int, cpu_seconds: int) -> None:
+    try:
+        _apply_limits(memory_mb, cpu_seconds)
+        conn.send(("ok", fn(data)))
+    except MemoryError:
+        conn.send(("error", MEMORY, None))
+    except BaseException as exc:  # noqa: BLE001 - report anything the parser raises
+        conn.send(("error", CRASH, f"{type(exc).__name__}: {exc}"[:500]))
+    finally:
+        conn.close()
+
+
+class ExtractionSandbox:
+    def __init__(self, settings: SandboxConfig = config.sandbox):
+        self.settings = settings
+        self.strikes: TTLCache[int] = TTLCache(maxsize=settings.blacklist_size, ttl_seconds=settings.blacklist_ttl_seconds)
+        # run() is called from worker threads; TTLCache reorders its OrderedDict even on reads.
+        self._strikes_lock = threading.Lock()
+
+    def _strike(self, key: str) -> None:
+        with self._strikes_lock:
+            self.strikes.set(key, (self.strikes.get(key) or 0) + 1)
+
+    def is_blacklisted(self, key: str) -> bool:
+        with self._strikes_lock:
+            return (self.strikes.get(key) or 0) >= self.settings.max_strikes
+
+    def run(self, fn: Callable[[bytes], str], data: bytes, cancel: Optional[threading.Event] = None) -> str:
+        """Call ``fn(data)`` in a limited subprocess and return its text.
+
+        Setting ``cancel`` kills the child. Raises ExtractionError with a
+        reason of timeout, memory, cpu, crash, blacklisted or cancelled.
+        """
+        if not self.settings.enabled:
+            return fn(data)
+
+        key = hashlib.sha256(data).hexdigest()
+        if self.is_blacklisted(key):
+            raise ExtractionError(BLACKLISTED, "file previously exhausted extraction limits")
+
+        ctx = multiprocessing.get_context(self.settings.start_method)
+        if self.settings.start_method == "forkserver":
+            # Takes effect when the server starts: children then fork with the parsers already imported.
+            ctx.set_forkserver_preload([fn.__module__])
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_child,
+            args=(child_conn, fn, data, self.settings.memory_mb, self.settings.cpu_seconds),
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+
+        message = None
+        ready = cancelled = False
+        deadline = time.monotonic() + self.settings.wall_seconds
+        try:
+            # poll() also returns when the child dies and the pipe hits EOF.
+            while not ready:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+                ready = parent_conn.poll(min(remaining, CANCEL_POLL_SECONDS) if cancel is not None else remaining)
+            if ready:
+                try:
+                    message = parent_conn.recv()
+                except EOFError:
+                    message = None
+        finally:
+            parent_conn.close()
+            killed = not ready and proc.is_alive()
+            if killed:
+                proc.kill()
+            proc.join(timeout=5)
+
+        if message and message[0] == "ok":
+            return message[1]
+        if cancelled:
+            # The caller gave up on this file; that says nothing about the file.
+            raise ExtractionError(CANCELLED)
+
+        if message:
+            reason, detail = message[1], message[2]
+        elif killed:
+            reason, detail = TIMEOUT, f"exceeded {self.settings.wall_seconds:g}s"
+        elif proc.exitcode == -signal.SIGXCPU:
+            reason, detail = CPU, f"exceeded {self.settings.cpu_seconds}s of CPU"
+        else:
+            reason, detail = CRASH, f"exit code {proc.exitcode}"
+
+        self._strike(key)
+        raise ExtractionError(reason, detail)
+
+
+@lru_cache(maxsize=1)
+def get_sandbox() -> ExtractionSandbox:
+    return ExtractionSandbox()
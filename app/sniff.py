@@ -0,0 +1,109 @@
+"""
+Content sniffing — identify an upload's format from its leading bytes.
+
+Only a fixed-size window at the head (and, for ZIP containers, the tail)
+of the buffer is inspected, so the cost is constant regardless of file size.
+"""
+
+import codecs
+from typing import Optional
+
+SNIFF_WINDOW = 4096
+ZIP_TAIL_WINDOW = 64 * 1024
+
+PDF = "pdf"
+DOCX = "docx"
+ZIP = "zip"
+DOC = "doc"
+RTF = "rtf"
+IMAGE = "image"
+TEXT = "text"
+UNKNOWN = "unknown"
+
+# Formats we can turn into text today.
+EXTRACTABLE_KINDS = {PDF, DOCX, RTF, TEXT}
+
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ZIP_MAGICS = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+
+_IMAGE_MAGICS = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpeg",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+    b"II*\x00": "tiff",
+    b"MM\x00*": "tiff",
+}
+
+_TEXT_BOMS = {
+    codecs.BOM_UTF8: "utf-8-sig",
+    codecs.BOM_UTF16_LE: "utf-16",
+    codecs.BOM_UTF16_BE: "utf-16",
+}
+
+# Control bytes other than \t \n \r \f almost never appear in real text.
+_BINARY_CONTROL_BYTES = bytes(b for b in range(32) if b not in (9, 10, 12, 13))
+
+
+def sniff_image_format(data: bytes) -> Optional[str]:
+    head = data[:16]
+    for magic, name in _IMAGE_MAGICS.items():
+        if head.startswith(magic):
+            return name
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    # "BM" alone is too weak (plain text can start with it); check the reserved fields.
+    if head[:2] == b"BM" and head[6:10] == b"\x00\x00\x00\x00":
+        return "bmp"
+    return None
+
+
+def _looks_like_text(window: bytes) -> bool:
+    if not window:
+        return False
+    if b"\x00" in window:
+        return False
+    # Tolerate a multi-byte sequence cut off at the window boundary.
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(window, final=False)
+        return True
+    except UnicodeDecodeError:
+        pass
+    # Legacy 8-bit encodings: accept when control bytes are rare.
+    controls = len(window) - len(window.translate(None, _BINARY_CONTROL_BYTES))
+    return controls / len(window) < 0.01
+
+
+def text_encoding(data: bytes) -> str:
+    head = data[:4]
+    for bom, encoding in _TEXT_BOMS.items():
+        if head.startswith(bom):
+            return encoding
+    return "utf-8"
+
+
+def sniff_file_type(data: bytes) -> str:
+    """Return one of the kind constants above based on magic bytes."""
+    if not data:
+        return UNKNOWN
+    head = data[:SNIFF_WINDOW]
+
+    # PDF readers accept the header anywhere in the first 1KB.
+    if b"%PDF-" in head[:1024]:
+        return PDF
+    if head.startswith(_ZIP_MAGICS):
+        # Entry names live in local headers (head) and the central directory (tail).
+        if b"word/" in head or b"word/" in data[-ZIP_TAIL_WINDOW:]:
+            return DOCX
+        return ZIP
+    if head.startswith(_OLE_MAGIC):
+        return DOC
+    if head.lstrip()[:5] == b"{\\rtf":
+        return RTF
+    if sniff_image_format(head):
+        return IMAGE
+    if any(head.startswith(bom) for bom in _TEXT_BOMS):
+        return TEXT
+    if _looks_like_text(head):
+        return TEXT
+    return UNKNOWN
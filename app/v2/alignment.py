@@ -1,10 +1,50 @@
+"""
+Role alignment in two stages: a per-role profile from
+``alignment_profiles`` (generated once per normalized role and cached),
+and a local comparison of the resume against it. The LLM only writes the
+narrative, unless ``ALIGNMENT_MODE=full`` sends the whole resume to it as
+before.
+"""
+
+from app.config import config
+
+from .alignment_profiles import CachedProfile, cached_alignment_profile, get_alignment_profile, get_alignment_profiles
 from .llm import call_gemini
-from .prompts import ROLE_ALIGNMENT_PROMPT
-from .types import AlignmentGap, RoleAlignment
+from .prompts import ALIGNMENT_NARRATIVE_PROMPT, ROLE_ALIGNMENT_PROMPT
+from .semantic_match import MatchResult, RequirementMatch, RoleProfile, get_role_matcher, match_resumes
+from .types import AlignmentGap, JobRequirements, RoleAlignment
+
+BASE_FIT = 25.0
+# Strong-impact bullets and "led" roles that earn the full impact and
+# ownership weights (3 points each under the default weights).
+IMPACT_SATURATION = 20 / 3
+OWNERSHIP_SATURATION = 10 / 3
+
+
+def _requirement_gap(match: RequirementMatch, profile: RoleProfile) -> AlignmentGap:
+    req = match.requirement
+    if profile.source == "job_description":
+        detail = f"{'Required' if req.weight >= 1 else 'Preferred'} by the job description but not evidenced"
+    else:
+        detail = f"Expected for {profile.title} but not evidenced"
+    area = f"{'skill' if req.kind == 'skill' else 'competency'}:{req.text}"
+    return AlignmentGap(area=area, severity="medium" if req.weight >= 1 else "low", detail=detail)
 
 
-def _heuristic_alignment(target_role: str, canonical, signals: dict) -> RoleAlignment:
-    role_lower = (target_role or "").lower()
+def _heuristic_alignment(
+    target_role: str,
+    canonical,
+    signals: dict,
+    requirements: JobRequirements | None = None,
+    match: MatchResult | None = None,
+    profile: CachedProfile | None = None,
+) -> RoleAlignment:
+    """Local alignment: impact and ownership evidence plus an offline
+    semantic match against the role's profile, weighted by the profile.
+    A job description's skills replace the profile's competencies.
+    ``match`` may be precomputed, e.g. by ``match_resumes`` over a batch."""
+    profile = profile or cached_alignment_profile(target_role)
+    weights = profile.profile.signal_weights
     strengths = []
     gaps = []
 
@@ -15,12 +55,6 @@ def _heuristic_alignment(target_role: str, canonical, signals: dict) -> RoleAlig
     else:
         gaps.append(AlignmentGap(area="impact evidence", severity="high", detail="Few measurable outcomes for target role"))
 
-    skill_signal = signals.get("skills")
-    hard = [h.name.lower() for h in getattr(skill_signal, "hard_skills", [])]
-    for token in role_lower.split():
-        if len(token) > 3 and token not in hard:
-            gaps.append(AlignmentGap(area=f"keyword:{token}", severity="low", detail="Target-role keyword weakly represented"))
-
     ownership = signals.get("ownership", [])
     led_count = sum(1 for o in ownership if getattr(o, "ownership_level", "") == "led")
     if led_count:
@@ -28,20 +62,106 @@ def _heuristic_alignment(target_role: str, canonical, signals: dict) -> RoleAlig
     else:
         gaps.append(AlignmentGap(area="ownership", severity="medium", detail="Leadership/ownership not explicit"))
 
-    fit = 55.0 + min(20.0, len(strong_impacts) * 3.0) + min(10.0, led_count * 3.0) - min(25.0, len(gaps) * 2.5)
+    matcher = get_role_matcher()
+    vectors = profile.vectors
+    if matcher is not None and requirements is not None and (requirements.required_skills or requirements.optional_skills):
+        vectors = matcher.profile(target_role, requirements)
+    role_profile = None
+    if vectors is not None:
+        role_profile = vectors.profile
+        match = match or match_resumes([canonical], vectors)[0]
+        for m in match.matched[:3]:
+            strengths.append(f"{m.requirement.text}: \"{m.evidence[:80]}\"")
+        gaps.extend(_requirement_gap(m, role_profile) for m in match.missing)
+        semantic_fit = match.fit_score
+    else:
+        hard = [h.name.lower() for h in getattr(signals.get("skills"), "hard_skills", [])]
+        for token in (target_role or "").lower().split():
+            if len(token) > 3 and token not in hard:
+                gaps.append(AlignmentGap(area=f"keyword:{token}", severity="low", detail="Target-role keyword weakly represented"))
+        semantic_fit = 50.0
+
+    fit = (
+        BASE_FIT
+        + weights["requirements"] * semantic_fit / 100
+        + weights["impact"] * min(1.0, len(strong_impacts) / IMPACT_SATURATION)
+        + weights["ownership"] * min(1.0, led_count / OWNERSHIP_SATURATION)
+    )
     fit = max(0.0, min(100.0, fit))
+    if role_profile is not None:
+        covered = len(match.matched)
+        narrative = f"Evidence found for {covered} of {covered + len(match.missing)} {role_profile.title} requirements; fit also reflects impact evidence and ownership clarity."
+    else:
+        narrative = "Overall fit based on impact evidence, ownership clarity, and role-keyword overlap."
     return RoleAlignment(
-        fit_score=fit,
+        fit_score=round(fit, 2),
         strength_alignment=strengths[:6],
         gaps=gaps[:6],
-        narrative_assessment="Overall fit based on impact evidence, ownership clarity, and role-keyword overlap.",
-        market_notes="Refine role-specific keywords and quantified outcomes for stronger recruiter pass-through.",
+        narrative_assessment=narrative,
+        market_notes=profile.profile.market_notes,
     )
 
 
-async def run_role_alignment(target_role: str, canonical, signals: dict, model: str | None = None) -> RoleAlignment:
+async def _narrative(alignment: RoleAlignment, target_role: str, model: str) -> str | None:
+    payload = {
+        "target_role": target_role,
+        "fit_score": alignment.fit_score,
+        "strengths": alignment.strength_alignment,
+        "gaps": [g.model_dump() for g in alignment.gaps],
+    }
+    llm = await call_gemini(ALIGNMENT_NARRATIVE_PROMPT, str(payload), model=model)
+    if isinstance(llm, dict) and isinstance(llm.get("narrative_assessment"), str) and llm["narrative_assessment"].strip():
+        return llm["narrative_assessment"].strip()
+    return None
+
+
+async def run_role_alignment(
+    target_role: str,
+    canonical,
+    signals: dict,
+    model: str | None = None,
+    requirements: JobRequirements | None = None,
+    stats: dict | None = None,
+    narrative: bool = True,
+) -> RoleAlignment:
+    """Score alignment against the role's cached profile locally; the LLM
+    only rewrites the narrative, unless ``narrative`` is False. In ``full`` mode the whole resume goes to
+    the LLM instead, with the local comparison as fallback. How the
+    alignment was served goes into ``stats``."""
+    model = model or "gemini-2.5-flash"
+    settings = config.alignment
+    profiles = get_alignment_profiles()
+    stats = stats if stats is not None else {}
+    stats.update({"mode": settings.mode, "full_llm_call": False, "narrative": "template"})
+    if settings.mode == "full":
+        alignment = await _full_alignment(target_role, canonical, signals, model, requirements)
+        if alignment is not None:
+            stats["full_llm_call"] = True
+            profiles.served["full_llm"] += 1
+            return alignment
+
+    profile = await get_alignment_profile(target_role, model=model, stats=stats)
+    alignment = _heuristic_alignment(target_role, canonical, signals, requirements, profile=profile)
+    text = await _narrative(alignment, target_role, model) if narrative and settings.narrative_llm else None
+    if text:
+        alignment.narrative_assessment = text
+        stats["narrative"] = "llm"
+        profiles.served["narrative_llm"] += 1
+    else:
+        profiles.served["local"] += 1
+    return alignment
+
+
+async def _full_alignment(
+    target_role: str,
+    canonical,
+    signals: dict,
+    model: str,
+    requirements: JobRequirements | None,
+) -> RoleAlignment | None:
     payload = {
         "target_role": target_role,
+        "job_requirements": requirements.model_dump(exclude={"content_hash", "source"}) if requirements else None,
         "canonical": canonical.model_dump(),
         "signals": {
             "impact": [x.model_dump() for x in signals.get("impact", [])],
@@ -51,10 +171,10 @@ async def run_role_alignment(target_role: str, canonical, signals: dict, model:
             "red_flags": signals.get("red_flags").model_dump() if signals.get("red_flags") else {},
         },
     }
-    llm = await call_gemini(ROLE_ALIGNMENT_PROMPT, str(payload), model=model or "gemini-2.5-flash")
+    llm = await call_gemini(ROLE_ALIGNMENT_PROMPT, str(payload), model=model)
     if isinstance(llm, dict):
         try:
             return RoleAlignment.model_validate(llm)
         except Exception:
             pass
-    return _heuristic_alignment(target_role, canonical, signals)
+    return None
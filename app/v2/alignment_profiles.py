@@ -0,0 +1,199 @@
+"""
+Per-role alignment profiles, generated once per normalized role and cached.
+
+A profile is everything alignment needs to know about a role independent
+of any resume: the competencies to look for, how the fit score splits
+between requirement coverage, impact evidence and ownership evidence, and
+market notes. It comes from the LLM when one answers, else from the role
+catalog and the role's seniority. Profiles are keyed by the normalized
+role (so "Sr. Backend Engineer" and "Senior Backend Developer" share one),
+the model and the prompt version. Concurrent requests for the same role
+share one in-flight generation. A heuristic profile standing in for a
+failed LLM call is kept only for ``ALIGNMENT_PROFILE_FALLBACK_TTL_SECONDS``.
+
+The per-resume comparison against a profile runs locally in
+``alignment``. ``AlignmentProfileCache.stats`` reports how often that made
+a full per-resume LLM call unnecessary.
+"""
+
+import asyncio
+import json
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.cache import TTLCache
+from app.config import AlignmentConfig, config
+
+from .llm import call_gemini
+from .prompts import ROLE_PROFILE_PROMPT
+from .roles import NormalizedRole, normalize_role
+from .semantic_match import ProfileVectors, Requirement, RoleProfile, get_role_matcher
+from .signal_cache import prompt_version
+from .types import ProfileCompetency, RoleAlignmentProfile
+
+# Fit points on top of the base score; the defaults reproduce the original
+# fixed formula (0.45 x coverage, up to 20 for impact, up to 10 for ownership).
+DEFAULT_WEIGHTS = {"requirements": 45.0, "impact": 20.0, "ownership": 10.0}
+LEADERSHIP_WEIGHTS = {"requirements": 40.0, "impact": 20.0, "ownership": 15.0}
+LEADERSHIP_LEVELS = frozenset({"lead", "staff", "principal", "director"})
+DEFAULT_MARKET_NOTES = "Refine role-specific keywords and quantified outcomes for stronger recruiter pass-through."
+MARKET_NOTES = {
+    "engineering": "Screens look for shipped systems with scale, latency or reliability outcomes; name the stack next to each result.",
+    "data": "Hiring managers look for analyses or models that changed a decision; quantify the business effect.",
+    "product": "Lead with launches and the adoption, revenue or retention they moved.",
+    "design": "Link a portfolio and tie design work to conversion or usability outcomes.",
+    "sales": "Quota attainment and deal sizes are screened first; state them per year.",
+    "marketing": "Channel results with spend and return are screened first.",
+}
+LEADERSHIP_NOTE = " At this level, scope and ownership are weighed as heavily as hands-on results."
+
+
+class CachedProfile(NamedTuple):
+    profile: RoleAlignmentProfile
+    # None when numpy is unavailable and matching falls back to keywords.
+    vectors: ProfileVectors | None
+
+
+def _weights(raw: dict | None) -> dict[str, float]:
+    """Known keys only, rescaled to the default total so an LLM profile
+    cannot move the score range."""
+    weights = {k: max(0.0, float(v)) for k, v in (raw or {}).items() if k in DEFAULT_WEIGHTS}
+    total = sum(weights.values())
+    if not total:
+        return dict(DEFAULT_WEIGHTS)
+    scale = sum(DEFAULT_WEIGHTS.values()) / total
+    return {k: round(weights.get(k, 0.0) * scale, 2) for k in DEFAULT_WEIGHTS}
+
+
+def heuristic_profile(role: NormalizedRole) -> CachedProfile:
+    """Competencies from the role catalog (or the title), weights and notes
+    from the function area and seniority."""
+    matcher = get_role_matcher()
+    vectors = matcher.profile(role.title) if matcher is not None else None
+    competencies = [
+        ProfileCompetency(text=r.text, kind=r.kind, weight=r.weight) for r in (vectors.profile.requirements if vectors else ())
+    ]
+    leadership = role.seniority in LEADERSHIP_LEVELS
+    notes = MARKET_NOTES.get(role.function_area or "", DEFAULT_MARKET_NOTES) + (LEADERSHIP_NOTE if leadership else "")
+    profile = RoleAlignmentProfile(
+        role_key=role.cache_key,
+        title=role.title,
+        seniority=role.seniority,
+        competencies=competencies,
+        signal_weights=dict(LEADERSHIP_WEIGHTS if leadership else DEFAULT_WEIGHTS),
+        market_notes=notes,
+        source="heuristic",
+    )
+    return CachedProfile(profile, vectors)
+
+
+async def _generate(role: NormalizedRole, model: str) -> CachedProfile:
+    payload = {"title": role.title, "seniority": role.seniority, "specialization": list(role.specialization)}
+    llm = await call_gemini(ROLE_PROFILE_PROMPT, json.dumps(payload), model=model)
+    if isinstance(llm, dict):
+        try:
+            competencies = [ProfileCompetency.model_validate(c) for c in llm.get("competencies") or []]
+        except Exception:
+            competencies = []
+        matcher = get_role_matcher()
+        if competencies:
+            profile = RoleAlignmentProfile(
+                role_key=role.cache_key,
+                title=role.title,
+                seniority=role.seniority,
+                competencies=competencies,
+                signal_weights=_weights(llm.get("signal_weights")),
+                market_notes=llm.get("market_notes") if isinstance(llm.get("market_notes"), str) else None,
+                source="llm",
+            )
+            vectors = None
+            if matcher is not None:
+                requirements = tuple(Requirement(c.text, c.kind, c.weight) for c in competencies)
+                vectors = ProfileVectors(RoleProfile(f"role:{role.cache_key}", role.title, requirements, "llm"), matcher.vectorizer)
+            return CachedProfile(profile, vectors)
+    return heuristic_profile(role)
+
+
+class AlignmentProfileCache:
+    def __init__(self, settings: AlignmentConfig = config.alignment):
+        self.profiles: TTLCache[CachedProfile] = TTLCache(maxsize=settings.profile_cache_size, ttl_seconds=settings.profile_cache_ttl_seconds)
+        self.fallback_ttl_seconds = settings.profile_fallback_ttl_seconds
+        self.in_flight: dict[str, asyncio.Future] = {}
+        # Alignments by how they were served: "local", "narrative_llm" or "full_llm".
+        self.served: Counter = Counter()
+
+    def stats(self) -> dict:
+        total = sum(self.served.values())
+        without = total - self.served["full_llm"]
+        lookups = self.profiles.hits + self.profiles.misses
+        return {
+            "alignments": total,
+            "served": dict(self.served),
+            "without_full_llm": without,
+            "without_full_llm_rate": round(without / total, 3) if total else 0.0,
+            "profiles_cached": len(self.profiles),
+            "profile_hit_rate": round(self.profiles.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_alignment_profiles() -> AlignmentProfileCache:
+    return AlignmentProfileCache()
+
+
+def _key(role: NormalizedRole, model: str) -> str:
+    return f"{role.cache_key}\x1f{model}\x1f{prompt_version(ROLE_PROFILE_PROMPT)}"
+
+
+async def get_alignment_profile(target_role: str, model: str | None = None, stats: dict | None = None) -> CachedProfile:
+    """The profile for ``target_role``'s normalized role, generated on the
+    first request for it. Hit/miss and the profile source go into ``stats``."""
+    model = model or "gemini-2.5-flash"
+    role = normalize_role(target_role or "")
+    key = _key(role, model)
+    cache = get_alignment_profiles()
+    cached = cache.profiles.get(key)
+    hit = cached is not None
+    if cached is None:
+        pending = cache.in_flight.get(key)
+        if pending is not None:
+            try:
+                cached = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request that started the generation was cancelled; take it over.
+                return await get_alignment_profile(target_role, model, stats)
+            hit = True
+        else:
+            pending = asyncio.get_running_loop().create_future()
+            cache.in_flight[key] = pending
+            try:
+                cached = await _generate(role, model)
+                cache.profiles.set(key, cached, None if cached.profile.source == "llm" else cache.fallback_ttl_seconds)
+                pending.set_result(cached)
+            except asyncio.CancelledError:
+                pending.cancel()
+                raise
+            except BaseException as exc:
+                pending.set_exception(exc)
+                # Nobody may be waiting; mark the exception retrieved.
+                pending.exception()
+                raise
+            finally:
+                cache.in_flight.pop(key, None)
+    if stats is not None:
+        stats.update({"role_key": role.cache_key, "profile_cache_hit": hit, "profile_source": cached.profile.source})
+    return cached
+
+
+def cached_alignment_profile(target_role: str, model: str | None = None) -> CachedProfile:
+    """The cached profile when there is one, else the heuristic profile
+    (not cached), for synchronous callers such as ``simulate``."""
+    role = normalize_role(target_role or "")
+    key = _key(role, model or "gemini-2.5-flash")
+    cache = get_alignment_profiles()
+    if key in cache.profiles:
+        return cache.profiles.get(key)
+    return heuristic_profile(role)
@@ -0,0 +1,42 @@
+"""
+Analysis store — finished analyses kept by ``analysis_id``.
+
+Holds the canonical resume, typed signals, alignment, score and
+recommendations of recent /v2/analyze runs, so follow-up requests such as
+/v2/simulate work from them without re-running the pipeline.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.cache import TTLCache
+from app.config import AnalysisStoreConfig, config
+
+from .types import CanonicalResume, JobRequirements, Recommendation, ResumeScore, RoleAlignment
+
+
+class StoredAnalysis(NamedTuple):
+    analysis_id: str
+    target_role: str
+    canonical: CanonicalResume
+    signals: dict
+    alignment: RoleAlignment
+    score: ResumeScore
+    recommendations: list[Recommendation]
+    requirements: JobRequirements | None = None
+
+
+class AnalysisStore:
+    def __init__(self, settings: AnalysisStoreConfig = config.analysis_store):
+        self.analyses: TTLCache[StoredAnalysis] = TTLCache(maxsize=settings.size, ttl_seconds=settings.ttl_seconds)
+
+    def get(self, analysis_id: str) -> StoredAnalysis | None:
+        return self.analyses.get(analysis_id)
+
+    def put(self, analysis: StoredAnalysis) -> None:
+        self.analyses.set(analysis.analysis_id, analysis)
+
+
+@lru_cache(maxsize=1)
+def get_analysis_store() -> AnalysisStore | None:
+    return AnalysisStore() if config.analysis_store.enabled else None
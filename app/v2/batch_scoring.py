@@ -0,0 +1,263 @@
+"""
+Batch scoring — compute_score vectorized over many stored analyses.
+
+Rescoring a corpus after a change to ``WEIGHTS`` or a dimension formula
+should not mean rebuilding pydantic objects per resume. Each analysis is
+reduced once to a ``ScoreInputs`` row (counts, sums and rates the six
+dimensions read). Rows pack into NumPy columns, and ``score_batch``
+evaluates every dimension, the overall score, confidence and tier as array
+expressions. The formulas mirror app/v2/scoring.py operation for
+operation, so results are bit-identical to ``compute_score``;
+tests/unit/test_batch_scoring.py holds them to that.
+
+    python -m app.v2.batch_scoring rescore --summaries corpus.npz --out scores.npz [--weights weights.json]
+"""
+
+import argparse
+import json
+from typing import NamedTuple
+
+from .scoring import WEIGHTS, skill_overlap
+from .timeline import Timeline, resume_timeline
+from .types import (
+    ATSSignal,
+    CanonicalResume,
+    ImpactSignal,
+    JobRequirements,
+    OwnershipSignal,
+    RedFlagSignal,
+    RoleAlignment,
+    SkillSignal,
+)
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+DEPTH_MAP = {"expert": 1.0, "proficient": 0.75, "familiar": 0.5}
+TIERS = ("strong", "competitive", "needs-work", "major-gaps")
+
+
+class ScoreInputs(NamedTuple):
+    impact_count: int
+    impact_strong: int
+    impact_weak: int
+    star_sum: float
+    ownership_count: int
+    ownership_led: int
+    ownership_contributed: int
+    ownership_unclear: int
+    hard_count: int
+    depth_sum: float
+    skill_overlap: float
+    skill_terms: float
+    ats_rate: float
+    flags_high: int
+    flags_medium: int
+    flags_low: int
+    has_summary: bool
+    dated_roles: int
+    undated_roles: int
+    fit_score: float
+    has_experience: bool
+    has_education: bool
+    has_skills: bool
+    has_ats: bool
+    has_red_flags: bool
+
+
+def summarize(
+    canonical,
+    signals: dict,
+    alignment,
+    target_role: str,
+    timeline: Timeline | None = None,
+    requirements: JobRequirements | None = None,
+) -> ScoreInputs:
+    """Reduce one analysis to the numbers compute_score reads."""
+    impact = signals.get("impact", []) or []
+    ownership = signals.get("ownership", []) or []
+    skills_signal = signals.get("skills")
+    hard = getattr(skills_signal, "hard_skills", []) if skills_signal else []
+    ats = signals.get("ats")
+    red_flags = signals.get("red_flags")
+    flags = getattr(red_flags, "flags", []) if red_flags else []
+    severities = [getattr(f, "severity", "low") for f in flags]
+    overlap, terms = skill_overlap(hard, target_role, requirements) if hard else (0, 0)
+    timeline = resume_timeline(canonical, timeline)
+    return ScoreInputs(
+        impact_count=len(impact),
+        impact_strong=sum(1 for i in impact if getattr(i, "quantification", "") == "strong"),
+        impact_weak=sum(1 for i in impact if getattr(i, "quantification", "") == "weak"),
+        star_sum=sum(float(getattr(i, "star_score", 0)) for i in impact),
+        ownership_count=len(ownership),
+        ownership_led=sum(1 for o in ownership if getattr(o, "ownership_level", "") == "led"),
+        ownership_contributed=sum(1 for o in ownership if getattr(o, "ownership_level", "") == "contributed"),
+        ownership_unclear=sum(1 for o in ownership if getattr(o, "ownership_level", "") == "unclear"),
+        hard_count=len(hard),
+        depth_sum=sum(DEPTH_MAP.get(getattr(s, "depth", "familiar"), 0.5) for s in hard),
+        skill_overlap=overlap,
+        skill_terms=terms,
+        ats_rate=float(getattr(ats, "pass_rate", 0.0) or 0.0),
+        flags_high=severities.count("high"),
+        flags_medium=severities.count("medium"),
+        flags_low=len(severities) - severities.count("high") - severities.count("medium"),
+        has_summary=bool(getattr(canonical, "summary", None)),
+        dated_roles=len(timeline),
+        undated_roles=len(timeline.undated),
+        fit_score=float(getattr(alignment, "fit_score", 50.0) or 50.0),
+        has_experience=bool(getattr(canonical, "experience", [])),
+        has_education=bool(getattr(canonical, "education", [])),
+        has_skills=bool(getattr(canonical, "skills", [])),
+        has_ats=bool(ats),
+        has_red_flags=red_flags is not None,
+    )
+
+
+def summarize_result(result: dict) -> ScoreInputs:
+    """Summarize a stored ``ResumeDoctorResult`` dump."""
+    raw = result.get("signals", {})
+    signals = {
+        "impact": [ImpactSignal.model_validate(x) for x in raw.get("impact", [])],
+        "ownership": [OwnershipSignal.model_validate(x) for x in raw.get("ownership", [])],
+        "skills": SkillSignal.model_validate(raw["skills"]) if raw.get("skills") is not None else None,
+        "ats": ATSSignal.model_validate(raw["ats"]) if raw.get("ats") is not None else None,
+        "red_flags": RedFlagSignal.model_validate(raw["red_flags"]) if raw.get("red_flags") is not None else None,
+    }
+    canonical = CanonicalResume.model_validate(result["canonical"])
+    alignment = RoleAlignment.model_validate(result.get("alignment") or {})
+    requirements = JobRequirements.model_validate(result["job_requirements"]) if result.get("job_requirements") else None
+    return summarize(canonical, signals, alignment, result.get("target_role") or "", requirements=requirements)
+
+
+def pack(rows: list[ScoreInputs]) -> dict:
+    """Column arrays keyed by ScoreInputs field name."""
+    columns = list(zip(*rows)) if rows else [[] for _ in ScoreInputs._fields]
+    return {name: np.asarray(values, dtype=np.float64) for name, values in zip(ScoreInputs._fields, columns)}
+
+
+def save_batch(batch: dict, path: str) -> None:
+    with open(path, "wb") as fh:
+        np.savez_compressed(fh, **batch)
+
+
+def load_batch(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in ScoreInputs._fields}
+
+
+def _round2(values):
+    """Python's ``round(x, 2)`` elementwise.
+
+    ``np.round`` scales by 100 first, which can land on the other side of a
+    tie; values close to one are re-rounded in Python so results match.
+    """
+    scaled = values * 100
+    rounded = np.round(values, 2)
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), 2) for v in values[near_tie]]
+    return rounded
+
+
+def _clamp(values):
+    return np.minimum(np.maximum(values, 0.0), 100.0)
+
+
+def _ratio(part, whole):
+    return part / np.maximum(whole, 1)
+
+
+def score_batch(batch: dict, weights: dict[str, float] = WEIGHTS) -> dict:
+    """Dimension scores, weighted contributions, overall, confidence and tier
+    for every row of a packed batch."""
+    b = batch
+
+    impact = np.where(
+        b["impact_count"] > 0,
+        _clamp(_ratio(b["impact_strong"], b["impact_count"]) * 70 + _ratio(b["impact_weak"], b["impact_count"]) * 20 + _ratio(b["star_sum"], b["impact_count"]) * 10),
+        20.0,
+    )
+    ownership = np.where(
+        b["ownership_count"] > 0,
+        _clamp(
+            _ratio(b["ownership_led"], b["ownership_count"]) * 90
+            + _ratio(b["ownership_contributed"], b["ownership_count"]) * 60
+            - _ratio(b["ownership_unclear"], b["ownership_count"]) * 25
+        ),
+        30.0,
+    )
+    skills = np.where(
+        b["hard_count"] > 0,
+        _clamp(_ratio(b["depth_sum"], b["hard_count"]) * 70 + _ratio(b["skill_overlap"], b["skill_terms"]) * 30),
+        25.0,
+    )
+    ats = _clamp(b["ats_rate"] * 100)
+    red_flags = _clamp(100 - (b["flags_high"] * 20 + b["flags_medium"] * 10 + b["flags_low"] * 4))
+    progression = b["dated_roles"] * 8 + b["undated_roles"] * 4
+    narrative = _clamp(b["has_summary"] * 25 + np.minimum(progression, 25) + b["fit_score"] * 0.5)
+
+    dimensions = {
+        "impact_quality": impact,
+        "ownership": ownership,
+        "skills_relevance": skills,
+        "ats_compliance": ats,
+        "red_flag_penalty": red_flags,
+        "narrative_coherence": narrative,
+    }
+    contributions = {name: _round2(score * weights[name]) for name, score in dimensions.items()}
+    overall = np.zeros(len(impact))
+    for contribution in contributions.values():
+        overall = overall + contribution
+
+    completeness = np.zeros(len(impact))
+    for column, share in (
+        ("has_experience", 0.2),
+        ("has_education", 0.15),
+        ("has_skills", 0.15),
+        ("impact_count", 0.2),
+        ("ownership_count", 0.1),
+        ("has_ats", 0.1),
+        ("has_red_flags", 0.1),
+    ):
+        completeness = completeness + np.where(b[column] > 0, share, 0.0)
+
+    tier = np.select([overall >= 80, overall >= 60, overall >= 40], TIERS[:3], TIERS[3])
+    return {
+        "dimensions": dimensions,
+        "contributions": contributions,
+        "overall": _round2(_clamp(overall)),
+        "confidence": _round2(_clamp(completeness * 100)),
+        "tier": tier,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rescore packed analysis summaries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rescore = sub.add_parser("rescore")
+    rescore.add_argument("--summaries", required=True, help=".npz written by save_batch")
+    rescore.add_argument("--out", required=True)
+    rescore.add_argument("--weights", help="JSON object overriding dimension weights")
+    args = parser.parse_args()
+
+    weights = dict(WEIGHTS)
+    if args.weights:
+        with open(args.weights, encoding="utf-8") as fh:
+            weights.update(json.load(fh))
+    scores = score_batch(load_batch(args.summaries), weights)
+    with open(args.out, "wb") as fh:
+        np.savez_compressed(
+            fh,
+            overall=scores["overall"],
+            confidence=scores["confidence"],
+            tier=scores["tier"],
+            **{f"dim_{name}": values for name, values in scores["dimensions"].items()},
+        )
+    tiers = {tier: int((scores["tier"] == tier).sum()) for tier in TIERS}
+    print(f"rescored {len(scores['overall'])} analyses -> {args.out} {tiers}")
+
+
+if __name__ == "__main__":
+    main()
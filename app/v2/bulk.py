@@ -0,0 +1,437 @@
+"""
+Offline bulk analysis through batch-job LLM submission.
+
+Nightly re-analysis of the corpus does not need interactive latency, so
+it should not go through the synchronous ``call_gemini`` path next to live
+traffic. A ``BulkJob`` runs the unmodified v2 pipeline over its payloads
+in rounds:
+
+1. Replay. Every unfinished payload runs through ``run_v2_pipeline``,
+   ``BULK_CONCURRENCY`` at a time, with ``llm_override`` answering LLM
+   calls from the responses collected so far. A call with no response yet
+   is recorded and raises ``ResponsePending``, which abandons that
+   pipeline for the round. Payloads that finish are written to
+   ``results.jsonl``. Uploads are ingested (decoded, scanned, extracted)
+   on their first round only; the text is kept in ``ingested.jsonl``.
+2. Submit. The recorded requests go into request files per model,
+   ``requests/round-<n>-<model>-<part>.jsonl``, one generateContent body
+   per line keyed by a hash of the call, each file under
+   ``BULK_MAX_REQUEST_BYTES``. Each file is submitted to a ``BatchBackend``.
+   If a submission fails, the ones already made are still waited on, so
+   nothing is submitted twice.
+3. Poll. The job waits until the backend jobs finish, then appends their
+   responses to ``responses.jsonl`` and replays again.
+
+Each round answers at least the earliest LLM stage left in every pipeline
+(canonicalize, then the extractors and JD, then the alignment profile and
+narrative, then the guidance polish), so a corpus finishes in a few
+rounds. A failed backend job answers its requests with None, and the
+stages fall back to their heuristics as they do on live LLM failures.
+
+All state lives under ``BULK_DIR/<job_id>/`` and ``manifest.json`` is
+rewritten after every step, so a job resumes from its id after a crash or
+redeploy without resubmitting what the backend already has.
+
+    python -m app.v2.bulk submit --payloads corpus.jsonl [--wait]
+    python -m app.v2.bulk resume JOB_ID
+    python -m app.v2.bulk status JOB_ID
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+
+from app.config import BulkConfig, config
+
+from app.pipeline import IngestResult
+
+from .llm import build_request, llm_override, parse_response
+from .pipeline import ingest_payload, run_v2_pipeline
+from .types import ResumeDoctorResult
+
+GEMINI_API_ROOT = "https://generativelanguage.googleapis.com/v1beta/"
+GEMINI_BATCH_URL = GEMINI_API_ROOT + "models/{model}:batchGenerateContent"
+GEMINI_BATCH_STATES = {
+    "BATCH_STATE_SUCCEEDED": "succeeded",
+    "BATCH_STATE_FAILED": "failed",
+    "BATCH_STATE_CANCELLED": "failed",
+    "BATCH_STATE_EXPIRED": "failed",
+}
+
+
+class ResponsePending(Exception):
+    """An LLM call whose batch response has not been collected yet."""
+
+
+def request_key(prompt: str, text: str, model: str, temperature: float, max_tokens: int) -> str:
+    return hashlib.sha256(json.dumps([prompt, text, model, temperature, max_tokens]).encode("utf-8")).hexdigest()
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _append_jsonl(path: Path, rows: list[dict]) -> None:
+    with open(path, "a", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps(row) + "\n")
+
+
+def _chunks(lines: list[dict], max_bytes: int) -> list[list[dict]]:
+    """``lines`` split so each chunk's JSONL stays under ``max_bytes``; a
+    single larger line gets a chunk of its own."""
+    chunks: list[list[dict]] = [[]]
+    size = 0
+    for line in lines:
+        n = len(json.dumps(line).encode("utf-8")) + 1
+        if chunks[-1] and size + n > max_bytes:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(line)
+        size += n
+    return chunks
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+class BatchBackend(ABC):
+    """Runs request files as batch jobs. ``submit`` returns a handle, ``poll``
+    reports "running", "succeeded" or "failed", and ``results`` maps each
+    request key to its raw generateContent response (None if it failed)."""
+
+    name = ""
+
+    @abstractmethod
+    async def submit(self, requests_path: Path, model: str) -> str: ...
+
+    @abstractmethod
+    async def poll(self, handle: str) -> str: ...
+
+    @abstractmethod
+    async def results(self, handle: str) -> dict[str, dict | None]: ...
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for a batch service, for tests and dry runs. Jobs
+    are directories under ``root``, and the first poll answers every request
+    with ``respond``, ``(model, body) -> raw response``. There is no default:
+    answering with live generateContent calls would put the corpus back on
+    the interactive API one call at a time."""
+
+    name = "local"
+
+    def __init__(self, root: str | Path, respond: Callable[[str, dict], Awaitable[dict | None]]):
+        self.root = Path(root)
+        self.respond = respond
+
+    async def submit(self, requests_path: Path, model: str) -> str:
+        handle = f"local-{uuid4().hex[:12]}"
+        job_dir = self.root / handle
+        job_dir.mkdir(parents=True)
+        shutil.copyfile(requests_path, job_dir / "requests.jsonl")
+        (job_dir / "state").write_text("running")
+        return handle
+
+    async def poll(self, handle: str) -> str:
+        job_dir = self.root / handle
+        state = (job_dir / "state").read_text().strip()
+        if state != "running":
+            return state
+        try:
+            rows = [{"key": line["key"], "response": await self.respond(line["model"], line["request"])} for line in _read_jsonl(job_dir / "requests.jsonl")]
+        except Exception:
+            state = "failed"
+        else:
+            _append_jsonl(job_dir / "results.jsonl", rows)
+            state = "succeeded"
+        (job_dir / "state").write_text(state)
+        return state
+
+    async def results(self, handle: str) -> dict[str, dict | None]:
+        return {row["key"]: row["response"] for row in _read_jsonl(self.root / handle / "results.jsonl")}
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini batch mode with inlined requests, one batch per request file.
+    Inlined batches are capped in size by the API; ``BulkJob`` splits
+    request files at ``BULK_MAX_REQUEST_BYTES`` to stay under it."""
+
+    name = "gemini"
+
+    async def _call(self, method: str, url: str, **kwargs) -> dict:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY is not set")
+        async with httpx.AsyncClient(timeout=120) as client:
+            response = await client.request(method, url, params={"key": api_key}, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+    async def _batch(self, handle: str) -> dict:
+        data = await self._call("GET", GEMINI_API_ROOT + handle)
+        return data.get("metadata") or data
+
+    async def submit(self, requests_path: Path, model: str) -> str:
+        requests = [{"request": line["request"], "metadata": {"key": line["key"]}} for line in _read_jsonl(requests_path)]
+        body = {"batch": {"display_name": requests_path.stem, "input_config": {"requests": {"requests": requests}}}}
+        operation = await self._call("POST", GEMINI_BATCH_URL.format(model=model), json=body)
+        return operation["name"]
+
+    async def poll(self, handle: str) -> str:
+        return GEMINI_BATCH_STATES.get((await self._batch(handle)).get("state", ""), "running")
+
+    async def results(self, handle: str) -> dict[str, dict | None]:
+        inlined = ((await self._batch(handle)).get("output") or {}).get("inlinedResponses") or {}
+        if isinstance(inlined, dict):
+            inlined = inlined.get("inlinedResponses") or []
+        return {item["metadata"]["key"]: item.get("response") for item in inlined if "key" in (item.get("metadata") or {})}
+
+
+def get_batch_backend(name: str) -> BatchBackend:
+    if name == "gemini":
+        return GeminiBatchBackend()
+    if name == "local":
+        raise ValueError("the local bulk backend needs a responder; pass a LocalBatchBackend explicitly")
+    raise ValueError(f"unknown bulk backend {name!r}")
+
+
+class _Replay:
+    """The ``llm_override`` for one round: stored responses, else record the
+    request and raise."""
+
+    def __init__(self, responses: dict[str, dict | list | None]):
+        self.responses = responses
+        self.requests: dict[str, dict] = {}
+
+    async def __call__(self, prompt: str, text: str, model: str, temperature: float, max_tokens: int):
+        key = request_key(prompt, text, model, temperature, max_tokens)
+        if key in self.responses:
+            return copy.deepcopy(self.responses[key])
+        if key not in self.requests:
+            self.requests[key] = {"key": key, "model": model, "request": build_request(prompt, text, temperature, max_tokens)}
+        raise ResponsePending(key)
+
+
+class BulkJob:
+    """One bulk analysis, stored under ``<BULK_DIR>/<job_id>``. Create it with
+    ``create`` or reopen it with ``load``, then ``run`` it to completion or
+    drive it one ``step`` at a time."""
+
+    def __init__(self, job_id: str, backend: BatchBackend, settings: BulkConfig = config.bulk):
+        self.job_id = job_id
+        self.backend = backend
+        self.settings = settings
+        self.directory = Path(settings.directory) / job_id
+        self.manifest: dict = {}
+
+    @classmethod
+    def create(cls, payloads: list[dict], backend: BatchBackend | None = None, job_id: str | None = None, settings: BulkConfig = config.bulk) -> "BulkJob":
+        backend = backend or get_batch_backend(settings.backend)
+        job = cls(job_id or f"bulk-{time.strftime('%Y%m%d')}-{uuid4().hex[:8]}", backend, settings)
+        (job.directory / "requests").mkdir(parents=True)
+        _append_jsonl(job.directory / "payloads.jsonl", [{"item_id": str(i), "payload": p} for i, p in enumerate(payloads)])
+        job.manifest = {
+            "job_id": job.job_id,
+            "backend": backend.name,
+            "status": "replaying",
+            "round": 0,
+            "items": len(payloads),
+            "completed": 0,
+            "errors": {},
+            "submissions": [],
+            "requests_submitted": 0,
+            "created_at": time.time(),
+            "updated_at": time.time(),
+        }
+        job._save()
+        return job
+
+    @classmethod
+    def load(cls, job_id: str, backend: BatchBackend | None = None, settings: BulkConfig = config.bulk) -> "BulkJob":
+        path = Path(settings.directory) / job_id / "manifest.json"
+        if not path.exists():
+            raise FileNotFoundError(f"no bulk job {job_id!r} under {settings.directory}")
+        manifest = json.loads(path.read_text())
+        job = cls(job_id, backend or get_batch_backend(manifest["backend"]), settings)
+        job.manifest = manifest
+        return job
+
+    def _save(self) -> None:
+        self.manifest["updated_at"] = time.time()
+        _write_json(self.directory / "manifest.json", self.manifest)
+
+    @property
+    def status(self) -> str:
+        return self.manifest["status"]
+
+    def _responses(self) -> dict[str, dict | list | None]:
+        return {row["key"]: row["response"] for row in _read_jsonl(self.directory / "responses.jsonl")}
+
+    async def _collect(self) -> bool:
+        """Poll outstanding submissions; store the responses of finished ones.
+        True once none are outstanding."""
+        for submission in self.manifest["submissions"]:
+            if submission["state"] != "running":
+                continue
+            state = await self.backend.poll(submission["handle"])
+            if state == "running":
+                continue
+            keys = [line["key"] for line in _read_jsonl(self.directory / submission["path"])]
+            raw = await self.backend.results(submission["handle"]) if state == "succeeded" else {}
+            _append_jsonl(self.directory / "responses.jsonl", [{"key": key, "response": parse_response(raw.get(key))} for key in keys])
+            submission["state"] = state
+        return all(s["state"] != "running" for s in self.manifest["submissions"])
+
+    async def _ingest(self, item_id: str, payload: dict, ingested: dict[str, IngestResult]) -> IngestResult:
+        """The item's ingest result from an earlier round, else a fresh one,
+        stored without the file bytes the v2 pipeline does not read."""
+        if item_id not in ingested:
+            result = (await ingest_payload(payload))._replace(file_bytes=b"")
+            _append_jsonl(self.directory / "ingested.jsonl", [{"item_id": item_id, "text": result.text, "antivirus": result.antivirus, "step_durations": result.step_durations}])
+            ingested[item_id] = result
+        return ingested[item_id]
+
+    async def _replay_item(self, item_id: str, payload: dict, replay: _Replay, ingested: dict[str, IngestResult], slots: asyncio.Semaphore) -> dict | str | None:
+        """The result dump, an error message, or None while responses are pending."""
+        # Each item runs in its own task with a copy of the context, so this
+        # binds the override for this pipeline and the tasks it starts only.
+        llm_override.set(replay)
+        async with slots:
+            try:
+                result = await run_v2_pipeline(payload, await self._ingest(item_id, payload, ingested))
+            except ResponsePending:
+                return None
+            except Exception as exc:
+                return f"{type(exc).__name__}: {exc}"
+        result["telemetry"]["stage_metrics"]["bulk"] = {"job_id": self.job_id, "item_id": item_id, "rounds": self.manifest["round"]}
+        return result
+
+    async def _replay(self) -> dict[str, dict]:
+        """Replay unfinished items against the stored responses. Returns the
+        requests still missing, by key."""
+        completed = {row["item_id"] for row in _read_jsonl(self.directory / "results.jsonl")}
+        items = [row for row in _read_jsonl(self.directory / "payloads.jsonl") if row["item_id"] not in completed | set(self.manifest["errors"])]
+        replay = _Replay(self._responses())
+        ingested = {
+            row.pop("item_id"): IngestResult(file_bytes=b"", **row) for row in _read_jsonl(self.directory / "ingested.jsonl")
+        }
+        slots = asyncio.Semaphore(self.settings.concurrency)
+        # A pipeline abandoned at a pending call cancels its background tasks;
+        # a request they had not made yet is recorded in a later round.
+        outcomes = await asyncio.gather(*(self._replay_item(row["item_id"], row["payload"], replay, ingested, slots) for row in items))
+
+        finished = []
+        for row, outcome in zip(items, outcomes):
+            if isinstance(outcome, dict):
+                finished.append({"item_id": row["item_id"], "result": outcome})
+            elif isinstance(outcome, str):
+                self.manifest["errors"][row["item_id"]] = outcome
+        _append_jsonl(self.directory / "results.jsonl", finished)
+        self.manifest["completed"] = len(completed) + len(finished)
+        return replay.requests
+
+    async def _submit(self, requests: dict[str, dict]) -> None:
+        by_model: dict[str, list[dict]] = {}
+        for line in requests.values():
+            by_model.setdefault(line["model"], []).append(line)
+        for model, lines in sorted(by_model.items()):
+            for part, chunk in enumerate(_chunks(lines, self.settings.max_request_bytes)):
+                path = Path("requests") / f"round-{self.manifest['round']}-{model}-{part}.jsonl"
+                _append_jsonl(self.directory / path, chunk)
+                handle = await self.backend.submit(self.directory / path, model)
+                self.manifest["submissions"].append({"round": self.manifest["round"], "model": model, "path": str(path), "handle": handle, "state": "running"})
+                self.manifest["requests_submitted"] += len(chunk)
+                # Saved per submission so a crash here never resubmits a file.
+                self._save()
+
+    async def step(self) -> str:
+        """Advance the job by one poll or one replay-and-submit round."""
+        if self.status == "waiting":
+            if await self._collect():
+                self.manifest["status"] = "replaying"
+        elif self.status == "replaying":
+            if self.manifest["round"] >= self.settings.max_rounds:
+                self.manifest["status"] = "failed"
+                self.manifest["errors"]["job"] = f"still waiting on LLM responses after {self.manifest['round']} rounds"
+            else:
+                self.manifest["round"] += 1
+                requests = await self._replay()
+                if not requests:
+                    self.manifest["status"] = "done"
+                else:
+                    try:
+                        await self._submit(requests)
+                    finally:
+                        # After a failed submission, wait on the files that did
+                        # go out; the next replay records the rest again.
+                        if any(s["round"] == self.manifest["round"] for s in self.manifest["submissions"]):
+                            self.manifest["status"] = "waiting"
+                        self._save()
+        self._save()
+        return self.status
+
+    async def run(self, poll_seconds: float | None = None) -> dict[str, ResumeDoctorResult]:
+        """Step until the job is done or failed; meant to own its event loop."""
+        poll_seconds = self.settings.poll_seconds if poll_seconds is None else poll_seconds
+        while await self.step() not in ("done", "failed"):
+            if self.status == "waiting":
+                await asyncio.sleep(poll_seconds)
+        return self.results()
+
+    def results(self) -> dict[str, ResumeDoctorResult]:
+        """Finished analyses by item id (the payload's line number)."""
+        return {row["item_id"]: ResumeDoctorResult.model_validate(row["result"]) for row in _read_jsonl(self.directory / "results.jsonl")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run offline bulk analyses through batch LLM jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    submit_cmd = sub.add_parser("submit", help="start a job over pipeline payloads, one JSON object per line")
+    submit_cmd.add_argument("--payloads", required=True)
+    submit_cmd.add_argument("--job-id")
+    submit_cmd.add_argument("--wait", action="store_true", help="run to completion instead of exiting after the first submission")
+    resume_cmd = sub.add_parser("resume", help="run a job to completion")
+    resume_cmd.add_argument("job_id")
+    status_cmd = sub.add_parser("status")
+    status_cmd.add_argument("job_id")
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        job = BulkJob.create(_read_jsonl(Path(args.payloads)), job_id=args.job_id)
+        print(job.job_id)
+        if args.wait:
+            asyncio.run(job.run())
+        else:
+            asyncio.run(job.step())
+    elif args.command == "resume":
+        job = BulkJob.load(args.job_id)
+        asyncio.run(job.run())
+    else:
+        job = BulkJob.load(args.job_id)
+    manifest = {k: v for k, v in job.manifest.items() if k != "submissions"}
+    print(json.dumps({**manifest, "submissions": len(job.manifest["submissions"])}, indent=2))
+    if job.status == "done":
+        print(f"results: {job.directory / 'results.jsonl'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+Local bullet classifier — a distilled stand-in for the impact LLM call.
+
+A hashed n-gram logistic regression trained offline on bullets the LLM has
+already labeled (``ImpactSignal`` JSON lines, see ``BULLET_LABEL_LOG``).
+One weight matrix holds three heads: impact_type and quantification
+(softmax) and star_score (linear). Temperatures fitted on a calibration
+slice make the softmax confidence mean what it says, so extract_impact
+can keep confident predictions and escalate the rest to the LLM.
+
+    python -m app.v2.bullet_model train --labels labels.jsonl --out bullet_model.npz
+    python -m app.v2.bullet_model evaluate --model bullet_model.npz --labels heldout.jsonl
+
+The artifact is an ``.npz`` with ``weights``, ``bias``, ``temperatures``
+and a JSON ``meta`` record carrying the format version and label sets.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+import zlib
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from app.config import BulletModelConfig, config
+
+from .prompts import IMPACT_EXTRACTOR_PROMPT
+from .signal_cache import normalize_bullet, prompt_version
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+IMPACT_TYPES = ("metric", "scope", "outcome", "duty")
+QUANTIFICATIONS = ("strong", "weak", "none")
+# Column blocks of the weight matrix.
+TYPE_COLS = slice(0, len(IMPACT_TYPES))
+QUANT_COLS = slice(len(IMPACT_TYPES), len(IMPACT_TYPES) + len(QUANTIFICATIONS))
+STAR_COL = len(IMPACT_TYPES) + len(QUANTIFICATIONS)
+N_OUTPUTS = STAR_COL + 1
+WORD_RE = re.compile(r"[a-z0-9%$+#]+")
+TEMPERATURE_GRID = [0.5 + 0.1 * i for i in range(46)]
+
+
+class BulletPrediction(NamedTuple):
+    impact_type: str
+    quantification: str
+    star_score: float
+    confidence: float
+
+
+def _grams(text: str) -> list[str]:
+    lower = text.lower()
+    words = WORD_RE.findall(lower)
+    grams = ["__bias__", f"__len{min(len(words) // 5, 6)}__"]
+    if words:
+        grams.append(f"^{words[0]}")
+    if any(ch.isdigit() for ch in lower):
+        grams.append("__num__")
+    if "%" in lower:
+        grams.append("__pct__")
+    if "$" in lower:
+        grams.append("__money__")
+    grams.extend(words)
+    grams.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+
+def featurize(texts: list[str], dim: int):
+    """CSR rows of hashed, L2-normalized binary features; every row is non-empty."""
+    indices: list[int] = []
+    indptr = [0]
+    values: list[float] = []
+    mask = dim - 1
+    for text in texts:
+        row = {zlib.crc32(g.encode("utf-8")) & mask for g in _grams(text)}
+        weight = 1.0 / len(row) ** 0.5
+        indices.extend(row)
+        values.extend([weight] * len(row))
+        indptr.append(len(indices))
+    return np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64), np.asarray(values, dtype=np.float32)
+
+
+def _forward(weights, bias, indices, indptr, values):
+    contributions = weights[indices] * values[:, None]
+    return np.add.reduceat(contributions, indptr[:-1], axis=0) + bias
+
+
+def _softmax(logits, temperature: float = 1.0):
+    z = logits / temperature
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class BulletClassifier:
+    def __init__(self, weights, bias, temperatures, meta: dict):
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"bullet model format {meta.get('format_version')} is not supported (expected {FORMAT_VERSION})")
+        self.weights = weights
+        self.bias = bias
+        self.temperatures = temperatures
+        self.meta = meta
+        self.dim = int(meta["dim"])
+
+    def _outputs(self, texts: list[str]):
+        indices, indptr, values = featurize(texts, self.dim)
+        logits = _forward(self.weights, self.bias, indices, indptr, values)
+        type_p = _softmax(logits[:, TYPE_COLS], float(self.temperatures[0]))
+        quant_p = _softmax(logits[:, QUANT_COLS], float(self.temperatures[1]))
+        star = np.clip(logits[:, STAR_COL], 0.0, 1.0)
+        return type_p, quant_p, star
+
+    def predict(self, texts: list[str]) -> list[BulletPrediction]:
+        if not texts:
+            return []
+        type_p, quant_p, star = self._outputs(texts)
+        type_i, quant_i = type_p.argmax(axis=1), quant_p.argmax(axis=1)
+        rows = np.arange(len(texts))
+        confidence = np.minimum(type_p[rows, type_i], quant_p[rows, quant_i])
+        return [
+            BulletPrediction(IMPACT_TYPES[t], QUANTIFICATIONS[q], round(float(s), 2), float(c))
+            for t, q, s, c in zip(type_i, quant_i, star, confidence)
+        ]
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                weights=self.weights,
+                bias=self.bias,
+                temperatures=self.temperatures,
+                meta=np.array(json.dumps(self.meta)),
+            )
+
+
+def load_bullet_model(path: str) -> BulletClassifier:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        return BulletClassifier(data["weights"], data["bias"], data["temperatures"], meta)
+
+
+@lru_cache(maxsize=1)
+def get_bullet_classifier(settings: BulletModelConfig = config.bullet_model) -> BulletClassifier | None:
+    """The configured classifier, or None. A model distilled from labels of an
+    older impact prompt is refused, so every bullet goes to the LLM until it
+    is retrained. So is a missing or unreadable artifact: the None is cached,
+    where an exception would be retried (and fail) on every call."""
+    if np is None or not settings.path:
+        return None
+    try:
+        classifier = load_bullet_model(settings.path)
+    except Exception as exc:
+        logger.warning("could not load bullet model %s (%s); not using it", settings.path, exc)
+        return None
+    trained_for = classifier.meta.get("prompt_version")
+    if trained_for != prompt_version(IMPACT_EXTRACTOR_PROMPT):
+        logger.warning(
+            "bullet model %s was trained for impact prompt %s, not the current %s; not using it",
+            settings.path,
+            trained_for,
+            prompt_version(IMPACT_EXTRACTOR_PROMPT),
+        )
+        return None
+    return classifier
+
+
+# --- labels -----------------------------------------------------------------
+
+
+def _append_lines(path: str, lines: list[str]) -> None:
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.writelines(lines)
+
+
+async def record_labels(signals: Iterable, settings: BulletModelConfig = config.bullet_model) -> None:
+    """Append LLM impact labels to the training log, when one is configured.
+    The write runs in a worker thread, off the event loop."""
+    if not settings.label_log:
+        return
+    lines = [
+        json.dumps({"text": s.text, "impact_type": s.impact_type, "quantification": s.quantification, "star_score": s.star_score}) + "\n"
+        for s in signals
+    ]
+    if lines:
+        await asyncio.to_thread(_append_lines, settings.label_log, lines)
+
+
+def load_labels(paths: Iterable[str]) -> list[dict]:
+    """Read labeled bullets, keeping the last label seen for each bullet."""
+    by_text: dict[str, dict] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("impact_type") in IMPACT_TYPES and row.get("quantification") in QUANTIFICATIONS and row.get("text"):
+                    by_text[normalize_bullet(row["text"])] = row
+    return list(by_text.values())
+
+
+def split_labels(rows: list[dict]) -> tuple[list[dict], list[dict], list[dict]]:
+    """Deterministic train / calibration / held-out split by bullet hash (80/10/10)."""
+    train, calibration, heldout = [], [], []
+    for row in rows:
+        bucket = zlib.crc32(normalize_bullet(row["text"]).encode("utf-8")) % 10
+        (heldout if bucket == 0 else calibration if bucket == 1 else train).append(row)
+    return train, calibration, heldout
+
+
+# --- training ---------------------------------------------------------------
+
+
+def _targets(rows: list[dict]):
+    type_y = np.array([IMPACT_TYPES.index(r["impact_type"]) for r in rows])
+    quant_y = np.array([QUANTIFICATIONS.index(r["quantification"]) for r in rows])
+    star_y = np.array([float(r.get("star_score", 0.5)) for r in rows], dtype=np.float32)
+    return type_y, quant_y, star_y
+
+
+def _fit_temperature(logits, y) -> float:
+    if not len(y):
+        return 1.0
+    rows = np.arange(len(y))
+
+    def nll(t: float) -> float:
+        return float(-np.log(_softmax(logits, t)[rows, y] + 1e-12).mean())
+
+    return min(TEMPERATURE_GRID, key=nll)
+
+
+def train(
+    rows: list[dict],
+    calibration: list[dict] | None = None,
+    dim: int = 1 << 18,
+    epochs: int = 300,
+    lr: float = 0.5,
+    l2: float = 1e-6,
+) -> BulletClassifier:
+    """Full-batch Adam on the summed cross-entropy and squared-error losses."""
+    if dim & (dim - 1):
+        raise ValueError("dim must be a power of two")
+    indices, indptr, values = featurize([r["text"] for r in rows], dim)
+    type_y, quant_y, star_y = _targets(rows)
+    n = len(rows)
+    row_of = np.repeat(np.arange(n), np.diff(indptr))
+    type_onehot = np.eye(len(IMPACT_TYPES), dtype=np.float32)[type_y]
+    quant_onehot = np.eye(len(QUANTIFICATIONS), dtype=np.float32)[quant_y]
+
+    weights = np.zeros((dim, N_OUTPUTS), dtype=np.float32)
+    bias = np.zeros(N_OUTPUTS, dtype=np.float32)
+    m_w, v_w = np.zeros_like(weights), np.zeros_like(weights)
+    m_b, v_b = np.zeros_like(bias), np.zeros_like(bias)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        logits = _forward(weights, bias, indices, indptr, values)
+        grad_out = np.empty_like(logits)
+        grad_out[:, TYPE_COLS] = _softmax(logits[:, TYPE_COLS]) - type_onehot
+        grad_out[:, QUANT_COLS] = _softmax(logits[:, QUANT_COLS]) - quant_onehot
+        grad_out[:, STAR_COL] = logits[:, STAR_COL] - star_y
+        grad_out /= n
+
+        grad_w = np.zeros_like(weights)
+        np.add.at(grad_w, indices, grad_out[row_of] * values[:, None])
+        grad_w += l2 * weights
+        grad_b = grad_out.sum(axis=0)
+
+        m_w = beta1 * m_w + (1 - beta1) * grad_w
+        v_w = beta2 * v_w + (1 - beta2) * grad_w * grad_w
+        m_b = beta1 * m_b + (1 - beta1) * grad_b
+        v_b = beta2 * v_b + (1 - beta2) * grad_b * grad_b
+        correction = lr * (1 - beta2**step) ** 0.5 / (1 - beta1**step)
+        weights -= correction * m_w / (np.sqrt(v_w) + eps)
+        bias -= correction * m_b / (np.sqrt(v_b) + eps)
+
+    temperatures = np.ones(2, dtype=np.float32)
+    if calibration:
+        c_indices, c_indptr, c_values = featurize([r["text"] for r in calibration], dim)
+        c_logits = _forward(weights, bias, c_indices, c_indptr, c_values)
+        c_type, c_quant, _ = _targets(calibration)
+        temperatures[0] = _fit_temperature(c_logits[:, TYPE_COLS], c_type)
+        temperatures[1] = _fit_temperature(c_logits[:, QUANT_COLS], c_quant)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "dim": dim,
+        "impact_types": list(IMPACT_TYPES),
+        "quantifications": list(QUANTIFICATIONS),
+        "prompt_version": prompt_version(IMPACT_EXTRACTOR_PROMPT),
+        "trained_at": int(time.time()),
+        "train_size": n,
+        "calibration_size": len(calibration or []),
+    }
+    return BulletClassifier(weights, bias, temperatures, meta)
+
+
+def evaluate(classifier: BulletClassifier, rows: list[dict], min_confidence: float = config.bullet_model.min_confidence) -> dict:
+    """Agreement with LLM labels, calibration error and escalation rate."""
+    if not rows:
+        return {"size": 0}
+    predictions = classifier.predict([r["text"] for r in rows])
+    type_ok = np.array([p.impact_type == r["impact_type"] for p, r in zip(predictions, rows)])
+    quant_ok = np.array([p.quantification == r["quantification"] for p, r in zip(predictions, rows)])
+    both_ok = type_ok & quant_ok
+    confidence = np.array([p.confidence for p in predictions])
+    star_error = np.array([abs(p.star_score - float(r.get("star_score", 0.5))) for p, r in zip(predictions, rows)])
+
+    f1 = []
+    for label in IMPACT_TYPES:
+        predicted = np.array([p.impact_type == label for p in predictions])
+        actual = np.array([r["impact_type"] == label for r in rows])
+        tp = float((predicted & actual).sum())
+        precision = tp / predicted.sum() if predicted.sum() else 0.0
+        recall = tp / actual.sum() if actual.sum() else 0.0
+        f1.append(2 * precision * recall / (precision + recall) if precision + recall else 0.0)
+
+    # Expected calibration error of the combined confidence over 10 bins.
+    bins = np.minimum((confidence * 10).astype(int), 9)
+    ece = sum(abs(confidence[bins == b].mean() - both_ok[bins == b].mean()) * (bins == b).mean() for b in range(10) if (bins == b).any())
+
+    local = confidence >= min_confidence
+    return {
+        "size": len(rows),
+        "impact_type_accuracy": round(float(type_ok.mean()), 4),
+        "impact_type_macro_f1": round(float(np.mean(f1)), 4),
+        "quantification_accuracy": round(float(quant_ok.mean()), 4),
+        "star_score_mae": round(float(star_error.mean()), 4),
+        "expected_calibration_error": round(float(ece), 4),
+        "min_confidence": min_confidence,
+        "local_rate": round(float(local.mean()), 4),
+        "escalation_rate": round(float(1 - local.mean()), 4),
+        "local_accuracy": round(float(both_ok[local].mean()), 4) if local.any() else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train or evaluate the local bullet classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="train on LLM-labeled bullets and report on a held-out slice")
+    train_cmd.add_argument("--labels", action="append", required=True, help="JSONL of labeled bullets (repeatable)")
+    train_cmd.add_argument("--out", required=True)
+    train_cmd.add_argument("--dim", type=int, default=1 << 18)
+    train_cmd.add_argument("--epochs", type=int, default=300)
+    eval_cmd = sub.add_parser("evaluate", help="report agreement with LLM labels")
+    eval_cmd.add_argument("--model", required=True)
+    eval_cmd.add_argument("--labels", action="append", required=True)
+    for cmd in (train_cmd, eval_cmd):
+        cmd.add_argument("--min-confidence", type=float, default=config.bullet_model.min_confidence)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train_rows, calibration_rows, heldout_rows = split_labels(load_labels(args.labels))
+        classifier = train(train_rows, calibration_rows, dim=args.dim, epochs=args.epochs)
+        report = evaluate(classifier, heldout_rows, args.min_confidence)
+        classifier.meta["heldout"] = report
+        classifier.save(args.out)
+        print(f"trained on {len(train_rows)} bullets -> {args.out}")
+    else:
+        report = evaluate(load_bullet_model(args.model), load_labels(args.labels), args.min_confidence)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
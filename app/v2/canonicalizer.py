@@ -1,14 +1,22 @@
+import asyncio
 import math
 import re
+from typing import NamedTuple
+
+from app.config import CanonicalizerConfig, config
+from app.pipeline import EMAIL_RE, PHONE_RE, URL_RE, _looks_like_location, _looks_like_name
 
 from .llm import call_gemini
 from .prompts import CANONICALIZER_PROMPT
+from .timeline import has_month, normalize_date
 from .types import (
+    CanonicalContact,
     CanonicalEducation,
     CanonicalExperience,
     CanonicalProject,
     CanonicalResume,
     Certification,
+    ParseQuality,
     ResumeMetadata,
 )
 
@@ -22,122 +30,197 @@ HEADER_MAP = {
     "summary": ["summary", "profile", "about"],
 }
 
-MONTHS = {
-    "jan": "01",
-    "feb": "02",
-    "mar": "03",
-    "apr": "04",
-    "may": "05",
-    "jun": "06",
-    "jul": "07",
-    "aug": "08",
-    "sep": "09",
-    "oct": "10",
-    "nov": "11",
-    "dec": "12",
-}
-
 BULLET_RE = re.compile(r"^\s*(?:[-•*]|\d+[.)])\s+(.+)$")
 DATE_RANGE_RE = re.compile(
     r"(?P<start>(?:[A-Za-z]{3,9}\s+)?\d{4})\s*(?:-|–|to)\s*(?P<end>(?:[A-Za-z]{3,9}\s+)?\d{4}|present|current)",
     re.IGNORECASE,
 )
+# Every date range has a year followed by a separator; far cheaper to scan for than the full pattern.
+DATE_RANGE_HINT_RE = re.compile(r"\d{4}\s*(?:-|–|to)", re.IGNORECASE)
+WORD_RE = re.compile(r"\b\w+\b")
+YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+PART_SPLIT_RE = re.compile(r"\||,")
+SKILL_SPLIT_RE = re.compile(r"[,|/•]")
+HEADER_CLEAN_RE = re.compile(r"[^a-zA-Z ]")
+HEADER_LOOKUP = {name: section for section, names in HEADER_MAP.items() for name in names}
+
+CORE_SECTIONS = {"experience", "education", "skills"}
+QUALITY_WEIGHTS = {
+    "sections": 0.25,
+    "dated_roles": 0.25,
+    "bullet_coverage": 0.2,
+    "classified_lines": 0.15,
+    "date_clarity": 0.15,
+}
+ROUTE_HEURISTIC = "heuristic"
+ROUTE_SECTIONS = "llm_sections"
+ROUTE_LLM = "llm"
+SECTION_MAX_TOKENS = 8192
+HEAD_SECTIONS = ("skills", "awards")
+SHARD_SECTIONS = ("experience", "education", "projects", "certifications")
 
+HEADER = "header"
+BULLET = "bullet"
+DATE_RANGE = "date_range"
+CONTACT = "contact"
+PLAIN = "plain"
 
-def _normalize_date(raw: str | None) -> str | None:
-    if not raw:
-        return None
-    value = raw.strip().lower()
-    if value in {"present", "current"}:
-        return None
-    year = re.search(r"(19|20)\d{2}", value)
-    if not year:
-        return None
-    month = "01"
-    for m, n in MONTHS.items():
-        if m in value:
-            month = n
-            break
-    return f"{year.group(0)}-{month}"
+
+class TaggedLine(NamedTuple):
+    text: str
+    kind: str
+    body: str
+    header: str | None = None
+    date: re.Match | None = None
+
+
+class Shard(NamedTuple):
+    name: str
+    text: str
+
+
+class TokenizedResume(NamedTuple):
+    sections: dict[str, list[TaggedLine]]
+    metadata: ResumeMetadata
+    contact: CanonicalContact
 
 
 def _detect_header(line: str) -> str | None:
-    cleaned = re.sub(r"[^a-zA-Z ]", "", line).strip().lower()
-    for section, names in HEADER_MAP.items():
-        if cleaned in names:
-            return section
-    return None
+    section = HEADER_LOOKUP.get(line.lower())
+    if section:
+        return section
+    cleaned = HEADER_CLEAN_RE.sub("", line).strip().lower()
+    return HEADER_LOOKUP.get(cleaned)
 
 
-def _segment_sections(text: str) -> tuple[dict[str, list[str]], list[str]]:
-    sections: dict[str, list[str]] = {k: [] for k in HEADER_MAP}
+def _date_range(line: str) -> re.Match | None:
+    return DATE_RANGE_RE.search(line) if DATE_RANGE_HINT_RE.search(line) else None
+
+
+def _classify(line: str) -> TaggedLine:
+    header = _detect_header(line)
+    if header:
+        return TaggedLine(line, HEADER, line, header=header)
+    bullet = BULLET_RE.match(line)
+    if bullet:
+        return TaggedLine(line, BULLET, bullet.group(1).strip())
+    date_match = _date_range(line)
+    if date_match:
+        return TaggedLine(line, DATE_RANGE, line, date=date_match)
+    if "@" in line or "http" in line or PHONE_RE.search(line):
+        return TaggedLine(line, CONTACT, line)
+    return TaggedLine(line, PLAIN, line)
+
+
+def _tagged(line: TaggedLine | str) -> TaggedLine:
+    return line if isinstance(line, TaggedLine) else _classify(line.strip())
+
+
+def tokenize(text: str) -> TokenizedResume:
+    """Tag every non-empty line once and collect metadata in the same pass."""
+    sections: dict[str, list[TaggedLine]] = {k: [] for k in HEADER_MAP}
     section_order: list[str] = []
+    head: list[str] = []
+    contact_lines: list[str] = []
     current = "summary"
+    line_count = bullet_count = 0
+    word_count = len(WORD_RE.findall(text))
+
     for raw in text.splitlines():
         line = raw.strip()
         if not line:
             continue
-        header = _detect_header(line)
-        if header:
-            current = header
-            if header not in section_order:
-                section_order.append(header)
+        line_count += 1
+        if len(head) < 2:
+            head.append(line)
+        tagged = _classify(line)
+        if tagged.kind == HEADER:
+            current = tagged.header
+            if current not in section_order:
+                section_order.append(current)
             continue
-        sections[current].append(line)
-    return sections, section_order
+        if tagged.kind == BULLET:
+            bullet_count += 1
+        elif tagged.kind == CONTACT:
+            contact_lines.append(line)
+        sections[current].append(tagged)
+
+    metadata = ResumeMetadata(
+        estimated_word_count=word_count,
+        section_order=section_order,
+        page_estimate=max(1, math.ceil(word_count / 500)) if word_count else 0,
+        bullet_count=bullet_count,
+        bullet_ratio=round(bullet_count / max(line_count, 1), 3),
+        needs_ocr=len(text.strip()) < 200,
+    )
+    return TokenizedResume(sections, metadata, _contact_from_lines(head, contact_lines))
+
+
+def _segment_sections(text: str) -> tuple[dict[str, list[str]], list[str]]:
+    tokens = tokenize(text)
+    sections = {k: [ln.text for ln in lines] for k, lines in tokens.sections.items()}
+    return sections, tokens.metadata.section_order
 
 
-def _parse_experience(lines: list[str]) -> list[CanonicalExperience]:
+def _split_parts(line: str) -> list[str]:
+    return [p.strip() for p in PART_SPLIT_RE.split(line) if p.strip()]
+
+
+def _parse_experience(lines: list[TaggedLine] | list[str]) -> list[CanonicalExperience]:
     roles: list[CanonicalExperience] = []
     current: CanonicalExperience | None = None
 
-    for line in lines:
-        bullet = BULLET_RE.match(line)
-        if bullet and current:
-            current.bullets.append(bullet.group(1).strip())
+    for item in lines:
+        tagged = _tagged(item)
+        line = tagged.text
+        if tagged.kind == BULLET and current:
+            current.bullets.append(tagged.body)
             continue
 
-        date_match = DATE_RANGE_RE.search(line)
+        # A bullet before any role header may still carry the role's dates.
+        date_match = tagged.date or (_date_range(line) if tagged.kind == BULLET else None)
         if date_match:
             prefix = line[: date_match.start()].strip(" -|,")
-            parts = [p.strip() for p in re.split(r"\||,", prefix) if p.strip()]
+            parts = _split_parts(prefix)
             title = parts[0] if parts else prefix
             company = parts[1] if len(parts) > 1 else (roles[-1].company if roles else "")
-            start = _normalize_date(date_match.group("start")) or ""
+            start_raw = date_match.group("start")
+            start = normalize_date(start_raw) or ""
             end_raw = date_match.group("end")
-            end = _normalize_date(end_raw)
+            end = normalize_date(end_raw)
             current = CanonicalExperience(
                 company=company,
                 title=title,
                 start_date=start,
                 end_date=end,
                 is_current=end_raw.lower() in {"present", "current"},
-                date_ambiguous=False,
+                date_ambiguous=not has_month(start_raw) or (end is not None and not has_month(end_raw)),
                 bullets=[],
             )
             roles.append(current)
             continue
 
-        if not current and line:
-            pieces = [p.strip() for p in re.split(r"\||,", line) if p.strip()]
+        if not current:
+            pieces = _split_parts(line)
             if len(pieces) >= 2:
                 current = CanonicalExperience(company=pieces[1], title=pieces[0], start_date="", bullets=[])
                 roles.append(current)
             continue
 
-        if current and line and len(line.split()) <= 8 and not BULLET_RE.match(line):
+        if tagged.kind != BULLET and len(line.split()) <= 8:
             if not current.location and any(k in line.lower() for k in [",", "remote", "india", "usa", "uk"]):
                 current.location = line
     return roles
 
 
-def _parse_education(lines: list[str]) -> list[CanonicalEducation]:
+def _parse_education(lines: list[TaggedLine] | list[str]) -> list[CanonicalEducation]:
     items: list[CanonicalEducation] = []
-    for line in lines:
+    for item in lines:
+        line = item.text if isinstance(item, TaggedLine) else item
         if len(line) < 4:
             continue
-        years = re.findall(r"(?:19|20)\d{2}", line)
-        parts = [p.strip() for p in re.split(r"\||,", line) if p.strip()]
+        years = YEAR_RE.findall(line)
+        parts = _split_parts(line)
         institution = parts[0] if parts else line
         degree = parts[1] if len(parts) > 1 else None
         start_date = f"{years[0]}-01" if years else None
@@ -153,25 +236,26 @@ def _parse_education(lines: list[str]) -> list[CanonicalEducation]:
     return items
 
 
-def _parse_skills(lines: list[str]) -> list[str]:
-    joined = ",".join(lines)
-    raw = re.split(r"[,|/•]", joined)
+def _parse_skills(lines: list[TaggedLine] | list[str]) -> list[str]:
     skills = []
     seen = set()
-    for token in raw:
-        s = token.strip()
-        if not s or len(s) > 40:
-            continue
-        key = s.lower()
-        if key not in seen:
-            seen.add(key)
-            skills.append(s)
+    for item in lines:
+        line = item.text if isinstance(item, TaggedLine) else item
+        for token in SKILL_SPLIT_RE.split(line):
+            s = token.strip()
+            if not s or len(s) > 40:
+                continue
+            key = s.lower()
+            if key not in seen:
+                seen.add(key)
+                skills.append(s)
     return skills
 
 
-def _parse_projects(lines: list[str]) -> list[CanonicalProject]:
+def _parse_projects(lines: list[TaggedLine] | list[str]) -> list[CanonicalProject]:
     projects: list[CanonicalProject] = []
-    for line in lines:
+    for item in lines:
+        line = item.text if isinstance(item, TaggedLine) else item
         if len(line.split()) < 2:
             continue
         bits = [b.strip() for b in line.split("-", 1)]
@@ -181,47 +265,143 @@ def _parse_projects(lines: list[str]) -> list[CanonicalProject]:
     return projects
 
 
-def _parse_certifications(lines: list[str]) -> list[Certification]:
+def _parse_certifications(lines: list[TaggedLine] | list[str]) -> list[Certification]:
     certs: list[Certification] = []
-    for line in lines:
-        parts = [p.strip() for p in re.split(r"\||,", line) if p.strip()]
+    for item in lines:
+        parts = _split_parts(item.text if isinstance(item, TaggedLine) else item)
         if not parts:
             continue
         certs.append(Certification(name=parts[0], issuer=parts[1] if len(parts) > 1 else None))
     return certs
 
 
-def _heuristic_canonicalize(text: str) -> CanonicalResume:
-    sections, section_order = _segment_sections(text)
-    lines = [ln for ln in text.splitlines() if ln.strip()]
-    bullet_count = sum(1 for ln in lines if BULLET_RE.match(ln))
-    word_count = len(re.findall(r"\b\w+\b", text))
-    bullet_ratio = round(bullet_count / max(len(lines), 1), 3)
-
-    metadata = ResumeMetadata(
-        estimated_word_count=word_count,
-        section_order=section_order,
-        page_estimate=max(1, math.ceil(word_count / 500)) if word_count else 0,
-        bullet_count=bullet_count,
-        bullet_ratio=bullet_ratio,
-        needs_ocr=len(text.strip()) < 200,
+def _contact_from_lines(head: list[str], contact_lines: list[str]) -> CanonicalContact:
+    """Same rules as the v1 header parse, applied to the lines tagged as contact."""
+    name = location = None
+    if head:
+        if _looks_like_name(head[0]):
+            name = head[0]
+            if len(head) > 1 and _looks_like_location(head[1]):
+                location = head[1]
+        elif len(head[0].split()) <= 6 and _looks_like_location(head[0]):
+            location = head[0]
+
+    joined = "\n".join(contact_lines)
+    email = EMAIL_RE.search(joined)
+    phone = PHONE_RE.search(joined)
+    return CanonicalContact(
+        name=name,
+        email=email.group(0) if email else None,
+        phone=phone.group(0) if phone else None,
+        location=location,
+        links=URL_RE.findall(joined)[:5],
     )
 
-    summary = " ".join(sections.get("summary", [])[:3]) if sections.get("summary") else None
+
+def _heuristic_contact(text: str) -> CanonicalContact:
+    return tokenize(text).contact
+
+
+def _canonical_from_tokens(tokens: TokenizedResume) -> CanonicalResume:
+    sections = tokens.sections
+    summary = " ".join(ln.text for ln in sections["summary"][:3]) if sections["summary"] else None
     return CanonicalResume(
+        contact=tokens.contact,
         summary=summary,
-        experience=_parse_experience(sections.get("experience", [])),
-        education=_parse_education(sections.get("education", [])),
-        skills=_parse_skills(sections.get("skills", [])),
-        projects=_parse_projects(sections.get("projects", [])),
-        certifications=_parse_certifications(sections.get("certifications", [])),
-        awards=[{"text": line} for line in sections.get("awards", [])],
-        metadata=metadata,
+        experience=_parse_experience(sections["experience"]),
+        education=_parse_education(sections["education"]),
+        skills=_parse_skills(sections["skills"]),
+        projects=_parse_projects(sections["projects"]),
+        certifications=_parse_certifications(sections["certifications"]),
+        awards=[{"text": ln.text} for ln in sections["awards"]],
+        metadata=tokens.metadata,
     )
 
 
+def _heuristic_canonicalize(text: str) -> CanonicalResume:
+    return _canonical_from_tokens(tokenize(text))
+
+
+def score_parse_quality(tokens: TokenizedResume, canonical: CanonicalResume) -> ParseQuality:
+    """Score how much of the resume the heuristic parse recovered (0-1).
+
+    Components: core sections found, roles with dates, roles with bullets,
+    experience lines left unclassified, and roles with month-less dates.
+    """
+    found = set(tokens.metadata.section_order)
+    roles = canonical.experience
+    n_roles = len(roles)
+
+    exp_lines = tokens.sections["experience"]
+    loose = sum(1 for ln in exp_lines if ln.kind in (PLAIN, CONTACT))
+    consumed = sum(1 for r in roles if not r.start_date) + sum(1 for r in roles if r.location)
+    unclassified = max(0, loose - consumed)
+    body_lines = len(exp_lines)
+    if not found:
+        # Without any headers everything lands in the summary and only three lines are kept.
+        unclassified += max(0, len(tokens.sections["summary"]) - 3)
+        body_lines += len(tokens.sections["summary"])
+
+    components = {
+        "sections": round(len(found & CORE_SECTIONS) / len(CORE_SECTIONS), 3),
+        "dated_roles": round(sum(1 for r in roles if r.start_date) / n_roles, 3) if n_roles else 0.0,
+        "bullet_coverage": round(sum(1 for r in roles if r.bullets) / n_roles, 3) if n_roles else 0.0,
+        "classified_lines": round(1 - unclassified / body_lines, 3) if body_lines else 1.0,
+        "date_clarity": round(1 - sum(1 for r in roles if r.date_ambiguous) / n_roles, 3) if n_roles else 0.0,
+    }
+    score = sum(QUALITY_WEIGHTS[k] * v for k, v in components.items())
+
+    weak: list[str] = []
+    if (
+        not n_roles
+        or components["dated_roles"] < 1
+        or components["bullet_coverage"] < 0.5
+        or components["classified_lines"] < 0.8
+        or components["date_clarity"] < 0.5
+    ):
+        weak.append("experience")
+    if not canonical.education:
+        weak.append("education")
+    if len(canonical.skills) < 3:
+        weak.append("skills")
+    return ParseQuality(score=round(score, 3), components=components, weak_sections=weak)
+
+
+def _route(quality: ParseQuality, found: set[str], routing: str, settings: CanonicalizerConfig) -> str:
+    if routing == "never":
+        return ROUTE_HEURISTIC
+    if routing == "always":
+        return ROUTE_LLM
+    if quality.score >= settings.min_quality:
+        return ROUTE_HEURISTIC
+    # Sections can only be sent on their own when their header was found.
+    if settings.section_routing and quality.weak_sections and all(s in found for s in quality.weak_sections):
+        return ROUTE_SECTIONS
+    return ROUTE_LLM
+
+
+def _section_text(tokens: TokenizedResume, sections: list[str]) -> str:
+    parts = []
+    for section in sections:
+        parts.append(section.title())
+        parts.extend(ln.text for ln in tokens.sections[section])
+    return "\n".join(parts)
+
+
+def _merge_sections(heuristic: CanonicalResume, partial: CanonicalResume, sections: list[str]) -> CanonicalResume:
+    merged = heuristic.model_copy(deep=True)
+    for section in sections:
+        value = getattr(partial, section)
+        if value:
+            setattr(merged, section, value)
+    return merged
+
+
 def _merge_canonical(primary: CanonicalResume, fallback: CanonicalResume) -> CanonicalResume:
     merged = primary.model_copy(deep=True)
+    for key in ("name", "email", "phone", "location", "links"):
+        if not getattr(merged.contact, key):
+            setattr(merged.contact, key, getattr(fallback.contact, key))
     if not merged.summary:
         merged.summary = fallback.summary
     if not merged.experience:
@@ -261,24 +441,140 @@ def _merge_canonical(primary: CanonicalResume, fallback: CanonicalResume) -> Can
     return merged
 
 
-async def canonicalize(text: str, model: str | None = None) -> CanonicalResume:
-    heuristic = _heuristic_canonicalize(text)
+def _role_chunks(lines: list[TaggedLine], roles_per_chunk: int) -> list[list[TaggedLine]]:
+    """Split experience lines before every ``roles_per_chunk``-th role.
+
+    A role starts at its header block, the company and title lines directly
+    above its date line, so one shard gets the whole role.
+    """
+    starts: list[int] = []
+    for i, ln in enumerate(lines):
+        if ln.kind != DATE_RANGE:
+            continue
+        start = i
+        while start > 0 and lines[start - 1].kind not in (BULLET, DATE_RANGE):
+            start -= 1
+        starts.append(start)
+    cuts = [0, *starts[max(1, roles_per_chunk) :: max(1, roles_per_chunk)], len(lines)]
+    return [lines[lo:hi] for lo, hi in zip(cuts, cuts[1:]) if lo < hi]
+
+
+def _build_shards(tokens: TokenizedResume, sections: list[str] | None, roles_per_shard: int) -> list[Shard]:
+    """Shard the document by section; ``sections=None`` means the whole resume.
+
+    The whole-resume head shard carries contact, summary, skills and awards.
+    """
+    shards: list[Shard] = []
+    if sections is None:
+        head = [ln.text for ln in tokens.sections["summary"]]
+        for section in HEAD_SECTIONS:
+            if tokens.sections[section]:
+                head.append(section.title())
+                head.extend(ln.text for ln in tokens.sections[section])
+        if head:
+            shards.append(Shard("head", "\n".join(head)))
+        sections = [s for s in SHARD_SECTIONS if tokens.sections[s]]
+
+    for section in sections:
+        lines = tokens.sections[section]
+        chunks = _role_chunks(lines, roles_per_shard) if section == "experience" else [lines]
+        for i, chunk in enumerate(chunks):
+            body = "\n".join([section.title(), *(ln.text for ln in chunk)])
+            shards.append(Shard(f"{section}:{i}" if section == "experience" else section, body))
+    return shards
+
+
+def _merge_shards(results: list[CanonicalResume]) -> CanonicalResume:
+    """Concatenate shard results in document order."""
+    merged = CanonicalResume()
+    seen_skills: set[str] = set()
+    for part in results:
+        for key in ("name", "email", "phone", "location", "links"):
+            if not getattr(merged.contact, key):
+                setattr(merged.contact, key, getattr(part.contact, key))
+        merged.summary = merged.summary or part.summary
+        merged.experience.extend(part.experience)
+        merged.education.extend(part.education)
+        merged.projects.extend(part.projects)
+        merged.certifications.extend(part.certifications)
+        merged.awards.extend(part.awards)
+        for skill in part.skills:
+            if skill.lower() not in seen_skills:
+                seen_skills.add(skill.lower())
+                merged.skills.append(skill)
+    return merged
+
 
+async def _llm_canonicalize(text: str, model: str | None, max_tokens: int) -> CanonicalResume | None:
     llm_raw = await call_gemini(
         prompt=CANONICALIZER_PROMPT,
         text=text,
         model=model or "gemini-2.5-flash",
         temperature=0.1,
-        max_tokens=16384,
+        max_tokens=max_tokens,
     )
+    if not isinstance(llm_raw, dict):
+        return None
+    try:
+        return CanonicalResume.model_validate(llm_raw)
+    except Exception:
+        return None
 
-    llm_resume: CanonicalResume | None = None
-    if isinstance(llm_raw, dict):
-        try:
-            llm_resume = CanonicalResume.model_validate(llm_raw)
-        except Exception:
-            llm_resume = None
+
+async def _canonicalize_shards(shards: list[Shard], model: str | None, max_tokens: int) -> CanonicalResume | None:
+    results = await asyncio.gather(*(_llm_canonicalize(shard.text, model, max_tokens) for shard in shards))
+    if not any(results):
+        return None
+    # A failed shard falls back to the heuristic parse of the same text.
+    return _merge_shards([r or _heuristic_canonicalize(shard.text) for r, shard in zip(results, shards)])
+
+
+async def canonicalize(
+    text: str,
+    model: str | None = None,
+    stats: dict | None = None,
+    routing: str | None = None,
+    sharding: bool | None = None,
+    settings: CanonicalizerConfig = config.canonicalizer,
+) -> CanonicalResume:
+    """Heuristic parse first; call the LLM only as the routing policy allows.
+
+    ``routing`` overrides ``CANONICALIZER_ROUTING`` (auto | always | never)
+    and ``sharding`` overrides ``CANONICALIZER_SHARDING``. The decision and
+    parse-quality score are written into ``stats``.
+    """
+    tokens = tokenize(text)
+    heuristic = _canonical_from_tokens(tokens)
+    quality = score_parse_quality(tokens, heuristic)
+    route = _route(quality, set(tokens.metadata.section_order), routing or settings.routing, settings)
+    if stats is not None:
+        stats.update(
+            route=route,
+            parse_quality=quality.score,
+            components=quality.components,
+            weak_sections=quality.weak_sections,
+            llm_called=route != ROUTE_HEURISTIC,
+        )
+
+    if route == ROUTE_HEURISTIC:
+        return heuristic
+
+    sections = quality.weak_sections if route == ROUTE_SECTIONS else []
+    shards: list[Shard] = []
+    if (settings.sharding if sharding is None else sharding) and tokens.metadata.section_order:
+        shards = _build_shards(tokens, sections or None, settings.shard_roles)
+
+    if len(shards) > 1:
+        if stats is not None:
+            stats["shards"] = [shard.name for shard in shards]
+        llm_resume = await _canonicalize_shards(shards, model, settings.shard_max_tokens)
+    elif sections:
+        llm_resume = await _llm_canonicalize(_section_text(tokens, sections), model, SECTION_MAX_TOKENS)
+    else:
+        llm_resume = await _llm_canonicalize(text, model, 16384)
 
     if not llm_resume:
         return heuristic
+    if sections:
+        return _merge_sections(heuristic, llm_resume, sections)
     return _merge_canonical(llm_resume, heuristic)
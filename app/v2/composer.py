@@ -4,6 +4,7 @@ Converts canonical + enhanced data into ATS-safe output.
 No LLM involved. Pure template rendering.
 """
 
+from .timeline import format_month
 from .types import CanonicalResume
 
 
@@ -141,25 +142,12 @@ def compose_resume(
 def _format_period(start: str | None, end: str | None, is_current: bool = False) -> str:
     if not start and not end:
         return ""
-    start_str = _format_date(start) if start else ""
+    start_str = format_month(start) if start else ""
     if is_current:
         end_str = "Present"
     else:
-        end_str = _format_date(end) if end else ""
+        end_str = format_month(end) if end else ""
 
     if start_str and end_str:
         return f"{start_str} – {end_str}"
     return start_str or end_str
-
-
-def _format_date(date_str: str) -> str:
-    """Convert YYYY-MM to Month YYYY."""
-    MONTHS = {
-        "01": "Jan", "02": "Feb", "03": "Mar", "04": "Apr",
-        "05": "May", "06": "Jun", "07": "Jul", "08": "Aug",
-        "09": "Sep", "10": "Oct", "11": "Nov", "12": "Dec",
-    }
-    parts = date_str.split("-")
-    if len(parts) == 2:
-        return f"{MONTHS.get(parts[1], parts[1])} {parts[0]}"
-    return date_str
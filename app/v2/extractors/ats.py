@@ -2,17 +2,19 @@ import re
 
 from ..llm import call_gemini
 from ..prompts import ATS_VALIDATOR_PROMPT
+from ..timeline import Timeline, resume_timeline
 from ..types import ATSCheck, ATSSignal, CanonicalResume
 
 EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
 PHONE_RE = re.compile(r"(\+?\d[\d\s\-()]{8,}\d)")
 
 
-def _heuristic_ats(canonical: CanonicalResume, intake_data: dict | None = None) -> ATSSignal:
+def _heuristic_ats(canonical: CanonicalResume, intake_data: dict | None = None, timeline: Timeline | None = None) -> ATSSignal:
+    timeline = resume_timeline(canonical, timeline)
     checks: list[ATSCheck] = []
 
     checks.append(ATSCheck(rule="core_sections", passed=bool(canonical.experience and canonical.education and canonical.skills), detail="Need experience, education, and skills"))
-    checks.append(ATSCheck(rule="date_presence", passed=all(bool(r.start_date) for r in canonical.experience) if canonical.experience else False, detail="Every role should include start date"))
+    checks.append(ATSCheck(rule="date_presence", passed=bool(canonical.experience) and not timeline.undated, detail="Every role should include a parseable start date"))
     checks.append(ATSCheck(rule="reasonable_length", passed=300 <= canonical.metadata.estimated_word_count <= 1200, detail=f"Word count {canonical.metadata.estimated_word_count}"))
     checks.append(ATSCheck(rule="bulleted_content", passed=canonical.metadata.bullet_ratio >= 0.15, detail=f"Bullet ratio {canonical.metadata.bullet_ratio:.2f}"))
 
@@ -29,7 +31,12 @@ def _heuristic_ats(canonical: CanonicalResume, intake_data: dict | None = None)
     return ATSSignal(overall_pass=rate >= 0.7, pass_rate=rate, checks=checks)
 
 
-async def extract_ats(canonical: CanonicalResume, model: str | None = None, intake_data: dict | None = None) -> ATSSignal:
+async def extract_ats(
+    canonical: CanonicalResume,
+    model: str | None = None,
+    intake_data: dict | None = None,
+    timeline: Timeline | None = None,
+) -> ATSSignal:
     payload = {
         "metadata": canonical.metadata.model_dump(),
         "section_order": canonical.metadata.section_order,
@@ -44,4 +51,4 @@ async def extract_ats(canonical: CanonicalResume, model: str | None = None, inta
             return ATSSignal.model_validate(llm)
         except Exception:
             pass
-    return _heuristic_ats(canonical, intake_data)
+    return _heuristic_ats(canonical, intake_data, timeline)
@@ -1,25 +1,24 @@
-import re
+from app.config import config
 
+from ..bullet_model import get_bullet_classifier, record_labels
+from ..features import BulletFeatureIndex, feature_index
 from ..llm import call_gemini
 from ..prompts import IMPACT_EXTRACTOR_PROMPT
+from ..signal_cache import bullet_key, cache_stats, get_signal_cache
 from ..types import CanonicalResume, ImpactSignal
 
-VERB_RE = re.compile(r"\b(increased|reduced|improved|built|launched|delivered|designed|optimized|led|implemented|owned|managed|created)\b", re.IGNORECASE)
-NUM_RE = re.compile(r"\b\d+(?:\.\d+)?%?|\$\d+[\d,]*(?:\.\d+)?\b")
 
-
-def _heuristic_impact(canonical: CanonicalResume) -> list[ImpactSignal]:
+def _heuristic_impact(canonical: CanonicalResume, features: BulletFeatureIndex | None = None) -> list[ImpactSignal]:
+    index = feature_index(canonical, features)
     signals: list[ImpactSignal] = []
-    for ri, role in enumerate(canonical.experience):
-        for bi, bullet in enumerate(role.bullets):
-            b = bullet.lower()
-            metrics = NUM_RE.findall(bullet)
-            verbs = VERB_RE.findall(bullet)
+    for ri in range(index.role_count):
+        for bi, i in enumerate(index.role_range(ri)):
+            metrics = index.metrics[i]
             if metrics:
                 impact_type, quant, star = "metric", "strong", 0.85
-            elif any(k in b for k in ["improved", "increased", "reduced", "optimized", "launched"]):
+            elif index.has(i, "outcome"):
                 impact_type, quant, star = "outcome", "weak", 0.62
-            elif any(k in b for k in ["responsible for", "tasked with", "worked on"]):
+            elif index.has(i, "duty"):
                 impact_type, quant, star = "duty", "none", 0.28
             else:
                 impact_type, quant, star = "scope", "none", 0.45
@@ -27,28 +26,97 @@ def _heuristic_impact(canonical: CanonicalResume) -> list[ImpactSignal]:
                 ImpactSignal(
                     role_index=ri,
                     bullet_index=bi,
-                    text=bullet,
+                    text=index.texts[i],
                     impact_type=impact_type,
                     quantification=quant,
                     star_score=star,
-                    verbs=[v.lower() for v in verbs],
-                    metrics=metrics,
+                    verbs=list(index.verbs[i]),
+                    metrics=list(metrics),
                 )
             )
     return signals
 
 
-async def extract_impact(canonical: CanonicalResume, model: str | None = None, intake_data: dict | None = None) -> list[ImpactSignal]:
-    payload = {
-        "experience": [
-            {"role_index": i, "company": r.company, "title": r.title, "bullets": r.bullets}
-            for i, r in enumerate(canonical.experience)
-        ]
-    }
-    llm = await call_gemini(IMPACT_EXTRACTOR_PROMPT, str(payload), model=model or "gemini-2.5-flash")
-    if isinstance(llm, list):
-        try:
-            return [ImpactSignal.model_validate(x) for x in llm]
-        except Exception:
-            pass
-    return _heuristic_impact(canonical)
+async def extract_impact(
+    canonical: CanonicalResume,
+    model: str | None = None,
+    intake_data: dict | None = None,
+    features: BulletFeatureIndex | None = None,
+    stats: dict | None = None,
+) -> list[ImpactSignal]:
+    """Classify every bullet: signal cache first, then the local classifier
+    when one is configured, and only the remaining bullets go to the LLM.
+    Cache hits and misses and the local/escalated split go into ``stats``."""
+    model = model or "gemini-2.5-flash"
+    cache = get_signal_cache()
+    signals: dict[tuple[int, int], ImpactSignal] = {}
+    missing: dict[tuple[int, int], str] = {}
+    for ri, role in enumerate(canonical.experience):
+        for bi, bullet in enumerate(role.bullets):
+            key = bullet_key(bullet, model, IMPACT_EXTRACTOR_PROMPT)
+            hit = cache.impact.get(key) if cache else None
+            if hit is not None:
+                signals[(ri, bi)] = hit.model_copy(update={"role_index": ri, "bullet_index": bi, "text": bullet})
+            else:
+                missing[(ri, bi)] = key
+    if stats is not None:
+        stats.update(cache_stats(len(signals), len(missing)))
+
+    classifier = get_bullet_classifier()
+    if classifier is not None and missing:
+        index = feature_index(canonical, features)
+        positions = list(missing)
+        flat = [index.role_range(ri)[bi] for ri, bi in positions]
+        for (ri, bi), i, prediction in zip(positions, flat, classifier.predict([index.texts[i] for i in flat])):
+            if prediction.confidence < config.bullet_model.min_confidence:
+                continue
+            signals[(ri, bi)] = ImpactSignal(
+                role_index=ri,
+                bullet_index=bi,
+                text=index.texts[i],
+                impact_type=prediction.impact_type,
+                quantification=prediction.quantification,
+                star_score=prediction.star_score,
+                verbs=list(index.verbs[i]),
+                metrics=list(index.metrics[i]),
+            )
+            del missing[(ri, bi)]
+        if stats is not None:
+            stats["local"] = len(positions) - len(missing)
+            stats["escalated"] = len(missing)
+
+    if missing:
+        payload = {
+            "experience": [
+                {
+                    "role_index": ri,
+                    "company": role.company,
+                    "title": role.title,
+                    "bullets": [{"bullet_index": bi, "text": b} for bi, b in enumerate(role.bullets) if (ri, bi) in missing],
+                }
+                for ri, role in enumerate(canonical.experience)
+                if any((ri, bi) in missing for bi in range(len(role.bullets)))
+            ]
+        }
+        llm = await call_gemini(IMPACT_EXTRACTOR_PROMPT, str(payload), model=model)
+        fresh: list[ImpactSignal] = []
+        if isinstance(llm, list):
+            try:
+                fresh = [ImpactSignal.model_validate(x) for x in llm]
+            except Exception:
+                fresh = []
+        accepted: list[ImpactSignal] = []
+        for signal in fresh:
+            pos = (signal.role_index, signal.bullet_index)
+            if pos in missing and pos not in signals:
+                signals[pos] = signal
+                # Label the bullet as it appears in the resume, not the LLM's echo of it.
+                accepted.append(signal.model_copy(update={"text": canonical.experience[pos[0]].bullets[pos[1]]}))
+                if cache:
+                    cache.impact.set(missing[pos], signal)
+        await record_labels(accepted)
+
+    if any(pos not in signals for pos in missing):
+        for signal in _heuristic_impact(canonical, features):
+            signals.setdefault((signal.role_index, signal.bullet_index), signal)
+    return [signals[pos] for pos in sorted(signals)]
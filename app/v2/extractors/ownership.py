@@ -1,40 +1,58 @@
+from app.config import config
+
+from ..features import BulletFeatureIndex, feature_index
 from ..llm import call_gemini
 from ..prompts import OWNERSHIP_DETECTOR_PROMPT
+from ..signal_cache import cache_stats, get_signal_cache, role_key
 from ..types import CanonicalResume, OwnershipSignal
 
 
-def _heuristic_ownership(canonical: CanonicalResume) -> list[OwnershipSignal]:
-    led = {"led", "owned", "architected", "spearheaded", "built"}
-    contributed = {"collaborated", "helped", "supported", "partnered"}
-    participated = {"worked on", "assisted", "participated"}
+def _heuristic_confidence(index: BulletFeatureIndex, role_index: int) -> float:
+    """How clear-cut the heuristic ownership level is for one role.
+
+    A single level with no passive phrasing is unambiguous; mixed levels,
+    passive phrasing or no ownership language at all are not. Levels are
+    picked from substring hits, so a level whose verb only appears inside
+    another word ("Handled", "Scheduled") is ambiguous too.
+    """
+    groups = ("led", "contributed", "participated")
+    levels = sum(index.role_has(role_index, group) for group in groups)
+    if not levels:
+        return 0.2
+    if any(index.role_has(role_index, g) and not index.role_has_word(role_index, g) for g in groups):
+        return 0.3
+    confidence = 0.9 if levels == 1 else 0.6
+    if index.role_has(role_index, "passive"):
+        confidence -= 0.3
+    return round(confidence, 2)
 
+
+def _heuristic_ownership(canonical: CanonicalResume, features: BulletFeatureIndex | None = None) -> list[OwnershipSignal]:
+    index = feature_index(canonical, features)
     result: list[OwnershipSignal] = []
     for i, role in enumerate(canonical.experience):
-        bullets = " | ".join(role.bullets).lower()
+        mask = index.role_masks[i]
         evidence = role.bullets[:3]
-        passive_flags = []
 
-        if any(k in bullets for k in led):
+        if index.role_has(i, "led"):
             level = "led"
-        elif any(k in bullets for k in contributed):
+        elif index.role_has(i, "contributed"):
             level = "contributed"
-        elif any(k in bullets for k in participated):
+        elif index.role_has(i, "participated"):
             level = "participated"
         else:
             level = "unclear"
 
-        if "across" in bullets or "cross-functional" in bullets:
+        if index.role_has(i, "scope_cross"):
             scope = "cross-functional"
-        elif "team" in bullets or "squad" in bullets:
+        elif index.role_has(i, "scope_team"):
             scope = "team"
-        elif "org" in bullets or "company-wide" in bullets:
+        elif index.role_has(i, "scope_org"):
             scope = "org-wide"
         else:
             scope = "individual"
 
-        for token in ["responsible for", "helped", "worked on", "assisted"]:
-            if token in bullets:
-                passive_flags.append(token)
+        passive_flags = index.hits(mask, "passive")
 
         result.append(
             OwnershipSignal(
@@ -51,17 +69,62 @@ def _heuristic_ownership(canonical: CanonicalResume) -> list[OwnershipSignal]:
     return result
 
 
-async def extract_ownership(canonical: CanonicalResume, model: str | None = None, intake_data: dict | None = None) -> list[OwnershipSignal]:
-    payload = {
-        "experience": [
-            {"role_index": i, "company": r.company, "title": r.title, "bullets": r.bullets}
-            for i, r in enumerate(canonical.experience)
-        ]
-    }
-    llm = await call_gemini(OWNERSHIP_DETECTOR_PROMPT, str(payload), model=model or "gemini-2.5-flash")
-    if isinstance(llm, list):
-        try:
-            return [OwnershipSignal.model_validate(x) for x in llm]
-        except Exception:
-            pass
-    return _heuristic_ownership(canonical)
+async def extract_ownership(
+    canonical: CanonicalResume,
+    model: str | None = None,
+    intake_data: dict | None = None,
+    features: BulletFeatureIndex | None = None,
+    stats: dict | None = None,
+) -> list[OwnershipSignal]:
+    """Assess every role: signal cache first, then the heuristic where its
+    confidence clears ``OWNERSHIP_MIN_CONFIDENCE``; only the ambiguous
+    remainder goes to the LLM. Cache hits and the escalation share are
+    written into ``stats``."""
+    model = model or "gemini-2.5-flash"
+    cache = get_signal_cache()
+    signals: dict[int, OwnershipSignal] = {}
+    missing: dict[int, str] = {}
+    for i, role in enumerate(canonical.experience):
+        key = role_key(role, model, OWNERSHIP_DETECTOR_PROMPT)
+        hit = cache.ownership.get(key) if cache else None
+        if hit is not None:
+            signals[i] = hit.model_copy(update={"role_index": i})
+        else:
+            missing[i] = key
+    if stats is not None:
+        stats.update(cache_stats(len(signals), len(missing)))
+
+    index = feature_index(canonical, features)
+    heuristic = _heuristic_ownership(canonical, index)
+    for i in list(missing):
+        if _heuristic_confidence(index, i) >= config.ownership.min_confidence:
+            signals[i] = heuristic[i]
+            del missing[i]
+    if stats is not None:
+        stats["escalated"] = len(missing)
+        stats["escalation_rate"] = round(len(missing) / len(canonical.experience), 3) if canonical.experience else 0.0
+
+    if missing:
+        payload = {
+            "experience": [
+                {"role_index": i, "company": r.company, "title": r.title, "bullets": r.bullets}
+                for i, r in enumerate(canonical.experience)
+                if i in missing
+            ]
+        }
+        llm = await call_gemini(OWNERSHIP_DETECTOR_PROMPT, str(payload), model=model)
+        fresh: list[OwnershipSignal] = []
+        if isinstance(llm, list):
+            try:
+                fresh = [OwnershipSignal.model_validate(x) for x in llm]
+            except Exception:
+                fresh = []
+        for signal in fresh:
+            if signal.role_index in missing and signal.role_index not in signals:
+                signals[signal.role_index] = signal
+                if cache:
+                    cache.ownership.set(missing[signal.role_index], signal)
+
+    for signal in heuristic:
+        signals.setdefault(signal.role_index, signal)
+    return [signals[i] for i in sorted(signals)]
@@ -1,10 +1,13 @@
-from datetime import datetime
-
+from ..features import BulletFeatureIndex, feature_index
 from ..llm import call_gemini
 from ..prompts import RED_FLAG_DETECTOR_PROMPT
+from ..timeline import Timeline, resume_timeline
 from ..types import CanonicalResume, RedFlag, RedFlagSignal
 
-
+# A month or two of overlap is a normal handover between jobs.
+MIN_OVERLAP_MONTHS = 3
+MIN_GAP_MONTHS = 6
+SHORT_TENURE_MONTHS = 12
 
 
 _FLAG_ALIASES = {
@@ -20,48 +23,39 @@ def _normalize_flag_types(signal: RedFlagSignal) -> RedFlagSignal:
     return RedFlagSignal(flags=normalized)
 
 
-def _to_dt(ym: str | None) -> datetime | None:
-    if not ym or len(ym) < 7:
-        return None
-    try:
-        return datetime.strptime(ym, "%Y-%m")
-    except Exception:
-        return None
-
-
-def _months_between(a: datetime, b: datetime) -> int:
-    return (b.year - a.year) * 12 + (b.month - a.month)
-
-
-def _heuristic_red_flags(canonical: CanonicalResume) -> RedFlagSignal:
+def _heuristic_red_flags(
+    canonical: CanonicalResume,
+    features: BulletFeatureIndex | None = None,
+    timeline: Timeline | None = None,
+) -> RedFlagSignal:
+    index = feature_index(canonical, features)
+    timeline = resume_timeline(canonical, timeline)
     flags: list[RedFlag] = []
 
-    # gaps
-    roles = sorted(canonical.experience, key=lambda r: r.start_date or "")
-    for i in range(1, len(roles)):
-        prev_end = _to_dt(roles[i - 1].end_date)
-        curr_start = _to_dt(roles[i].start_date)
-        if prev_end and curr_start:
-            gap = _months_between(prev_end, curr_start)
-            if gap > 6:
-                flags.append(RedFlag(type="employment_gap", severity="medium" if gap < 12 else "high", detail=f"{gap}-month gap between roles", location=f"experience[{i}]"))
+    for gap in timeline.gaps(MIN_GAP_MONTHS):
+        flags.append(RedFlag(type="employment_gap", severity="medium" if gap.months < 12 else "high", detail=f"{gap.months}-month gap between roles", location=f"experience[{gap.before_role}]"))
+
+    for overlap in timeline.overlaps(MIN_OVERLAP_MONTHS):
+        if overlap.ambiguous:
+            continue
+        first, second = canonical.experience[overlap.first], canonical.experience[overlap.second]
+        flags.append(RedFlag(type="overlapping_employment", severity="medium", detail=f"{first.company or first.title} and {second.company or second.title} overlap by {overlap.months} months", location=f"experience[{overlap.second}]"))
 
     # hopping + generic language
     short_roles = 0
     generic_hits = 0
     stale_hits = 0
-    stale_tokens = {"jquery", "svn", "dreamweaver", "visual basic 6"}
 
-    for i, role in enumerate(canonical.experience):
-        start, end = _to_dt(role.start_date), _to_dt(role.end_date)
-        if start and end and _months_between(start, end) < 12:
+    for iv in timeline.intervals:
+        if not iv.ongoing and iv.months < SHORT_TENURE_MONTHS:
             short_roles += 1
-        for j, bullet in enumerate(role.bullets):
-            b = bullet.lower()
-            if "responsible for" in b or "various" in b:
+
+    for i in range(index.role_count):
+        for j, b in enumerate(index.role_range(i)):
+            if index.has(b, "generic"):
                 generic_hits += 1
                 flags.append(RedFlag(type="generic_language", severity="low", detail="Duty-heavy or generic wording", location=f"experience[{i}].bullets[{j}]"))
-            if any(t in b for t in stale_tokens):
+            if index.has(b, "stale"):
                 stale_hits += 1
 
     if short_roles >= 3:
@@ -74,7 +68,13 @@ def _heuristic_red_flags(canonical: CanonicalResume) -> RedFlagSignal:
     return RedFlagSignal(flags=flags)
 
 
-async def extract_red_flags(canonical: CanonicalResume, model: str | None = None, intake_data: dict | None = None) -> RedFlagSignal:
+async def extract_red_flags(
+    canonical: CanonicalResume,
+    model: str | None = None,
+    intake_data: dict | None = None,
+    features: BulletFeatureIndex | None = None,
+    timeline: Timeline | None = None,
+) -> RedFlagSignal:
     payload = {
         "experience": [r.model_dump() for r in canonical.experience],
         "skills": canonical.skills,
@@ -85,4 +85,4 @@ async def extract_red_flags(canonical: CanonicalResume, model: str | None = None
             return _normalize_flag_types(RedFlagSignal.model_validate(llm))
         except Exception:
             pass
-    return _normalize_flag_types(_heuristic_red_flags(canonical))
+    return _normalize_flag_types(_heuristic_red_flags(canonical, features, timeline))
@@ -1,34 +1,31 @@
-import re
-
+from ..features import BulletFeatureIndex, feature_index
 from ..llm import call_gemini
 from ..prompts import SKILLS_EXTRACTOR_PROMPT
+from ..taxonomy import get_taxonomy
 from ..types import CanonicalResume, EvidencedSoftSkill, ExtractedSkill, SkillSignal
 
-SOFT_SKILL_HINTS = ["leadership", "communication", "stakeholder", "mentorship", "ownership", "collaboration"]
-
 
-def _heuristic_skills(canonical: CanonicalResume) -> SkillSignal:
+def _heuristic_skills(canonical: CanonicalResume, features: BulletFeatureIndex | None = None) -> SkillSignal:
+    index = feature_index(canonical, features)
+    taxonomy = get_taxonomy()
     hard: dict[str, ExtractedSkill] = {}
 
-    for s in canonical.skills:
-        key = s.strip().lower()
-        if key:
-            hard[key] = ExtractedSkill(name=s.strip(), depth="familiar", context="skills section")
+    for entry in canonical.skills:
+        entry = entry.strip()
+        # Entries the taxonomy does not know are kept as the candidate wrote them.
+        for name in taxonomy.skill_names(entry, listed=True) or ([entry] if entry else []):
+            hard.setdefault(name.lower(), ExtractedSkill(name=name, depth="familiar", context="skills section"))
 
-    bullets = "\n".join(b for r in canonical.experience for b in r.bullets)
-    tokens = re.findall(r"\b[A-Za-z][A-Za-z0-9+#.-]{1,24}\b", bullets)
-    for token in tokens:
-        tl = token.lower()
-        if tl in hard:
-            hard[tl].depth = "proficient"
-        elif token[0].isupper() and len(token) > 2:
-            hard[tl] = ExtractedSkill(name=token, depth="proficient", context="experience bullets")
+    for name in (n for names in index.skills for n in names):
+        key = name.lower()
+        if key in hard:
+            hard[key].depth = "proficient"
+        else:
+            hard[key] = ExtractedSkill(name=name, depth="proficient", context="experience bullets")
 
     soft = []
-    low = bullets.lower()
-    for hint in SOFT_SKILL_HINTS:
-        if hint in low:
-            soft.append(EvidencedSoftSkill(name=hint.title(), evidence=f"Mentioned in role bullets ({hint})"))
+    for hint in index.hits(index.document_mask, "soft_skill"):
+        soft.append(EvidencedSoftSkill(name=hint.title(), evidence=f"Mentioned in role bullets ({hint})"))
 
     return SkillSignal(
         hard_skills=list(hard.values())[:40],
@@ -37,7 +34,12 @@ def _heuristic_skills(canonical: CanonicalResume) -> SkillSignal:
     )
 
 
-async def extract_skills(canonical: CanonicalResume, model: str | None = None, intake_data: dict | None = None) -> SkillSignal:
+async def extract_skills(
+    canonical: CanonicalResume,
+    model: str | None = None,
+    intake_data: dict | None = None,
+    features: BulletFeatureIndex | None = None,
+) -> SkillSignal:
     payload = {
         "skills": canonical.skills,
         "experience": [{"title": r.title, "bullets": r.bullets} for r in canonical.experience],
@@ -49,4 +51,4 @@ async def extract_skills(canonical: CanonicalResume, model: str | None = None, i
             return SkillSignal.model_validate(llm)
         except Exception:
             pass
-    return _heuristic_skills(canonical)
+    return _heuristic_skills(canonical, features)
@@ -0,0 +1,153 @@
+"""
+Bullet feature index — per-request bullet features computed once.
+
+The heuristic extractors and the rewrite validator all look at the same
+bullets: lowercase text, numeric metrics, action verbs, taxonomy skills and
+a set of keyword lists. BulletFeatureIndex walks every bullet a single time and
+stores those features in flat arrays, with keyword membership packed into
+one bitmask per bullet, so each consumer reads instead of re-scanning.
+"""
+
+import re
+from array import array
+
+from .taxonomy import get_taxonomy
+from .types import CanonicalResume
+
+VERB_RE = re.compile(r"\b(increased|reduced|improved|built|launched|delivered|designed|optimized|led|implemented|owned|managed|created)\b", re.IGNORECASE)
+NUM_RE = re.compile(r"\b\d+(?:\.\d+)?%?|\$\d+[\d,]*(?:\.\d+)?\b")
+NUMERAL_RE = re.compile(r"\d+[%x]?")
+
+WEAK_PHRASES = [
+    "responsible for", "worked on", "helped with", "involved in",
+    "assisted with", "participated in", "was tasked with",
+]
+SOFT_SKILL_HINTS = ["leadership", "communication", "stakeholder", "mentorship", "ownership", "collaboration"]
+
+# Keyword groups matched as lowercase substrings; order matters where a
+# consumer reports the first or all hits.
+KEYWORD_GROUPS: dict[str, tuple[str, ...]] = {
+    "outcome": ("improved", "increased", "reduced", "optimized", "launched"),
+    "duty": ("responsible for", "tasked with", "worked on"),
+    "led": ("led", "owned", "architected", "spearheaded", "built"),
+    "contributed": ("collaborated", "helped", "supported", "partnered"),
+    "participated": ("worked on", "assisted", "participated"),
+    "scope_cross": ("across", "cross-functional"),
+    "scope_team": ("team", "squad"),
+    "scope_org": ("org", "company-wide"),
+    "passive": ("responsible for", "helped", "worked on", "assisted"),
+    "generic": ("responsible for", "various"),
+    "stale": ("jquery", "svn", "dreamweaver", "visual basic 6"),
+    "weak_phrase": tuple(WEAK_PHRASES),
+    "soft_skill": tuple(SOFT_SKILL_HINTS),
+}
+
+
+def _assign_bits(groups: dict[str, tuple[str, ...]]) -> dict[str, int]:
+    bits: dict[str, int] = {}
+    for keywords in groups.values():
+        for kw in keywords:
+            bits.setdefault(kw, 1 << len(bits))
+    return bits
+
+
+KEYWORD_BITS = _assign_bits(KEYWORD_GROUPS)
+GROUP_MASKS = {
+    group: sum(KEYWORD_BITS[kw] for kw in set(keywords)) for group, keywords in KEYWORD_GROUPS.items()
+}
+assert len(KEYWORD_BITS) <= 64, "keyword masks are stored as unsigned 64-bit integers"
+KEYWORD_WORD_RES = {kw: re.compile(rf"\b{re.escape(kw)}\b") for kw in KEYWORD_BITS}
+
+
+def keyword_mask(lower: str) -> int:
+    mask = 0
+    for kw, bit in KEYWORD_BITS.items():
+        if kw in lower:
+            mask |= bit
+    return mask
+
+
+def word_mask(lower: str, mask: int) -> int:
+    """The bits of ``mask`` whose keyword appears as whole words, so "led"
+    counts in "Led the team" but not in "Handled tickets"."""
+    return sum(bit for kw, bit in KEYWORD_BITS.items() if mask & bit and KEYWORD_WORD_RES[kw].search(lower))
+
+
+class BulletFeatureIndex:
+    """Features for every bullet, addressed by flat index or by role.
+
+    Bullets of role ``r`` occupy ``role_offsets[r]:role_offsets[r + 1]``.
+    """
+
+    def __init__(self, bullets_by_role: list[list[str]]):
+        self.texts: list[str] = []
+        self.lower: list[str] = []
+        self.metrics: list[list[str]] = []
+        self.verbs: list[list[str]] = []
+        self.skills: list[list[str]] = []
+        self.numerals: list[set[str]] = []
+        self.masks = array("Q")
+        self.word_counts = array("I")
+        self.role_offsets = array("I", [0])
+        self.role_masks = array("Q")
+        # Whole-word keyword hits per role, a subset of ``role_masks``.
+        self.role_word_masks = array("Q")
+
+        taxonomy = get_taxonomy()
+        for bullets in bullets_by_role:
+            role_mask = role_word_mask = 0
+            for bullet in bullets:
+                lower = bullet.lower()
+                mask = keyword_mask(lower)
+                role_mask |= mask
+                role_word_mask |= word_mask(lower, mask)
+                self.texts.append(bullet)
+                self.lower.append(lower)
+                self.metrics.append(NUM_RE.findall(bullet))
+                self.verbs.append([v.lower() for v in VERB_RE.findall(bullet)])
+                self.skills.append([m.name for m in taxonomy.find(bullet)])
+                self.numerals.append(set(NUMERAL_RE.findall(bullet)))
+                self.masks.append(mask)
+                self.word_counts.append(len(bullet.split()))
+            self.role_offsets.append(len(self.texts))
+            self.role_masks.append(role_mask)
+            self.role_word_masks.append(role_word_mask)
+
+    @classmethod
+    def from_canonical(cls, canonical: CanonicalResume) -> "BulletFeatureIndex":
+        return cls([role.bullets for role in canonical.experience])
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def role_count(self) -> int:
+        return len(self.role_masks)
+
+    def role_range(self, role_index: int) -> range:
+        return range(self.role_offsets[role_index], self.role_offsets[role_index + 1])
+
+    def has(self, index: int, group: str) -> bool:
+        return bool(self.masks[index] & GROUP_MASKS[group])
+
+    def role_has(self, role_index: int, group: str) -> bool:
+        return bool(self.role_masks[role_index] & GROUP_MASKS[group])
+
+    def role_has_word(self, role_index: int, group: str) -> bool:
+        return bool(self.role_word_masks[role_index] & GROUP_MASKS[group])
+
+    @property
+    def document_mask(self) -> int:
+        mask = 0
+        for role_mask in self.role_masks:
+            mask |= role_mask
+        return mask
+
+    @staticmethod
+    def hits(mask: int, group: str) -> list[str]:
+        """Keywords of ``group`` present in ``mask``, in group order."""
+        return [kw for kw in KEYWORD_GROUPS[group] if mask & KEYWORD_BITS[kw]]
+
+
+def feature_index(canonical: CanonicalResume, features: BulletFeatureIndex | None = None) -> BulletFeatureIndex:
+    return features if features is not None else BulletFeatureIndex.from_canonical(canonical)
@@ -0,0 +1,361 @@
+"""
+Template-first recommendations and interview prep.
+
+Most of what the recommendation and interview-prep stages say is a
+deterministic function of the analysis: which score dimensions are weak,
+which red-flag types fired, whether ownership is unclear or never "led",
+and which requirements alignment found missing. ``triggers`` reduces an
+analysis to those signal keys. The template library maps each key to a
+recommendation and/or an interview question, filled in with the resume's
+own details. Recommendations are ranked by the weakest score dimension and
+questions by severity, all locally.
+
+An optional single LLM call then polishes the wording of both lists at
+once. It may only rewrite titles, descriptions, "after" rewrites, questions
+and coaching notes; ids, dimensions, priorities and severities stay as the
+templates set them. ``fast`` skips it.
+"""
+
+import json
+from typing import NamedTuple
+
+from app.config import config
+
+from .llm import call_gemini
+from .prompts import GUIDANCE_POLISH_PROMPT
+from .types import InterviewQuestion, Recommendation
+
+MAX_RECOMMENDATIONS = 5
+MAX_QUESTIONS = 8
+MAX_FLAG_QUESTIONS = 4
+MAX_GAP_QUESTIONS = 2
+SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+class RecTemplate(NamedTuple):
+    id: str
+    title: str
+    dimension: str
+    effort: str
+    impact: float
+    description: str
+    location: str
+    before: str | None = None
+    after: str | None = None
+
+
+class QuestionTemplate(NamedTuple):
+    question: str
+    coaching_note: str
+    framework: str
+    do_not: str
+    # None takes the severity of the flag or gap that triggered it.
+    severity: str | None = None
+    likelihood: str | None = None
+
+
+class Trigger(NamedTuple):
+    key: str
+    source: str
+    severity: str
+    context: dict
+
+
+RECOMMENDATIONS: dict[str, RecTemplate] = {
+    "impact:unquantified": RecTemplate(
+        "rec-impact-1", "Rewrite top bullets with measurable outcomes", "impact_quality", "moderate", 10,
+        "Add metric + context + result to at least 5 bullets.", "experience",
+        before="Responsible for API development", after="Built 6 partner APIs, reducing onboarding time by 32%.",
+    ),
+    "ownership:not_led": RecTemplate(
+        "rec-ownership-1", "Make ownership explicit in each role", "ownership", "low", 7,
+        "Replace passive verbs with decision-level ownership statements.", "experience",
+    ),
+    "ats:failing": RecTemplate(
+        "rec-ats-1", "Improve ATS structure", "ats_compliance", "low", 6,
+        "Ensure standard headers, consistent dates, and contact metadata.", "resume_header",
+    ),
+    "overall:low": RecTemplate(
+        "rec-narrative-1", "Strengthen resume narrative", "narrative_coherence", "moderate", 5,
+        "Align summary and experience bullets with target role outcomes.", "summary",
+    ),
+    "summary:missing": RecTemplate(
+        "rec-summary-1", "Add a targeted summary", "narrative_coherence", "low", 4,
+        "Open with two lines naming the {role} scope you have owned and your strongest result.", "summary",
+    ),
+    "skills:unmatched": RecTemplate(
+        "rec-skills-1", "Evidence missing role skills", "skills_relevance", "moderate", 6,
+        "Show evidence of {skills} in experience bullets, or list the skills if you have them.", "skills",
+    ),
+    "competency:unmatched": RecTemplate(
+        "rec-competency-1", "Cover missing role competencies", "narrative_coherence", "moderate", 5,
+        "Add a bullet that evidences: {competencies}.", "experience",
+    ),
+    "flag:employment_gap": RecTemplate(
+        "rec-gap-1", "Account for the employment gap", "red_flag_penalty", "low", 3,
+        "Add a one-line entry for the gap (study, caregiving, freelance) so screeners do not guess.", "experience",
+    ),
+    "flag:job_hopping": RecTemplate(
+        "rec-tenure-1", "Frame short tenures", "red_flag_penalty", "low", 3,
+        "Mark contract or acquired roles as such and group short stints under one heading.", "experience",
+    ),
+    "flag:overlapping_employment": RecTemplate(
+        "rec-overlap-1", "Clarify overlapping roles", "red_flag_penalty", "low", 2,
+        "Label concurrent roles as part-time, advisory or contract.", "experience",
+    ),
+    "flag:stale_tech": RecTemplate(
+        "rec-stack-1", "Foreground your current stack", "skills_relevance", "low", 4,
+        "Lead the skills section and recent bullets with the tools you use today.", "skills",
+    ),
+    "flag:generic_language": RecTemplate(
+        "rec-language-1", "Replace generic phrasing", "red_flag_penalty", "low", 3,
+        "Swap duty phrases like \"responsible for\" for what you built or changed.", "experience",
+    ),
+}
+
+QUESTIONS: dict[str, QuestionTemplate] = {
+    "flag:employment_gap": QuestionTemplate(
+        "Can you walk us through the timeline and intent behind the employment gap?",
+        "Be concise, honest, and outcomes-focused.", "STAR", "Do not blame former employers.",
+    ),
+    "flag:job_hopping": QuestionTemplate(
+        "What drove your recent role transitions, and what stability are you seeking next?",
+        "Be concise, honest, and outcomes-focused.", "STAR", "Do not blame former employers.",
+    ),
+    "flag:overlapping_employment": QuestionTemplate(
+        "Your resume shows overlapping roles ({detail}); how was your time split between them?",
+        "State the arrangement plainly and what each role delivered.", "STAR", "Do not leave the overlap unexplained.",
+    ),
+    "flag:stale_tech": QuestionTemplate(
+        "How current is your hands-on experience with the tools this role uses?",
+        "Name recent projects and what you learned most recently.", "STAR", "Do not overstate depth in tools you have not used lately.",
+    ),
+    "flag:generic_language": QuestionTemplate(
+        "Which project best shows a result you drove, rather than a duty you held?",
+        "Name the outcome first, then your part in it.", "STAR", "Do not restate your job description.",
+    ),
+    "flag:impact_weakness": QuestionTemplate(
+        "Pick one project and tell us the measurable result you drove.",
+        "Lead with the number, then how you got there.", "STAR", "Do not describe duties without outcomes.",
+    ),
+    "flag:*": QuestionTemplate(
+        "Can you clarify this concern: {detail}?",
+        "Be concise, honest, and outcomes-focused.", "STAR", "Do not blame former employers.",
+    ),
+    "ownership:unclear": QuestionTemplate(
+        "What specific decisions did you personally own in your recent projects?",
+        "Differentiate what you led vs supported.", "CAR", "Do not use vague wording like 'helped with everything'.",
+        severity="high", likelihood="high",
+    ),
+    "gap:skill": QuestionTemplate(
+        "Where have you used {name}, and how deep is that experience?",
+        "Give one concrete project and your level honestly.", "Gap-Action-Result", "Do not deny the gap; show plan and progress.",
+        likelihood="medium",
+    ),
+    "gap:competency": QuestionTemplate(
+        "Walk us through your experience with: {name}.",
+        "Pick the closest example you have and say what you would do differently at this level.", "STAR",
+        "Do not deny the gap; show plan and progress.", likelihood="medium",
+    ),
+    "gap:*": QuestionTemplate(
+        "How are you addressing this gap: {name}?",
+        "Provide active learning and practical evidence.", "Gap-Action-Result", "Do not deny the gap; show plan and progress.",
+        likelihood="medium",
+    ),
+}
+
+
+def _weakest_bullet(impact: list) -> str | None:
+    weak = [s for s in impact if getattr(s, "quantification", "") == "none" and getattr(s, "text", "")]
+    return min(weak, key=lambda s: s.star_score).text if weak else None
+
+
+def triggers(score, signals: dict, alignment=None, canonical=None, target_role: str = "") -> list[Trigger]:
+    """The signal keys an analysis fires, in the order questions are asked."""
+    fired: list[Trigger] = []
+    red_flags = signals.get("red_flags")
+    for flag in (getattr(red_flags, "flags", None) or [])[:MAX_FLAG_QUESTIONS]:
+        fired.append(Trigger(f"flag:{flag.type}", flag.type, flag.severity, {"detail": flag.detail}))
+
+    ownership = signals.get("ownership", [])
+    if any(getattr(o, "ownership_level", "") == "unclear" for o in ownership):
+        fired.append(Trigger("ownership:unclear", "ownership", "high", {}))
+    if not any(getattr(o, "ownership_level", "") == "led" for o in ownership):
+        fired.append(Trigger("ownership:not_led", "ownership", "medium", {}))
+
+    impact = signals.get("impact", [])
+    if sum(1 for s in impact if getattr(s, "quantification", "") == "strong") < 3:
+        fired.append(Trigger("impact:unquantified", "impact", "medium", {"before": _weakest_bullet(impact)}))
+
+    ats = signals.get("ats")
+    if ats and getattr(ats, "pass_rate", 1.0) < 0.8:
+        fired.append(Trigger("ats:failing", "ats", "medium", {}))
+    if getattr(score, "overall", 100) < 60:
+        fired.append(Trigger("overall:low", "score", "medium", {}))
+    if canonical is not None and not getattr(canonical, "summary", None):
+        fired.append(Trigger("summary:missing", "summary", "low", {"role": target_role or "target-role"}))
+
+    gaps = list(getattr(alignment, "gaps", None) or [])
+    for gap in gaps[:MAX_GAP_QUESTIONS]:
+        kind, _, name = gap.area.partition(":")
+        key = f"gap:{kind}" if name and kind in ("skill", "competency") else "gap:*"
+        fired.append(Trigger(key, "role_alignment", gap.severity, {"name": name or gap.area}))
+    skills = [g.area.partition(":")[2] for g in gaps if g.area.startswith("skill:")]
+    if skills:
+        fired.append(Trigger("skills:unmatched", "role_alignment", "medium", {"skills": ", ".join(skills[:3])}))
+    competencies = [g.area.partition(":")[2] for g in gaps if g.area.startswith("competency:")]
+    if competencies:
+        fired.append(Trigger("competency:unmatched", "role_alignment", "medium", {"competencies": "; ".join(competencies[:2])}))
+    return fired
+
+
+def rank_recommendations(recs: list[Recommendation], score) -> list[Recommendation]:
+    """Stabilize recommendation priority by tying it to weakest score dimensions."""
+    if not recs:
+        return recs
+
+    dims = getattr(score, "dimensions", {}) or {}
+
+    def _dim_score(dim: str) -> float:
+        d = dims.get(dim)
+        if d is None:
+            return 50.0
+        try:
+            return float(getattr(d, "score", 50.0))
+        except Exception:
+            return 50.0
+
+    # Lower score => higher urgency. Estimated impact breaks ties.
+    ranked = sorted(
+        recs,
+        key=lambda r: (
+            _dim_score(getattr(r, "dimension", "")),
+            -float(getattr(r, "estimated_score_impact", 0.0) or 0.0),
+            getattr(r, "title", ""),
+        ),
+    )
+
+    for i, rec in enumerate(ranked, start=1):
+        rec.priority = i
+    return ranked[:MAX_RECOMMENDATIONS]
+
+
+def _recommendations(fired: list[Trigger], score) -> list[Recommendation]:
+    recs: dict[str, Recommendation] = {}
+    for trigger in fired:
+        template = RECOMMENDATIONS.get(trigger.key)
+        if template is None or template.id in recs:
+            continue
+        before, after = template.before, template.after
+        if trigger.context.get("before"):
+            # The resume's own weakest bullet; the polish pass rewrites it.
+            before, after = trigger.context["before"], None
+        recs[template.id] = Recommendation(
+            id=template.id,
+            title=template.title,
+            dimension=template.dimension,
+            effort=template.effort,
+            estimated_score_impact=template.impact,
+            description=template.description.format(**trigger.context),
+            before=before,
+            after=after,
+            location=template.location,
+        )
+    return rank_recommendations(list(recs.values()), score)
+
+
+def _questions(fired: list[Trigger]) -> list[InterviewQuestion]:
+    questions: dict[str, InterviewQuestion] = {}
+    for trigger in fired:
+        template = QUESTIONS.get(trigger.key) or QUESTIONS.get(f"{trigger.key.partition(':')[0]}:*")
+        if template is None:
+            continue
+        question = template.question.format(**trigger.context)
+        severity = template.severity or trigger.severity
+        questions.setdefault(
+            question,
+            InterviewQuestion(
+                question=question,
+                source=trigger.source,
+                severity=severity,
+                likelihood=template.likelihood or ("high" if severity in {"high", "medium"} else "medium"),
+                coaching_note=template.coaching_note,
+                suggested_framework=template.framework,
+                do_not=template.do_not,
+            ),
+        )
+    ranked = sorted(questions.values(), key=lambda q: SEVERITY_RANK.get(q.severity, len(SEVERITY_RANK)))
+    return ranked[:MAX_QUESTIONS]
+
+
+def template_recommendations(score, signals: dict, alignment=None, canonical=None, target_role: str = "") -> list[Recommendation]:
+    return _recommendations(triggers(score, signals, alignment, canonical, target_role), score)
+
+
+def template_questions(red_flags, ownership: list, alignment=None) -> list[InterviewQuestion]:
+    return _questions(triggers(None, {"red_flags": red_flags, "ownership": ownership}, alignment))
+
+
+async def polish(target_role: str, recs: list[Recommendation], questions: list[InterviewQuestion], model: str | None = None) -> bool:
+    """Reword both lists in one LLM call, in place. Only wording fields are
+    taken from the answer; False when nothing was applied."""
+    if not recs and not questions:
+        return False
+    payload = {
+        "target_role": target_role,
+        "recommendations": [r.model_dump(include={"id", "title", "description", "before", "after"}) for r in recs],
+        "questions": [{"index": i, **q.model_dump(include={"question", "coaching_note"})} for i, q in enumerate(questions)],
+    }
+    llm = await call_gemini(GUIDANCE_POLISH_PROMPT, json.dumps(payload), model=model or "gemini-2.5-flash")
+    if not isinstance(llm, dict):
+        return False
+    applied = False
+    by_id = {r.id: r for r in recs}
+    for item in llm.get("recommendations") or []:
+        rec = by_id.get(item.get("id")) if isinstance(item, dict) else None
+        if rec is None:
+            continue
+        for field in ("title", "description", "after"):
+            if isinstance(item.get(field), str) and item[field].strip():
+                setattr(rec, field, item[field].strip())
+                applied = True
+    for item in llm.get("questions") or []:
+        index = item.get("index") if isinstance(item, dict) else None
+        if not isinstance(index, int) or not 0 <= index < len(questions):
+            continue
+        for field in ("question", "coaching_note"):
+            if isinstance(item.get(field), str) and item[field].strip():
+                setattr(questions[index], field, item[field].strip())
+                applied = True
+    return applied
+
+
+async def generate_guidance(
+    target_role: str,
+    canonical,
+    signals: dict,
+    alignment,
+    score,
+    model: str | None = None,
+    fast: bool = False,
+    stats: dict | None = None,
+) -> tuple[list[Recommendation], list[InterviewQuestion]]:
+    """Recommendations and interview questions from templates, then one
+    optional polish call for both. Which keys fired and whether the polish
+    ran go into ``stats``."""
+    fired = triggers(score, signals, alignment, canonical, target_role)
+    recs = _recommendations(fired, score)
+    questions = _questions(fired)
+    polished = "skipped"
+    if not fast and config.guidance.polish:
+        polished = "llm" if await polish(target_role, recs, questions, model) else "template"
+    if stats is not None:
+        stats.update(
+            {
+                "triggers": [t.key for t in fired],
+                "recommendations": len(recs),
+                "questions": len(questions),
+                "polish": polished,
+            }
+        )
+    return recs, questions
@@ -0,0 +1,152 @@
+"""
+Incremental re-analysis across resume versions.
+
+The last canonical resume and extractor signals are kept per ``user_id``.
+A new version is diffed against that snapshot by section and by role, so
+only roles that actually changed are sent back through the impact and
+ownership extractors and untouched document-level signals are reused.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.cache import TTLCache
+from app.config import IncrementalConfig, config
+
+from .types import (
+    ATSSignal,
+    CanonicalExperience,
+    CanonicalResume,
+    ImpactSignal,
+    OwnershipSignal,
+    RedFlagSignal,
+    SkillSignal,
+)
+
+SECTIONS = ("contact", "summary", "experience", "education", "skills", "projects", "certifications", "awards", "metadata")
+
+# Sections each document-level extractor reads; it is reused when none changed.
+SIGNAL_INPUTS = {
+    "skills": {"skills", "experience", "certifications"},
+    "ats": set(SECTIONS),
+    "red_flags": {"experience", "skills"},
+}
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def context_fingerprint(intake_data: dict, models: dict) -> str:
+    """Extractor inputs outside the resume; a change invalidates the snapshot."""
+    return _digest({"intake_data": intake_data, "models": models})
+
+
+def role_fingerprint(role: CanonicalExperience) -> str:
+    return _digest(role.model_dump())
+
+
+def section_fingerprints(canonical: CanonicalResume) -> dict[str, str]:
+    dumped = canonical.model_dump()
+    return {section: _digest(dumped[section]) for section in SECTIONS}
+
+
+class ResumeSnapshot(NamedTuple):
+    resume_version_id: str | None
+    text_hash: str
+    context_hash: str
+    canonical: CanonicalResume
+    impact: list[ImpactSignal]
+    ownership: list[OwnershipSignal]
+    skills: SkillSignal
+    ats: ATSSignal
+    red_flags: RedFlagSignal
+
+
+class VersionDiff(NamedTuple):
+    changed_sections: list[str]
+    # new role index -> previous role index for roles whose content is identical
+    reused_roles: dict[int, int]
+    changed_roles: list[int]
+
+
+def diff_versions(previous: CanonicalResume, current: CanonicalResume) -> VersionDiff:
+    before = section_fingerprints(previous)
+    after = section_fingerprints(current)
+    changed_sections = [s for s in SECTIONS if before[s] != after[s]]
+
+    # Match roles by content so reordering or inserting a role keeps the others.
+    available: dict[str, list[int]] = defaultdict(list)
+    for i, role in enumerate(previous.experience):
+        available[role_fingerprint(role)].append(i)
+    reused: dict[int, int] = {}
+    changed: list[int] = []
+    for i, role in enumerate(current.experience):
+        slots = available.get(role_fingerprint(role))
+        if slots:
+            reused[i] = slots.pop(0)
+        else:
+            changed.append(i)
+    return VersionDiff(changed_sections, reused, changed)
+
+
+def stale_signals(diff: VersionDiff) -> set[str]:
+    changed = set(diff.changed_sections)
+    return {name for name, inputs in SIGNAL_INPUTS.items() if inputs & changed}
+
+
+def subset_canonical(canonical: CanonicalResume, role_indices: list[int]) -> CanonicalResume:
+    """A copy of ``canonical`` holding only the given roles, in that order."""
+    subset = canonical.model_copy(deep=True)
+    subset.experience = [subset.experience[i] for i in role_indices]
+    return subset
+
+
+def stitch_role_signals(
+    previous: list,
+    fresh: list,
+    diff: VersionDiff,
+) -> list:
+    """Merge reused and recomputed per-role signals under the new role indices.
+
+    ``fresh`` was extracted from ``subset_canonical(current, diff.changed_roles)``
+    so its role indices point into ``diff.changed_roles``.
+    """
+    by_previous_role: dict[int, list] = defaultdict(list)
+    for signal in previous:
+        by_previous_role[signal.role_index].append(signal)
+
+    merged = []
+    for new_index, old_index in diff.reused_roles.items():
+        merged.extend(s.model_copy(update={"role_index": new_index}) for s in by_previous_role.get(old_index, []))
+    for signal in fresh:
+        if 0 <= signal.role_index < len(diff.changed_roles):
+            merged.append(signal.model_copy(update={"role_index": diff.changed_roles[signal.role_index]}))
+    merged.sort(key=lambda s: (s.role_index, getattr(s, "bullet_index", 0)))
+    return merged
+
+
+class ResumeVersionStore:
+    def __init__(self, settings: IncrementalConfig = config.incremental):
+        self.snapshots: TTLCache[ResumeSnapshot] = TTLCache(maxsize=settings.store_size, ttl_seconds=settings.ttl_seconds)
+
+    def get(self, user_id: str, context_hash: str) -> ResumeSnapshot | None:
+        snapshot = self.snapshots.get(user_id)
+        if snapshot is None or snapshot.context_hash != context_hash:
+            return None
+        return snapshot
+
+    def put(self, user_id: str, snapshot: ResumeSnapshot) -> None:
+        self.snapshots.set(user_id, snapshot)
+
+
+@lru_cache(maxsize=1)
+def get_version_store() -> ResumeVersionStore:
+    return ResumeVersionStore()
@@ -0,0 +1,194 @@
+"""
+Job-description requirement extraction, cached by JD content.
+
+A job description is reduced once to a ``JobRequirements`` profile:
+required and optional skills (as canonical taxonomy names), seniority,
+domain and minimum years. Profiles are cached by a hash of the normalized
+JD text and the model, and concurrent requests for the same JD share one
+in-flight extraction. Screening 500 candidates against one posting
+therefore costs one extraction. A heuristic fallback is cached only for
+``JD_FALLBACK_TTL_SECONDS`` so an LLM outage does not pin it for the full
+TTL.
+"""
+
+import asyncio
+import hashlib
+import re
+from functools import lru_cache
+
+from app.cache import TTLCache
+from app.config import JobDescriptionConfig, config
+
+from .llm import call_gemini
+from .prompts import JD_EXTRACTOR_PROMPT
+from .signal_cache import prompt_version
+from .taxonomy import get_taxonomy
+from .types import JobRequirements
+
+OPTIONAL_HEADER_RE = re.compile(r"\b(nice[- ]to[- ]have|preferred|bonus|plus|desirable|good to have)\b", re.I)
+REQUIRED_HEADER_RE = re.compile(r"\b(requirements|required|must[- ]have|qualifications|what you('ll)? need|you have)\b", re.I)
+YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years", re.I)
+SENIORITY_PATTERNS = [
+    ("director", re.compile(r"\b(director|head of|vp)\b", re.I)),
+    ("principal", re.compile(r"\bprincipal\b", re.I)),
+    ("staff", re.compile(r"\bstaff\b", re.I)),
+    ("manager", re.compile(r"\b(engineering manager|manager)\b", re.I)),
+    ("lead", re.compile(r"\b(lead|tech lead)\b", re.I)),
+    ("senior", re.compile(r"\b(senior|sr\.?)\b", re.I)),
+    ("junior", re.compile(r"\b(junior|jr\.?|entry[- ]level|graduate)\b", re.I)),
+    ("intern", re.compile(r"\bintern(ship)?\b", re.I)),
+    ("mid", re.compile(r"\b(mid[- ]level|intermediate)\b", re.I)),
+]
+DOMAINS = {
+    "fintech": ("fintech", "payments", "banking", "lending", "trading"),
+    "healthcare": ("healthcare", "health", "clinical", "patient", "medical"),
+    "e-commerce": ("e-commerce", "ecommerce", "retail", "marketplace", "checkout"),
+    "adtech": ("advertising", "adtech", "ad tech", "programmatic"),
+    "edtech": ("edtech", "education", "learning platform"),
+    "security": ("security", "identity", "threat"),
+    "logistics": ("logistics", "supply chain", "fleet", "delivery"),
+    "gaming": ("gaming", "game studio"),
+}
+SPACE_RE = re.compile(r"\s+")
+
+
+def jd_fingerprint(text: str, model: str) -> str:
+    normalized = SPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.sha256(f"{normalized}\x1f{model}\x1f{prompt_version(JD_EXTRACTOR_PROMPT)}".encode("utf-8")).hexdigest()
+
+
+def _title(lines: list[str]) -> str | None:
+    for line in lines[:3]:
+        if 2 <= len(line.split()) <= 8 and not line.endswith("."):
+            return line.strip(" :-")
+    return None
+
+
+def _seniority(title: str | None, text: str) -> str | None:
+    for source in (title or "", text[:400]):
+        for level, pattern in SENIORITY_PATTERNS:
+            if pattern.search(source):
+                return level
+    return None
+
+
+def _domain(text: str) -> str | None:
+    lower = text.lower()
+    hits = {domain: sum(lower.count(word) for word in words) for domain, words in DOMAINS.items()}
+    best = max(hits, key=hits.get)
+    return best if hits[best] else None
+
+
+def _heuristic_requirements(text: str) -> JobRequirements:
+    taxonomy = get_taxonomy()
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    required: dict[str, None] = {}
+    optional: dict[str, None] = {}
+    in_optional = False
+    for line in lines:
+        # A line naming "nice to have" switches to optional skills until the
+        # next requirements header; inline cues apply to that line only.
+        is_header = len(line) <= 60 and line.rstrip(":").count(" ") <= 6
+        if OPTIONAL_HEADER_RE.search(line):
+            if is_header:
+                in_optional = True
+                continue
+            target = optional
+        elif REQUIRED_HEADER_RE.search(line) and is_header:
+            in_optional = False
+            continue
+        else:
+            target = optional if in_optional else required
+        for name in taxonomy.skill_names(line):
+            target.setdefault(name, None)
+
+    title = _title(lines)
+    years = YEARS_RE.search(text)
+    return JobRequirements(
+        title=title,
+        required_skills=list(required),
+        optional_skills=[name for name in optional if name not in required],
+        seniority=_seniority(title, text),
+        domain=_domain(text),
+        min_years=int(years.group(1)) if years else None,
+        source="heuristic",
+    )
+
+
+def _canonical_skills(names: list[str]) -> list[str]:
+    taxonomy = get_taxonomy()
+    result: dict[str, None] = {}
+    for name in names:
+        for canonical in taxonomy.skill_names(name, listed=True) or [name.strip()]:
+            if canonical:
+                result.setdefault(canonical, None)
+    return list(result)
+
+
+async def _extract(text: str, model: str) -> JobRequirements:
+    llm = await call_gemini(JD_EXTRACTOR_PROMPT, text, model=model)
+    if isinstance(llm, dict):
+        try:
+            requirements = JobRequirements.model_validate({**llm, "source": "llm"})
+            requirements.required_skills = _canonical_skills(requirements.required_skills)
+            requirements.optional_skills = [s for s in _canonical_skills(requirements.optional_skills) if s not in requirements.required_skills]
+            return requirements
+        except Exception:
+            pass
+    return _heuristic_requirements(text)
+
+
+class RequirementsCache:
+    def __init__(self, settings: JobDescriptionConfig = config.job_description):
+        self.profiles: TTLCache[JobRequirements] = TTLCache(maxsize=settings.cache_size, ttl_seconds=settings.cache_ttl_seconds)
+        self.fallback_ttl_seconds = settings.fallback_ttl_seconds
+        self.in_flight: dict[str, asyncio.Future] = {}
+
+
+@lru_cache(maxsize=1)
+def get_requirements_cache() -> RequirementsCache:
+    return RequirementsCache()
+
+
+async def extract_requirements(text: str, model: str | None = None, stats: dict | None = None) -> JobRequirements:
+    """The requirement profile for a JD, from cache when this JD (and model)
+    was seen before. Whether it was a hit and where the profile came from
+    is written into ``stats``."""
+    model = model or "gemini-2.5-flash"
+    text = text[: config.job_description.max_chars]
+    key = jd_fingerprint(text, model)
+    cache = get_requirements_cache()
+    cached = cache.profiles.get(key)
+    hit = cached is not None
+    if cached is None:
+        pending = cache.in_flight.get(key)
+        if pending is not None:
+            try:
+                cached = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request that started the extraction was cancelled; take it over.
+                return await extract_requirements(text, model, stats)
+            hit = True
+        else:
+            pending = asyncio.get_running_loop().create_future()
+            cache.in_flight[key] = pending
+            try:
+                cached = await _extract(text, model)
+                cached.content_hash = key
+                cache.profiles.set(key, cached, None if cached.source == "llm" else cache.fallback_ttl_seconds)
+                pending.set_result(cached)
+            except asyncio.CancelledError:
+                pending.cancel()
+                raise
+            except BaseException as exc:
+                pending.set_exception(exc)
+                # Nobody may be waiting; mark the exception retrieved.
+                pending.exception()
+                raise
+            finally:
+                cache.in_flight.pop(key, None)
+    if stats is not None:
+        stats.update({"cache_hit": hit, "source": cached.source, "content_hash": key[:16]})
+    return cached.model_copy(deep=True)
@@ -1,9 +1,15 @@
 import json
 import os
 import re
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Awaitable, Callable
 
 import httpx
 
+from app.config import config
+
+from .llm_batching import MicroBatcher
 
 GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
 
@@ -114,24 +120,15 @@ def _extract_json_blob(text: str) -> dict | list | None:
     return None
 
 
-async def call_gemini(
-    prompt: str,
-    text: str,
-    model: str = "gemini-2.5-flash",
-    temperature: float = 0.2,
-    max_tokens: int = 8192,
-) -> dict | list | None:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return None
-
-    payload = {
+def build_request(prompt: str, text: str, temperature: float = 0.2, max_tokens: int = 8192, max_input_chars: int = 50000) -> dict:
+    """The generateContent request body for one prompt and input."""
+    return {
         "contents": [
             {
                 "role": "user",
                 "parts": [
                     {"text": prompt},
-                    {"text": f"INPUT:\n{text[:50000]}"},
+                    {"text": f"INPUT:\n{text[:max_input_chars]}"},
                 ],
             }
         ],
@@ -142,22 +139,75 @@ async def call_gemini(
         },
     }
 
+
+def parse_response(data: dict | None) -> dict | list | None:
+    """The JSON the model returned in a generateContent response."""
+    if not isinstance(data, dict):
+        return None
+    try:
+        parts = data.get("candidates", [])[0].get("content", {}).get("parts", [])
+        text_out = "".join(part.get("text", "") for part in parts)
+    except Exception:
+        return None
+
+    if not text_out:
+        return None
+    return _extract_json_blob(text_out)
+
+
+async def post_request(model: str, body: dict) -> dict | None:
+    """POST one generateContent request; the raw response, or None on failure."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
     try:
         async with httpx.AsyncClient(timeout=90) as client:
             response = await client.post(
-                GEMINI_URL.format(model=model), params={"key": api_key}, json=payload
+                GEMINI_URL.format(model=model), params={"key": api_key}, json=body
             )
             response.raise_for_status()
-            data = response.json()
+            return response.json()
     except Exception:
         return None
 
-    try:
-        parts = data.get("candidates", [])[0].get("content", {}).get("parts", [])
-        text_out = "".join(part.get("text", "") for part in parts)
-    except Exception:
+
+# Set by offline bulk runs (app/v2/bulk.py) to answer calls from stored
+# batch results instead of the live API.
+llm_override: ContextVar[Callable[..., Awaitable[dict | list | None]] | None] = ContextVar("llm_override", default=None)
+
+
+@lru_cache(maxsize=1)
+def get_micro_batcher() -> MicroBatcher | None:
+    if not config.llm_batch.enabled:
         return None
+    return MicroBatcher(_generate)
 
-    if not text_out:
+
+async def call_gemini(
+    prompt: str,
+    text: str,
+    model: str = "gemini-2.5-flash",
+    temperature: float = 0.2,
+    max_tokens: int = 8192,
+) -> dict | list | None:
+    override = llm_override.get()
+    if override is not None:
+        return await override(prompt, text, model or "gemini-2.5-flash", temperature, max_tokens)
+    if not os.getenv("GEMINI_API_KEY"):
         return None
-    return _extract_json_blob(text_out)
+    batcher = get_micro_batcher()
+    if batcher is not None and batcher.accepts(prompt):
+        return await batcher.submit(prompt, text, model, temperature, max_tokens)
+    return await _generate(prompt, text, model, temperature, max_tokens)
+
+
+async def _generate(
+    prompt: str,
+    text: str,
+    model: str = "gemini-2.5-flash",
+    temperature: float = 0.2,
+    max_tokens: int = 8192,
+    max_input_chars: int = 50000,
+) -> dict | list | None:
+    data = await post_request(model, build_request(prompt, text, temperature, max_tokens, max_input_chars))
+    return parse_response(data)
@@ -0,0 +1,186 @@
+"""
+Cross-request micro-batching of same-stage LLM calls.
+
+Under load many pipelines send the same extractor prompt with different,
+small inputs at nearly the same time. With batching on, ``call_gemini``
+hands calls for the enabled stages to a ``MicroBatcher``. The batcher
+holds them for up to ``window_ms`` and packs them into one multi-document
+prompt: the stage prompt plus ``BATCH_INSTRUCTIONS``, with the inputs as a
+JSON array of ``{"id", "input"}``. It makes one LLM call and resolves
+each caller's future with the output for its document id.
+
+A batch is flushed when its window expires, when it reaches ``max_docs``
+documents, or before the next input would push it past the input token
+budget. A batch of one is sent with the plain stage prompt. If the
+response omits some ids, those documents are retried individually. If the
+whole call fails, every caller gets None, exactly as an unbatched failure
+would, and the extractors fall back to their heuristics.
+"""
+
+import asyncio
+import itertools
+import json
+from collections import Counter
+from typing import Awaitable, Callable
+
+from app.config import LlmBatchConfig, config
+
+from .prompts import (
+    ATS_VALIDATOR_PROMPT,
+    IMPACT_EXTRACTOR_PROMPT,
+    OWNERSHIP_DETECTOR_PROMPT,
+    RED_FLAG_DETECTOR_PROMPT,
+    SKILLS_EXTRACTOR_PROMPT,
+)
+
+STAGE_PROMPTS = {
+    "impact": IMPACT_EXTRACTOR_PROMPT,
+    "ownership": OWNERSHIP_DETECTOR_PROMPT,
+    "skills": SKILLS_EXTRACTOR_PROMPT,
+    "ats": ATS_VALIDATOR_PROMPT,
+    "red_flags": RED_FLAG_DETECTOR_PROMPT,
+}
+BATCH_INSTRUCTIONS = """
+BATCH MODE:
+INPUT is a JSON array of independent documents, each {"id":"str","input":"str"}.
+Apply the task above to each document's input on its own, as if it were the only input.
+Return exactly one result per document id.
+
+BATCH OUTPUT SCHEMA:
+{"results":[{"id":"str","output":<the OUTPUT SCHEMA above for that document>}]}
+""".strip()
+# Output tokens a single document may need by default; a batch asks for the
+# sum of its documents' budgets, up to the batch output cap.
+DOC_OUTPUT_TOKENS = 8192
+CHARS_PER_TOKEN = 4
+
+Generate = Callable[..., Awaitable[dict | list | None]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class _Batch:
+    __slots__ = ("docs", "tokens", "timer")
+
+    def __init__(self):
+        # (document id, input, max output tokens, caller's future)
+        self.docs: list[tuple[str, str, int, asyncio.Future]] = []
+        self.tokens = 0
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher:
+    """Packs concurrent calls that share a prompt, model and temperature.
+    ``generate`` is the unbatched call, ``(prompt, text, model, temperature,
+    max_tokens, max_input_chars)``."""
+
+    def __init__(self, generate: Generate, settings: LlmBatchConfig = config.llm_batch):
+        self.generate = generate
+        self.settings = settings
+        self.stages = {STAGE_PROMPTS[s]: s for s in settings.stages if s in STAGE_PROMPTS}
+        self.pending: dict[tuple[str, str, float], _Batch] = {}
+        # Flushed batches still running, referenced until they finish.
+        self._tasks: set[asyncio.Task] = set()
+        # batches, documents, llm_calls, singles, retried, oversized
+        self.counts: Counter = Counter()
+        self._ids = itertools.count()
+
+    def accepts(self, prompt: str) -> bool:
+        return prompt in self.stages
+
+    async def submit(self, prompt: str, text: str, model: str, temperature: float = 0.2, max_tokens: int = DOC_OUTPUT_TOKENS):
+        tokens = estimate_tokens(text)
+        if tokens >= self.settings.max_input_tokens:
+            self.counts["oversized"] += 1
+            self.counts["llm_calls"] += 1
+            return await self.generate(prompt, text, model, temperature, max_tokens)
+
+        key = (prompt, model, temperature)
+        batch = self.pending.get(key)
+        if batch is not None and batch.tokens + tokens > self.settings.max_input_tokens:
+            self._flush(key, batch)
+            batch = None
+        loop = asyncio.get_running_loop()
+        if batch is None:
+            batch = self.pending[key] = _Batch()
+            batch.timer = loop.call_later(self.settings.window_ms / 1000, self._flush, key, batch)
+        future = loop.create_future()
+        batch.docs.append((f"d{next(self._ids)}", text, max_tokens, future))
+        batch.tokens += tokens
+        if len(batch.docs) >= self.settings.max_docs:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: tuple[str, str, float], batch: _Batch) -> None:
+        if self.pending.get(key) is batch:
+            del self.pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+            batch.timer = None
+        if batch.docs:
+            docs, batch.docs = batch.docs, []
+            task = asyncio.ensure_future(self._run(*key, docs))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _single(self, prompt: str, model: str, temperature: float, text: str, max_tokens: int, future: asyncio.Future) -> None:
+        self.counts["llm_calls"] += 1
+        try:
+            result = await self.generate(prompt, text, model, temperature, max_tokens)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _run(self, prompt: str, model: str, temperature: float, docs: list[tuple[str, str, int, asyncio.Future]]) -> None:
+        self.counts["batches"] += 1
+        self.counts["documents"] += len(docs)
+        if len(docs) == 1:
+            self.counts["singles"] += 1
+            await self._single(prompt, model, temperature, *docs[0][1:])
+            return
+
+        payload = json.dumps([{"id": doc_id, "input": text} for doc_id, text, _, _ in docs])
+        self.counts["llm_calls"] += 1
+        try:
+            response = await self.generate(
+                f"{prompt}\n\n{BATCH_INSTRUCTIONS}",
+                payload,
+                model,
+                temperature,
+                min(self.settings.max_output_tokens, sum(max_tokens for _, _, max_tokens, _ in docs)),
+                len(payload),
+            )
+        except Exception as exc:
+            for _, _, _, future in docs:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        items = response.get("results") if isinstance(response, dict) else response
+        results = {str(item["id"]): item.get("output") for item in items or [] if isinstance(item, dict) and "id" in item}
+        retry = []
+        for doc_id, text, max_tokens, future in docs:
+            if future.done():
+                continue
+            if doc_id in results:
+                future.set_result(results[doc_id])
+            elif response is None:
+                future.set_result(None)
+            else:
+                retry.append((text, max_tokens, future))
+        if retry:
+            self.counts["retried"] += len(retry)
+            await asyncio.gather(*(self._single(prompt, model, temperature, *doc) for doc in retry))
+
+    def stats(self) -> dict:
+        batched = self.counts["documents"] - self.counts["singles"]
+        return {
+            **self.counts,
+            "avg_batch_size": round(self.counts["documents"] / self.counts["batches"], 2) if self.counts["batches"] else 0.0,
+            "batched_share": round(batched / self.counts["documents"], 3) if self.counts["documents"] else 0.0,
+        }
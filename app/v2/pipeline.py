@@ -1,11 +1,12 @@
 import asyncio
-import base64
 import time
 from uuid import uuid4
 
-from app.pipeline import _extract_text, _is_safe_text
+from app.config import config
+from app.pipeline import IngestResult, ingest_file
 
 from .alignment import run_role_alignment
+from .analysis_store import StoredAnalysis, get_analysis_store
 from .canonicalizer import canonicalize
 from .extractors import (
     extract_ats,
@@ -13,49 +14,153 @@ from .extractors import (
     extract_ownership,
     extract_red_flags,
     extract_skills,
-    generate_interview_prep,
 )
-from .recommendations import generate_recommendations
+from .features import BulletFeatureIndex
+from .guidance import generate_guidance
+from .incremental import (
+    ResumeSnapshot,
+    context_fingerprint,
+    diff_versions,
+    get_version_store,
+    stale_signals,
+    stitch_role_signals,
+    subset_canonical,
+    text_fingerprint,
+)
+from .job_description import extract_requirements
+from .roles import normalize_role
 from .scoring import compute_score
+from .search_index import document_from_analysis, get_search_index
+from .timeline import build_timeline
 from .types import PipelineTelemetry, ResumeDoctorResult
+from .v1_fields import build_v1_result
+
+
+async def _reuse(value):
+    return value
+
+
+async def ingest_payload(payload: dict) -> IngestResult:
+    """Ingest the upload carried by a v2 payload."""
+    return await ingest_file(
+        payload.get("file_base64") or payload.get("fileBase64") or "",
+        payload.get("mime_type") or payload.get("mimeType"),
+        payload.get("file_name") or payload.get("fileName"),
+    )
 
 
-async def run_v2_pipeline(payload: dict) -> dict:
+async def run_v2_pipeline(payload: dict, ingested: IngestResult | None = None) -> dict:
+    """Analyze ``payload``. ``ingested`` is the upload's earlier ingest result
+    when the caller already has one (bulk replays), which skips decode, scan
+    and extraction."""
+    # Background tasks started for this request; any still running when the
+    # pipeline exits early are cancelled rather than left to finish unawaited.
+    background: list[asyncio.Task] = []
+    try:
+        return await _run_v2_pipeline(payload, background, ingested)
+    finally:
+        for task in background:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+
+
+async def _run_v2_pipeline(payload: dict, background: list[asyncio.Task], ingested: IngestResult | None) -> dict:
     t0 = time.perf_counter()
     step_durations: dict[str, int] = {}
+    stage_metrics: dict[str, dict] = {}
     models = payload.get("models") or {}
 
     req_id = str(uuid4())
     target_role = payload.get("target_role") or payload.get("targetRole") or "Unknown"
     intake_data = payload.get("intake_data") or payload.get("intakeData") or {}
+    options = payload.get("options") or {}
+    # Fast mode skips the optional LLM wording passes (alignment narrative, guidance polish).
+    fast = bool(options.get("fast"))
 
-    t = time.perf_counter()
-    file_base64 = payload.get("file_base64") or payload.get("fileBase64") or ""
-    file_name = payload.get("file_name") or payload.get("fileName")
-    mime_type = payload.get("mime_type") or payload.get("mimeType")
-    file_bytes = base64.b64decode(file_base64)
-    text = _extract_text(file_bytes, mime_type, file_name)
-    step_durations["ingest_extract_text"] = int((time.perf_counter() - t) * 1000)
+    # The JD is independent of the resume; extract it alongside ingest
+    # and the signal extractors, and only wait for it before alignment.
+    job_description = (payload.get("job_description") or payload.get("jobDescription") or "").strip()
+    requirements_task = None
+    if job_description:
+        stage_metrics["job_description"] = {}
+        requirements_task = asyncio.create_task(
+            extract_requirements(job_description, model=models.get("job_description"), stats=stage_metrics["job_description"])
+        )
+        background.append(requirements_task)
 
-    t = time.perf_counter()
-    is_safe, reason = _is_safe_text(text)
-    if not is_safe:
-        raise ValueError(reason or "Unsafe resume text")
-    step_durations["safety_check"] = int((time.perf_counter() - t) * 1000)
+    if ingested is None:
+        ingested = await ingest_payload(payload)
+    text = ingested.text
+    step_durations.update(ingested.step_durations)
+
+    user_id = payload.get("user_id") or payload.get("userId")
+    resume_version_id = payload.get("resume_version_id") or payload.get("resumeVersionId")
+    store = get_version_store() if user_id and config.incremental.enabled and options.get("incremental", True) else None
+    text_hash = text_fingerprint(text)
+    context_hash = context_fingerprint(intake_data, models)
+    previous = store.get(user_id, context_hash) if store else None
+    recomputed: list[str] = []
 
     t = time.perf_counter()
-    canonical = await canonicalize(text, model=models.get("canonicalizer"))
+    stage_metrics["canonicalize"] = {}
+    if previous and previous.text_hash == text_hash:
+        canonical = previous.canonical.model_copy(deep=True)
+        stage_metrics["canonicalize"]["route"] = "reused"
+    else:
+        canonical = await canonicalize(
+            text,
+            model=models.get("canonicalizer"),
+            stats=stage_metrics["canonicalize"],
+            routing=options.get("canonicalizer_routing"),
+            sharding=options.get("canonicalizer_sharding"),
+        )
+        recomputed.append("canonicalize")
     step_durations["canonicalize"] = int((time.perf_counter() - t) * 1000)
 
     t = time.perf_counter()
-    impact, ownership, skills, ats, red_flags = await asyncio.gather(
-        extract_impact(canonical, model=models.get("impact"), intake_data=intake_data),
-        extract_ownership(canonical, model=models.get("ownership"), intake_data=intake_data),
-        extract_skills(canonical, model=models.get("skills"), intake_data=intake_data),
-        extract_ats(canonical, model=models.get("ats"), intake_data=intake_data),
-        extract_red_flags(canonical, model=models.get("red_flags"), intake_data=intake_data),
-    )
+    stage_metrics["impact"], stage_metrics["ownership"] = {}, {}
+    features = BulletFeatureIndex.from_canonical(canonical)
+    timeline = build_timeline(canonical)
+    if previous:
+        diff = diff_versions(previous.canonical, canonical)
+        stale = stale_signals(diff)
+        changed = subset_canonical(canonical, diff.changed_roles)
+        fresh_impact, fresh_ownership, skills, ats, red_flags = await asyncio.gather(
+            extract_impact(changed, model=models.get("impact"), intake_data=intake_data, stats=stage_metrics["impact"]) if diff.changed_roles else _reuse([]),
+            extract_ownership(changed, model=models.get("ownership"), intake_data=intake_data, stats=stage_metrics["ownership"]) if diff.changed_roles else _reuse([]),
+            extract_skills(canonical, model=models.get("skills"), intake_data=intake_data, features=features) if "skills" in stale else _reuse(previous.skills),
+            extract_ats(canonical, model=models.get("ats"), intake_data=intake_data, timeline=timeline) if "ats" in stale else _reuse(previous.ats),
+            extract_red_flags(canonical, model=models.get("red_flags"), intake_data=intake_data, features=features, timeline=timeline) if "red_flags" in stale else _reuse(previous.red_flags),
+        )
+        impact = stitch_role_signals(previous.impact, fresh_impact, diff)
+        ownership = stitch_role_signals(previous.ownership, fresh_ownership, diff)
+        if diff.changed_roles:
+            recomputed.extend(["impact", "ownership"])
+        recomputed.extend(name for name in ("skills", "ats", "red_flags") if name in stale)
+        stage_metrics["incremental"] = {
+            "previous_version_id": previous.resume_version_id,
+            "changed_sections": diff.changed_sections,
+            "roles_recomputed": diff.changed_roles,
+            "roles_reused": sorted(diff.reused_roles),
+        }
+    else:
+        impact, ownership, skills, ats, red_flags = await asyncio.gather(
+            extract_impact(canonical, model=models.get("impact"), intake_data=intake_data, features=features, stats=stage_metrics["impact"]),
+            extract_ownership(canonical, model=models.get("ownership"), intake_data=intake_data, features=features, stats=stage_metrics["ownership"]),
+            extract_skills(canonical, model=models.get("skills"), intake_data=intake_data, features=features),
+            extract_ats(canonical, model=models.get("ats"), intake_data=intake_data, timeline=timeline),
+            extract_red_flags(canonical, model=models.get("red_flags"), intake_data=intake_data, features=features, timeline=timeline),
+        )
+        recomputed.extend(["impact", "ownership", "skills", "ats", "red_flags"])
     step_durations["extractors_parallel"] = int((time.perf_counter() - t) * 1000)
+    if store:
+        stage_metrics.setdefault("incremental", {"previous_version_id": None})["recomputed"] = recomputed
+        store.put(
+            user_id,
+            ResumeSnapshot(resume_version_id, text_hash, context_hash, canonical, impact, ownership, skills, ats, red_flags),
+        )
 
     signals = {
         "impact": impact,
@@ -65,35 +170,69 @@ async def run_v2_pipeline(payload: dict) -> dict:
         "red_flags": red_flags,
     }
 
+    requirements = None
+    if requirements_task is not None:
+        t = time.perf_counter()
+        requirements = await requirements_task
+        step_durations["job_description"] = int((time.perf_counter() - t) * 1000)
+        if target_role == "Unknown" and requirements.title:
+            target_role = requirements.title
+
+    role = normalize_role(target_role)
+    stage_metrics["role"] = {**role._asdict(), "cache_key": role.cache_key}
+
     t = time.perf_counter()
-    alignment = await run_role_alignment(target_role, canonical, signals, model=models.get("alignment"))
+    stage_metrics["alignment"] = {}
+    alignment = await run_role_alignment(
+        target_role,
+        canonical,
+        signals,
+        model=models.get("alignment"),
+        requirements=requirements,
+        stats=stage_metrics["alignment"],
+        narrative=not fast,
+    )
     step_durations["alignment"] = int((time.perf_counter() - t) * 1000)
 
     t = time.perf_counter()
-    score = compute_score(canonical, signals, alignment, target_role)
+    score = compute_score(canonical, signals, alignment, target_role, timeline, requirements)
     step_durations["scoring"] = int((time.perf_counter() - t) * 1000)
 
+    # Recommendations and interview questions come from templates; one
+    # optional LLM call rewords both, skipped in fast mode.
+    # The former "recommendations" and "interview_prep" model overrides still
+    # apply to the call that now does both.
+    guidance_model = models.get("guidance") or models.get("recommendations") or models.get("interview_prep") or "gemini-2.5-flash"
     t = time.perf_counter()
-    recommendations = await generate_recommendations(
-        target_role=target_role,
-        canonical=canonical,
-        signals=signals,
-        alignment=alignment,
-        score=score,
-        model=models.get("recommendations"),
+    stage_metrics["guidance"] = {}
+    recommendations, interview_prep = await generate_guidance(
+        target_role,
+        canonical,
+        signals,
+        alignment,
+        score,
+        model=guidance_model,
+        fast=fast,
+        stats=stage_metrics["guidance"],
     )
-    step_durations["recommendations"] = int((time.perf_counter() - t) * 1000)
+    step_durations["guidance"] = int((time.perf_counter() - t) * 1000)
+    # Kept for dashboards reading the per-step keys from before guidance was one step.
+    step_durations["recommendations"] = step_durations["interview_prep"] = step_durations["guidance"]
 
-    t = time.perf_counter()
-    interview_prep = await generate_interview_prep(
-        canonical=canonical,
-        red_flags=red_flags,
-        ownership=ownership,
-        alignment=alignment,
-        model=models.get("interview_prep"),
-        intake_data={**intake_data, "target_role": target_role},
-    )
-    step_durations["interview_prep"] = int((time.perf_counter() - t) * 1000)
+    analyses = get_analysis_store()
+    if analyses:
+        analyses.put(StoredAnalysis(req_id, target_role, canonical, signals, alignment, score, recommendations, requirements))
+    search_index = get_search_index()
+    if search_index is not None:
+        # One document per candidate: a re-analysis replaces the last one.
+        key = f"user:{user_id}" if user_id else f"text:{text_hash}"
+        search_index.add(document_from_analysis(req_id, canonical, skills, score, timeline, key=key), background=True)
+
+    v1 = None
+    if options.get("include_v1_fields"):
+        t = time.perf_counter()
+        v1 = build_v1_result(canonical, text, ingested.antivirus, target_role, timeline, requirements)
+        step_durations["v1_fields"] = int((time.perf_counter() - t) * 1000)
 
     telemetry = PipelineTelemetry(
         request_id=req_id,
@@ -102,21 +241,26 @@ async def run_v2_pipeline(payload: dict) -> dict:
         step_durations=step_durations,
         models_used={
             "canonicalizer": models.get("canonicalizer", "gemini-2.5-flash"),
+            "job_description": models.get("job_description", "gemini-2.5-flash"),
             "impact": models.get("impact", "gemini-2.5-flash"),
             "ownership": models.get("ownership", "gemini-2.5-flash"),
             "skills": models.get("skills", "gemini-2.5-flash"),
             "ats": models.get("ats", "gemini-2.5-flash"),
             "red_flags": models.get("red_flags", "gemini-2.5-flash"),
             "alignment": models.get("alignment", "gemini-2.5-flash"),
-            "recommendations": models.get("recommendations", "gemini-2.5-flash"),
-            "interview_prep": models.get("interview_prep", "gemini-2.5-flash"),
+            "guidance": guidance_model,
+            "recommendations": guidance_model,
+            "interview_prep": guidance_model,
         },
+        stage_metrics=stage_metrics,
     )
 
     result = ResumeDoctorResult(
+        analysis_id=req_id,
         target_role=target_role,
-        resume_version_id=payload.get("resume_version_id"),
-        user_id=payload.get("user_id"),
+        job_requirements=requirements,
+        resume_version_id=resume_version_id,
+        user_id=user_id,
         canonical=canonical,
         signals={
             "impact": [x.model_dump() for x in impact],
@@ -129,6 +273,7 @@ async def run_v2_pipeline(payload: dict) -> dict:
         score=score,
         recommendations=recommendations,
         interview_prep=interview_prep,
+        v1=v1,
         telemetry=telemetry,
     )
     return result.model_dump()
@@ -11,9 +11,11 @@ RULES:
 3) Keep unknown strings as null or empty.
 4) Experience must preserve bullets.
 5) Skills should be deduplicated and title-cased where appropriate.
+6) Contact details come from the resume header; never guess them.
 
 OUTPUT SCHEMA:
 {
+  "contact": {"name":"str|null","email":"str|null","phone":"str|null","location":"str|null","links":["str"]},
   "summary": "str|null",
   "experience": [{"company":"str","title":"str","start_date":"YYYY-MM","end_date":"YYYY-MM|null","is_current":false,"date_ambiguous":false,"location":"str|null","bullets":["str"]}],
   "education": [{"institution":"str","degree":"str|null","field":"str|null","start_date":"YYYY-MM|null","end_date":"YYYY-MM|null","gpa":"str|null"}],
@@ -183,6 +185,7 @@ RULES:
 1) fit_score range 0-100.
 2) Include strengths and gaps grounded in evidence.
 3) narrative_assessment should be concise and practical.
+4) When job_requirements is present, judge fit against its required skills first, then optional skills, seniority and min_years.
 
 OUTPUT SCHEMA:
 {"fit_score":0.0,"strength_alignment":["str"],"gaps":[{"area":"str","severity":"str","detail":"str"}],"narrative_assessment":"str","market_notes":"str|null"}
@@ -197,52 +200,84 @@ Output: {"fit_score":41,"gaps":[{"area":"core DS tooling","severity":"high","det
 """.strip()
 
 
-INTERVIEW_PREP_PROMPT = """
+ROLE_PROFILE_PROMPT = """
 SYSTEM:
-You are a hiring panel prep coach.
+You are a recruiter-market analyst describing what a role is screened for.
 
 TASK:
-Generate likely interview questions derived from red flags, ownership, and role-fit gaps.
+For the given role title, seniority and specialization, list what a strong candidate's resume evidences. Do not assume any particular candidate.
 
 RULES:
-1) Questions must be realistic and specific.
-2) Include coaching_note, framework, and do_not guidance.
-3) Prioritize highest-risk items first.
+1) competencies: 5-9 items; kind is "skill" or "competency"; weight is 1.0 for must-haves, 0.5 for differentiators.
+2) Phrase each competency so resume evidence can be matched against it (e.g. "Designing and building REST APIs").
+3) signal_weights split fit points between requirement coverage, impact evidence and ownership evidence; weight ownership higher for lead and above.
+4) market_notes is one or two practical sentences on how this role is screened today.
 
 OUTPUT SCHEMA:
-[{"question":"str","source":"str","severity":"high|medium|low","likelihood":"high|medium|low","coaching_note":"str","suggested_framework":"str","do_not":"str"}]
+{"competencies":[{"text":"str","kind":"skill|competency","weight":1.0}],"signal_weights":{"requirements":45,"impact":20,"ownership":10},"market_notes":"str"}
 
 FEW-SHOT EXAMPLE 1:
-Input red flag: employment gap
-Output: {"question":"Can you walk us through your 2022 career gap?","source":"employment_gap","severity":"medium","likelihood":"high"}
+Input: {"title":"Engineering Manager","seniority":"director","specialization":[]}
+Output: {"competencies":[{"text":"Managing and growing engineering teams","kind":"competency","weight":1.0},{"text":"Hiring and mentoring engineers","kind":"competency","weight":1.0}],"signal_weights":{"requirements":35,"impact":20,"ownership":20},"market_notes":"Screened for org scope and delivery track record; name team sizes and outcomes."}
+""".strip()
 
-FEW-SHOT EXAMPLE 2:
-Input ownership unclear
-Output: {"question":"What specific decisions did you own in the migration project?","source":"ownership","severity":"high","likelihood":"high"}
+
+ALIGNMENT_NARRATIVE_PROMPT = """
+SYSTEM:
+You are a recruiter-market alignment evaluator.
+
+TASK:
+Write the narrative assessment for an alignment that has already been scored. Do not change the score, strengths or gaps.
+
+RULES:
+1) Two or three sentences, concise and practical.
+2) Ground every claim in the given strengths and gaps.
+
+OUTPUT SCHEMA:
+{"narrative_assessment":"str"}
 """.strip()
 
 
-RECOMMENDATION_PROMPT = """
+GUIDANCE_POLISH_PROMPT = """
 SYSTEM:
-You are a resume doctor focused on highest ROI edits.
+You are a resume doctor and hiring panel prep coach editing drafted advice.
 
 TASK:
-Generate at most 5 prioritized recommendations with before/after rewrites when possible.
+Polish the wording of the drafted recommendations and interview questions for the target role.
 
 RULES:
-1) priority starts at 1 and increments.
-2) estimated_score_impact is 0-15.
-3) Tie each recommendation to a scoring dimension.
-4) Keep rewrites concise and ATS-safe.
+1) Keep every item's meaning, id and index; do not add, drop or reorder items.
+2) For recommendations you may rewrite title, description and after. When before quotes a resume bullet, after is that bullet rewritten with metric + context + result, ATS-safe and without invented numbers (use placeholders like [X%]).
+3) For questions you may rewrite question and coaching_note so they are realistic and specific to the target role.
+4) Keep each field under 30 words.
 
 OUTPUT SCHEMA:
-[{"id":"str","priority":1,"title":"str","dimension":"str","effort":"low|moderate|high","estimated_score_impact":0.0,"description":"str","before":"str|null","after":"str|null","location":"str"}]
+{"recommendations":[{"id":"str","title":"str","description":"str","after":"str|null"}],"questions":[{"index":0,"question":"str","coaching_note":"str"}]}
 
 FEW-SHOT EXAMPLE 1:
-Input: duty-heavy bullets
-Output: {"title":"Rewrite duty statements into outcome bullets","dimension":"impact_quality","before":"Responsible for API development","after":"Built and launched 5 APIs reducing partner integration time by 30%"}
+Input: {"target_role":"Backend Engineer","recommendations":[{"id":"rec-impact-1","title":"Rewrite top bullets with measurable outcomes","before":"Worked on payment APIs"}],"questions":[]}
+Output: {"recommendations":[{"id":"rec-impact-1","title":"Quantify your API work","description":"Add the scale and result to each backend bullet.","after":"Built payment APIs handling [X] requests/day, cutting checkout errors by [Y%]."}],"questions":[]}
+""".strip()
 
-FEW-SHOT EXAMPLE 2:
-Input: missing skills depth
-Output: {"title":"Add proficiency context to core stack","dimension":"skills_relevance","description":"Tag key skills with where and how recently used."}
+
+JD_EXTRACTOR_PROMPT = """
+SYSTEM:
+You are a technical recruiter reading a job description.
+
+TASK:
+Extract the requirements a candidate is screened against.
+
+RULES:
+1) required_skills are must-haves; optional_skills are nice-to-haves, preferred or bonus.
+2) Use normalized skill names (e.g. "Kubernetes", not "k8s").
+3) seniority is one of intern|junior|mid|senior|staff|principal|lead|manager|director, or null.
+4) domain is the industry or product area in a few words, or null.
+5) min_years is the minimum years of experience asked for, or null.
+
+OUTPUT SCHEMA:
+{"title":"str|null","required_skills":["str"],"optional_skills":["str"],"seniority":"str|null","domain":"str|null","min_years":0}
+
+FEW-SHOT EXAMPLE 1:
+Input: "Senior Backend Engineer, Payments. 5+ years with Go or Python, PostgreSQL, Kafka. Nice to have: Kubernetes."
+Output: {"title":"Senior Backend Engineer","required_skills":["Go","Python","PostgreSQL","Kafka"],"optional_skills":["Kubernetes"],"seniority":"senior","domain":"payments","min_years":5}
 """.strip()
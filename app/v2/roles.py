@@ -0,0 +1,183 @@
+"""
+Target-role normalization: free-text titles to a canonical role id plus
+seniority and specialization.
+
+"Sr. Backend Engineer", "Senior Backend Developer" and "senior back-end
+engineer (Python)" all name the same role, so every role-dependent stage
+keys its caches on ``NormalizedRole.cache_key`` rather than the raw string.
+
+The title taxonomy lives in ``data/role_titles.json``: roles with aliases,
+an abbreviation map, multi-word phrases collapsed to one token, seniority
+words and per-function keywords. It is compiled once into an exact alias
+table over normalized token strings and an inverted index from tokens to
+aliases. A title is looked up as written, then with seniority stripped,
+then with taxonomy skills stripped (they become the specialization), then
+with typos corrected against the alias vocabulary, and finally by
+token-overlap against the aliases sharing a token. Results are memoized
+per raw string.
+"""
+
+import difflib
+import json
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.config import RoleConfig, config
+
+from .taxonomy import get_taxonomy
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#&]*")
+PAREN_RE = re.compile(r"\(([^)]*)\)")
+FILLER = frozenset("a an the of and for to in at with".split())
+# Typo correction only for words long enough that a close match is not
+# another real word.
+MIN_TYPO_LEN = 5
+TYPO_CUTOFF = 0.85
+
+
+class NormalizedRole(NamedTuple):
+    role_id: str
+    title: str
+    function_area: str | None
+    seniority: str | None
+    specialization: tuple[str, ...]
+    confidence: float
+
+    @property
+    def cache_key(self) -> str:
+        """Specialization is left out so "(Python)" variants share entries."""
+        return f"{self.role_id}@{self.seniority or 'any'}"
+
+    @property
+    def known(self) -> bool:
+        return not self.role_id.startswith("custom:")
+
+
+class RoleNormalizer:
+    def __init__(self, data: dict, settings: RoleConfig = config.roles):
+        self.settings = settings
+        self.abbreviations: dict[str, list[str]] = {k: v.split() for k, v in data.get("abbreviations", {}).items()}
+        self.phrases: list[tuple[list[str], str]] = sorted(
+            ((k.split(), v) for k, v in data.get("phrases", {}).items()), key=lambda p: -len(p[0])
+        )
+        self.seniority: dict[str, str] = {}
+        self.seniority_rank: dict[str, int] = {}
+        for rank, (level, words) in enumerate(data.get("seniority", {}).items()):
+            self.seniority_rank[level] = rank
+            for word in words:
+                self.seniority[word] = level
+        self.function_keywords: list[tuple[str, frozenset[str]]] = [
+            (area, frozenset(" ".join(self.tokens(w)) for w in words)) for area, words in data.get("function_keywords", {}).items()
+        ]
+
+        self.roles: dict[str, dict] = {}
+        self.aliases: dict[str, str] = {}
+        self.index: dict[str, set[str]] = {}
+        for role in data["roles"]:
+            self.roles[role["id"]] = role
+            for alias in [role["title"], *role.get("aliases", [])]:
+                key = " ".join(self.tokens(alias))
+                self.aliases.setdefault(key, role["id"])
+                for token in key.split():
+                    self.index.setdefault(token, set()).add(key)
+        self.vocabulary = sorted(self.index)
+
+    def tokens(self, text: str) -> list[str]:
+        """Lowercased tokens with abbreviations expanded and known phrases
+        collapsed, so "Front-End Dev" and "frontend developer" agree."""
+        out: list[str] = []
+        for word in TOKEN_RE.findall(text.lower().replace("-", " ").replace("/", " ")):
+            out.extend(self.abbreviations.get(word, [word]))
+        for words, replacement in self.phrases:
+            n = len(words)
+            i = 0
+            while i + n <= len(out):
+                if out[i : i + n] == words:
+                    out[i : i + n] = [replacement]
+                i += 1
+        return out
+
+    def _seniority(self, tokens: list[str]) -> tuple[str | None, list[str]]:
+        found = [self.seniority[t] for t in tokens if t in self.seniority]
+        level = max(found, key=self.seniority_rank.__getitem__) if found else None
+        return level, [t for t in tokens if t not in self.seniority]
+
+    def _function_area(self, tokens: list[str]) -> str | None:
+        joined = f" {' '.join(tokens)} "
+        for area, keywords in self.function_keywords:
+            if any(f" {k} " in joined for k in keywords):
+                return area
+        return None
+
+    def _correct(self, tokens: list[str]) -> list[str]:
+        return [
+            t if t in self.index or len(t) < MIN_TYPO_LEN else next(iter(difflib.get_close_matches(t, self.vocabulary, 1, TYPO_CUTOFF)), t)
+            for t in tokens
+        ]
+
+    def _closest(self, tokens: list[str]) -> tuple[str | None, float]:
+        """Best alias by token-set overlap among aliases sharing a token."""
+        query = set(tokens) - FILLER
+        candidates = {alias for t in query for alias in self.index.get(t, ())}
+        best, best_score = None, 0.0
+        for alias in sorted(candidates):
+            alias_tokens = set(alias.split()) - FILLER
+            score = 2 * len(query & alias_tokens) / (len(query) + len(alias_tokens))
+            if score > best_score:
+                best, best_score = alias, score
+        return best, best_score
+
+    def normalize(self, text: str) -> NormalizedRole:
+        raw = " ".join((text or "").split())
+        taxonomy = get_taxonomy()
+        # "(Python)" and other parentheticals only ever qualify the role.
+        qualifiers = " ".join(PAREN_RE.findall(raw))
+        base = PAREN_RE.sub(" ", raw)
+        tokens = self.tokens(base)
+        seniority, core = self._seniority(tokens)
+        stripped = base
+        for m in reversed(taxonomy.find(base)):
+            stripped = stripped[: m.start] + " " + stripped[m.end :]
+        _, skill_free = self._seniority(self.tokens(stripped))
+
+        alias, confidence = None, 0.0
+        for candidate in (tokens, core, skill_free):
+            if " ".join(candidate) in self.aliases:
+                alias, confidence = " ".join(candidate), 1.0
+                break
+        if alias is None and skill_free:
+            corrected = self._correct(skill_free)
+            if " ".join(corrected) in self.aliases:
+                alias, confidence = " ".join(corrected), 0.9
+            else:
+                closest, score = self._closest(corrected)
+                if closest is not None and score >= self.settings.fuzzy_cutoff:
+                    alias, confidence = closest, round(score, 3)
+
+        # Skills the alias itself names ("React Developer") are not a
+        # specialization of the role.
+        alias_skills = {s.lower() for s in taxonomy.skill_names(alias or "")}
+        specialization = tuple(
+            dict.fromkeys(s for s in taxonomy.skill_names(f"{base} {qualifiers}") if s.lower() not in alias_skills)
+        )
+        if alias is not None:
+            role = self.roles[self.aliases[alias]]
+            return NormalizedRole(role["id"], role["title"], role.get("function_area"), seniority, specialization, confidence)
+        # A title made only of seniority words ("Chief of Staff") names the
+        # role itself, so its words make the slug.
+        words = [t for t in core if t not in FILLER] or [t for t in tokens if t not in FILLER]
+        slug = "_".join(words) or "unknown"
+        return NormalizedRole(f"custom:{slug}", base.strip() or raw, self._function_area(tokens), seniority, specialization, 0.0)
+
+
+@lru_cache(maxsize=1)
+def get_role_normalizer(settings: RoleConfig = config.roles) -> RoleNormalizer:
+    with open(settings.role_titles_path, encoding="utf-8") as fh:
+        return RoleNormalizer(json.load(fh), settings)
+
+
+@lru_cache(maxsize=65536)
+def normalize_role(text: str) -> NormalizedRole:
+    """Memoized ``RoleNormalizer.normalize`` on the shared taxonomy."""
+    return get_role_normalizer().normalize(text)
@@ -1,4 +1,6 @@
-from .types import DimensionScore, ResumeScore
+from .taxonomy import get_taxonomy
+from .timeline import Timeline, resume_timeline
+from .types import DimensionScore, JobRequirements, ResumeScore
 
 WEIGHTS = {
     "impact_quality": 0.25,
@@ -34,18 +36,44 @@ def score_ownership(ownership: list) -> DimensionScore:
     return DimensionScore(score=score, weight=WEIGHTS["ownership"], rationale="Leadership and ownership explicitness")
 
 
-def score_skills(skills_signal, target_role: str) -> DimensionScore:
+def skill_overlap(hard: list, target_role: str, requirements: JobRequirements | None = None) -> tuple[float, float]:
+    """How many of the wanted skill terms ``hard`` covers, and out of how many.
+
+    With a job description, its required skills count 1 each and optional
+    skills 0.5. Otherwise skills named in the target role ("Senior Python
+    Engineer") are matched on canonical names and the remaining words fall
+    back to substring overlap.
+    """
+    hard_names = {getattr(s, "name", "").lower() for s in hard}
+    if requirements is not None and (requirements.required_skills or requirements.optional_skills):
+        required = {s.lower() for s in requirements.required_skills}
+        optional = {s.lower() for s in requirements.optional_skills} - required
+        overlap = len(required & hard_names) + 0.5 * len(optional & hard_names)
+        return overlap, len(required) + 0.5 * len(optional)
+
+    role = target_role or ""
+    role_matches = get_taxonomy().find(role)
+    role_skills = {m.name.lower() for m in role_matches}
+    for m in reversed(role_matches):
+        role = role[: m.start] + " " + role[m.end :]
+    role_tokens = [t for t in role.lower().split() if len(t) > 2]
+    names = " ".join(getattr(s, "name", "").lower() for s in hard)
+    overlap = len(role_skills & hard_names) + sum(1 for t in role_tokens if t in names)
+    return overlap, len(role_skills) + len(role_tokens)
+
+
+def score_skills(skills_signal, target_role: str, requirements: JobRequirements | None = None) -> DimensionScore:
     hard = getattr(skills_signal, "hard_skills", []) if skills_signal else []
     if not hard:
         return DimensionScore(score=25, weight=WEIGHTS["skills_relevance"], rationale="No hard skills extracted")
     depth_map = {"expert": 1.0, "proficient": 0.75, "familiar": 0.5}
     avg_depth = sum(depth_map.get(getattr(s, "depth", "familiar"), 0.5) for s in hard) / len(hard)
 
-    role_tokens = [t for t in (target_role or "").lower().split() if len(t) > 2]
-    names = " ".join(getattr(s, "name", "").lower() for s in hard)
-    overlap = sum(1 for t in role_tokens if t in names)
-    overlap_score = (overlap / max(len(role_tokens), 1)) * 30
+    overlap, terms = skill_overlap(hard, target_role, requirements)
+    overlap_score = (overlap / max(terms, 1)) * 30
     score = _clamp(avg_depth * 70 + overlap_score)
+    if requirements is not None and (requirements.required_skills or requirements.optional_skills):
+        return DimensionScore(score=score, weight=WEIGHTS["skills_relevance"], rationale="Skill depth and job-description skill coverage")
     return DimensionScore(score=score, weight=WEIGHTS["skills_relevance"], rationale="Skill depth and target-role keyword relevance")
 
 
@@ -65,11 +93,13 @@ def score_red_flags(red_flags_signal) -> DimensionScore:
     return DimensionScore(score=score, weight=WEIGHTS["red_flag_penalty"], rationale="Penalty for risk signals")
 
 
-def score_narrative(canonical, alignment) -> DimensionScore:
+def score_narrative(canonical, alignment, timeline: Timeline | None = None) -> DimensionScore:
     summary_present = 1 if getattr(canonical, "summary", None) else 0
-    role_count = len(getattr(canonical, "experience", []))
+    # Roles that cannot be placed on the timeline add less to the story.
+    timeline = resume_timeline(canonical, timeline)
+    progression = len(timeline) * 8 + len(timeline.undated) * 4
     fit = float(getattr(alignment, "fit_score", 50.0) or 50.0)
-    score = _clamp(summary_present * 25 + min(role_count * 8, 25) + fit * 0.5)
+    score = _clamp(summary_present * 25 + min(progression, 25) + fit * 0.5)
     return DimensionScore(score=score, weight=WEIGHTS["narrative_coherence"], rationale="Summary, progression, and role alignment coherence")
 
 
@@ -95,14 +125,21 @@ def _tier(overall: float) -> str:
     return "major-gaps"
 
 
-def compute_score(canonical, signals: dict, alignment, target_role: str) -> ResumeScore:
+def compute_score(
+    canonical,
+    signals: dict,
+    alignment,
+    target_role: str,
+    timeline: Timeline | None = None,
+    requirements: JobRequirements | None = None,
+) -> ResumeScore:
     dimensions = {
         "impact_quality": score_impact(signals.get("impact", [])),
         "ownership": score_ownership(signals.get("ownership", [])),
-        "skills_relevance": score_skills(signals.get("skills"), target_role),
+        "skills_relevance": score_skills(signals.get("skills"), target_role, requirements),
         "ats_compliance": score_ats(signals.get("ats")),
         "red_flag_penalty": score_red_flags(signals.get("red_flags")),
-        "narrative_coherence": score_narrative(canonical, alignment),
+        "narrative_coherence": score_narrative(canonical, alignment, timeline),
     }
 
     overall = 0.0
@@ -0,0 +1,679 @@
+"""
+Recruiter search — an inverted index over analyzed resumes.
+
+Each finished analysis becomes one document. Its normalized skills, title
+words and companies are indexed as postings under field-prefixed terms
+(``s:kubernetes``, ``t:backend``, ``c:acme``), and its summary and bullet
+words (``w:``) are scored with BM25. Tenure, overall score and tier are
+numeric facets used as filters.
+
+Postings live in two places. A compiled segment holds flat arrays in a
+binary file; workers mmap it and score queries with NumPy, one vectorized
+pass per query term. A small in-memory delta takes documents as analyses
+complete, and updates and removals tombstone the segment's copy. Once the
+delta reaches ``SEARCH_INDEX_COMPACT_AT`` documents, ``compact`` merges
+both into a fresh segment and, when ``SEARCH_INDEX_PATH`` is set, replaces
+the file. In the service the merge runs in a worker thread and the new
+segment is swapped in when it finishes; updates made meanwhile are
+replayed onto it. The delta itself is never written out: analyses indexed since
+the last compaction are lost when the process exits.
+
+A document may carry a ``key`` naming the resume it describes (the user,
+or the text fingerprint for anonymous uploads). Indexing a new analysis
+under a key replaces the earlier one, so re-analyzing a resume leaves a
+single document. Keys are stored in the segment and survive reloads.
+
+    python -m app.v2.search_index build --results results.jsonl --out index.bin
+    python -m app.v2.search_index query --index index.bin --text "payments" --skill Python -k 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from app.config import SearchIndexConfig, config
+
+from .batch_scoring import TIERS
+from .taxonomy import get_taxonomy
+from .timeline import Timeline, resume_timeline
+from .types import CanonicalResume, ResumeScore, SkillSignal
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RSIX"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sIIIIQ")
+K1 = 1.2
+B = 0.75
+# Skill, title and company terms are matched, not counted; each matching
+# term adds its idf times the field weight. Bullet words use BM25.
+FIELD_WEIGHTS = {"w": 1.0, "s": 2.0, "t": 1.5, "c": 1.0}
+OPTIONAL_SKILL_WEIGHT = 0.5
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our the to was were with".split()
+)
+COMPANY_SUFFIX_RE = re.compile(r"[\s,]+(inc|llc|ltd|limited|corp|corporation|co|gmbh|plc|pvt)\.?$")
+
+
+@lru_cache(maxsize=1 << 16)
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _pad(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+def words(text: str) -> list[str]:
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def normalize_company(name: str) -> str:
+    return COMPANY_SUFFIX_RE.sub("", " ".join(name.lower().split())).strip()
+
+
+def canonical_skill(name: str) -> str:
+    matches = get_taxonomy().skill_names(name, listed=True)
+    return (matches[0] if matches else name.strip()).lower()
+
+
+class SearchDocument(NamedTuple):
+    analysis_id: str
+    skills: list[str]
+    titles: list[str]
+    companies: list[str]
+    text: str
+    tenure_months: int
+    overall: float
+    tier: str
+    key: str = ""
+
+
+class SearchHit(NamedTuple):
+    analysis_id: str
+    score: float
+    overall: float
+    tier: str
+    tenure_months: int
+    matched_skills: list[str]
+
+
+def document_from_analysis(
+    analysis_id: str,
+    canonical: CanonicalResume,
+    skills: SkillSignal | None,
+    score: ResumeScore,
+    timeline: Timeline | None = None,
+    key: str = "",
+) -> SearchDocument:
+    names = [s.name for s in getattr(skills, "hard_skills", [])] + list(canonical.skills)
+    timeline = resume_timeline(canonical, timeline)
+    text = " ".join([canonical.summary or ""] + [b for role in canonical.experience for b in role.bullets])
+    return SearchDocument(
+        analysis_id=analysis_id,
+        skills=list(dict.fromkeys(canonical_skill(n) for n in names if n.strip())),
+        titles=[role.title for role in canonical.experience if role.title],
+        companies=[normalize_company(role.company) for role in canonical.experience if role.company],
+        text=text,
+        tenure_months=timeline.total_months if timeline.intervals else -1,
+        overall=score.overall,
+        tier=score.tier,
+        key=key,
+    )
+
+
+def document_from_result(result: dict) -> SearchDocument:
+    """Index document for a stored ``ResumeDoctorResult`` dump."""
+    skills = (result.get("signals") or {}).get("skills")
+    return document_from_analysis(
+        result["analysis_id"],
+        CanonicalResume.model_validate(result["canonical"]),
+        SkillSignal.model_validate(skills) if skills else None,
+        ResumeScore.model_validate(result["score"]),
+        key=f"user:{result['user_id']}" if result.get("user_id") else "",
+    )
+
+
+def _analyze(doc: SearchDocument) -> tuple[Counter, int]:
+    """Term hash -> frequency, and the BM25 length (bullet word count)."""
+    terms: Counter = Counter()
+    text = words(doc.text)
+    terms.update(_term_hash(f"w:{w}") for w in text)
+    terms.update({_term_hash(f"s:{s}"): 1 for s in doc.skills})
+    terms.update({_term_hash(f"t:{w}"): 1 for title in doc.titles for w in words(title)})
+    terms.update({_term_hash(f"c:{c}"): 1 for c in doc.companies if c})
+    return terms, len(text)
+
+
+class _Entry(NamedTuple):
+    terms: Counter
+    length: int
+    tenure_months: int
+    overall: float
+    tier: int
+    key: str
+
+
+def _entry(doc: SearchDocument) -> _Entry:
+    terms, length = _analyze(doc)
+    tier = TIERS.index(doc.tier) if doc.tier in TIERS else len(TIERS)
+    return _Entry(terms, length, doc.tenure_months, doc.overall, tier, doc.key)
+
+
+def _compile(
+    post_hash, post_doc, post_tf, lengths, tenures, overalls, tiers, ids: list[str], keys: list[str]
+) -> bytes:
+    """Write posting and document columns as a segment. A stable sort groups
+    postings by term hash, so each term's postings must already appear in
+    doc id order."""
+    post_hash = np.asarray(post_hash, dtype="<u8")
+    order = np.argsort(post_hash, kind="stable")
+    post_hash = post_hash[order]
+    post_doc = np.asarray(post_doc, dtype="<u4")[order]
+    post_tf = np.minimum(np.asarray(post_tf, dtype=np.int64)[order], 65535)
+    first = np.flatnonzero(np.diff(post_hash)) + 1
+    hashes = post_hash[np.concatenate([[0], first])] if len(post_hash) else post_hash
+    term_start = np.concatenate([[0], first, [len(post_hash)]]) if len(post_hash) else np.zeros(1)
+    lengths = np.asarray(lengths, dtype="<u4")
+
+    # Analysis ids, then keys, share one string blob.
+    blob = bytearray()
+    id_offsets = [0]
+    for analysis_id in ids:
+        blob.extend(analysis_id.encode("utf-8"))
+        id_offsets.append(len(blob))
+    key_offsets = [len(blob)]
+    for key in keys:
+        blob.extend(key.encode("utf-8"))
+        key_offsets.append(len(blob))
+
+    buf = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(ids), len(hashes), len(post_doc), int(lengths.sum())))
+    sections = [
+        ("<u8", hashes),
+        ("<u4", term_start),
+        ("<u4", post_doc),
+        ("<u2", post_tf),
+        ("<u4", lengths),
+        ("<i4", tenures),
+        ("<f8", overalls),
+        ("<u1", tiers),
+        ("<u4", id_offsets),
+        ("<u4", key_offsets),
+    ]
+    for dtype, values in sections:
+        _pad(buf)
+        buf.extend(np.asarray(values, dtype=dtype).tobytes())
+    _pad(buf)
+    buf.extend(blob)
+    return bytes(buf)
+
+
+def _columns(docs: Iterable[tuple[str, _Entry]], first_doc: int = 0) -> tuple:
+    ids: list[str] = []
+    keys: list[str] = []
+    lengths, tenures, overalls, tiers = [], [], [], []
+    post_hash, post_doc, post_tf = [], [], []
+    for doc_id, (analysis_id, entry) in enumerate(docs, start=first_doc):
+        ids.append(analysis_id)
+        keys.append(entry.key)
+        lengths.append(entry.length)
+        tenures.append(entry.tenure_months)
+        overalls.append(entry.overall)
+        tiers.append(entry.tier)
+        post_hash.extend(entry.terms.keys())
+        post_tf.extend(entry.terms.values())
+        post_doc.extend([doc_id] * len(entry.terms))
+    return post_hash, post_doc, post_tf, lengths, tenures, overalls, tiers, ids, keys
+
+
+def compile_segment(docs: Iterable[tuple[str, _Entry]]) -> bytes:
+    """Compile ``(analysis_id, entry)`` pairs into the segment format."""
+    return _compile(*_columns(docs))
+
+
+class IndexSegment:
+    """Read-only view over a compiled segment buffer (bytes or mmap)."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, version, n_docs, n_terms, n_postings, total_length = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a search index segment (or built by another version)")
+        offset = HEADER.size
+
+        def take(dtype: str, count: int):
+            nonlocal offset
+            offset += -offset % 8
+            section = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += section.nbytes
+            return section
+
+        self.term_hash = take("<u8", n_terms)
+        self.term_start = take("<u4", n_terms + 1)
+        self.post_doc = take("<u4", n_postings)
+        self.post_tf = take("<u2", n_postings)
+        self.lengths = take("<u4", n_docs)
+        self.tenure = take("<i4", n_docs)
+        self.overall = take("<f8", n_docs)
+        self.tier = take("<u1", n_docs)
+        self._id_offsets = take("<u4", n_docs + 1)
+        self._key_offsets = take("<u4", n_docs + 1)
+        offset += -offset % 8
+        self._strings = memoryview(buffer)[offset:]
+        self.doc_count = n_docs
+        self.total_length = total_length
+
+    def analysis_id(self, doc_id: int) -> str:
+        return bytes(self._strings[self._id_offsets[doc_id] : self._id_offsets[doc_id + 1]]).decode("utf-8")
+
+    def key(self, doc_id: int) -> str:
+        return bytes(self._strings[self._key_offsets[doc_id] : self._key_offsets[doc_id + 1]]).decode("utf-8")
+
+    def postings(self, term: int):
+        """``(doc ids, term frequencies)`` for a term hash, or None."""
+        i = int(np.searchsorted(self.term_hash, np.uint64(term)))
+        if i < len(self.term_hash) and int(self.term_hash[i]) == term:
+            lo, hi = int(self.term_start[i]), int(self.term_start[i + 1])
+            return self.post_doc[lo:hi], self.post_tf[lo:hi]
+        return None
+
+    def merge(self, live, delta: list[tuple[str, _Entry]]) -> bytes:
+        """A new segment holding the ``live`` documents of this one followed
+        by ``delta``, merged column-wise without decoding documents."""
+        live = np.asarray(live, dtype=bool)
+        new_id = np.cumsum(live) - 1
+        term_of = np.repeat(np.arange(len(self.term_hash)), np.diff(self.term_start.astype(np.int64)))
+        kept = live[self.post_doc]
+        d_hash, d_doc, d_tf, d_len, d_tenure, d_overall, d_tier, d_ids, d_keys = _columns(delta, first_doc=int(live.sum()))
+        live_ids = np.flatnonzero(live).tolist()
+        return _compile(
+            np.concatenate([self.term_hash[term_of[kept]], np.asarray(d_hash, dtype="<u8")]),
+            np.concatenate([new_id[self.post_doc[kept]], np.asarray(d_doc, dtype=np.int64)]),
+            np.concatenate([self.post_tf[kept], np.asarray(d_tf, dtype=np.int64)]),
+            np.concatenate([self.lengths[live], np.asarray(d_len, dtype="<u4")]),
+            np.concatenate([self.tenure[live], np.asarray(d_tenure, dtype="<i4")]),
+            np.concatenate([self.overall[live], np.asarray(d_overall, dtype="<f8")]),
+            np.concatenate([self.tier[live], np.asarray(d_tier, dtype="<u1")]),
+            [self.analysis_id(i) for i in live_ids] + d_ids,
+            [self.key(i) for i in live_ids] + d_keys,
+        )
+
+
+def _segment_maps(segment: IndexSegment) -> tuple[IndexSegment, dict[str, int], dict[str, str]]:
+    """A segment with its analysis id -> doc id and key -> analysis id maps."""
+    ids = {segment.analysis_id(i): i for i in range(segment.doc_count)}
+    keys = {key: analysis_id for analysis_id, i in ids.items() if (key := segment.key(i))}
+    return segment, ids, keys
+
+
+def _empty_segment() -> IndexSegment:
+    return IndexSegment(compile_segment([]))
+
+
+def load_segment(path: str) -> IndexSegment:
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return _empty_segment()
+        return IndexSegment(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class _QueryTerm(NamedTuple):
+    hash: int
+    field: str
+    weight: float
+    label: str
+
+
+def _query_terms(text: str, skills: Iterable[str], optional_skills: Iterable[str], titles: Iterable[str], companies: Iterable[str]) -> list[_QueryTerm]:
+    terms: dict[int, _QueryTerm] = {}
+
+    def add(field: str, value: str, weight: float) -> None:
+        h = _term_hash(f"{field}:{value}")
+        if h not in terms or terms[h].weight < weight:
+            terms[h] = _QueryTerm(h, field, weight, value)
+
+    for w in words(text or ""):
+        add("w", w, FIELD_WEIGHTS["w"])
+    for s in optional_skills:
+        add("s", canonical_skill(s), FIELD_WEIGHTS["s"] * OPTIONAL_SKILL_WEIGHT)
+    for s in skills:
+        add("s", canonical_skill(s), FIELD_WEIGHTS["s"])
+    for title in titles:
+        for w in words(title):
+            add("t", w, FIELD_WEIGHTS["t"])
+    for c in companies:
+        add("c", normalize_company(c), FIELD_WEIGHTS["c"])
+    return list(terms.values())
+
+
+class _Snapshot(NamedTuple):
+    """What a background compaction merges: the segment, its tombstones
+    and the delta as they were when it started."""
+
+    segment: IndexSegment
+    deleted: "np.ndarray"
+    delta: dict[str, _Entry]
+
+
+class SearchIndex:
+    def __init__(self, segment: IndexSegment | None = None, path: str | None = None, compact_at: int = 2000):
+        self.path = path
+        self.compact_at = compact_at
+        self._compaction: asyncio.Task | None = None
+        self._reset(*_segment_maps(segment or _empty_segment()))
+
+    def _reset(self, segment: IndexSegment, segment_ids: dict[str, int], keys: dict[str, str]) -> None:
+        self.segment = segment
+        self._deleted = np.zeros(segment.doc_count, dtype=bool)
+        self._segment_ids = segment_ids
+        # Resume key -> analysis id of its live document.
+        self._keys = keys
+        self._live_length = segment.total_length
+        self._delta: dict[str, _Entry] = {}
+        self._delta_df: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self.segment.doc_count - int(self._deleted.sum()) + len(self._delta)
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return analysis_id in self._delta or (analysis_id in self._segment_ids and not self._deleted[self._segment_ids[analysis_id]])
+
+    def add(self, doc: SearchDocument, background: bool = False) -> None:
+        """Index ``doc``, replacing any earlier version of the same analysis
+        and any other analysis under the same key. A full delta is compacted
+        here, or with ``background`` in a worker thread so the caller's event
+        loop keeps serving requests."""
+        self.remove(doc.analysis_id)
+        if doc.key in self._keys:
+            self.remove(self._keys[doc.key])
+        self._insert(doc.analysis_id, _entry(doc))
+        if len(self._delta) < self.compact_at or self._compaction is not None:
+            return
+        if background:
+            self._compaction = asyncio.get_running_loop().create_task(self._compact_snapshot(self._snapshot()))
+            self._compaction.add_done_callback(self._compaction_done)
+        else:
+            self.compact()
+
+    def _insert(self, analysis_id: str, entry: _Entry) -> None:
+        self._delta[analysis_id] = entry
+        if entry.key:
+            self._keys[entry.key] = analysis_id
+        self._delta_df.update(entry.terms.keys())
+        self._live_length += entry.length
+
+    def remove(self, analysis_id: str) -> bool:
+        entry = self._delta.pop(analysis_id, None)
+        if entry is not None:
+            self._delta_df.subtract(entry.terms.keys())
+            self._live_length -= entry.length
+            self._drop_key(entry.key, analysis_id)
+            return True
+        doc_id = self._segment_ids.get(analysis_id)
+        if doc_id is not None and not self._deleted[doc_id]:
+            self._tombstone(doc_id, analysis_id)
+            return True
+        return False
+
+    def _tombstone(self, doc_id: int, analysis_id: str) -> None:
+        self._deleted[doc_id] = True
+        self._live_length -= int(self.segment.lengths[doc_id])
+        self._drop_key(self.segment.key(doc_id), analysis_id)
+
+    def _drop_key(self, key: str, analysis_id: str) -> None:
+        if key and self._keys.get(key) == analysis_id:
+            del self._keys[key]
+
+    def _snapshot(self) -> _Snapshot:
+        return _Snapshot(self.segment, self._deleted.copy(), dict(self._delta))
+
+    def _merge(self, snapshot: _Snapshot) -> tuple:
+        """The merged segment and its lookup maps; touches no index state,
+        so it can run in a worker thread."""
+        data = snapshot.segment.merge(~snapshot.deleted, list(snapshot.delta.items()))
+        if not self.path:
+            return _segment_maps(IndexSegment(data))
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, self.path)
+        return _segment_maps(load_segment(self.path))
+
+    def _install(self, snapshot: _Snapshot, merged: tuple) -> None:
+        """Swap in the merged segment, then replay what changed since the
+        snapshot: documents removed or replaced are tombstoned in the new
+        segment, and documents added meanwhile stay in the delta."""
+        deleted, delta, old_ids = self._deleted, self._delta, self._segment_ids
+        self._reset(*merged)
+        for analysis_id, doc_id in list(self._segment_ids.items()):
+            if analysis_id in snapshot.delta:
+                live = delta.get(analysis_id) is snapshot.delta[analysis_id]
+            else:
+                live = not deleted[old_ids[analysis_id]]
+            if not live:
+                self._tombstone(doc_id, analysis_id)
+        for analysis_id, entry in delta.items():
+            if snapshot.delta.get(analysis_id) is not entry:
+                self._insert(analysis_id, entry)
+
+    def compact(self) -> None:
+        """Merge the delta and drop tombstoned documents into a new segment,
+        written to ``path`` (and mmapped back) when one is set."""
+        snapshot = self._snapshot()
+        self._install(snapshot, self._merge(snapshot))
+
+    async def compact_in_background(self) -> None:
+        """``compact`` with the merge and file write in a worker thread;
+        searches and updates meanwhile use the current segment and delta."""
+        await self._compact_snapshot(self._snapshot())
+
+    async def _compact_snapshot(self, snapshot: _Snapshot) -> None:
+        merged = await asyncio.to_thread(self._merge, snapshot)
+        self._install(snapshot, merged)
+
+    def _compaction_done(self, task: asyncio.Task) -> None:
+        self._compaction = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("search index compaction failed", exc_info=task.exception())
+
+    def search(
+        self,
+        text: str = "",
+        skills: Iterable[str] = (),
+        optional_skills: Iterable[str] = (),
+        titles: Iterable[str] = (),
+        companies: Iterable[str] = (),
+        must_skills: Iterable[str] = (),
+        min_tenure_months: int | None = None,
+        max_tenure_months: int | None = None,
+        tiers: Iterable[str] | None = None,
+        min_score: float | None = None,
+        k: int = 50,
+    ) -> list[SearchHit]:
+        """Top ``k`` documents by BM25 plus field matches, among those passing
+        every filter. Without query terms, filtered documents rank by overall
+        score."""
+        terms = _query_terms(text, skills, optional_skills, titles, companies)
+        must = [_term_hash(f"s:{canonical_skill(s)}") for s in must_skills]
+        tier_codes = {TIERS.index(t) for t in tiers if t in TIERS} if tiers is not None else None
+        n_docs = max(len(self), 1)
+        avg_length = max(self._live_length / n_docs, 1.0)
+        seg = self.segment
+
+        def idf(df: int) -> float:
+            return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        # Segment: one vectorized pass per query term. Document frequencies
+        # leave out tombstoned copies, so scores match a freshly built index.
+        scores = np.zeros(seg.doc_count)
+        keep = ~self._deleted
+        seg_postings = {t.hash: seg.postings(t.hash) for t in terms}
+        df = {
+            t.hash: self._delta_df[t.hash] + (0 if seg_postings[t.hash] is None else int(keep[seg_postings[t.hash][0]].sum()))
+            for t in terms
+        }
+        for term in terms:
+            postings = seg_postings[term.hash]
+            if postings is None:
+                continue
+            docs, tf = postings
+            weight = term.weight * idf(df[term.hash])
+            if term.field == "w":
+                tf = tf.astype(np.float64)
+                norm = K1 * (1 - B + B * seg.lengths[docs] / avg_length)
+                scores[docs] += weight * tf * (K1 + 1) / (tf + norm)
+            else:
+                scores[docs] += weight
+        for term in must:
+            postings = seg.postings(term)
+            has = np.zeros(seg.doc_count, dtype=bool)
+            if postings is not None:
+                has[postings[0]] = True
+            keep &= has
+        if min_tenure_months is not None:
+            keep &= seg.tenure >= min_tenure_months
+        if max_tenure_months is not None:
+            keep &= (seg.tenure >= 0) & (seg.tenure <= max_tenure_months)
+        if tier_codes is not None:
+            keep &= np.isin(seg.tier, list(tier_codes))
+        if min_score is not None:
+            keep &= seg.overall >= min_score
+        if terms:
+            keep &= scores > 0
+        else:
+            scores = seg.overall.astype(np.float64)
+
+        candidates = np.flatnonzero(keep)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked: list[tuple[float, str, float, int, int]] = [
+            (float(scores[i]), seg.analysis_id(i), float(seg.overall[i]), int(seg.tier[i]), int(seg.tenure[i])) for i in candidates.tolist()
+        ]
+
+        # Delta: small, scored per document.
+        for analysis_id, entry in self._delta.items():
+            if any(term not in entry.terms for term in must):
+                continue
+            if min_tenure_months is not None and entry.tenure_months < min_tenure_months:
+                continue
+            if max_tenure_months is not None and not 0 <= entry.tenure_months <= max_tenure_months:
+                continue
+            if (tier_codes is not None and entry.tier not in tier_codes) or (min_score is not None and entry.overall < min_score):
+                continue
+            score = 0.0
+            for term in terms:
+                tf = entry.terms.get(term.hash)
+                if not tf:
+                    continue
+                weight = term.weight * idf(df[term.hash])
+                if term.field == "w":
+                    score += weight * tf * (K1 + 1) / (tf + K1 * (1 - B + B * entry.length / avg_length))
+                else:
+                    score += weight
+            if terms and score <= 0:
+                continue
+            ranked.append((score if terms else entry.overall, analysis_id, entry.overall, entry.tier, entry.tenure_months))
+
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        skill_terms = [t for t in terms if t.field == "s"]
+        hits = []
+        for score, analysis_id, overall, tier, tenure in ranked[:k]:
+            hits.append(
+                SearchHit(
+                    analysis_id=analysis_id,
+                    score=round(score, 4),
+                    overall=overall,
+                    tier=TIERS[tier] if tier < len(TIERS) else "",
+                    tenure_months=tenure,
+                    matched_skills=[t.label for t in skill_terms if self._has_term(analysis_id, t.hash, seg_postings[t.hash])],
+                )
+            )
+        return hits
+
+    def _has_term(self, analysis_id: str, term: int, postings) -> bool:
+        entry = self._delta.get(analysis_id)
+        if entry is not None:
+            return term in entry.terms
+        if postings is None:
+            return False
+        docs = postings[0]
+        doc_id = self._segment_ids[analysis_id]
+        i = int(np.searchsorted(docs, doc_id))
+        return i < len(docs) and int(docs[i]) == doc_id
+
+
+def load_index(path: str, compact_at: int = 2000) -> SearchIndex:
+    segment = load_segment(path) if os.path.exists(path) else None
+    return SearchIndex(segment, path=path, compact_at=compact_at)
+
+
+@lru_cache(maxsize=1)
+def get_search_index(settings: SearchIndexConfig = config.search_index) -> SearchIndex | None:
+    if np is None or not settings.enabled:
+        return None
+    if settings.path:
+        return load_index(settings.path, settings.compact_at)
+    return SearchIndex(compact_at=settings.compact_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the recruiter search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="index ResumeDoctorResult dumps, one JSON object per line")
+    build_cmd.add_argument("--results", required=True)
+    build_cmd.add_argument("--out", required=True)
+    query_cmd = sub.add_parser("query")
+    query_cmd.add_argument("--index", required=True)
+    query_cmd.add_argument("--text", default="")
+    query_cmd.add_argument("--skill", action="append", default=[])
+    query_cmd.add_argument("--must-skill", action="append", default=[])
+    query_cmd.add_argument("--min-tenure-months", type=int)
+    query_cmd.add_argument("--tier", action="append")
+    query_cmd.add_argument("-k", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = SearchIndex(path=args.out, compact_at=1 << 62)
+        with open(args.results, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    index.add(document_from_result(json.loads(line)))
+        index.compact()
+        print(f"indexed {len(index)} analyses -> {args.out} ({os.path.getsize(args.out)} bytes)")
+        return
+
+    index = load_index(args.index)
+    t = time.perf_counter()
+    hits = index.search(
+        text=args.text,
+        skills=args.skill,
+        must_skills=args.must_skill,
+        min_tenure_months=args.min_tenure_months,
+        tiers=args.tier,
+        k=args.k,
+    )
+    took = (time.perf_counter() - t) * 1000
+    for hit in hits:
+        print(json.dumps(hit._asdict()))
+    print(f"{len(hits)} hits from {len(index)} analyses in {took:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
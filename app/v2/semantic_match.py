@@ -0,0 +1,267 @@
+"""
+Offline role matching — TF-IDF similarity between resume evidence and role
+requirements, with no network calls and no GPU.
+
+A role profile is a weighted list of requirements, either a catalog role
+from ``data/role_profiles.json`` or the skills of a job description. Text
+is turned into hashed TF-IDF vectors. Skill mentions are rewritten to
+their canonical taxonomy name plus a lower-weight category feature, so
+"k8s" evidences "Kubernetes" and MySQL gives partial credit toward
+PostgreSQL. IDF is fitted on the catalog's requirement text.
+
+Titles resolve to catalog roles through ``roles.normalize_role``, and
+title-derived profiles are cached under the normalized role's key, so
+spelling variants of one title share an entry. Profile vectors are built
+once and cached. Matching projects each bullet, the summary and each
+listed skill onto the profile's vocabulary, and scores every unit against
+every requirement in one cosine matmul. That matmul
+covers all resumes in the call. A requirement's best unit is its evidence;
+requirements below ``MATCH_THRESHOLD`` are missing.
+"""
+
+import json
+import math
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from app.cache import TTLCache
+from app.config import SemanticMatchConfig, config
+
+from .roles import normalize_role
+from .taxonomy import get_taxonomy
+from .types import CanonicalResume, JobRequirements
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+DIM = 1 << 20
+MATCH_THRESHOLD = 0.3
+FULL_MATCH = 0.5
+# A skill named only in the skills section is weaker evidence than a bullet.
+SKILL_LIST_FACTOR = 0.8
+SKILL_FEATURE_WEIGHT = 2.0
+CATEGORY_FEATURE_WEIGHT = 0.5
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#/]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our such than that the their this to was were with "
+    "using use used via etc end".split()
+)
+SUFFIXES = ("ing", "ed", "es", "s")
+
+
+class Requirement(NamedTuple):
+    text: str
+    kind: str
+    weight: float
+
+
+class RoleProfile(NamedTuple):
+    role_id: str
+    title: str
+    requirements: tuple[Requirement, ...]
+    source: str
+
+
+class RequirementMatch(NamedTuple):
+    requirement: Requirement
+    similarity: float
+    evidence: str | None
+
+
+class MatchResult(NamedTuple):
+    fit_score: float
+    matched: list[RequirementMatch]
+    missing: list[RequirementMatch]
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def features(text: str, drop: frozenset = frozenset()) -> Counter:
+    """Weighted feature counts: canonical skills and their categories, then
+    stemmed words and word bigrams from the text the skills did not cover."""
+    feats: Counter = Counter()
+    matches = get_taxonomy().find(text)
+    for m in matches:
+        feats[f"skill:{m.name.lower()}"] += SKILL_FEATURE_WEIGHT
+        if m.category:
+            feats[f"cat:{m.category}"] += CATEGORY_FEATURE_WEIGHT
+    for m in reversed(matches):
+        text = text[: m.start] + " . " + text[m.end :]
+    words = [_stem(w) for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and w not in drop]
+    feats.update(words)
+    feats.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return feats
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & (DIM - 1)
+
+
+class Vectorizer:
+    """Hashed TF-IDF with sublinear term frequency."""
+
+    def __init__(self, documents: Iterable[str]):
+        df: Counter = Counter()
+        n = 0
+        for doc in documents:
+            n += 1
+            df.update({_hash(f) for f in features(doc)})
+        self.idf = {h: math.log((1 + n) / (1 + count)) + 1 for h, count in df.items()}
+        self.default_idf = math.log(1 + n) + 1
+
+    def vector(self, text: str, drop: frozenset = frozenset()) -> dict[int, float]:
+        vec: dict[int, float] = {}
+        for feature, tf in features(text, drop).items():
+            h = _hash(feature)
+            vec[h] = vec.get(h, 0.0) + (1 + math.log(tf) if tf >= 1 else tf) * self.idf.get(h, self.default_idf)
+        return vec
+
+
+class ProfileVectors:
+    """A role profile's requirement vectors over its own vocabulary, rows
+    L2-normalized."""
+
+    def __init__(self, profile: RoleProfile, vectorizer: Vectorizer):
+        self.profile = profile
+        self.vectorizer = vectorizer
+        rows = [vectorizer.vector(r.text) for r in profile.requirements]
+        self.columns = {h: i for i, h in enumerate(sorted({h for row in rows for h in row}))}
+        matrix = np.zeros((len(rows), len(self.columns)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for h, v in row.items():
+                matrix[i, self.columns[h]] = v
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-12)
+        self.weights = np.asarray([r.weight for r in profile.requirements], dtype=np.float64)
+
+    def project(self, texts: list[str]):
+        """Unit vectors on the profile vocabulary; the rest of each text is
+        dropped, so long bullets are not penalized for unrelated words."""
+        out = np.zeros((len(texts), len(self.columns)), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for h, v in self.vectorizer.vector(text).items():
+                col = self.columns.get(h)
+                if col is not None:
+                    out[i, col] = v
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def _units(canonical: CanonicalResume) -> tuple[list[str], list[float]]:
+    texts = [b for role in canonical.experience for b in role.bullets]
+    if canonical.summary:
+        texts.append(canonical.summary)
+    factors = [1.0] * len(texts)
+    texts.extend(canonical.skills)
+    factors.extend([SKILL_LIST_FACTOR] * len(canonical.skills))
+    return texts, factors
+
+
+def match_resumes(canonicals: list[CanonicalResume], vectors: ProfileVectors) -> list[MatchResult]:
+    """Match many resumes against one profile with a single similarity matmul."""
+    texts: list[str] = []
+    factors: list[float] = []
+    bounds = [0]
+    for canonical in canonicals:
+        unit_texts, unit_factors = _units(canonical)
+        texts.extend(unit_texts)
+        factors.extend(unit_factors)
+        bounds.append(len(texts))
+    similarity = vectors.project(texts) @ vectors.matrix.T if texts else np.zeros((0, len(vectors.weights)))
+    similarity = similarity * np.asarray(factors, dtype=np.float32)[:, None]
+
+    requirements = vectors.profile.requirements
+    total_weight = float(vectors.weights.sum()) or 1.0
+    results = []
+    for start, end in zip(bounds, bounds[1:]):
+        if start == end:
+            best = np.zeros(len(requirements))
+            where = np.full(len(requirements), -1)
+        else:
+            block = similarity[start:end]
+            where = block.argmax(axis=0) + start
+            best = block.max(axis=0).astype(np.float64)
+        credit = np.where(best >= MATCH_THRESHOLD, np.minimum(best / FULL_MATCH, 1.0), 0.0)
+        fit = round(100 * float((credit * vectors.weights).sum()) / total_weight, 2)
+        matched, missing = [], []
+        for i, req in enumerate(requirements):
+            if best[i] >= MATCH_THRESHOLD:
+                matched.append(RequirementMatch(req, round(float(best[i]), 3), texts[where[i]]))
+            else:
+                missing.append(RequirementMatch(req, round(float(best[i]), 3), None))
+        matched.sort(key=lambda m: (-m.requirement.weight, -m.similarity))
+        missing.sort(key=lambda m: -m.requirement.weight)
+        results.append(MatchResult(fit, matched, missing))
+    return results
+
+
+class RoleMatcher:
+    """The role catalog with precomputed profile vectors, plus a cache of
+    profiles built for job descriptions and uncatalogued titles."""
+
+    def __init__(self, catalog: list[dict], settings: SemanticMatchConfig = config.semantic_match):
+        corpus = [r["text"] for role in catalog for r in role["requirements"]]
+        corpus += [role["title"] for role in catalog]
+        self.vectorizer = Vectorizer(corpus)
+        self.catalog: dict[str, ProfileVectors] = {}
+        for role in catalog:
+            profile = RoleProfile(
+                role["id"],
+                role["title"],
+                tuple(Requirement(r["text"], r.get("kind", "competency"), float(r.get("weight", 1.0))) for r in role["requirements"]),
+                "catalog",
+            )
+            self.catalog[role["id"]] = ProfileVectors(profile, self.vectorizer)
+        self._cache: TTLCache[ProfileVectors] = TTLCache(maxsize=settings.profile_cache_size, ttl_seconds=settings.profile_cache_ttl_seconds)
+
+    def catalog_role(self, target_role: str) -> str | None:
+        """The catalog role id ``target_role`` normalizes to, if profiled."""
+        role_id = normalize_role(target_role or "").role_id
+        return role_id if role_id in self.catalog else None
+
+    def profile(self, target_role: str, requirements: JobRequirements | None = None) -> ProfileVectors:
+        """Vectors for the JD's skills when given, else the catalog role the
+        title names, else requirements read off the title itself."""
+        if requirements is not None and (requirements.required_skills or requirements.optional_skills):
+            key = f"jd:{requirements.content_hash or hash((tuple(requirements.required_skills), tuple(requirements.optional_skills)))}"
+            cached = self._cache.get(key)
+            if cached is None:
+                reqs = [Requirement(s, "skill", 1.0) for s in requirements.required_skills]
+                reqs += [Requirement(s, "skill", 0.5) for s in requirements.optional_skills if s not in requirements.required_skills]
+                cached = ProfileVectors(RoleProfile(key, requirements.title or target_role, tuple(reqs), "job_description"), self.vectorizer)
+                self._cache.set(key, cached)
+            return cached
+
+        role = normalize_role(target_role or "")
+        if role.role_id in self.catalog:
+            return self.catalog[role.role_id]
+        key = f"title:{role.cache_key}"
+        cached = self._cache.get(key)
+        if cached is None:
+            reqs = [Requirement(name, "skill", 1.0) for name in get_taxonomy().skill_names(role.title)]
+            if role.title:
+                reqs.append(Requirement(role.title, "competency", 1.0))
+            cached = ProfileVectors(RoleProfile(key, role.title, tuple(reqs), "title"), self.vectorizer)
+            self._cache.set(key, cached)
+        return cached
+
+    def match(self, canonicals: list[CanonicalResume], target_role: str, requirements: JobRequirements | None = None) -> list[MatchResult]:
+        return match_resumes(canonicals, self.profile(target_role, requirements))
+
+
+@lru_cache(maxsize=1)
+def get_role_matcher(settings: SemanticMatchConfig = config.semantic_match) -> RoleMatcher | None:
+    if np is None:
+        return None
+    with open(settings.role_profiles_path, encoding="utf-8") as fh:
+        return RoleMatcher(json.load(fh)["roles"], settings)
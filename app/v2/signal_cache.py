@@ -0,0 +1,59 @@
+"""
+Signal cache — LLM impact and ownership results reused across requests.
+
+Bullet wording rarely changes between resume versions, and shared
+templates repeat it across users. Impact classifications are cached per
+bullet and ownership assessments per role. Keys hash the normalized
+content together with the model and a fingerprint of the prompt, so
+editing a prompt or switching models starts from a cold cache. Only
+LLM output is cached. Heuristic fallbacks are cheap and must not stop a
+later request from reaching the LLM.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+from app.cache import TTLCache
+from app.config import SignalCacheConfig, config
+
+from .types import CanonicalExperience, ImpactSignal, OwnershipSignal
+
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_bullet(text: str) -> str:
+    return SPACE_RE.sub(" ", text).strip().casefold()
+
+
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def _key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def bullet_key(text: str, model: str, prompt: str) -> str:
+    return _key(normalize_bullet(text), model, prompt_version(prompt))
+
+
+def role_key(role: CanonicalExperience, model: str, prompt: str) -> str:
+    bullets = "\x1e".join(normalize_bullet(b) for b in role.bullets)
+    return _key(normalize_bullet(role.company), normalize_bullet(role.title), bullets, model, prompt_version(prompt))
+
+
+def cache_stats(hits: int, misses: int) -> dict:
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 3) if total else 0.0}
+
+
+class SignalCache:
+    def __init__(self, settings: SignalCacheConfig = config.signal_cache):
+        self.impact: TTLCache[ImpactSignal] = TTLCache(maxsize=settings.impact_size, ttl_seconds=settings.ttl_seconds)
+        self.ownership: TTLCache[OwnershipSignal] = TTLCache(maxsize=settings.ownership_size, ttl_seconds=settings.ttl_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_signal_cache() -> SignalCache | None:
+    return SignalCache() if config.signal_cache.enabled else None
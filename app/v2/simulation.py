@@ -0,0 +1,258 @@
+"""
+What-if score simulation over a stored analysis.
+
+Applies hypothetical edits to the stored canonical resume and re-derives
+only the signals those edits touch, heuristically and without LLM calls.
+Stored signals may have come from the LLM, so an untouched signal is kept
+as is. A touched signal gets the *change* the heuristic sees between the
+original and the edited resume, rather than being replaced by heuristic
+output wholesale. That keeps an edit to one bullet from also rewriting
+everything the LLM said about the rest of the resume. Score, tier and the
+recommendation ranking are then recomputed.
+"""
+
+import time
+
+from .alignment import _heuristic_alignment
+from .analysis_store import StoredAnalysis
+from .extractors.ats import _heuristic_ats
+from .extractors.impact import _heuristic_impact
+from .extractors.ownership import _heuristic_ownership
+from .extractors.red_flags import _heuristic_red_flags
+from .extractors.skills import _heuristic_skills
+from .features import BulletFeatureIndex
+from .guidance import rank_recommendations, template_recommendations
+from .scoring import compute_score
+from .types import (
+    ATSSignal,
+    CanonicalResume,
+    ImpactSignal,
+    RedFlagSignal,
+    ResumeScore,
+    SimulationEdit,
+    SkillSignal,
+)
+
+BULLET_EDITS = {"rewrite_bullet", "quantify_bullet", "add_bullet", "remove_bullet"}
+EDIT_KINDS = BULLET_EDITS | {"set_summary", "add_skill", "remove_skill"}
+
+
+class SimulationError(ValueError):
+    pass
+
+
+def _role(canonical: CanonicalResume, edit: SimulationEdit):
+    if edit.role_index is None or not 0 <= edit.role_index < len(canonical.experience):
+        raise SimulationError(f"{edit.kind}: role_index {edit.role_index} out of range")
+    return canonical.experience[edit.role_index]
+
+
+def _bullet_index(bullets: list, edit: SimulationEdit) -> int:
+    if edit.bullet_index is None or not 0 <= edit.bullet_index < len(bullets):
+        raise SimulationError(f"{edit.kind}: bullet_index {edit.bullet_index} out of range")
+    return edit.bullet_index
+
+
+def _text(edit: SimulationEdit) -> str:
+    if not (edit.text or "").strip():
+        raise SimulationError(f"{edit.kind}: text is required")
+    return edit.text.strip()
+
+
+def apply_edits(canonical: CanonicalResume, edits: list[SimulationEdit]):
+    """Return the edited copy of ``canonical`` plus, per role, where each
+    bullet came from: the original bullet index, or None for new text, and
+    the bullets marked as quantified."""
+    edited = canonical.model_copy(deep=True)
+    origins = [list(range(len(role.bullets))) for role in edited.experience]
+    quantified: set[tuple[int, int]] = set()
+    for edit in edits:
+        if edit.kind not in EDIT_KINDS:
+            raise SimulationError(f"unknown edit kind {edit.kind!r}")
+        if edit.kind in BULLET_EDITS:
+            role = _role(edited, edit)
+            ri = edit.role_index
+            if edit.kind == "add_bullet":
+                role.bullets.append(_text(edit))
+                origins[ri].append(None)
+                continue
+            bi = _bullet_index(role.bullets, edit)
+            if edit.kind == "remove_bullet":
+                del role.bullets[bi]
+                del origins[ri][bi]
+                quantified = {(r, b - 1 if r == ri and b > bi else b) for r, b in quantified if (r, b) != (ri, bi)}
+            elif edit.kind == "rewrite_bullet":
+                role.bullets[bi] = _text(edit)
+                origins[ri][bi] = None
+                quantified.discard((ri, bi))
+            else:
+                origins[ri][bi] = None
+                quantified.add((ri, bi))
+        elif edit.kind == "set_summary":
+            edited.summary = (edit.text or "").strip() or None
+        elif edit.kind == "add_skill":
+            if _text(edit).lower() not in {s.lower() for s in edited.skills}:
+                edited.skills.append(_text(edit))
+        else:
+            edited.skills = [s for s in edited.skills if s.lower() != _text(edit).lower()]
+
+    _update_metadata(canonical, edited)
+    return edited, origins, quantified
+
+
+def _update_metadata(original: CanonicalResume, edited: CanonicalResume) -> None:
+    def words(c: CanonicalResume) -> int:
+        return len((c.summary or "").split()) + sum(len(b.split()) for r in c.experience for b in r.bullets) + len(c.skills)
+
+    def bullets(c: CanonicalResume) -> int:
+        return sum(len(r.bullets) for r in c.experience)
+
+    meta = edited.metadata
+    added_bullets = bullets(edited) - bullets(original)
+    lines = original.metadata.bullet_count / original.metadata.bullet_ratio if original.metadata.bullet_ratio else 0
+    meta.estimated_word_count = max(0, meta.estimated_word_count + words(edited) - words(original))
+    meta.bullet_count = max(0, meta.bullet_count + added_bullets)
+    if lines:
+        meta.bullet_ratio = round(meta.bullet_count / max(lines + added_bullets, 1), 3)
+
+
+def _impact(stored: list[ImpactSignal], edited: CanonicalResume, origins: list, quantified: set, features: BulletFeatureIndex) -> list[ImpactSignal]:
+    by_position = {(s.role_index, s.bullet_index): s for s in stored}
+    heuristic = {(s.role_index, s.bullet_index): s for s in _heuristic_impact(edited, features)}
+    result: list[ImpactSignal] = []
+    for ri, role_origins in enumerate(origins):
+        for bi, origin in enumerate(role_origins):
+            kept = by_position.get((ri, origin)) if origin is not None else None
+            if kept is not None:
+                result.append(kept.model_copy(update={"bullet_index": bi}))
+                continue
+            signal = heuristic[(ri, bi)]
+            if (ri, bi) in quantified:
+                signal = signal.model_copy(update={"impact_type": "metric", "quantification": "strong", "star_score": max(signal.star_score, 0.85)})
+            result.append(signal)
+    return result
+
+
+def _ownership(stored: list, original: CanonicalResume, edited: CanonicalResume, changed_roles: set[int], before: BulletFeatureIndex, after: BulletFeatureIndex) -> list:
+    old = _heuristic_ownership(original, before)
+    new = _heuristic_ownership(edited, after)
+    by_role = {s.role_index: s for s in stored}
+    result = []
+    for i, signal in enumerate(new):
+        kept = by_role.get(i)
+        unchanged = i not in changed_roles or (old[i].ownership_level, old[i].scope) == (signal.ownership_level, signal.scope)
+        result.append(kept if kept is not None and unchanged else signal)
+    return result
+
+
+def _skills(stored: SkillSignal | None, original: CanonicalResume, edited: CanonicalResume, before: BulletFeatureIndex, after: BulletFeatureIndex) -> SkillSignal:
+    old = _heuristic_skills(original, before)
+    new = _heuristic_skills(edited, after)
+    if stored is None:
+        return new
+    old_hard = {s.name.lower() for s in old.hard_skills}
+    new_hard = {s.name.lower(): s for s in new.hard_skills}
+    removed = old_hard - set(new_hard)
+    hard = [s for s in stored.hard_skills if s.name.lower() not in removed]
+    present = {s.name.lower() for s in hard}
+    hard.extend(s for name, s in new_hard.items() if name not in old_hard and name not in present)
+
+    old_soft = {s.name.lower() for s in old.soft_skills}
+    new_soft = {s.name.lower(): s for s in new.soft_skills}
+    removed = old_soft - set(new_soft)
+    soft = [s for s in stored.soft_skills if s.name.lower() not in removed]
+    present = {s.name.lower() for s in soft}
+    soft.extend(s for name, s in new_soft.items() if name not in old_soft and name not in present)
+    return stored.model_copy(update={"hard_skills": hard, "soft_skills": soft})
+
+
+def _red_flags(stored: RedFlagSignal | None, original: CanonicalResume, edited: CanonicalResume, before: BulletFeatureIndex, after: BulletFeatureIndex) -> RedFlagSignal:
+    new = _heuristic_red_flags(edited, after)
+    if stored is None:
+        return new
+
+    def key(flag):
+        return flag.type, flag.location
+
+    old_keys = {key(f) for f in _heuristic_red_flags(original, before).flags}
+    new_keys = {key(f) for f in new.flags}
+    flags = [f for f in stored.flags if key(f) not in old_keys - new_keys]
+    flags.extend(f for f in new.flags if key(f) not in old_keys and key(f) not in {key(x) for x in flags})
+    return RedFlagSignal(flags=flags)
+
+
+def _ats(stored: ATSSignal | None, original: CanonicalResume, edited: CanonicalResume) -> ATSSignal:
+    new = _heuristic_ats(edited)
+    if stored is None:
+        return new
+    old_checks = {c.rule: c.passed for c in _heuristic_ats(original).checks}
+    new_checks = {c.rule: c for c in new.checks}
+    checks = [
+        new_checks[c.rule] if c.rule in new_checks and old_checks.get(c.rule) != new_checks[c.rule].passed else c
+        for c in stored.checks
+    ]
+    if not checks:
+        return stored
+    rate = round(sum(1 for c in checks if c.passed) / len(checks), 2)
+    return ATSSignal(overall_pass=rate >= 0.7, pass_rate=rate, checks=checks)
+
+
+def _dimensions(score: ResumeScore) -> dict:
+    return {name: round(dim.score, 2) for name, dim in score.dimensions.items()}
+
+
+def simulate(analysis: StoredAnalysis, edits: list[SimulationEdit]) -> dict:
+    t0 = time.perf_counter()
+    original = analysis.canonical
+    edited, origins, quantified = apply_edits(original, edits)
+    changed_roles = {
+        ri for ri, role_origins in enumerate(origins) if role_origins != list(range(len(original.experience[ri].bullets)))
+    }
+    bullets_changed = bool(changed_roles)
+    summary_changed = edited.summary != original.summary
+    skills_changed = edited.skills != original.skills
+
+    signals = dict(analysis.signals)
+    recomputed: list[str] = []
+    before = BulletFeatureIndex.from_canonical(original)
+    after = BulletFeatureIndex.from_canonical(edited)
+    if bullets_changed:
+        signals["impact"] = _impact(analysis.signals.get("impact", []), edited, origins, quantified, after)
+        signals["ownership"] = _ownership(analysis.signals.get("ownership", []), original, edited, changed_roles, before, after)
+        signals["red_flags"] = _red_flags(analysis.signals.get("red_flags"), original, edited, before, after)
+        recomputed.extend(["impact", "ownership", "red_flags"])
+    if bullets_changed or skills_changed:
+        signals["skills"] = _skills(analysis.signals.get("skills"), original, edited, before, after)
+        recomputed.append("skills")
+    if bullets_changed or skills_changed or summary_changed:
+        signals["ats"] = _ats(analysis.signals.get("ats"), original, edited)
+        recomputed.append("ats")
+
+    alignment = analysis.alignment
+    if recomputed:
+        fit_delta = (
+            _heuristic_alignment(analysis.target_role, edited, signals, analysis.requirements).fit_score
+            - _heuristic_alignment(analysis.target_role, original, analysis.signals, analysis.requirements).fit_score
+        )
+        alignment = alignment.model_copy(update={"fit_score": max(0.0, min(100.0, alignment.fit_score + fit_delta))})
+
+    score = compute_score(edited, signals, alignment, analysis.target_role, requirements=analysis.requirements)
+    recommendations = [r.model_copy() for r in analysis.recommendations] or template_recommendations(
+        score, signals, alignment, edited, analysis.target_role
+    )
+    recommendations = rank_recommendations(recommendations, score)
+
+    baseline = _dimensions(analysis.score)
+    simulated = _dimensions(score)
+    return {
+        "analysis_id": analysis.analysis_id,
+        "baseline": {"overall": analysis.score.overall, "tier": analysis.score.tier, "dimensions": baseline},
+        "simulated": {"overall": score.overall, "tier": score.tier, "dimensions": simulated},
+        "delta": {
+            "overall": round(score.overall - analysis.score.overall, 2),
+            "dimensions": {name: round(simulated[name] - baseline.get(name, 0.0), 2) for name in simulated},
+        },
+        "recommendations": [r.model_dump() for r in recommendations],
+        "recomputed_signals": recomputed,
+        "duration_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
@@ -0,0 +1,326 @@
+"""
+Skills taxonomy — canonical skills and aliases compiled into a token automaton.
+
+``data/skills_taxonomy.json`` lists canonical skills with their aliases
+("k8s" -> Kubernetes, "Postgres" -> PostgreSQL). ``build`` compiles it into
+an Aho-Corasick automaton over word tokens and writes it as flat arrays in
+a binary file. Workers mmap that file, so they share one read-only copy and
+loading costs nothing beyond opening it. A scan tokenizes the text once and
+walks the automaton a token at a time, matching every alias and multi-word
+phrase in a single pass.
+
+Aliases that are also ordinary words ("Go to market", "Excel at ...") are
+listed as ``context_aliases``. In running text they only count next to
+another skill or one of the entry's ``context_before`` / ``context_after``
+cue words; text that is itself a skill list (``listed=True``) needs no cue.
+
+    python -m app.v2.taxonomy build [--source skills_taxonomy.json] [--out skills_taxonomy.bin]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
+
+from app.ahocorasick import Automaton
+from app.config import SkillsConfig, config
+
+MAGIC = b"SKTX"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sIIIIIII")
+TOKEN_RE = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#]*(?:\.[A-Za-z0-9+#]+)*")
+# Joins the original-case tokens of a case-sensitive alias.
+EXACT_SEP = "\x1f"
+# Separates the before and after cue words of a context alias.
+CUE_SEP = "|"
+
+
+class SkillMatch(NamedTuple):
+    name: str
+    category: str
+    start: int
+    end: int
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _pattern(alias: str) -> tuple[str, ...]:
+    return tuple(TOKEN_RE.findall(alias))
+
+
+def _pad(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+def compile_taxonomy(skills: Iterable[dict]) -> bytes:
+    """Compile taxonomy entries (``name``, ``category``, ``aliases``,
+    ``case_sensitive``, ``case_sensitive_aliases``, ``context_aliases``,
+    ``context_before``, ``context_after``) into the binary format."""
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    automaton = Automaton()
+    skill_name: list[int] = []
+    skill_category: list[int] = []
+    for skill_id, entry in enumerate(skills):
+        skill_name.append(intern(entry["name"]))
+        skill_category.append(intern(entry.get("category", "")))
+        exact_aliases = list(entry.get("case_sensitive_aliases", []))
+        loose_aliases = list(entry.get("aliases", []))
+        (exact_aliases if entry.get("case_sensitive") else loose_aliases).insert(0, entry["name"])
+        context_aliases = set(entry.get("context_aliases", []))
+        cues = " ".join(t.lower() for t in entry.get("context_before", [])) + CUE_SEP + " ".join(t.lower() for t in entry.get("context_after", []))
+        for alias in loose_aliases:
+            tokens = _pattern(alias)
+            context = intern(cues) if alias in context_aliases else -1
+            automaton.add(tuple(t.lower() for t in tokens), (skill_id, -1, context))
+        for alias in exact_aliases:
+            tokens = _pattern(alias)
+            context = intern(cues) if alias in context_aliases else -1
+            automaton.add(tuple(t.lower() for t in tokens), (skill_id, intern(EXACT_SEP.join(tokens)), context))
+
+    goto, fail, out, out_link = automaton.tables()
+    vocab = sorted({token for edges in goto for token in edges})
+    token_id = {token: i for i, token in enumerate(vocab)}
+    hashed = sorted((_token_hash(token), token_id[token]) for token in vocab)
+    if len({h for h, _ in hashed}) != len(hashed):
+        raise ValueError("token hash collision in taxonomy vocabulary")
+
+    edge_start, edge_token, edge_target = [0], [], []
+    for edges in goto:
+        for tid, target in sorted((token_id[token], target) for token, target in edges.items()):
+            edge_token.append(tid)
+            edge_target.append(target)
+        edge_start.append(len(edge_token))
+
+    out_start, out_skill, out_len, out_exact, out_context = [0], [], [], [], []
+    for outputs in out:
+        # Dedupe identical aliases listed twice for one skill.
+        for length, (skill_id, exact, context) in sorted(set(outputs)):
+            out_skill.append(skill_id)
+            out_len.append(length)
+            out_exact.append(exact)
+            out_context.append(context)
+        out_start.append(len(out_skill))
+
+    blob = bytearray()
+    string_offsets = [0]
+    for value in strings:
+        blob.extend(value.encode("utf-8"))
+        string_offsets.append(len(blob))
+
+    buf = bytearray(
+        HEADER.pack(MAGIC, FORMAT_VERSION, len(vocab), len(goto), len(edge_token), len(out_skill), len(skill_name), len(strings))
+    )
+    sections = [
+        ("Q", [h for h, _ in hashed]),
+        ("I", [tid for _, tid in hashed]),
+        ("I", edge_start),
+        ("I", edge_token),
+        ("I", edge_target),
+        ("I", fail),
+        ("i", out_link),
+        ("I", out_start),
+        ("I", out_skill),
+        ("I", out_len),
+        ("i", out_exact),
+        ("i", out_context),
+        ("I", skill_name),
+        ("I", skill_category),
+        ("I", string_offsets),
+    ]
+    for code, values in sections:
+        _pad(buf)
+        buf.extend(struct.pack(f"<{len(values)}{code}", *values))
+    _pad(buf)
+    buf.extend(blob)
+    return bytes(buf)
+
+
+class SkillTaxonomy:
+    """Read-only view over a compiled taxonomy buffer (bytes or mmap)."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, n_vocab, n_states, n_edges, n_outputs, n_skills, n_strings = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a compiled skills taxonomy (or built by another version)")
+        offset = HEADER.size
+
+        def take(code: str, count: int) -> memoryview:
+            nonlocal offset
+            offset += -offset % 8
+            size = struct.calcsize(code) * count
+            section = view[offset : offset + size].cast(code)
+            offset += size
+            return section
+
+        self._vocab_hash = take("Q", n_vocab)
+        self._vocab_id = take("I", n_vocab)
+        self._edge_start = take("I", n_states + 1)
+        self._edge_token = take("I", n_edges)
+        self._edge_target = take("I", n_edges)
+        self._fail = take("I", n_states)
+        self._out_link = take("i", n_states)
+        self._out_start = take("I", n_states + 1)
+        self._out_skill = take("I", n_outputs)
+        self._out_len = take("I", n_outputs)
+        self._out_exact = take("i", n_outputs)
+        self._out_context = take("i", n_outputs)
+        self._skill_name = take("I", n_skills)
+        self._skill_category = take("I", n_skills)
+        self._string_offsets = take("I", n_strings + 1)
+        offset += -offset % 8
+        self._strings = view[offset:]
+        self.skill_count = n_skills
+        self.state_count = n_states
+        self._cues: dict[int, tuple[frozenset, frozenset]] = {}
+
+    def _string(self, i: int) -> str:
+        return bytes(self._strings[self._string_offsets[i] : self._string_offsets[i + 1]]).decode("utf-8")
+
+    def _cue_words(self, context: int) -> tuple[frozenset, frozenset]:
+        if context not in self._cues:
+            before, after = self._string(context).split(CUE_SEP)
+            self._cues[context] = frozenset(before.split()), frozenset(after.split())
+        return self._cues[context]
+
+    def skill(self, skill_id: int) -> tuple[str, str]:
+        return self._string(self._skill_name[skill_id]), self._string(self._skill_category[skill_id])
+
+    def _token_id(self, token: str) -> int:
+        h = _token_hash(token)
+        i = bisect_left(self._vocab_hash, h)
+        if i < len(self._vocab_hash) and self._vocab_hash[i] == h:
+            return self._vocab_id[i]
+        return -1
+
+    def _next(self, state: int, tid: int) -> int:
+        lo, hi = self._edge_start[state], self._edge_start[state + 1]
+        i = bisect_left(self._edge_token, tid, lo, hi)
+        if i < hi and self._edge_token[i] == tid:
+            return self._edge_target[i]
+        return -1
+
+    def scan(self, tokens: list[str]) -> Iterator[tuple[int, int, int, int]]:
+        """Yield ``(first_token, end_token, skill_id, context)`` for every alias
+        occurrence; ``context`` is -1 unless the alias needs a context cue."""
+        fail, out_start, out_link = self._fail, self._out_start, self._out_link
+        state = 0
+        for i, token in enumerate(tokens):
+            tid = self._token_id(token.lower())
+            if tid < 0:
+                # No alias contains this token, so every partial match ends here.
+                state = 0
+                continue
+            nxt = self._next(state, tid)
+            while nxt < 0 and state:
+                state = fail[state]
+                nxt = self._next(state, tid)
+            state = max(nxt, 0)
+            hit = state if out_start[state] < out_start[state + 1] else out_link[state]
+            while hit > 0:
+                for o in range(out_start[hit], out_start[hit + 1]):
+                    start = i + 1 - self._out_len[o]
+                    exact = self._out_exact[o]
+                    if exact >= 0 and EXACT_SEP.join(tokens[start : i + 1]) != self._string(exact):
+                        continue
+                    yield start, i + 1, self._out_skill[o], self._out_context[o]
+                hit = out_link[hit]
+
+    def _has_cue(self, tokens: list[str], start: int, end: int, context: int, starts: set, ends: set) -> bool:
+        if start in ends or end in starts:
+            return True
+        before, after = self._cue_words(context)
+        return (start > 0 and tokens[start - 1].lower() in before) or (end < len(tokens) and tokens[end].lower() in after)
+
+    def find(self, text: str, listed: bool = False) -> list[SkillMatch]:
+        """Skills mentioned in ``text``, longest match first where aliases overlap.
+
+        ``listed`` marks text that is itself a skill list (a skills-section
+        entry, a filter), where context aliases count without a cue.
+        """
+        spans = [(m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+        if not spans:
+            return []
+        tokens = [text[a:b] for a, b in spans]
+        hits = sorted(self.scan(tokens), key=lambda h: (h[0], h[0] - h[1]))
+        kept: list[tuple[int, int, int, int]] = []
+        covered_to = 0
+        for hit in hits:
+            if hit[0] < covered_to:
+                continue
+            covered_to = hit[1]
+            kept.append(hit)
+        starts, ends = {h[0] for h in kept}, {h[1] for h in kept}
+        matches: list[SkillMatch] = []
+        for start, end, skill_id, context in kept:
+            if context >= 0 and not listed and not self._has_cue(tokens, start, end, context, starts, ends):
+                continue
+            name, category = self.skill(skill_id)
+            matches.append(SkillMatch(name, category, spans[start][0], spans[end - 1][1]))
+        return matches
+
+    def skill_names(self, text: str, listed: bool = False) -> list[str]:
+        """Distinct canonical skill names in ``text``, in order of first mention."""
+        seen: dict[str, None] = {}
+        for match in self.find(text, listed):
+            seen.setdefault(match.name, None)
+        return list(seen)
+
+
+def build(source: str, out: str) -> int:
+    with open(source, encoding="utf-8") as fh:
+        skills = json.load(fh)["skills"]
+    data = compile_taxonomy(skills)
+    tmp = f"{out}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, out)
+    return len(skills)
+
+
+def load_taxonomy(path: str) -> SkillTaxonomy:
+    with open(path, "rb") as fh:
+        return SkillTaxonomy(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+@lru_cache(maxsize=1)
+def get_taxonomy(settings: SkillsConfig = config.skills) -> SkillTaxonomy:
+    """The compiled taxonomy, falling back to compiling the JSON in memory
+    when the binary is missing or older than its source."""
+    source, path = settings.taxonomy_source, settings.taxonomy_path
+    if os.path.exists(path) and (not os.path.exists(source) or os.path.getmtime(path) >= os.path.getmtime(source)):
+        return load_taxonomy(path)
+    with open(source, encoding="utf-8") as fh:
+        return SkillTaxonomy(compile_taxonomy(json.load(fh)["skills"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile the skills taxonomy")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="compile the JSON taxonomy into the mmap-able binary")
+    build_cmd.add_argument("--source", default=config.skills.taxonomy_source)
+    build_cmd.add_argument("--out", default=config.skills.taxonomy_path)
+    args = parser.parse_args()
+    count = build(args.source, args.out)
+    print(f"compiled {count} skills -> {args.out} ({os.path.getsize(args.out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Employment timeline — every role parsed once into month intervals.
+
+Roles carry ``YYYY-MM`` strings from the canonicalizer (or the LLM). The
+timeline turns each into an inclusive ``[start, end]`` month interval and
+answers the questions the red-flag, ATS, scoring and composer code used to
+work out separately: overlaps between roles, gaps in employment, tenure,
+total experience and how many roles ran at once. Overlaps and peak
+concurrency come from a sweep over interval endpoints, so roles that are
+not adjacent by start date are compared too.
+"""
+
+import heapq
+import re
+from datetime import date
+from typing import NamedTuple
+
+from .types import CanonicalResume
+
+MONTHS = {
+    "jan": "01",
+    "feb": "02",
+    "mar": "03",
+    "apr": "04",
+    "may": "05",
+    "jun": "06",
+    "jul": "07",
+    "aug": "08",
+    "sep": "09",
+    "oct": "10",
+    "nov": "11",
+    "dec": "12",
+}
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+YEAR_MONTH_RE = re.compile(r"^(\d{4})-(\d{2})")
+
+
+def normalize_date(raw: str | None) -> str | None:
+    """``"Jun 2021"`` -> ``"2021-06"``; a bare year becomes January."""
+    if not raw:
+        return None
+    value = raw.strip().lower()
+    if value in {"present", "current"}:
+        return None
+    year = YEAR_RE.search(value)
+    if not year:
+        return None
+    month = "01"
+    for m, n in MONTHS.items():
+        if m in value:
+            month = n
+            break
+    return f"{year.group(0)}-{month}"
+
+
+def has_month(raw: str) -> bool:
+    value = raw.lower()
+    return any(m in value for m in MONTHS)
+
+
+def month_index(ym: str | None) -> int | None:
+    """Months since year 0 for a ``YYYY-MM`` string, or None if unparseable."""
+    match = YEAR_MONTH_RE.match(ym or "")
+    if not match:
+        return None
+    month = int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return int(match.group(1)) * 12 + month - 1
+
+
+def format_month(ym: str) -> str:
+    """``"2021-06"`` -> ``"Jun 2021"``; anything else is returned unchanged."""
+    index = month_index(ym)
+    if index is None or len(ym) != 7:
+        return ym
+    return f"{MONTH_NAMES[index % 12]} {index // 12}"
+
+
+class RoleInterval(NamedTuple):
+    role_index: int
+    start: int
+    # Inclusive; the current month for ongoing roles.
+    end: int
+    ongoing: bool
+    ambiguous: bool
+
+    @property
+    def months(self) -> int:
+        return self.end - self.start + 1
+
+
+class Overlap(NamedTuple):
+    first: int
+    second: int
+    months: int
+    ambiguous: bool
+
+
+class Gap(NamedTuple):
+    # Role that ends the covered stretch and the role that resumes it.
+    after_role: int
+    before_role: int
+    months: int
+
+
+class Timeline:
+    """Month intervals for the dated roles of one resume, sorted by start."""
+
+    def __init__(self, intervals: list[RoleInterval], undated: list[int]):
+        self.intervals = sorted(intervals, key=lambda iv: (iv.start, iv.end, iv.role_index))
+        self.undated = undated
+        self._by_role = {iv.role_index: iv for iv in self.intervals}
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def interval(self, role_index: int) -> RoleInterval | None:
+        return self._by_role.get(role_index)
+
+    def tenure_months(self, role_index: int) -> int | None:
+        iv = self._by_role.get(role_index)
+        return iv.months if iv else None
+
+    def overlaps(self, min_months: int = 1) -> list[Overlap]:
+        """Every pair of roles sharing at least ``min_months`` months."""
+        found: list[Overlap] = []
+        active: list[tuple[int, int]] = []  # (end, position in self.intervals)
+        for pos, iv in enumerate(self.intervals):
+            while active and active[0][0] < iv.start:
+                heapq.heappop(active)
+            for end, other_pos in active:
+                other = self.intervals[other_pos]
+                months = min(end, iv.end) - iv.start + 1
+                if months >= min_months:
+                    found.append(Overlap(other.role_index, iv.role_index, months, other.ambiguous or iv.ambiguous))
+            heapq.heappush(active, (iv.end, pos))
+        return found
+
+    def gaps(self, min_months: int = 1) -> list[Gap]:
+        """Stretches of at least ``min_months`` months covered by no role."""
+        found: list[Gap] = []
+        covered: RoleInterval | None = None
+        for iv in self.intervals:
+            if covered is not None:
+                months = iv.start - covered.end - 1
+                if months >= min_months:
+                    found.append(Gap(covered.role_index, iv.role_index, months))
+            if covered is None or iv.end > covered.end:
+                covered = iv
+        return found
+
+    @property
+    def total_months(self) -> int:
+        """Months employed, counting concurrent roles once."""
+        total = 0
+        covered_to: int | None = None
+        for iv in self.intervals:
+            if covered_to is None or iv.start > covered_to:
+                total += iv.months
+                covered_to = iv.end
+            elif iv.end > covered_to:
+                total += iv.end - covered_to
+                covered_to = iv.end
+        return total
+
+    @property
+    def max_concurrent(self) -> int:
+        ends: list[int] = []
+        peak = 0
+        for iv in self.intervals:
+            while ends and ends[0] < iv.start:
+                heapq.heappop(ends)
+            heapq.heappush(ends, iv.end)
+            peak = max(peak, len(ends))
+        return peak
+
+
+def build_timeline(canonical: CanonicalResume, today: date | None = None) -> Timeline:
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    intervals: list[RoleInterval] = []
+    undated: list[int] = []
+    for i, role in enumerate(canonical.experience):
+        start = month_index(role.start_date)
+        if start is None:
+            undated.append(i)
+            continue
+        end = month_index(role.end_date)
+        ongoing = role.is_current or end is None
+        if ongoing:
+            end = now
+        elif role.date_ambiguous and end % 12 == 0:
+            # A bare year normalizes to January; read "2015 - 2017" as through December.
+            end += 11
+        intervals.append(RoleInterval(i, start, max(end, start), ongoing, role.date_ambiguous))
+    return Timeline(intervals, undated)
+
+
+def resume_timeline(canonical: CanonicalResume, timeline: Timeline | None = None) -> Timeline:
+    return timeline if timeline is not None else build_timeline(canonical)
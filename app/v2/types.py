@@ -1,6 +1,14 @@
 from pydantic import BaseModel, Field
 
 
+class CanonicalContact(BaseModel):
+    name: str | None = None
+    email: str | None = None
+    phone: str | None = None
+    location: str | None = None
+    links: list[str] = Field(default_factory=list)
+
+
 class CanonicalExperience(BaseModel):
     company: str = ""
     title: str = ""
@@ -43,7 +51,14 @@ class ResumeMetadata(BaseModel):
     needs_ocr: bool = False
 
 
+class ParseQuality(BaseModel):
+    score: float = 0.0
+    components: dict[str, float] = Field(default_factory=dict)
+    weak_sections: list[str] = Field(default_factory=list)
+
+
 class CanonicalResume(BaseModel):
+    contact: CanonicalContact = Field(default_factory=CanonicalContact)
     summary: str | None = None
     experience: list[CanonicalExperience] = Field(default_factory=list)
     education: list[CanonicalEducation] = Field(default_factory=list)
@@ -93,6 +108,17 @@ class SkillSignal(BaseModel):
     certifications: list[str] = Field(default_factory=list)
 
 
+class JobRequirements(BaseModel):
+    title: str | None = None
+    required_skills: list[str] = Field(default_factory=list)
+    optional_skills: list[str] = Field(default_factory=list)
+    seniority: str | None = None
+    domain: str | None = None
+    min_years: int | None = None
+    content_hash: str = ""
+    source: str = "heuristic"
+
+
 class ATSCheck(BaseModel):
     rule: str
     passed: bool
@@ -130,6 +156,22 @@ class RoleAlignment(BaseModel):
     market_notes: str | None = None
 
 
+class ProfileCompetency(BaseModel):
+    text: str
+    kind: str = "competency"
+    weight: float = 1.0
+
+
+class RoleAlignmentProfile(BaseModel):
+    role_key: str
+    title: str
+    seniority: str | None = None
+    competencies: list[ProfileCompetency] = Field(default_factory=list)
+    signal_weights: dict[str, float] = Field(default_factory=dict)
+    market_notes: str | None = None
+    source: str = "heuristic"
+
+
 class DimensionScore(BaseModel):
     score: float
     weight: float
@@ -173,19 +215,23 @@ class PipelineTelemetry(BaseModel):
     total_duration_ms: int = 0
     step_durations: dict[str, int] = Field(default_factory=dict)
     models_used: dict[str, str] = Field(default_factory=dict)
+    stage_metrics: dict[str, dict] = Field(default_factory=dict)
 
 
 class ResumeDoctorResult(BaseModel):
     version: str = "2.0"
+    analysis_id: str | None = None
     resume_version_id: str | None = None
     user_id: str | None = None
     target_role: str
+    job_requirements: JobRequirements | None = None
     canonical: CanonicalResume
     signals: dict
     alignment: RoleAlignment | None = None
     score: ResumeScore
     recommendations: list[Recommendation] = Field(default_factory=list)
     interview_prep: list[InterviewQuestion] = Field(default_factory=list)
+    v1: dict | None = None
     telemetry: PipelineTelemetry = Field(default_factory=PipelineTelemetry)
 
 
@@ -194,8 +240,55 @@ class V2AnalyzeRequest(BaseModel):
     file_name: str | None = Field(None, alias="fileName")
     mime_type: str | None = Field(None, alias="mimeType")
     target_role: str = Field(..., alias="targetRole")
+    job_description: str | None = Field(None, alias="jobDescription")
     intake_data: dict | None = Field(None, alias="intakeData")
+    user_id: str | None = Field(None, alias="userId")
+    resume_version_id: str | None = Field(None, alias="resumeVersionId")
     models: dict[str, str] | None = None
-    options: dict[str, bool] | None = None
+    options: dict[str, bool | str] | None = None
+
+    model_config = {"populate_by_name": True}
+
+
+class SimulationEdit(BaseModel):
+    """A hypothetical change to an analyzed resume.
+
+    kind: rewrite_bullet | quantify_bullet | add_bullet | remove_bullet |
+    set_summary | add_skill | remove_skill
+    """
+
+    kind: str
+    role_index: int | None = Field(None, alias="roleIndex")
+    bullet_index: int | None = Field(None, alias="bulletIndex")
+    text: str | None = None
+
+    model_config = {"populate_by_name": True}
+
+
+class V2SimulateRequest(BaseModel):
+    analysis_id: str = Field(..., alias="analysisId")
+    edits: list[SimulationEdit] = Field(default_factory=list)
+
+    model_config = {"populate_by_name": True}
+
+
+class V2SearchRequest(BaseModel):
+    """Recruiter search over analyzed resumes.
+
+    ``job_description`` is reduced to its cached requirement profile: its
+    required and optional skills and title join the query terms.
+    """
+
+    query: str = ""
+    job_description: str | None = Field(None, alias="jobDescription")
+    skills: list[str] = Field(default_factory=list)
+    must_skills: list[str] = Field(default_factory=list, alias="mustSkills")
+    titles: list[str] = Field(default_factory=list)
+    companies: list[str] = Field(default_factory=list)
+    min_tenure_months: int | None = Field(None, alias="minTenureMonths")
+    max_tenure_months: int | None = Field(None, alias="maxTenureMonths")
+    tiers: list[str] | None = None
+    min_score: float | None = Field(None, alias="minScore")
+    k: int = Field(50, ge=1, le=1000)
 
     model_config = {"populate_by_name": True}
@@ -0,0 +1,112 @@
+"""
+v1 ``fields`` and ``scores`` derived from a v2 canonical resume.
+
+Lets a single /v2/analyze request with ``include_v1_fields`` answer what
+/parse used to, reusing the ingest and canonicalization already done
+instead of running extract_fields_llm on the same text.
+"""
+
+import re
+
+from app.pipeline import (
+    _bucket_experience,
+    _guess_role,
+    _map_function_area,
+    _score_ats,
+    _score_match,
+    _score_readability,
+)
+
+from .taxonomy import get_taxonomy
+from .timeline import Timeline, resume_timeline
+from .types import CanonicalResume, JobRequirements
+
+YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*years", re.I)
+
+
+def _experience_years(canonical: CanonicalResume, text: str, timeline: Timeline | None = None) -> int | None:
+    timeline = resume_timeline(canonical, timeline)
+    if timeline.intervals:
+        return timeline.total_months // 12
+
+    match = YEARS_RE.search(canonical.summary or "") or YEARS_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _current_role(canonical: CanonicalResume) -> str | None:
+    roles = [r for r in canonical.experience if r.title]
+    if not roles:
+        return None
+    current = [r for r in roles if r.is_current]
+    if current:
+        return current[0].title
+    return max(roles, key=lambda r: r.start_date or "").title
+
+
+def v1_fields_from_canonical(canonical: CanonicalResume, text: str, timeline: Timeline | None = None) -> dict:
+    contact = canonical.contact
+    fields: dict = {}
+    if contact.name:
+        fields["name"] = {"value": contact.name, "confidence": 0.8}
+    if contact.email:
+        fields["email"] = {"value": contact.email, "confidence": 0.9}
+    if contact.phone:
+        fields["phone"] = {"value": contact.phone, "confidence": 0.8}
+    if contact.location:
+        fields["location"] = {"value": contact.location, "confidence": 0.7}
+    if contact.links:
+        fields["links"] = {"value": contact.links[:5], "confidence": 0.6}
+        linkedin = next((url for url in contact.links if "linkedin.com" in url), None)
+        github = next((url for url in contact.links if "github.com" in url), None)
+        if linkedin:
+            fields["linkedinUrl"] = {"value": linkedin, "confidence": 0.85}
+        if github:
+            fields["githubUrl"] = {"value": github, "confidence": 0.85}
+
+    role = _current_role(canonical)
+    role_confidence = 0.8
+    if not role:
+        role = _guess_role([ln.strip() for ln in text.splitlines() if ln.strip()])
+        role_confidence = 0.65
+    if role:
+        fields["role"] = {"value": role, "confidence": role_confidence}
+        function_area = _map_function_area(role)
+        if function_area:
+            fields["functionArea"] = {"value": function_area, "confidence": 0.6}
+
+    years = _experience_years(canonical, text, timeline)
+    if years is not None:
+        fields["experience"] = {"value": _bucket_experience(years), "confidence": 0.7}
+    return fields
+
+
+def _requirements_match(text: str, requirements: JobRequirements) -> int:
+    found = {name.lower() for name in get_taxonomy().skill_names(text)}
+    required = [s.lower() for s in requirements.required_skills]
+    return round(100 * sum(1 for s in required if s in found) / len(required))
+
+
+def build_v1_result(
+    canonical: CanonicalResume,
+    text: str,
+    antivirus: dict,
+    target_role: str | None,
+    timeline: Timeline | None = None,
+    requirements: JobRequirements | None = None,
+) -> dict:
+    """Return the v1 ``text``/``scores``/``fields`` block for a combined request."""
+    fields = v1_fields_from_canonical(canonical, text, timeline)
+    if not text or len(text) < 200:
+        fields["needsOcr"] = {"value": True, "confidence": 0.9, "ocr_status": "queued"}
+    else:
+        fields["needsOcr"] = {"value": False, "confidence": 0.9, "ocr_status": "not_required"}
+    fields["antivirus"] = antivirus
+    return {
+        "text": text or None,
+        "scores": {
+            "readability": _score_readability(text),
+            "ats": _score_ats(text),
+            "match": _requirements_match(text, requirements) if requirements and requirements.required_skills else _score_match(text, target_role),
+        },
+        "fields": fields,
+    }
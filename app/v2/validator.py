@@ -3,6 +3,7 @@ Validation Layer — Post-rewrite quality checks.
 Deterministic rules, no LLM.
 """
 
+from .features import BulletFeatureIndex, feature_index
 from .types import CanonicalResume
 
 
@@ -22,11 +23,6 @@ class ValidationIssue:
         }
 
 
-WEAK_PHRASES = [
-    "responsible for", "worked on", "helped with", "involved in",
-    "assisted with", "participated in", "was tasked with",
-]
-
 FILLER_VERBS = ["managed", "handled", "oversaw"]
 
 
@@ -34,9 +30,15 @@ def validate_rewrite(
     canonical: CanonicalResume,
     enhanced_summary: str,
     enhanced_bullets: list[list[str]],
+    features: BulletFeatureIndex | None = None,
 ) -> dict:
-    """Run post-rewrite validation checks."""
+    """Run post-rewrite validation checks.
+
+    ``features`` is the index of the original bullets, if already built.
+    """
     issues: list[ValidationIssue] = []
+    original = feature_index(canonical, features)
+    enhanced = BulletFeatureIndex(enhanced_bullets)
 
     # 1. Summary length check
     if enhanced_summary:
@@ -59,25 +61,24 @@ def validate_rewrite(
     weak_count = 0
     long_count = 0
 
-    for i, bullets in enumerate(enhanced_bullets):
-        for j, bullet in enumerate(bullets):
+    for i in range(enhanced.role_count):
+        for j, b in enumerate(enhanced.role_range(i)):
+            bullet = enhanced.texts[b]
             total_bullets += 1
             loc = f"experience[{i}].bullets[{j}]"
 
             # Weak phrase check
-            lower = bullet.lower()
-            for phrase in WEAK_PHRASES:
-                if phrase in lower:
-                    weak_count += 1
-                    issues.append(ValidationIssue(
-                        "weak_phrase", "medium",
-                        f'Contains weak phrasing: "{phrase}"',
-                        loc
-                    ))
-                    break
+            weak = enhanced.hits(enhanced.masks[b], "weak_phrase")
+            if weak:
+                weak_count += 1
+                issues.append(ValidationIssue(
+                    "weak_phrase", "medium",
+                    f'Contains weak phrasing: "{weak[0]}"',
+                    loc
+                ))
 
             # Length check
-            words = len(bullet.split())
+            words = enhanced.word_counts[b]
             if words > 30:
                 long_count += 1
                 issues.append(ValidationIssue(
@@ -111,20 +112,12 @@ def validate_rewrite(
 
     # 4. No hallucinated metrics check (heuristic)
     # Can't fully validate without original, but flag suspicious patterns
-    for i, (orig_bullets, new_bullets) in enumerate(
-        zip(
-            [exp.bullets for exp in canonical.experience],
-            enhanced_bullets,
-        )
-    ):
-        for j, (orig, new) in enumerate(zip(orig_bullets, new_bullets)):
+    for i in range(min(original.role_count, enhanced.role_count)):
+        for j, (orig, new) in enumerate(zip(original.role_range(i), enhanced.role_range(i))):
             # Count numbers in original vs new
-            import re
-            orig_nums = set(re.findall(r'\d+[%x]?', orig))
-            new_nums = set(re.findall(r'\d+[%x]?', new))
-            added_nums = new_nums - orig_nums
+            added_nums = enhanced.numerals[new] - original.numerals[orig]
             # Allow ~ prefixed estimates
-            if added_nums and '~' not in new:
+            if added_nums and '~' not in enhanced.texts[new]:
                 issues.append(ValidationIssue(
                     "possible_hallucinated_metric", "medium",
                     f"New metrics added without ~ estimate marker: {added_nums}",
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Corpus rescoring: compute_score per analysis vs. score_batch.
+
+Builds a corpus by repeating the golden fixture analyses, then times
+rescoring it with compute_score (pydantic objects, one resume at a time)
+and with score_batch over packed summaries.
+
+    python benchmarks/bench_batch_scoring.py
+"""
+import asyncio
+import base64
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.batch_scoring import pack, score_batch, summarize  # noqa: E402
+from app.v2.pipeline import run_v2_pipeline  # noqa: E402
+from app.v2.scoring import compute_score  # noqa: E402
+from app.v2.timeline import build_timeline  # noqa: E402
+from app.v2.types import (  # noqa: E402
+    ATSSignal,
+    CanonicalResume,
+    ImpactSignal,
+    OwnershipSignal,
+    RedFlagSignal,
+    RoleAlignment,
+    SkillSignal,
+)
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+TARGET_ROLE = "Senior Backend Engineer"
+
+
+def _analyses() -> list[tuple]:
+    analyses = []
+    for path in sorted(FIXTURE_DIR.glob("*.txt")):
+        payload = {"fileBase64": base64.b64encode(path.read_bytes()).decode(), "fileName": path.name, "targetRole": TARGET_ROLE}
+        result = asyncio.run(run_v2_pipeline(payload))
+        raw = result["signals"]
+        canonical = CanonicalResume.model_validate(result["canonical"])
+        signals = {
+            "impact": [ImpactSignal.model_validate(x) for x in raw["impact"]],
+            "ownership": [OwnershipSignal.model_validate(x) for x in raw["ownership"]],
+            "skills": SkillSignal.model_validate(raw["skills"]),
+            "ats": ATSSignal.model_validate(raw["ats"]),
+            "red_flags": RedFlagSignal.model_validate(raw["red_flags"]),
+        }
+        analyses.append((canonical, signals, RoleAlignment.model_validate(result["alignment"]), build_timeline(canonical)))
+    return analyses
+
+
+def main() -> None:
+    analyses = _analyses()
+    print(f"{'analyses':>9} | {'compute_score s':>15} | {'score_batch s':>13} | {'speedup':>8}")
+    print("-" * 56)
+    for size in (10_000, 100_000):
+        corpus = [analyses[i % len(analyses)] for i in range(size)]
+        t = time.perf_counter()
+        for canonical, signals, alignment, timeline in corpus:
+            compute_score(canonical, signals, alignment, TARGET_ROLE, timeline)
+        one_by_one = time.perf_counter() - t
+
+        batch = pack([summarize(c, s, a, TARGET_ROLE, tl) for c, s, a, tl in analyses] * (size // len(analyses) + 1))
+        batch = {name: column[:size] for name, column in batch.items()}
+        t = time.perf_counter()
+        score_batch(batch)
+        batched = time.perf_counter() - t
+        print(f"{size:>9} | {one_by_one:>15.3f} | {batched:>13.3f} | {one_by_one / batched:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
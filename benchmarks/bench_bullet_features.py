@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Heuristic-mode extractor latency on resumes with hundreds of bullets.
+
+Runs the impact, ownership, skills and red-flag heuristics plus the rewrite
+validator, either each building its own bullet feature index (as if every
+consumer walked the bullets independently) or sharing one index per request.
+
+    python benchmarks/bench_bullet_features.py
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.canonicalizer import _heuristic_canonicalize  # noqa: E402
+from app.v2.extractors.impact import _heuristic_impact  # noqa: E402
+from app.v2.extractors.ownership import _heuristic_ownership  # noqa: E402
+from app.v2.extractors.red_flags import _heuristic_red_flags  # noqa: E402
+from app.v2.extractors.skills import _heuristic_skills  # noqa: E402
+from app.v2.features import BulletFeatureIndex  # noqa: E402
+from app.v2.types import CanonicalResume  # noqa: E402
+from app.v2.validator import validate_rewrite  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+
+
+def _resume_with(bullet_target: int) -> CanonicalResume:
+    pool = [_heuristic_canonicalize(p.read_text()) for p in sorted(FIXTURE_DIR.glob("*.txt"))]
+    roles = [role for c in pool for role in c.experience if role.bullets]
+    resume = pool[0].model_copy(deep=True)
+    resume.experience = []
+    count = 0
+    while count < bullet_target:
+        role = roles[len(resume.experience) % len(roles)].model_copy(deep=True)
+        resume.experience.append(role)
+        count += len(role.bullets)
+    return resume
+
+
+def _run(canonical: CanonicalResume, shared: bool) -> None:
+    index = BulletFeatureIndex.from_canonical(canonical) if shared else None
+    _heuristic_impact(canonical, index)
+    _heuristic_ownership(canonical, index)
+    _heuristic_skills(canonical, index)
+    _heuristic_red_flags(canonical, index)
+    validate_rewrite(canonical, "", [r.bullets for r in canonical.experience], features=index)
+
+
+def _best_ms(fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def main() -> None:
+    print(f"{'bullets':>8} | {'per-consumer ms':>15} | {'shared index ms':>15} | {'speedup':>7}")
+    print("-" * 56)
+    for target in (100, 300, 1_000):
+        canonical = _resume_with(target)
+        bullets = sum(len(r.bullets) for r in canonical.experience)
+        separate = _best_ms(lambda: _run(canonical, shared=False))
+        shared = _best_ms(lambda: _run(canonical, shared=True))
+        print(f"{bullets:>8} | {separate:>15.2f} | {shared:>15.2f} | {separate / shared:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
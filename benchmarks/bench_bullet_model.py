@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Local bullet classifier throughput.
+
+Trains a throwaway model on heuristic labels for the golden fixture bullets
+(standing in for LLM labels) and times prediction, per bullet and for a
+resume-sized batch.
+
+    python benchmarks/bench_bullet_model.py
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.bullet_model import train  # noqa: E402
+from app.v2.canonicalizer import _heuristic_canonicalize  # noqa: E402
+from app.v2.extractors.impact import _heuristic_impact  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+
+
+def _labels() -> list[dict]:
+    rows = []
+    for path in sorted(FIXTURE_DIR.glob("*.txt")):
+        for signal in _heuristic_impact(_heuristic_canonicalize(path.read_text())):
+            rows.append(signal.model_dump(include={"text", "impact_type", "quantification", "star_score"}))
+    return rows
+
+
+def _best_us(fn, repeat: int = 50) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1e6
+
+
+def main() -> None:
+    rows = _labels()
+    classifier = train(rows, rows, dim=1 << 18, epochs=100)
+    texts = [r["text"] for r in rows]
+    print(f"{'batch':>6} | {'total us':>9} | {'us/bullet':>9}")
+    print("-" * 31)
+    for size in (1, 10, 100, 1_000):
+        batch = (texts * (size // len(texts) + 1))[:size]
+        total = _best_us(lambda: classifier.predict(batch))
+        print(f"{size:>6} | {total:>9.1f} | {total / size:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Throughput of the heuristic canonicalizer on the golden fixtures.
+
+Compares the single-pass tokenizer (new) against the multi-scan
+implementation it replaced, loaded from git at the baseline revision. The
+baseline predates contact extraction, so the new column also pays for that.
+
+    python benchmarks/bench_canonicalizer.py [--baseline 14abb79]
+"""
+import argparse
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.canonicalizer import _heuristic_canonicalize  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+
+
+def _load_baseline(rev: str):
+    """Import app/v2/canonicalizer.py as of ``rev`` alongside the current package."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:app/v2/canonicalizer.py"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    module = types.ModuleType("app.v2._baseline_canonicalizer")
+    module.__package__ = "app.v2"
+    exec(compile(source, f"{rev}:app/v2/canonicalizer.py", "exec"), module.__dict__)
+    return module._heuristic_canonicalize
+
+
+def _throughput(fn, docs: list[str], seconds: float = 1.0) -> float:
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for doc in docs:
+            fn(doc)
+        done += len(docs)
+    return done / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", default="14abb79", help="git revision of the old canonicalizer")
+    args = parser.parse_args()
+    baseline_canonicalize = _load_baseline(args.baseline)
+    docs = [p.read_text() for p in sorted(FIXTURE_DIR.glob("*.txt"))]
+    print(f"fixtures: {len(docs)} ({sum(map(len, docs))} chars)")
+    baseline = _throughput(baseline_canonicalize, docs)
+    single = _throughput(_heuristic_canonicalize, docs)
+    print(f"{f'baseline ({args.baseline})':<20} {baseline:>10.0f} resumes/s")
+    print(f"{'new single-pass':<20} {single:>10.0f} resumes/s  ({single / baseline:.2f}x baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Throughput of the injection scanner as the pattern set grows.
+
+Compares the Aho-Corasick scanner against the old lowercase-and-`in` loop
+over the golden fixtures (concatenated to ~50KB).
+
+    python benchmarks/bench_injection_scan.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.safety import INJECTION_PATTERNS, InjectionPattern, InjectionScanner  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+VOCAB = [
+    "ignore", "previous", "system", "prompt", "override", "rules", "pretend", "jailbreak",
+    "developer", "mode", "reveal", "hidden", "policy", "assistant", "persona", "terminal",
+    "forget", "above", "instructions", "respond", "only", "with", "unfiltered", "output",
+]
+
+
+def _synthetic_patterns(n: int, rng: random.Random) -> list[InjectionPattern]:
+    patterns = [InjectionPattern(p) for p in INJECTION_PATTERNS]
+    while len(patterns) < n:
+        words = rng.sample(VOCAB, rng.randint(2, 5))
+        patterns.append(InjectionPattern(" ".join(words) + f" {len(patterns)}"))
+    return patterns
+
+
+def _naive(text: str, patterns: list[InjectionPattern]) -> int:
+    lower = text.lower()
+    return sum(1 for p in patterns if p.pattern in lower)
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(7)
+    corpus = "\n".join(p.read_text() for p in sorted(FIXTURE_DIR.glob("*.txt")))
+    text = (corpus * (50_000 // len(corpus) + 1))[:50_000]
+
+    print(f"text: {len(text)} chars")
+    print(f"{'patterns':>9} | {'states':>7} | {'automaton ms':>12} | {'naive ms':>9}")
+    print("-" * 48)
+    for n in (10, 100, 1_000, 5_000):
+        patterns = _synthetic_patterns(n, rng)
+        scanner = InjectionScanner(patterns)
+        ac = _time(lambda: scanner.scan(text))
+        naive = _time(lambda: _naive(text, patterns))
+        print(f"{n:>9} | {scanner._automaton.state_count:>7} | {ac * 1000:>12.2f} | {naive * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
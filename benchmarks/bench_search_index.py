@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Recruiter search: top-k query latency over a compiled, mmapped index.
+
+Builds a synthetic corpus (random skills, titles and bullet vocabulary),
+compacts it to a segment file, reloads it with mmap, then times top-50
+queries with and without facet filters, and with a live delta on top.
+
+    python benchmarks/bench_search_index.py
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.search_index import SearchDocument, SearchIndex, load_index  # noqa: E402
+
+SKILLS = ["python", "java", "go", "kafka", "postgresql", "kubernetes", "react", "aws", "terraform", "spark", "django", "redis", "typescript", "rust", "airflow"]
+TITLES = ["Backend Engineer", "Senior Software Engineer", "Data Engineer", "Frontend Developer", "Platform Engineer", "Engineering Manager"]
+TIERS = ["strong", "competitive", "needs-work", "major-gaps"]
+VOCAB = [f"term{i}" for i in range(5000)] + ["payments", "latency", "migration", "pipeline", "checkout", "throughput", "billing", "search"]
+
+
+def _corpus(n: int, rng: random.Random) -> list[SearchDocument]:
+    docs = []
+    for i in range(n):
+        docs.append(
+            SearchDocument(
+                analysis_id=f"a{i:07d}",
+                skills=rng.sample(SKILLS, rng.randint(3, 8)),
+                titles=rng.sample(TITLES, 2),
+                companies=[f"company{rng.randint(0, 2000)}"],
+                text=" ".join(rng.choices(VOCAB, k=rng.randint(60, 200))),
+                tenure_months=rng.randint(0, 240),
+                overall=round(rng.uniform(20, 95), 2),
+                tier=rng.choice(TIERS),
+            )
+        )
+    return docs
+
+
+def _time(index: SearchIndex, runs: int = 50, **query) -> float:
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        index.search(**query)
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    queries = {
+        "text + skills": dict(text="payments latency pipeline", skills=["python", "kafka", "k8s"], k=50),
+        "skills + filters": dict(skills=["python", "kafka"], must_skills=["postgresql"], min_tenure_months=36, tiers=["strong", "competitive"], k=50),
+        "filters only": dict(min_tenure_months=60, max_tenure_months=120, min_score=70, k=50),
+    }
+    print(f"{'docs':>7} | {'build s':>7} | {'file MB':>7} | " + " | ".join(f"{name + ' ms':>18}" for name in queries))
+    print("-" * 98)
+    for size in (10_000, 50_000):
+        docs = _corpus(size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/index.bin"
+            t = time.perf_counter()
+            index = SearchIndex(path=path, compact_at=size + 1)
+            for doc in docs:
+                index.add(doc)
+            index.compact()
+            build = time.perf_counter() - t
+            index = load_index(path)
+            # A live delta on top of the segment, as between compactions.
+            for doc in _corpus(500, rng):
+                index.add(doc._replace(analysis_id="d" + doc.analysis_id))
+            size_mb = Path(path).stat().st_size / 1e6
+            timings = [_time(index, **query) for query in queries.values()]
+        print(f"{size:>7} | {build:>7.2f} | {size_mb:>7.1f} | " + " | ".join(f"{ms:>18.2f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Offline role matching: per-resume calls vs. one batched call.
+
+Canonicalizes the golden fixtures heuristically, repeats them into a
+corpus, and times matching it against a catalog role one resume at a time
+and with a single ``match_resumes`` call.
+
+    python benchmarks/bench_semantic_match.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.v2.canonicalizer import canonicalize  # noqa: E402
+from app.v2.semantic_match import get_role_matcher, match_resumes  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "golden"
+
+
+def main() -> None:
+    canonicals = [asyncio.run(canonicalize(p.read_text())) for p in sorted(FIXTURE_DIR.glob("*.txt"))]
+    matcher = get_role_matcher()
+    vectors = matcher.profile("Senior Backend Engineer")
+    print(f"{'resumes':>8} | {'one-by-one ms':>13} | {'batched ms':>10} | {'per resume us':>13}")
+    print("-" * 55)
+    for size in (100, 1000, 5000):
+        corpus = [canonicals[i % len(canonicals)] for i in range(size)]
+        t = time.perf_counter()
+        for canonical in corpus:
+            match_resumes([canonical], vectors)
+        single = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        match_resumes(corpus, vectors)
+        batched = (time.perf_counter() - t) * 1000
+        print(f"{size:>8} | {single:>13.1f} | {batched:>10.1f} | {batched * 1000 / size:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
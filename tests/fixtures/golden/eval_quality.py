@@ -66,8 +66,9 @@ async def main() -> None:
         results[fixture] = await run_v2_pipeline(payload(fixture))
 
     lines = ["# V2 Golden Fixture Quality Review", ""]
-    lines.append("| fixture | score | score sanity | blockers/red-flags | rec alignment | likely FP/FN note |")
-    lines.append("|---|---:|---|---|---|---|")
+    lines.append("| fixture | score | score sanity | parse quality | canonicalizer route | blockers/red-flags | rec alignment | likely FP/FN note |")
+    lines.append("|---|---:|---|---:|---|---|---|---|")
+    llm_calls = 0
 
     for name, out in results.items():
         score = out["score"]["overall"]
@@ -75,6 +76,8 @@ async def main() -> None:
         sanity = score_sanity(name, score)
         redq = red_flag_quality(name, flags)
         recq = top_recommendation_alignment(out)
+        routing = out["telemetry"]["stage_metrics"]["canonicalize"]
+        llm_calls += routing["llm_called"]
 
         note = ""
         if name == "overlapping_roles" and "employment_gap" in flags:
@@ -84,7 +87,12 @@ async def main() -> None:
         elif name == "senior" and score < 75:
             note = "Potentially harsh scoring for strong senior profile"
 
-        lines.append(f"| {name} | {score:.2f} | {sanity} | {redq} ({', '.join(sorted(flags)) or 'none'}) | {recq} | {note} |")
+        lines.append(
+            f"| {name} | {score:.2f} | {sanity} | {routing['parse_quality']:.2f} | {routing['route']} | {redq} ({', '.join(sorted(flags)) or 'none'}) | {recq} | {note} |"
+        )
+
+    lines.append("")
+    lines.append(f"Canonicalizer LLM call rate: {llm_calls}/{len(results)} ({llm_calls / max(len(results), 1):.0%})")
 
     out_md = FIXTURE_DIR / "QUALITY_REVIEW.md"
     out_json = FIXTURE_DIR / "quality_eval_latest.json"
@@ -0,0 +1,142 @@
+import asyncio
+import base64
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.config import BulkConfig
+from app.v2 import bulk as bulk_module
+from app.v2.bulk import BatchBackend, BulkJob, LocalBatchBackend, get_batch_backend
+from app.v2.prompts import ALIGNMENT_NARRATIVE_PROMPT
+from app.v2.types import ResumeDoctorResult
+
+FIXTURE_DIR = Path(__file__).parents[1] / "fixtures" / "golden"
+
+
+def _payload(name: str) -> dict:
+    return {
+        "fileBase64": base64.b64encode((FIXTURE_DIR / f"{name}.txt").read_bytes()).decode("utf-8"),
+        "fileName": f"{name}.txt",
+        "mimeType": "text/plain",
+        "targetRole": "Senior Backend Engineer",
+    }
+
+
+def test_bulk_job_runs_in_rounds_and_resumes_by_job_id(tmp_path, monkeypatch):
+    settings = BulkConfig(directory=str(tmp_path / "jobs"), backend="local", poll_seconds=0, max_rounds=8, concurrency=2)
+    answered: list[str] = []
+    ingests: list[str] = []
+    running = {"now": 0, "max": 0}
+    ingest, pipeline = bulk_module.ingest_payload, bulk_module.run_v2_pipeline
+
+    async def counting_ingest(payload):
+        ingests.append(payload["fileName"])
+        return await ingest(payload)
+
+    async def counting_pipeline(payload, ingested=None):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        try:
+            return await pipeline(payload, ingested)
+        finally:
+            running["now"] -= 1
+
+    monkeypatch.setattr(bulk_module, "ingest_payload", counting_ingest)
+    monkeypatch.setattr(bulk_module, "run_v2_pipeline", counting_pipeline)
+
+    async def respond(model, body):
+        prompt = body["contents"][0]["parts"][0]["text"]
+        answered.append(prompt)
+        if prompt == ALIGNMENT_NARRATIVE_PROMPT:
+            return {"candidates": [{"content": {"parts": [{"text": json.dumps({"narrative_assessment": "Narrative from the batch."})}]}}]}
+        # Every other stage gets an empty response and falls back to its heuristic.
+        return None
+
+    job = BulkJob.create([_payload("senior"), _payload("junior"), _payload("senior")], LocalBatchBackend(tmp_path / "svc", respond), settings=settings)
+    assert asyncio.run(job.step()) == "waiting"
+    first_round = json.loads((job.directory / "manifest.json").read_text())["submissions"]
+    assert len(first_round) == 1 and not answered
+
+    # A new process picks the job up by id; the backend job submitted above is collected, not resubmitted.
+    resumed = BulkJob.load(job.job_id, LocalBatchBackend(tmp_path / "svc", respond), settings=settings)
+    results = asyncio.run(resumed.run(poll_seconds=0))
+    manifest = resumed.manifest
+    assert manifest["status"] == "done" and manifest["completed"] == 3 and not manifest["errors"]
+    assert manifest["submissions"][0]["handle"] == first_round[0]["handle"]
+    assert len(answered) == manifest["requests_submitted"]
+    # The duplicate resume's calls share request keys with the first copy.
+    assert answered.count(ALIGNMENT_NARRATIVE_PROMPT) == 2
+
+    assert sorted(results) == ["0", "1", "2"]
+    for item_id, result in results.items():
+        assert isinstance(result, ResumeDoctorResult)
+        assert result.alignment.narrative_assessment == "Narrative from the batch."
+        assert result.telemetry.stage_metrics["bulk"]["job_id"] == job.job_id
+    assert results["0"].score.overall == results["2"].score.overall
+    assert manifest["round"] == max(r.telemetry.stage_metrics["bulk"]["rounds"] for r in results.values())
+    # Each upload is ingested once across rounds and the resume, and replays stay under the cap.
+    assert sorted(ingests) == ["junior.txt", "senior.txt", "senior.txt"]
+    assert running["max"] == 2
+
+
+def test_backends_are_explicit(tmp_path):
+    with pytest.raises(TypeError):
+        BatchBackend()
+    # The local stand-in has no live fallback, so it cannot be picked by name.
+    with pytest.raises(ValueError):
+        get_batch_backend("local")
+    with pytest.raises(ValueError):
+        BulkJob.create([], settings=BulkConfig(directory=str(tmp_path), backend="local"))
+    assert get_batch_backend("gemini").name == "gemini"
+
+
+def test_gemini_backend_splits_request_files_and_never_resubmits(tmp_path, monkeypatch):
+    batches: dict[str, list[dict]] = {}
+    polls: dict[str, int] = {}
+    submitted: list[str] = []
+    posts: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["key"] == "test-key"
+        if request.method == "POST":
+            posts.append(1)
+            if len(posts) == 2:
+                return httpx.Response(500, json={"error": "unavailable"})
+            assert request.url.path.endswith(":batchGenerateContent")
+            requests = json.loads(request.content)["batch"]["input_config"]["requests"]["requests"]
+            name = f"batches/{len(batches)}"
+            batches[name] = requests
+            submitted.extend(r["metadata"]["key"] for r in requests)
+            return httpx.Response(200, json={"name": name})
+        name = request.url.path.split("/v1beta/", 1)[1]
+        polls[name] = polls.get(name, 0) + 1
+        if polls[name] == 1:
+            return httpx.Response(200, json={"metadata": {"state": "BATCH_STATE_RUNNING"}})
+        inlined = []
+        for r in batches[name]:
+            prompt = r["request"]["contents"][0]["parts"][0]["text"]
+            text = json.dumps({"narrative_assessment": "Narrative from Gemini."}) if prompt == ALIGNMENT_NARRATIVE_PROMPT else "not json"
+            inlined.append({"metadata": r["metadata"], "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}})
+        return httpx.Response(200, json={"metadata": {"state": "BATCH_STATE_SUCCEEDED", "output": {"inlinedResponses": {"inlinedResponses": inlined}}}})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    settings = BulkConfig(directory=str(tmp_path / "jobs"), backend="gemini", poll_seconds=0, max_rounds=8, max_request_bytes=4000)
+
+    job = BulkJob.create([_payload("senior"), _payload("junior")], settings=settings)
+    # The second file of the first round fails to submit; the first is still waited on.
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(job.step())
+    assert job.status == "waiting" and len(job.manifest["submissions"]) == 1
+
+    results = asyncio.run(job.run(poll_seconds=0))
+    manifest = job.manifest
+    assert manifest["status"] == "done" and sorted(results) == ["0", "1"]
+    assert len(submitted) == len(set(submitted)) == manifest["requests_submitted"]
+    assert len(batches) == len(manifest["submissions"]) > manifest["round"]
+    for submission in manifest["submissions"]:
+        assert (job.directory / submission["path"]).stat().st_size <= 4000 or len(batches[submission["handle"]]) == 1
+    assert all(r.alignment.narrative_assessment == "Narrative from Gemini." for r in results.values())
@@ -8,6 +8,7 @@ from fastapi.testclient import TestClient
 
 from app.main import app
 from app.v2.pipeline import run_v2_pipeline
+from app.v2.search_index import get_search_index
 
 FIXTURE_DIR = Path(__file__).parents[1] / "fixtures" / "golden"
 EXPECTATIONS = json.loads((FIXTURE_DIR / "expectations.json").read_text())
@@ -37,6 +38,15 @@ def test_v2_endpoint_basic_contract_shape():
     assert isinstance(body["recommendations"], list)
     assert isinstance(body["interview_prep"], list)
     assert "telemetry" in body and "step_durations" in body["telemetry"]
+    assert body["telemetry"]["stage_metrics"]["role"]["cache_key"] == "backend_engineer@senior"
+    assert body["telemetry"]["stage_metrics"]["alignment"]["full_llm_call"] is False
+
+    stats = client.get("/svc/resume-parser/v2/alignment/stats").json()
+    assert stats["alignments"] >= 1 and stats["without_full_llm_rate"] == 1.0
+
+    fast = client.post("/svc/resume-parser/v2/analyze", json={**payload, "options": {"fast": True}}).json()
+    assert fast["telemetry"]["stage_metrics"]["guidance"]["polish"] == "skipped"
+    assert [r["id"] for r in fast["recommendations"]] == [r["id"] for r in body["recommendations"]]
 
 
 @pytest.mark.parametrize("fixture_name,expected", sorted(EXPECTATIONS.items()))
@@ -47,6 +57,7 @@ def test_golden_eval_pack_assertions(fixture_name, expected):
     score = result["score"]["overall"]
     assert expected["score_min"] <= score <= expected["score_max"]
     assert len(result["canonical"]["experience"]) == expected["roles_count"]
+    assert result["telemetry"]["stage_metrics"]["canonicalize"]["route"] == expected["canonicalizer_route"]
 
     flags = {f["type"] for f in result["signals"]["red_flags"]["flags"]}
     for required_flag in expected["required_flags"]:
@@ -56,3 +67,165 @@ def test_golden_eval_pack_assertions(fixture_name, expected):
     if expected.get("top_recommendation_dimension"):
         assert rec_dims
         assert expected["top_recommendation_dimension"] in rec_dims
+
+
+def test_include_v1_fields_reuses_v2_ingest_and_canonicalization(monkeypatch):
+    import app.pipeline as v1_pipeline
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("combined request must not run the v1 LLM field extraction")
+
+    monkeypatch.setattr(v1_pipeline, "extract_fields_llm", _fail)
+    header = "Asha Verma\nasha.verma@example.com | +91 98765 43210 | https://linkedin.com/in/ashaverma\n"
+    payload = _payload_for_fixture("senior")
+    text = header + (FIXTURE_DIR / "senior.txt").read_text()
+    payload["fileBase64"] = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+    payload["options"] = {"include_v1_fields": True}
+
+    result = asyncio.run(run_v2_pipeline(payload))
+
+    v1 = result["v1"]
+    assert v1["text"] == text.strip()
+    assert set(v1["scores"]) == {"readability", "ats", "match"}
+    fields = v1["fields"]
+    assert fields["name"]["value"] == "Asha Verma"
+    assert fields["email"]["value"] == "asha.verma@example.com"
+    assert fields["linkedinUrl"]["value"] == "https://linkedin.com/in/ashaverma"
+    assert fields["role"]["value"] == "Principal Engineer"
+    assert fields["functionArea"]["value"] == "engineering"
+    assert fields["experience"]["value"] == "10+"
+    assert "v1_fields" in result["telemetry"]["step_durations"]
+
+
+def test_older_guidance_model_overrides_are_honoured_and_reported(monkeypatch):
+    from app.v2 import guidance as guidance_module
+
+    models: list = []
+
+    async def fake_call_gemini(prompt, text, model=None, **kwargs):
+        models.append(model)
+        return None
+
+    monkeypatch.setattr(guidance_module, "call_gemini", fake_call_gemini)
+    payload = {**_payload_for_fixture("senior"), "models": {"interview_prep": "gemini-2.5-pro"}}
+    telemetry = asyncio.run(run_v2_pipeline(payload))["telemetry"]
+
+    assert models == ["gemini-2.5-pro"]
+    assert {telemetry["models_used"][k] for k in ("guidance", "recommendations", "interview_prep")} == {"gemini-2.5-pro"}
+    assert telemetry["step_durations"]["recommendations"] == telemetry["step_durations"]["guidance"]
+
+
+def test_new_resume_version_recomputes_only_changed_roles(monkeypatch):
+    import app.v2.pipeline as v2_pipeline
+    from app.v2.incremental import ResumeVersionStore
+
+    monkeypatch.setattr(v2_pipeline, "get_version_store", lambda: store)
+    store = ResumeVersionStore()
+    impact_roles: list[list[str]] = []
+    extract_impact = v2_pipeline.extract_impact
+
+    async def counting_extract_impact(canonical, **kwargs):
+        impact_roles.append([r.title for r in canonical.experience])
+        return await extract_impact(canonical, **kwargs)
+
+    monkeypatch.setattr(v2_pipeline, "extract_impact", counting_extract_impact)
+
+    original = (FIXTURE_DIR / "senior.txt").read_text()
+    edited = original.replace("Mentored 6 engineers", "Mentored 6 engineers into tech leads")
+
+    def _run(text: str, version: str) -> dict:
+        payload = _payload_for_fixture("senior")
+        payload["fileBase64"] = base64.b64encode(text.encode("utf-8")).decode("utf-8")
+        payload.update(userId="user-1", resumeVersionId=version)
+        return asyncio.run(run_v2_pipeline(payload))
+
+    first = _run(original, "v1")
+    second = _run(edited, "v2")
+    third = _run(edited, "v3")
+
+    assert first["telemetry"]["stage_metrics"]["incremental"]["recomputed"] == ["canonicalize", "impact", "ownership", "skills", "ats", "red_flags"]
+    assert impact_roles[1] == ["Senior Engineer"]
+    incremental = second["telemetry"]["stage_metrics"]["incremental"]
+    assert incremental["previous_version_id"] == "v1"
+    assert incremental["roles_recomputed"] == [1] and incremental["roles_reused"] == [0, 2]
+    assert "skills" in incremental["recomputed"] and "canonicalize" in incremental["recomputed"]
+
+    full = asyncio.run(run_v2_pipeline({**_payload_for_fixture("senior"), "fileBase64": base64.b64encode(edited.encode()).decode()}))
+    assert second["signals"]["impact"] == full["signals"]["impact"]
+    assert second["signals"]["ownership"] == full["signals"]["ownership"]
+
+    assert third["telemetry"]["stage_metrics"]["canonicalize"]["route"] == "reused"
+    assert third["telemetry"]["stage_metrics"]["incremental"]["recomputed"] == []
+    assert len(impact_roles) == 3
+
+
+def test_simulate_rescores_stored_analysis_under_edits():
+    client = TestClient(app)
+    analysis = client.post("/svc/resume-parser/v2/analyze", json=_payload_for_fixture("job_hopping")).json()
+    analysis_id = analysis["analysis_id"]
+    roles = analysis["canonical"]["experience"]
+    edits = [{"kind": "quantify_bullet", "roleIndex": ri, "bulletIndex": bi} for ri, role in enumerate(roles) for bi in range(len(role["bullets"]))]
+    edits.append({"kind": "set_summary", "text": "Backend engineer focused on payments reliability."})
+
+    response = client.post("/svc/resume-parser/v2/simulate", json={"analysisId": analysis_id, "edits": edits})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["baseline"]["overall"] == analysis["score"]["overall"]
+    assert body["simulated"]["overall"] > body["baseline"]["overall"]
+    assert body["delta"]["dimensions"]["impact_quality"] > 0
+    assert set(body["recomputed_signals"]) >= {"impact", "ats"}
+    assert [r["priority"] for r in body["recommendations"]] == list(range(1, len(body["recommendations"]) + 1))
+
+    # Without edits the stored score is reproduced exactly.
+    unchanged = client.post("/svc/resume-parser/v2/simulate", json={"analysisId": analysis_id, "edits": []}).json()
+    assert unchanged["simulated"] == unchanged["baseline"]
+
+    bad = client.post("/svc/resume-parser/v2/simulate", json={"analysisId": analysis_id, "edits": [{"kind": "rewrite_bullet", "roleIndex": 99, "bulletIndex": 0, "text": "x"}]})
+    assert bad.status_code == 422
+    missing = client.post("/svc/resume-parser/v2/simulate", json={"analysisId": "nope", "edits": []})
+    assert missing.status_code == 404
+
+
+def test_job_description_drives_alignment_and_skills_relevance():
+    client = TestClient(app)
+    payload = _payload_for_fixture("senior")
+    baseline = client.post("/svc/resume-parser/v2/analyze", json=payload).json()
+    payload["jobDescription"] = "Backend Engineer\nRequirements:\n- Haskell and Erlang in production\n\nNice to have:\n- OCaml"
+
+    body = client.post("/svc/resume-parser/v2/analyze", json=payload).json()
+    requirements = body["job_requirements"]
+    assert requirements["required_skills"] and requirements["content_hash"]
+    assert body["telemetry"]["stage_metrics"]["job_description"]["source"] == "heuristic"
+    assert any(g["area"].startswith("skill:") for g in body["alignment"]["gaps"])
+    assert body["score"]["dimensions"]["skills_relevance"]["rationale"] == "Skill depth and job-description skill coverage"
+    assert body["score"]["dimensions"]["skills_relevance"]["score"] <= baseline["score"]["dimensions"]["skills_relevance"]["score"]
+
+    repeat = client.post("/svc/resume-parser/v2/analyze", json=payload).json()
+    assert repeat["telemetry"]["stage_metrics"]["job_description"]["cache_hit"] is True
+
+
+@pytest.fixture
+def fresh_search_index():
+    get_search_index.cache_clear()
+    yield
+    get_search_index.cache_clear()
+
+
+def test_search_returns_analyzed_resumes_ranked_with_filters(fresh_search_index):
+    client = TestClient(app)
+
+    def analyze(name: str) -> str:
+        return client.post("/svc/resume-parser/v2/analyze", json=_payload_for_fixture(name)).json()["analysis_id"]
+
+    ids = {name: analyze(name) for name in ("senior", "junior")}
+    # Re-analyzing a resume replaces its document rather than adding one.
+    ids["senior"] = analyze("senior")
+
+    body = client.post("/svc/resume-parser/v2/search", json={"query": "latency", "skills": ["Python"], "k": 5}).json()
+    assert body["indexed"] == 2 and 1 <= len(body["hits"]) <= 2
+    assert all(h["score"] > 0 for h in body["hits"])
+    senior = next(h for h in body["hits"] if h["analysis_id"] == ids["senior"])
+    assert senior["matched_skills"] == ["python"]
+
+    filtered = client.post("/svc/resume-parser/v2/search", json={"skills": ["Python"], "minTenureMonths": 10_000}).json()
+    assert filtered["hits"] == []
@@ -0,0 +1,125 @@
+import asyncio
+
+from app.config import config
+from app.v2 import alignment as alignment_module
+from app.v2 import alignment_profiles as profiles_module
+from app.v2.alignment import run_role_alignment
+from app.v2.alignment_profiles import AlignmentProfileCache, _weights, heuristic_profile
+from app.v2.roles import normalize_role
+from app.v2.types import CanonicalExperience, CanonicalResume
+
+LLM_PROFILE = {
+    "competencies": [
+        {"text": "Designing and building REST APIs", "kind": "competency", "weight": 1.0},
+        {"text": "Go", "kind": "skill", "weight": 1.0},
+        {"text": "Event streaming with Kafka", "kind": "skill", "weight": 0.5},
+    ],
+    "signal_weights": {"requirements": 90, "impact": 40, "ownership": 20, "vibes": 50},
+    "market_notes": "Payments backends are screened for correctness under load.",
+}
+
+
+def _resume(bullets: list[str]) -> CanonicalResume:
+    return CanonicalResume(experience=[CanonicalExperience(company="Acme", title="Engineer", start_date="2020-01", bullets=bullets)])
+
+
+def _isolate(monkeypatch) -> AlignmentProfileCache:
+    cache = AlignmentProfileCache()
+    monkeypatch.setattr(profiles_module, "get_alignment_profiles", lambda: cache)
+    monkeypatch.setattr(alignment_module, "get_alignment_profiles", lambda: cache)
+    return cache
+
+
+def test_profile_is_generated_once_per_normalized_role(monkeypatch):
+    cache = _isolate(monkeypatch)
+    profile_calls, narrative_calls = [], []
+
+    async def fake_profile_llm(prompt, text, model=None):
+        profile_calls.append(text)
+        await asyncio.sleep(0)
+        return LLM_PROFILE
+
+    async def fake_narrative_llm(prompt, text, model=None):
+        narrative_calls.append(text)
+        return {"narrative_assessment": "Solid API work; no Go evidence yet."}
+
+    monkeypatch.setattr(profiles_module, "call_gemini", fake_profile_llm)
+    monkeypatch.setattr(alignment_module, "call_gemini", fake_narrative_llm)
+
+    async def screen():
+        titles = ["Sr. Backend Engineer", "Senior Backend Developer", "senior back-end engineer (Python)"]
+        stats = [{} for _ in titles]
+        results = await asyncio.gather(
+            *(run_role_alignment(t, _resume(["Built REST APIs serving 2M requests a day"]), {}, stats=s) for t, s in zip(titles, stats))
+        )
+        return results, stats
+
+    results, stats = asyncio.run(screen())
+    assert len(profile_calls) == 1 and len(narrative_calls) == 3
+    assert {s["role_key"] for s in stats} == {"backend_engineer@senior"}
+    assert [s["profile_cache_hit"] for s in stats].count(False) == 1
+    assert all(s["profile_source"] == "llm" and not s["full_llm_call"] and s["narrative"] == "llm" for s in stats)
+
+    alignment = results[0]
+    assert alignment.narrative_assessment == "Solid API work; no Go evidence yet."
+    assert alignment.market_notes == LLM_PROFILE["market_notes"]
+    assert [g.area for g in alignment.gaps if ":" in g.area] == ["skill:Go", "skill:Event streaming with Kafka"]
+    assert cache.stats()["without_full_llm_rate"] == 1.0 and cache.stats()["served"] == {"narrative_llm": 3}
+
+
+def test_heuristic_profiles_and_full_mode_fallback(monkeypatch):
+    cache = _isolate(monkeypatch)
+    assert _weights(LLM_PROFILE["signal_weights"]) == {"requirements": 45.0, "impact": 20.0, "ownership": 10.0}
+    assert _weights({"vibes": 1}) == _weights(None)
+
+    senior = heuristic_profile(normalize_role("Senior Backend Engineer")).profile
+    staff = heuristic_profile(normalize_role("Staff Backend Engineer")).profile
+    assert senior.source == "heuristic" and senior.competencies
+    assert staff.signal_weights["ownership"] > senior.signal_weights["ownership"]
+
+    # Without an LLM, full mode falls back to the local comparison.
+    monkeypatch.setattr(config.alignment, "mode", "full")
+    stats: dict = {}
+    alignment = asyncio.run(run_role_alignment("Backend Engineer", _resume(["Built REST APIs in Python"]), {}, stats=stats))
+    assert alignment.fit_score > 0
+    assert stats["mode"] == "full" and stats["full_llm_call"] is False and stats["narrative"] == "template"
+    assert cache.stats()["served"] == {"local": 1}
+
+
+def test_a_fallback_profile_is_retried_after_its_short_ttl(monkeypatch):
+    cache = _isolate(monkeypatch)
+    cache.fallback_ttl_seconds = 0
+    answers = [None, LLM_PROFILE]
+
+    async def flaky_llm(prompt, text, model=None):
+        return answers.pop(0)
+
+    monkeypatch.setattr(profiles_module, "call_gemini", flaky_llm)
+    assert asyncio.run(profiles_module.get_alignment_profile("Backend Engineer")).profile.source == "heuristic"
+    llm = asyncio.run(profiles_module.get_alignment_profile("Backend Engineer"))
+    assert llm.profile.source == "llm" and not answers
+    # LLM profiles keep the long TTL.
+    assert asyncio.run(profiles_module.get_alignment_profile("Backend Engineer")) is llm
+
+
+def test_a_cancelled_owner_hands_the_generation_to_a_waiter(monkeypatch):
+    _isolate(monkeypatch)
+    calls = []
+
+    async def slow_llm(prompt, text, model=None):
+        calls.append(text)
+        await asyncio.sleep(0.05)
+        return LLM_PROFILE
+
+    monkeypatch.setattr(profiles_module, "call_gemini", slow_llm)
+
+    async def cancel_the_owner():
+        owner = asyncio.create_task(profiles_module.get_alignment_profile("Backend Engineer"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(profiles_module.get_alignment_profile("Backend Engineer"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(cancel_the_owner()).profile.source == "llm"
+    assert len(calls) == 2
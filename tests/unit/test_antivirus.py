@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import struct
+import threading
+import time
+
+from app import pipeline
+from app.antivirus import AntivirusScanner, ClamdClient
+from app.config import AntivirusConfig
+
+MALWARE_MARKER = b"FAKE-CLAMD-TEST-SIGNATURE"
+
+
+class FakeClamd:
+    """Speaks enough of the clamd protocol: IDSESSION, INSTREAM and END."""
+
+    def __init__(self):
+        self.connections = 0
+        self.closed = 0
+        self.scans = 0
+        self.chunk_sizes: list[int] = []
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        in_session = False
+        command_id = 0
+        try:
+            while True:
+                command = await reader.readuntil(b"\0")
+                if command == b"zIDSESSION\0":
+                    in_session = True
+                    continue
+                if command == b"zEND\0":
+                    break
+                if command != b"zINSTREAM\0":
+                    writer.write(b"UNKNOWN COMMAND\0")
+                    break
+                data = bytearray()
+                while True:
+                    (size,) = struct.unpack("!I", await reader.readexactly(4))
+                    if size == 0:
+                        break
+                    self.chunk_sizes.append(size)
+                    data += await reader.readexactly(size)
+                self.scans += 1
+                command_id += 1
+                verdict = "stream: Fake.Test.Signature FOUND" if MALWARE_MARKER in data else "stream: OK"
+                prefix = f"{command_id}: " if in_session else ""
+                writer.write(f"{prefix}{verdict}\0".encode())
+                await writer.drain()
+                if not in_session:
+                    break
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+        self.closed += 1
+
+
+def _scanner(client: ClamdClient, **overrides) -> AntivirusScanner:
+    return AntivirusScanner(AntivirusConfig(provider="clamav", **overrides), client=client)
+
+
+def test_clamd_client_streams_chunks_over_one_pooled_session():
+    fake = FakeClamd()
+
+    async def run():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = ClamdClient(host="127.0.0.1", port=port, chunk_bytes=1024)
+        async with server:
+            first = await client.instream(b"a" * 5000)
+            second = await client.instream(b"b" * 10)
+            await client.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert (first, second) == ("stream: OK", "stream: OK")
+    assert fake.connections == 1
+    assert fake.scans == 2
+    assert fake.chunk_sizes == [1024, 1024, 1024, 1024, 904, 10]
+
+
+def test_sessions_pooled_on_a_finished_loop_are_closed(tmp_path):
+    fake = FakeClamd()
+    socket_path = str(tmp_path / "clamd.sock")
+    server_loop = asyncio.new_event_loop()
+    listening = threading.Event()
+
+    def serve():
+        server_loop.run_until_complete(asyncio.start_unix_server(fake.handle, path=socket_path))
+        listening.set()
+        server_loop.run_forever()
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    listening.wait()
+    client = ClamdClient(socket_path=socket_path)
+    try:
+        assert asyncio.run(client.instream(b"first")) == "stream: OK"
+        assert fake.closed == 0
+        assert asyncio.run(client.instream(b"second")) == "stream: OK"
+        deadline = time.monotonic() + 2
+        while fake.closed < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert (fake.connections, fake.closed) == (2, 1)
+    finally:
+        server_loop.call_soon_threadsafe(server_loop.stop)
+        server.join()
+
+
+def test_scanner_detects_infection_and_caches_verdicts_by_hash(tmp_path):
+    fake = FakeClamd()
+    socket_path = str(tmp_path / "clamd.sock")
+
+    async def run():
+        server = await asyncio.start_unix_server(fake.handle, path=socket_path)
+        scanner = _scanner(ClamdClient(socket_path=socket_path))
+        async with server:
+            infected = await scanner.scan(b"resume " + MALWARE_MARKER)
+            clean = await scanner.scan(b"plain resume")
+            again = await scanner.scan(b"plain resume")
+        return scanner, infected, clean, again
+
+    scanner, infected, clean, again = asyncio.run(run())
+    assert infected.status == "infected" and infected.signature == "Fake.Test.Signature"
+    assert scanner.blocks(infected)
+    assert clean.status == "clean" and not clean.cached
+    assert again.status == "clean" and again.cached
+    assert fake.scans == 2
+
+
+def test_scanner_fails_closed_when_clamd_is_unreachable(tmp_path):
+    scanner = _scanner(ClamdClient(socket_path=str(tmp_path / "missing.sock")))
+    verdict = asyncio.run(scanner.scan(b"resume"))
+    assert verdict.status == "error"
+    assert scanner.blocks(verdict)
+    assert scanner.field(verdict)["scan_status"] == "error"
+
+
+def test_pipeline_withholds_extraction_until_scan_passes(monkeypatch):
+    fake = FakeClamd()
+
+    async def run():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        scanner = _scanner(ClamdClient(host="127.0.0.1", port=port))
+        monkeypatch.setattr(pipeline, "get_antivirus", lambda: scanner)
+        async with server:
+            bad = await pipeline.run_pipeline({"fileBase64": base64.b64encode(b"Jane Doe " + MALWARE_MARKER).decode()})
+            good = await pipeline.run_pipeline({"fileBase64": base64.b64encode(b"Jane Doe\nBackend engineer").decode()})
+        return bad, good
+
+    bad, good = asyncio.run(run())
+    assert bad["text"] is None
+    assert bad["error"] == "Antivirus scan failed: Fake.Test.Signature"
+    assert bad["fields"]["antivirus"]["value"] == "infected"
+    assert good["text"] == "Jane Doe\nBackend engineer"
+    assert good["fields"]["antivirus"]["scan_status"] == "scanned"
@@ -0,0 +1,95 @@
+import asyncio
+import base64
+import random
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.v2.batch_scoring import load_batch, pack, save_batch, score_batch, summarize, summarize_result
+from app.v2.pipeline import run_v2_pipeline
+from app.v2.scoring import WEIGHTS, compute_score
+from app.v2.types import RedFlag
+
+FIXTURE_DIR = Path(__file__).parents[1] / "fixtures" / "golden"
+
+
+def _golden_results() -> list[dict]:
+    results = []
+    for path in sorted(FIXTURE_DIR.glob("*.txt")):
+        payload = {
+            "fileBase64": base64.b64encode(path.read_bytes()).decode("utf-8"),
+            "fileName": path.name,
+            "mimeType": "text/plain",
+            "targetRole": "Senior Backend Engineer",
+        }
+        results.append(asyncio.run(run_v2_pipeline(payload)))
+    return results
+
+
+def _assert_matches(batch_scores: dict, row: int, score) -> None:
+    assert batch_scores["overall"][row] == score.overall
+    assert batch_scores["confidence"][row] == score.confidence
+    assert batch_scores["tier"][row] == score.tier
+    for name, dim in score.dimensions.items():
+        assert batch_scores["dimensions"][name][row] == dim.score
+        assert batch_scores["contributions"][name][row] == dim.weighted_contribution
+
+
+def test_batch_scores_match_compute_score_on_golden_fixtures(tmp_path):
+    results = _golden_results()
+    path = tmp_path / "corpus.npz"
+    save_batch(pack([summarize_result(r) for r in results]), str(path))
+    scores = score_batch(load_batch(str(path)))
+    for row, result in enumerate(results):
+        assert scores["overall"][row] == result["score"]["overall"]
+        assert scores["confidence"][row] == result["score"]["confidence"]
+        assert scores["tier"][row] == result["score"]["tier"]
+        for name, dim in result["score"]["dimensions"].items():
+            assert scores["dimensions"][name][row] == dim["score"]
+            assert scores["contributions"][name][row] == dim["weighted_contribution"]
+
+
+def test_batch_scores_match_compute_score_on_perturbed_signals():
+    from app.v2.types import ATSSignal, CanonicalResume, ImpactSignal, OwnershipSignal, RedFlagSignal, RoleAlignment, SkillSignal
+
+    rng = random.Random(7)
+    rows, expected = [], []
+    for result in _golden_results():
+        canonical = CanonicalResume.model_validate(result["canonical"])
+        raw = result["signals"]
+        for _ in range(40):
+            impact = [ImpactSignal.model_validate(x) for x in raw["impact"]][: rng.randint(0, len(raw["impact"]))]
+            for signal in impact:
+                signal.quantification = rng.choice(["strong", "weak", "none"])
+                signal.star_score = round(rng.random(), rng.choice([1, 2, 3]))
+            ownership = [OwnershipSignal.model_validate(x) for x in raw["ownership"]]
+            for signal in ownership:
+                signal.ownership_level = rng.choice(["led", "contributed", "participated", "unclear"])
+            flags = [RedFlag(type="x", severity=rng.choice(["high", "medium", "low"]), detail="") for _ in range(rng.randint(0, 4))]
+            signals = {
+                "impact": impact,
+                "ownership": ownership,
+                "skills": SkillSignal.model_validate(raw["skills"]) if rng.random() > 0.1 else None,
+                "ats": ATSSignal(overall_pass=True, pass_rate=round(rng.random(), 2)),
+                "red_flags": RedFlagSignal(flags=flags) if rng.random() > 0.1 else None,
+            }
+            alignment = RoleAlignment(fit_score=rng.choice([0.0, 37.5, 50.0, 72.25, rng.uniform(0, 100)]))
+            target_role = rng.choice(["Senior Backend Engineer", "Python Developer", "Kubernetes Platform Lead", ""])
+            rows.append(summarize(canonical, signals, alignment, target_role))
+            expected.append(compute_score(canonical, signals, alignment, target_role))
+
+    scores = score_batch(pack(rows))
+    for row, score in enumerate(expected):
+        _assert_matches(scores, row, score)
+
+
+def test_batch_scoring_applies_new_weights():
+    results = _golden_results()
+    batch = pack([summarize_result(r) for r in results])
+    weights = {**WEIGHTS, "impact_quality": 0.5}
+    reweighted = score_batch(batch, weights)
+    for row, result in enumerate(results):
+        impact = result["score"]["dimensions"]["impact_quality"]["score"]
+        assert reweighted["contributions"]["impact_quality"][row] == round(impact * 0.5, 2)
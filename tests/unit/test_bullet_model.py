@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.config import BulletModelConfig
+from app.v2 import bullet_model
+from app.v2.extractors import impact as impact_module
+from app.v2.types import CanonicalExperience, CanonicalResume, ImpactSignal
+
+VERBS = ["Increased", "Reduced", "Improved", "Cut", "Grew"]
+OBJECTS = ["checkout conversion", "p95 latency", "infra cost", "onboarding time", "churn"]
+DUTIES = ["Responsible for", "Worked on", "Tasked with", "In charge of"]
+AREAS = ["backend services", "the billing system", "internal tools", "release pipelines", "vendor APIs"]
+
+
+def _labels() -> list[dict]:
+    rows = []
+    for i, (verb, obj) in enumerate(itertools.product(VERBS, OBJECTS)):
+        rows.append({"text": f"{verb} {obj} by {10 + i}%", "impact_type": "metric", "quantification": "strong", "star_score": 0.9})
+        rows.append({"text": f"{verb} {obj} for the platform team", "impact_type": "outcome", "quantification": "weak", "star_score": 0.6})
+    for duty, area in itertools.product(DUTIES, AREAS):
+        rows.append({"text": f"{duty} {area}", "impact_type": "duty", "quantification": "none", "star_score": 0.25})
+    return rows
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    rows = _labels()
+    return bullet_model.train(rows, rows[::3], dim=1 << 12, epochs=150)
+
+
+def test_classifier_learns_llm_labels_and_reports(classifier):
+    report = bullet_model.evaluate(classifier, _labels(), min_confidence=0.5)
+    assert report["impact_type_accuracy"] >= 0.95
+    assert report["quantification_accuracy"] >= 0.95
+    assert 0.0 <= report["expected_calibration_error"] <= 1.0
+    assert report["local_rate"] + report["escalation_rate"] == pytest.approx(1.0)
+
+    unseen = classifier.predict(["Reduced deploy time by 40%", "Responsible for data pipelines"])
+    assert [p.impact_type for p in unseen] == ["metric", "duty"]
+
+
+def test_artifact_round_trip_and_version_check(classifier, tmp_path):
+    path = tmp_path / "bullet_model.npz"
+    classifier.save(str(path))
+    loaded = bullet_model.load_bullet_model(str(path))
+    texts = ["Grew churn by 3%", "Worked on vendor APIs"]
+    assert loaded.predict(texts) == classifier.predict(texts)
+    assert loaded.meta["prompt_version"] == classifier.meta["prompt_version"]
+
+    with pytest.raises(ValueError):
+        bullet_model.BulletClassifier(loaded.weights, loaded.bias, loaded.temperatures, {**loaded.meta, "format_version": 99})
+
+
+def test_models_for_an_older_prompt_are_refused(classifier, tmp_path):
+    current, stale = tmp_path / "current.npz", tmp_path / "stale.npz"
+    classifier.save(str(current))
+    bullet_model.BulletClassifier(classifier.weights, classifier.bias, classifier.temperatures, {**classifier.meta, "prompt_version": "old"}).save(str(stale))
+    load = bullet_model.get_bullet_classifier.__wrapped__
+    assert load(BulletModelConfig(path=str(current))) is not None
+    assert load(BulletModelConfig(path=str(stale))) is None
+
+
+def test_missing_or_corrupt_models_are_not_used(tmp_path, caplog):
+    corrupt = tmp_path / "corrupt.npz"
+    corrupt.write_bytes(b"not a model")
+    load = bullet_model.get_bullet_classifier.__wrapped__
+    assert load(BulletModelConfig(path=str(tmp_path / "missing.npz"))) is None
+    assert load(BulletModelConfig(path=str(corrupt))) is None
+    assert sum("could not load bullet model" in r.message for r in caplog.records) == 2
+
+
+class _StubClassifier:
+    def predict(self, texts):
+        return [
+            bullet_model.BulletPrediction("metric", "strong", 0.9, 0.97 if "%" in text else 0.4)
+            for text in texts
+        ]
+
+
+def test_extract_impact_escalates_only_low_confidence_bullets(monkeypatch):
+    sent: list[str] = []
+
+    async def fake_call_gemini(prompt, payload, model=None):
+        sent.append(payload)
+        return [{"role_index": 0, "bullet_index": 1, "text": "Sang at the offsite", "impact_type": "scope", "quantification": "none", "star_score": 0.3}]
+
+    monkeypatch.setattr(impact_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(impact_module, "get_bullet_classifier", lambda: _StubClassifier())
+    monkeypatch.setattr(impact_module, "get_signal_cache", lambda: None)
+    canonical = CanonicalResume(
+        experience=[CanonicalExperience(company="Acme", title="Engineer", bullets=["Reduced infra cost by 30%", "Sang at the offsite"])]
+    )
+    stats: dict = {}
+    signals = asyncio.run(impact_module.extract_impact(canonical, stats=stats))
+
+    assert len(sent) == 1 and "Sang at the offsite" in sent[0] and "Reduced infra cost" not in sent[0]
+    assert [(s.bullet_index, s.impact_type) for s in signals] == [(0, "metric"), (1, "scope")]
+    assert signals[0].metrics == ["30%"] and signals[0].verbs == ["reduced"]
+    assert stats["local"] == 1 and stats["escalated"] == 1
+
+
+def test_llm_labels_record_the_resume_bullet_not_the_echo(monkeypatch):
+    recorded: list = []
+
+    async def fake_call_gemini(prompt, payload, model=None):
+        return [{"role_index": 0, "bullet_index": 0, "text": "sang at offsite", "impact_type": "scope", "quantification": "none", "star_score": 0.3}]
+
+    async def fake_record_labels(signals):
+        recorded.extend(signals)
+
+    monkeypatch.setattr(impact_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(impact_module, "record_labels", fake_record_labels)
+    monkeypatch.setattr(impact_module, "get_bullet_classifier", lambda: None)
+    monkeypatch.setattr(impact_module, "get_signal_cache", lambda: None)
+    canonical = CanonicalResume(experience=[CanonicalExperience(company="Acme", title="Engineer", bullets=["Sang at the offsite"])])
+    asyncio.run(impact_module.extract_impact(canonical))
+
+    assert [s.text for s in recorded] == ["Sang at the offsite"]
+
+
+def test_llm_labels_are_appended_to_the_log(tmp_path):
+    log = tmp_path / "labels.jsonl"
+    signals = [ImpactSignal(role_index=0, bullet_index=0, text="Cut p95 latency by 40%", impact_type="metric", quantification="strong", star_score=0.9)]
+    asyncio.run(bullet_model.record_labels(signals, BulletModelConfig(label_log=str(log))))
+    asyncio.run(bullet_model.record_labels([], BulletModelConfig(label_log=str(log))))
+    assert bullet_model.load_labels([str(log)]) == [{"text": "Cut p95 latency by 40%", "impact_type": "metric", "quantification": "strong", "star_score": 0.9}]
+
+
+def test_labels_are_deduplicated_and_split_deterministically(tmp_path):
+    path = tmp_path / "labels.jsonl"
+    rows = _labels()
+    path.write_text("\n".join(json.dumps(r) for r in rows + rows[:5]) + "\n")
+    loaded = bullet_model.load_labels([str(path)])
+    assert len(loaded) == len(rows)
+    assert bullet_model.split_labels(loaded) == bullet_model.split_labels(list(loaded))
@@ -1,4 +1,18 @@
-from app.v2.canonicalizer import _heuristic_canonicalize, _parse_experience, _segment_sections
+import asyncio
+
+from app.v2 import canonicalizer
+from app.v2.canonicalizer import (
+    BULLET,
+    CONTACT,
+    DATE_RANGE,
+    PLAIN,
+    _heuristic_canonicalize,
+    _parse_experience,
+    _role_chunks,
+    _segment_sections,
+    canonicalize,
+    tokenize,
+)
 
 
 def test_segment_sections_detects_known_headers():
@@ -9,6 +23,12 @@ def test_segment_sections_detects_known_headers():
     assert any("Senior Engineer" in ln for ln in sections["experience"])
 
 
+
+def test_long_decorated_headers_are_still_detected():
+    text = "=" * 30 + " EXPERIENCE " + "=" * 30 + "\nSenior Engineer | Acme | Jan 2020 - Present\n*** ~~~ Skills ~~~ ***\nPython\n"
+    _, order = _segment_sections(text)
+    assert order == ["experience", "skills"]
+
 def test_parse_experience_extracts_dates_company_and_bullets():
     lines = [
         "Senior Backend Engineer | NovaStack, Jan 2021 - Present",
@@ -48,3 +68,123 @@ AWS Solutions Architect | AWS
     assert len(canonical.skills) >= 3
     assert canonical.metadata.estimated_word_count > 20
     assert canonical.metadata.bullet_count == 1
+
+
+def test_tokenize_tags_each_line_once():
+    text = """Asha Verma
+asha@example.com | +91 98765 43210
+PROFESSIONAL EXPERIENCE:
+Platform Engineer | Acme, 2016 - 2020
+- Cut deploy time by 40%
+Education
+IIT Delhi, B.Tech, 2012 - 2016
+"""
+    tokens = tokenize(text)
+    kinds = {name: [ln.kind for ln in lines] for name, lines in tokens.sections.items() if lines}
+    assert kinds == {"summary": [PLAIN, CONTACT], "experience": [DATE_RANGE, BULLET], "education": [DATE_RANGE]}
+    assert tokens.metadata.section_order == ["experience", "education"]
+    assert tokens.metadata.bullet_count == 1
+    assert tokens.contact.email == "asha@example.com"
+    assert tokens.contact.phone == "+91 98765 43210"
+    assert _parse_experience(tokens.sections["experience"])[0].bullets == ["Cut deploy time by 40%"]
+
+
+CLEAN_RESUME = """Summary
+Backend engineer.
+Experience
+Senior Engineer | Acme, Jan 2020 - Present
+- Cut p99 latency by 40%
+Education
+State University, B.Tech, 2012 - 2016
+Skills
+Python, FastAPI, PostgreSQL
+"""
+
+
+def _record_llm_calls(monkeypatch, reply=None) -> list[dict]:
+    calls: list[dict] = []
+
+    async def fake_call_gemini(**kwargs):
+        calls.append(kwargs)
+        return reply
+
+    monkeypatch.setattr(canonicalizer, "call_gemini", fake_call_gemini)
+    return calls
+
+
+def test_clean_heuristic_parse_skips_the_llm(monkeypatch):
+    calls = _record_llm_calls(monkeypatch)
+    stats: dict = {}
+    canonical = asyncio.run(canonicalize(CLEAN_RESUME, stats=stats))
+    assert calls == []
+    assert stats["route"] == "heuristic" and stats["parse_quality"] == 1.0
+    assert canonical.experience[0].title == "Senior Engineer"
+
+    asyncio.run(canonicalize(CLEAN_RESUME, stats=stats, routing="always"))
+    assert len(calls) == 1 and stats["llm_called"]
+
+
+def test_only_weak_sections_are_sent_to_the_llm(monkeypatch):
+    text = CLEAN_RESUME.replace("Jan 2020 - Present", "2020 - 2023").replace("- Cut p99 latency by 40%\n", "")
+    reply = {"experience": [{"company": "Acme", "title": "Senior Engineer", "start_date": "2020-03", "bullets": ["Cut p99 latency by 40%"]}]}
+    calls = _record_llm_calls(monkeypatch, reply)
+    stats: dict = {}
+    canonical = asyncio.run(canonicalize(text, stats=stats))
+
+    assert stats["route"] == "llm_sections" and stats["weak_sections"] == ["experience"]
+    assert calls[0]["text"] == "Experience\nSenior Engineer | Acme, 2020 - 2023"
+    assert canonical.experience[0].start_date == "2020-03"
+    assert canonical.skills == ["Python", "FastAPI", "PostgreSQL"]
+
+
+def test_unstructured_text_routes_to_the_full_llm_parse(monkeypatch):
+    calls = _record_llm_calls(monkeypatch)
+    stats: dict = {}
+    asyncio.run(canonicalize("worked on backend things\nrole one 2019 to 2020\nsome tools python java", stats=stats))
+    assert stats["route"] == "llm" and stats["parse_quality"] < 0.5
+    assert calls[0]["max_tokens"] == 16384
+
+
+def test_sharded_canonicalization_runs_sections_concurrently_and_merges_in_order(monkeypatch):
+    roles = "\n".join(f"Engineer {i} | Company {i}, Jan {2010 + i} - Dec {2010 + i}\n- Shipped feature {i}" for i in range(7))
+    text = CLEAN_RESUME.replace(
+        "Senior Engineer | Acme, Jan 2020 - Present\n- Cut p99 latency by 40%", roles
+    ) + "Projects\nParser - Built extraction pipeline\n"
+    in_flight = {"now": 0, "max": 0}
+    calls: list[dict] = []
+
+    async def fake_call_gemini(**kwargs):
+        calls.append(kwargs)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        # Later shards finish first; the merge must still follow document order.
+        await asyncio.sleep(0.05 / len(calls))
+        in_flight["now"] -= 1
+        return canonicalizer._heuristic_canonicalize(kwargs["text"]).model_dump()
+
+    monkeypatch.setattr(canonicalizer, "call_gemini", fake_call_gemini)
+    stats: dict = {}
+    canonical = asyncio.run(canonicalize(text, stats=stats, routing="always", sharding=True))
+
+    assert stats["shards"] == ["head", "experience:0", "experience:1", "experience:2", "education", "projects"]
+    assert in_flight["max"] == len(stats["shards"])
+    assert {c["max_tokens"] for c in calls} == {4096}
+    assert [r.title for r in canonical.experience] == [f"Engineer {i}" for i in range(7)]
+    assert canonical.skills == ["Python", "FastAPI", "PostgreSQL"]
+    assert canonical.projects[0].name == "Parser"
+    assert canonical.summary == "Backend engineer."
+
+
+def test_role_shards_keep_multi_line_headers_with_their_dates():
+    text = (
+        "Experience\nAcme Corp\nSenior Engineer\nJan 2021 - Present\n- Built billing\n"
+        "Globex\nEngineer\nMar 2018 - Dec 2020\n- Shipped search\n"
+        "Initech | Intern, Jan 2017 - Dec 2017\n- Fixed tests\n"
+    )
+    chunks = _role_chunks(tokenize(text).sections["experience"], 1)
+    assert [[ln.text for ln in chunk] for chunk in chunks] == [
+        ["Acme Corp", "Senior Engineer", "Jan 2021 - Present", "- Built billing"],
+        ["Globex", "Engineer", "Mar 2018 - Dec 2020", "- Shipped search"],
+        ["Initech | Intern, Jan 2017 - Dec 2017", "- Fixed tests"],
+    ]
+    assert len(_role_chunks(tokenize(text).sections["experience"], 2)) == 2
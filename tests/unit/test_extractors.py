@@ -2,6 +2,7 @@ from app.v2.extractors.impact import _heuristic_impact
 from app.v2.extractors.ownership import _heuristic_ownership
 from app.v2.extractors.red_flags import _heuristic_red_flags
 from app.v2.extractors.skills import _heuristic_skills
+from app.v2.features import BulletFeatureIndex
 from app.v2.types import CanonicalExperience, CanonicalResume, ResumeMetadata
 
 
@@ -59,3 +60,115 @@ def test_red_flags_extractor_heuristic_detects_gap_generic_and_stale_tech():
     assert "employment_gap" in types
     assert "generic_language" in types
     assert "stale_tech" in types
+
+
+def test_bullet_feature_index_packs_keyword_hits_per_bullet_and_role():
+    canonical = _canonical_for_extractors()
+    index = BulletFeatureIndex.from_canonical(canonical)
+    assert list(index.role_offsets) == [0, 3, 4]
+    assert index.metrics[0] == ["25%"]
+    assert index.verbs[0] == ["led", "reduced"]
+    assert index.has(1, "generic") and not index.has(0, "generic")
+    assert index.hits(index.role_masks[0], "passive") == ["responsible for"]
+    assert index.role_has(1, "stale")
+    assert index.hits(index.document_mask, "soft_skill") == ["ownership"]
+
+
+def test_heuristics_give_the_same_result_with_a_shared_index():
+    canonical = _canonical_for_extractors()
+    index = BulletFeatureIndex.from_canonical(canonical)
+    assert _heuristic_impact(canonical, index) == _heuristic_impact(canonical)
+    assert _heuristic_ownership(canonical, index) == _heuristic_ownership(canonical)
+    assert _heuristic_skills(canonical, index) == _heuristic_skills(canonical)
+    assert _heuristic_red_flags(canonical, index) == _heuristic_red_flags(canonical)
+
+
+def test_impact_cache_sends_only_uncached_bullets_to_the_llm(monkeypatch):
+    import ast
+    import asyncio
+
+    from app.v2.extractors import impact as impact_module
+    from app.v2.signal_cache import SignalCache
+
+    sent: list[list[tuple[int, int]]] = []
+
+    async def fake_call_gemini(prompt, payload, model=None):
+        roles = ast.literal_eval(payload)["experience"]
+        positions = [(r["role_index"], b["bullet_index"]) for r in roles for b in r["bullets"]]
+        sent.append(positions)
+        return [
+            {"role_index": ri, "bullet_index": bi, "text": "", "impact_type": "scope", "quantification": "none", "star_score": 0.5}
+            for ri, bi in positions
+        ]
+
+    cache = SignalCache()
+    monkeypatch.setattr(impact_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(impact_module, "get_signal_cache", lambda: cache)
+
+    canonical = _canonical_for_extractors()
+    first_stats: dict = {}
+    first = asyncio.run(impact_module.extract_impact(canonical, stats=first_stats))
+    assert first_stats == {"hits": 0, "misses": 4, "hit_rate": 0.0}
+
+    edited = canonical.model_copy(deep=True)
+    edited.experience[0].bullets[1] = "Rebuilt the  billing pipeline"
+    edited.experience[1].bullets[0] = "  worked on LEGACY jquery admin dashboard"
+    stats: dict = {}
+    second = asyncio.run(impact_module.extract_impact(edited, stats=stats))
+
+    assert sent == [[(0, 0), (0, 1), (0, 2), (1, 0)], [(0, 1)]]
+    assert stats == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    assert [(s.role_index, s.bullet_index) for s in second] == [(s.role_index, s.bullet_index) for s in first]
+    assert second[3].text == "  worked on LEGACY jquery admin dashboard"
+
+
+def test_ownership_escalates_only_ambiguous_roles(monkeypatch):
+    import ast
+    import asyncio
+
+    from app.v2.extractors import ownership as ownership_module
+
+    sent: list[list[int]] = []
+
+    async def fake_call_gemini(prompt, payload, model=None):
+        roles = ast.literal_eval(payload)["experience"]
+        sent.append([r["role_index"] for r in roles])
+        return [
+            {"role_index": r["role_index"], "company": r["company"], "title": r["title"], "ownership_level": "contributed", "scope": "team"}
+            for r in roles
+        ]
+
+    monkeypatch.setattr(ownership_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(ownership_module, "get_signal_cache", lambda: None)
+    canonical = _canonical_for_extractors()
+    canonical.experience[0].bullets = ["Led the payments migration", "Architected the ledger service"]
+    stats: dict = {}
+    signals = asyncio.run(ownership_module.extract_ownership(canonical, stats=stats))
+
+    assert sent == [[1]]
+    assert [(s.role_index, s.ownership_level) for s in signals] == [(0, "led"), (1, "contributed")]
+    assert stats["escalated"] == 1 and stats["escalation_rate"] == 0.5
+
+
+def test_ownership_verbs_only_inside_other_words_are_escalated(monkeypatch):
+    import asyncio
+
+    from app.v2.extractors import ownership as ownership_module
+
+    sent: list[str] = []
+
+    async def fake_call_gemini(prompt, payload, model=None):
+        sent.append(payload)
+        return None
+
+    monkeypatch.setattr(ownership_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(ownership_module, "get_signal_cache", lambda: None)
+    canonical = _canonical_for_extractors()
+    canonical.experience[0].bullets = ["Handled customer tickets"]
+    canonical.experience[1].bullets = ["Scheduled on-call rotations"]
+    index = BulletFeatureIndex.from_canonical(canonical)
+    assert index.role_has(0, "led") and not index.role_has_word(0, "led")
+
+    stats: dict = {}
+    asyncio.run(ownership_module.extract_ownership(canonical, stats=stats, features=index))
+    assert stats["escalated"] == 2 and len(sent) == 1
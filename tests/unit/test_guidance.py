@@ -0,0 +1,67 @@
+import asyncio
+
+from app.v2 import guidance as guidance_module
+from app.v2.guidance import generate_guidance, template_questions
+from app.v2.types import (
+    AlignmentGap,
+    CanonicalResume,
+    ImpactSignal,
+    OwnershipSignal,
+    RedFlag,
+    RedFlagSignal,
+    ResumeScore,
+    RoleAlignment,
+)
+
+SIGNALS = {
+    "impact": [ImpactSignal(role_index=0, bullet_index=0, text="Responsible for API upkeep", impact_type="duty", quantification="none", star_score=0.2)],
+    "ownership": [OwnershipSignal(role_index=0, company="Acme", title="Engineer", ownership_level="unclear", scope="team")],
+    "red_flags": RedFlagSignal(
+        flags=[
+            RedFlag(type="generic_language", severity="low", detail="Duty-heavy or generic wording"),
+            RedFlag(type="employment_gap", severity="high", detail="14-month gap between roles"),
+        ]
+    ),
+}
+ALIGNMENT = RoleAlignment(gaps=[AlignmentGap(area="skill:Kafka", severity="medium", detail="Expected for Backend Engineer but not evidenced")])
+
+
+def test_templates_fill_from_the_resume_and_rank_questions_by_severity():
+    questions = template_questions(SIGNALS["red_flags"], SIGNALS["ownership"], ALIGNMENT)
+    assert [q.source for q in questions] == ["employment_gap", "ownership", "role_alignment", "generic_language"]
+    assert "Kafka" in questions[2].question
+
+    recs, _ = asyncio.run(generate_guidance("Backend Engineer", CanonicalResume(), SIGNALS, ALIGNMENT, ResumeScore(overall=50), fast=True))
+    by_id = {r.id: r for r in recs}
+    assert by_id["rec-impact-1"].before == "Responsible for API upkeep" and by_id["rec-impact-1"].after is None
+    assert "Kafka" in by_id["rec-skills-1"].description
+    assert len(recs) == 5 and [r.priority for r in recs] == [1, 2, 3, 4, 5]
+
+
+def test_one_polish_call_rewords_both_lists_and_fast_mode_skips_it(monkeypatch):
+    calls = []
+
+    async def fake_call_gemini(prompt, text, model=None):
+        calls.append(text)
+        return {
+            "recommendations": [
+                {"id": "rec-impact-1", "after": "Kept [N] partner APIs at 99.9% uptime", "dimension": "ats_compliance"},
+                {"id": "rec-unknown", "title": "Invented"},
+            ],
+            "questions": [{"index": 0, "question": "Tell us about the 14 months between roles."}, {"index": 99, "question": "x"}],
+        }
+
+    monkeypatch.setattr(guidance_module, "call_gemini", fake_call_gemini)
+    stats: dict = {}
+    recs, questions = asyncio.run(
+        generate_guidance("Backend Engineer", CanonicalResume(), SIGNALS, ALIGNMENT, ResumeScore(overall=50), stats=stats)
+    )
+    assert len(calls) == 1 and stats["polish"] == "llm"
+    impact = next(r for r in recs if r.id == "rec-impact-1")
+    assert impact.after == "Kept [N] partner APIs at 99.9% uptime" and impact.dimension == "impact_quality"
+    assert all(r.title != "Invented" for r in recs)
+    assert questions[0].question == "Tell us about the 14 months between roles." and questions[0].severity == "high"
+
+    fast: dict = {}
+    asyncio.run(generate_guidance("Backend Engineer", CanonicalResume(), SIGNALS, ALIGNMENT, ResumeScore(overall=50), fast=True, stats=fast))
+    assert len(calls) == 1 and fast["polish"] == "skipped"
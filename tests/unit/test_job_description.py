@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.config import JobDescriptionConfig
+from app.pipeline import IngestError
+from app.v2 import job_description as jd_module
+from app.v2.job_description import RequirementsCache, _heuristic_requirements, extract_requirements
+from app.v2.pipeline import run_v2_pipeline
+from app.v2.scoring import score_skills
+from app.v2.types import ExtractedSkill, JobRequirements, SkillSignal
+
+JD = """Senior Backend Engineer
+We build payments infrastructure for banking partners.
+
+Requirements:
+- 5+ years building services in Python
+- Production experience with PostgreSQL and Kubernetes
+
+Nice to have:
+- Kafka
+- Terraform
+"""
+
+
+def test_heuristic_requirements_split_required_and_optional_skills():
+    req = _heuristic_requirements(JD)
+    assert req.title == "Senior Backend Engineer"
+    assert req.seniority == "senior"
+    assert req.domain == "fintech"
+    assert req.min_years == 5
+    assert {"Python", "PostgreSQL", "Kubernetes"} <= set(req.required_skills)
+    assert {"Kafka", "Terraform"} <= set(req.optional_skills)
+    assert not set(req.required_skills) & set(req.optional_skills)
+
+
+def test_requirements_are_extracted_once_per_job_description(monkeypatch):
+    calls = []
+
+    async def fake_call_gemini(prompt, text, model=None):
+        calls.append(text)
+        await asyncio.sleep(0)
+        return {"title": "Backend Engineer", "required_skills": ["python", "k8s"], "optional_skills": ["Kafka", "Python"], "seniority": "senior"}
+
+    monkeypatch.setattr(jd_module, "call_gemini", fake_call_gemini)
+    monkeypatch.setattr(jd_module, "get_requirements_cache", lambda cache=RequirementsCache(): cache)
+
+    async def screen(n: int):
+        # Concurrent misses share one in-flight extraction.
+        return await asyncio.gather(*(extract_requirements(JD, stats={}) for _ in range(n)))
+
+    profiles = asyncio.run(screen(500))
+    stats: dict = {}
+    again = asyncio.run(extract_requirements("  " + JD.replace("\n", "  \n") + " ", stats=stats))
+    assert len(calls) == 1
+    assert stats["cache_hit"] is True and stats["source"] == "llm"
+    assert again.required_skills == profiles[0].required_skills
+    assert "Kubernetes" in again.required_skills and again.optional_skills == ["Kafka"]
+
+    asyncio.run(extract_requirements(JD, model="gemini-2.5-pro"))
+    assert len(calls) == 2
+
+
+def test_fallback_profiles_expire_quickly_and_cancelled_owners_hand_over(monkeypatch):
+    calls = []
+
+    async def down(prompt, text, model=None):
+        calls.append(text)
+        await asyncio.sleep(0.05)
+        return None
+
+    cache = RequirementsCache(JobDescriptionConfig(fallback_ttl_seconds=0))
+    monkeypatch.setattr(jd_module, "call_gemini", down)
+    monkeypatch.setattr(jd_module, "get_requirements_cache", lambda: cache)
+    stats: dict = {}
+    assert asyncio.run(extract_requirements(JD, stats=stats)).source == "heuristic"
+    asyncio.run(extract_requirements(JD, stats=stats))
+    assert len(calls) == 2 and stats["cache_hit"] is False
+
+    async def cancel_the_owner():
+        owner = asyncio.create_task(extract_requirements(JD + "v2"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(extract_requirements(JD + "v2"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(cancel_the_owner()).source == "heuristic"
+    assert len(calls) == 4
+
+
+def test_failed_ingest_cancels_the_job_description_extraction(monkeypatch):
+    finished = []
+
+    async def slow(prompt, text, model=None):
+        await asyncio.sleep(5)
+        finished.append(text)
+
+    monkeypatch.setattr(jd_module, "call_gemini", slow)
+    monkeypatch.setattr(jd_module, "get_requirements_cache", lambda cache=RequirementsCache(): cache)
+
+    async def analyze():
+        with pytest.raises(IngestError):
+            await run_v2_pipeline({"fileBase64": "not base64!", "jobDescription": JD, "targetRole": "Backend Engineer"})
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        await asyncio.sleep(0)
+        return pending
+
+    pending = asyncio.run(analyze())
+    assert pending and all(t.cancelled() for t in pending) and not finished
+
+
+def test_score_skills_weights_required_over_optional_skills():
+    requirements = JobRequirements(required_skills=["Python", "Kubernetes"], optional_skills=["Kafka"])
+
+    def signal(*names):
+        return SkillSignal(hard_skills=[ExtractedSkill(name=n, depth="proficient") for n in names])
+
+    required = score_skills(signal("Python", "Kubernetes"), "Unknown", requirements)
+    optional = score_skills(signal("Python", "Kafka"), "Unknown", requirements)
+    assert required.score > optional.score
+    assert required.rationale == "Skill depth and job-description skill coverage"
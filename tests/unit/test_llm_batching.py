@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from app.config import LlmBatchConfig
+from app.v2.llm_batching import BATCH_INSTRUCTIONS, MicroBatcher
+from app.v2.prompts import IMPACT_EXTRACTOR_PROMPT, JD_EXTRACTOR_PROMPT
+
+
+def _settings(**overrides) -> LlmBatchConfig:
+    return LlmBatchConfig(**{"enabled": True, "stages": ["impact"], "window_ms": 5, "max_docs": 4, "max_input_tokens": 24000, **overrides})
+
+
+def _recording_llm(calls: list, drop: set[str] = frozenset()):
+    async def generate(prompt, text, model, temperature=0.2, max_tokens=8192, max_input_chars=50000):
+        batched = prompt.endswith(BATCH_INSTRUCTIONS)
+        calls.append((batched, text))
+        await asyncio.sleep(0)
+        if not batched:
+            return {"echo": text}
+        return {"results": [{"id": d["id"], "output": {"echo": d["input"]}} for d in json.loads(text) if d["input"] not in drop]}
+
+    return generate
+
+
+async def _submit_all(batcher: MicroBatcher, texts: list[str]) -> list:
+    return await asyncio.gather(*(batcher.submit(IMPACT_EXTRACTOR_PROMPT, t, "m") for t in texts))
+
+
+def test_concurrent_calls_are_packed_and_split_back_by_document_id():
+    calls: list = []
+    batcher = MicroBatcher(_recording_llm(calls, drop={"doc-5"}), _settings())
+    assert batcher.accepts(IMPACT_EXTRACTOR_PROMPT) and not batcher.accepts(JD_EXTRACTOR_PROMPT)
+
+    texts = [f"doc-{i}" for i in range(10)]
+    results = asyncio.run(_submit_all(batcher, texts))
+    assert results == [{"echo": t} for t in texts]
+    # Two full batches of 4, one window-flushed batch of 2, and a solo retry of the dropped id.
+    assert [len(json.loads(text)) for batched, text in calls if batched] == [4, 4, 2]
+    assert [(batched, text) for batched, text in calls if not batched] == [(False, "doc-5")]
+    assert batcher.stats()["retried"] == 1 and batcher.stats()["llm_calls"] == 4
+
+
+def test_token_budget_singles_and_failed_calls():
+    calls: list = []
+    batcher = MicroBatcher(_recording_llm(calls), _settings(max_input_tokens=30))
+    big = "x" * 200
+    results = asyncio.run(_submit_all(batcher, ["a" * 60, "b" * 60, big]))
+    # Each 60-char input is ~16 tokens, so the second one starts a new batch;
+    # both go out alone with the plain prompt, as does the oversized input.
+    assert results == [{"echo": "a" * 60}, {"echo": "b" * 60}, {"echo": big}]
+    assert not any(batched for batched, _ in calls)
+    assert batcher.stats()["oversized"] == 1 and batcher.stats()["singles"] == 2
+
+    async def down(*args):
+        return None
+
+    failing = MicroBatcher(down, _settings())
+    assert asyncio.run(_submit_all(failing, ["a", "b", "c"])) == [None, None, None]
+    assert failing.stats()["llm_calls"] == 1
+
+
+def test_temperature_splits_batches_and_max_tokens_reach_every_call():
+    calls: list = []
+
+    async def generate(prompt, text, model, temperature=0.2, max_tokens=8192, max_input_chars=50000):
+        batched = prompt.endswith(BATCH_INSTRUCTIONS)
+        calls.append((batched, temperature, max_tokens))
+        if not batched:
+            return {"echo": text}
+        return {"results": [{"id": d["id"], "output": {"echo": d["input"]}} for d in json.loads(text) if d["input"] != "b"]}
+
+    async def run():
+        batcher = MicroBatcher(generate, _settings(max_output_tokens=1500))
+        calls_in = [("a", 0.2, 500), ("b", 0.2, 700), ("c", 0.2, 900), ("d", 0.7, 300)]
+        results = await asyncio.gather(*(batcher.submit(IMPACT_EXTRACTOR_PROMPT, t, "m", temp, limit) for t, temp, limit in calls_in))
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+        return results
+
+    assert asyncio.run(run()) == [{"echo": t} for t in "abcd"]
+    # One batch at 0.2 capped at the output limit, a solo call at 0.7, and a retry of "b" with its own budget.
+    assert sorted(calls) == [(False, 0.2, 700), (False, 0.7, 300), (True, 0.2, 1500)]
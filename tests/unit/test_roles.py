@@ -0,0 +1,36 @@
+from app.pipeline import _map_function_area
+from app.v2.roles import normalize_role
+from app.v2.semantic_match import get_role_matcher
+
+
+def test_spelling_variants_share_a_cache_key():
+    variants = ["Sr. Backend Engineer", "Senior Backend Developer", "senior back-end engineer (Python)", "SENIOR BE DEV"]
+    roles = [normalize_role(v) for v in variants]
+    assert {r.cache_key for r in roles} == {"backend_engineer@senior"}
+    assert roles[2].specialization == ("Python",)
+    assert normalize_role("Backend Engineer").cache_key == "backend_engineer@any"
+
+    typo = normalize_role("Senior Python Backend Enginer")
+    assert (typo.role_id, typo.seniority, typo.specialization) == ("backend_engineer", "senior", ("Python",))
+    assert 0 < typo.confidence < 1
+
+
+def test_abbreviations_seniority_and_unknown_titles():
+    assert normalize_role("Staff ML Eng").cache_key == "ml_engineer@staff"
+    assert normalize_role("Head of Engineering").cache_key == "engineering_manager@director"
+    assert normalize_role("Software Engineer II").seniority == "mid"
+    assert normalize_role("pm").role_id == "product_manager"
+
+    chef = normalize_role("Senior Pastry Chef")
+    assert not chef.known and chef.cache_key == "custom:pastry_chef@senior"
+    assert get_role_matcher().catalog_role("Senior Pastry Chef") is None
+    assert normalize_role("Chief of Staff").role_id == "custom:chief_staff"
+    assert normalize_role("Principal Staff").role_id != normalize_role("Chief of Staff").role_id
+
+
+def test_function_area_uses_the_taxonomy():
+    assert _map_function_area("Senior Product Designer") == "design"
+    assert _map_function_area("Front End Dev") == "engineering"
+    assert _map_function_area("HR Business Partner") == "hr"
+    assert _map_function_area("Growth Marketing Specialist") == "marketing"
+    assert _map_function_area("Pastry Chef") is None
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from app.config import SandboxConfig
+from app.sandbox import BLACKLISTED, CANCELLED, CPU, CRASH, MEMORY, TIMEOUT, ExtractionError, ExtractionSandbox
+
+
+def _echo(data: bytes) -> str:
+    return data.decode()
+
+
+def _spin(data: bytes) -> str:
+    while True:
+        pass
+
+
+def _hog_memory(data: bytes) -> str:
+    blocks = []
+    while True:
+        blocks.append(bytearray(64 * 1024 * 1024))
+
+
+def _sleep(data: bytes) -> str:
+    time.sleep(60)
+    return ""
+
+
+def _boom(data: bytes) -> str:
+    raise RuntimeError("corrupt xref table")
+
+
+def _sandbox(**overrides) -> ExtractionSandbox:
+    settings = {"memory_mb": 128, "cpu_seconds": 1, "wall_seconds": 5, "max_strikes": 2, **overrides}
+    return ExtractionSandbox(SandboxConfig(**settings))
+
+
+def _reason(sandbox: ExtractionSandbox, fn, data: bytes = b"x") -> str:
+    with pytest.raises(ExtractionError) as exc:
+        sandbox.run(fn, data)
+    return exc.value.reason
+
+
+def test_sandbox_returns_child_output():
+    assert _sandbox().run(_echo, b"Jane Doe") == "Jane Doe"
+
+
+def test_sandbox_enforces_cpu_memory_and_wall_clock_limits():
+    sandbox = _sandbox(max_strikes=99)
+    assert _reason(sandbox, _spin, b"a") == CPU
+    assert _reason(sandbox, _hog_memory, b"b") == MEMORY
+    assert _reason(sandbox, _boom, b"c") == CRASH
+
+    started = time.monotonic()
+    assert _reason(_sandbox(wall_seconds=0.5), _sleep, b"d") == TIMEOUT
+    assert time.monotonic() - started < 5
+
+
+def test_sandbox_blacklists_repeat_offenders_by_hash():
+    sandbox = _sandbox()
+    assert _reason(sandbox, _boom, b"bad file") == CRASH
+    assert _reason(sandbox, _boom, b"bad file") == CRASH
+
+    started = time.monotonic()
+    assert _reason(sandbox, _echo, b"bad file") == BLACKLISTED
+    assert time.monotonic() - started < 0.05
+    assert sandbox.run(_echo, b"good file") == "good file"
+
+
+def test_cancel_kills_the_child_without_a_strike():
+    sandbox = _sandbox(wall_seconds=30, max_strikes=1)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.monotonic()
+    with pytest.raises(ExtractionError) as exc:
+        sandbox.run(_sleep, b"slow file", cancel)
+    assert exc.value.reason == CANCELLED and time.monotonic() - started < 5
+    assert sandbox.run(_echo, b"slow file") == "slow file"
+
+
+def test_strikes_from_concurrent_workers_are_all_counted():
+    sandbox = _sandbox(max_strikes=4000)
+    workers = [threading.Thread(target=lambda: [sandbox._strike("bad") for _ in range(500)]) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sandbox.strikes.get("bad") == 4000 and sandbox.is_blacklisted("bad")
+
+
+def test_pdf_extraction_runs_through_the_sandbox():
+    fitz = pytest.importorskip("fitz")
+    from app.pipeline import _extract_pdf_text
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Senior Backend Engineer")
+    pdf = doc.tobytes()
+    assert _sandbox(memory_mb=512, cpu_seconds=5).run(_extract_pdf_text, pdf) == "Senior Backend Engineer"
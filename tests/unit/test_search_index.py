@@ -0,0 +1,105 @@
+from app.v2.search_index import SearchDocument, SearchIndex, load_index
+
+
+def _doc(analysis_id: str, skills: list[str], text: str, tenure: int = 48, overall: float = 70.0, tier: str = "competitive", **kw) -> SearchDocument:
+    return SearchDocument(
+        analysis_id=analysis_id,
+        skills=[s.lower() for s in skills],
+        titles=kw.get("titles", ["Backend Engineer"]),
+        companies=kw.get("companies", ["acme"]),
+        text=text,
+        tenure_months=tenure,
+        overall=overall,
+        tier=tier,
+    )
+
+
+def _corpus() -> list[SearchDocument]:
+    return [
+        _doc("a", ["Python", "Kafka", "PostgreSQL"], "Built payments pipeline on Kafka handling 2M events per day", tenure=72, overall=82, tier="strong"),
+        _doc("b", ["Python", "Django"], "Maintained Django admin and payments reports", tenure=30),
+        _doc("c", ["Java", "Kafka"], "Ran Kafka clusters for the ads platform", tenure=96, overall=55, tier="needs-work"),
+        _doc("d", ["React"], "Shipped checkout UI in React", tenure=12, titles=["Frontend Engineer"]),
+    ]
+
+
+def test_skills_and_bm25_rank_and_filters_apply():
+    index = SearchIndex()
+    for doc in _corpus():
+        index.add(doc)
+    hits = index.search(text="payments kafka", skills=["python"], k=10)
+    assert [h.analysis_id for h in hits][:1] == ["a"]
+    assert set(hits[0].matched_skills) == {"python"}
+    assert "d" not in {h.analysis_id for h in hits}
+
+    assert [h.analysis_id for h in index.search(skills=["k8s", "kafka"], must_skills=["Kafka"], min_tenure_months=80)] == ["c"]
+    assert [h.analysis_id for h in index.search(text="kafka", tiers=["strong"])] == ["a"]
+    # With only filters, matches rank by overall score.
+    assert [h.analysis_id for h in index.search(max_tenure_months=40)] == ["b", "d"]
+
+
+def test_incremental_updates_survive_compaction_and_mmap_reload(tmp_path):
+    path = str(tmp_path / "index.bin")
+    index = SearchIndex(path=path, compact_at=3)
+    for doc in _corpus():
+        index.add(doc)
+    assert len(index) == 4 and index.segment.doc_count == 3
+
+    index.add(_doc("b", ["Go"], "Rewrote billing service in Go"))
+    index.remove("c")
+    assert "c" not in index and len(index) == 3
+    assert [h.analysis_id for h in index.search(skills=["golang"])] == ["b"]
+    assert index.search(must_skills=["django"]) == []
+    before = index.search(text="payments kafka checkout", skills=["python"])
+
+    index.compact()
+    reloaded = load_index(path)
+    assert len(reloaded) == 3 and reloaded.segment.doc_count == 3
+    assert reloaded.search(text="payments kafka checkout", skills=["python"]) == before
+
+
+def test_a_key_keeps_one_document_per_resume_across_reloads(tmp_path):
+    path = str(tmp_path / "index.bin")
+    index = SearchIndex(path=path, compact_at=2)
+    index.add(_doc("a1", ["Python"], "Built payments pipeline")._replace(key="user:1"))
+    index.add(_doc("b", ["Go"], "Rewrote billing in Go")._replace(key="user:2"))
+    assert index.segment.doc_count == 2
+
+    reloaded = load_index(path)
+    reloaded.add(_doc("a2", ["Python", "Kafka"], "Built payments pipeline on Kafka")._replace(key="user:1"))
+    assert "a1" not in reloaded and len(reloaded) == 2
+    assert [h.analysis_id for h in reloaded.search(skills=["python"])] == ["a2"]
+    reloaded.remove("a2")
+    reloaded.add(_doc("a3", ["Python"], "Payments again")._replace(key="user:1"))
+    assert len(reloaded) == 2
+
+
+def test_background_compaction_keeps_changes_made_while_it_runs(tmp_path):
+    import asyncio
+
+    docs = {doc.analysis_id: doc for doc in _corpus()}
+    replacement = _doc("b2", ["Go"], "Rewrote billing service in Go")._replace(key="user:b")
+    index = SearchIndex(path=str(tmp_path / "index.bin"), compact_at=3)
+
+    async def run():
+        index.add(docs["a"], background=True)
+        index.add(docs["b"]._replace(key="user:b"), background=True)
+        index.add(docs["c"], background=True)
+        compaction = index._compaction
+        assert compaction is not None and index.segment.doc_count == 0
+        # Updates land while the merge runs in its thread.
+        index.remove("a")
+        index.add(replacement, background=True)
+        index.add(docs["d"], background=True)
+        await compaction
+
+    asyncio.run(run())
+    assert index.segment.doc_count == 3 and sorted(index._delta) == ["b2", "d"]
+    assert len(index) == 3 and "a" not in index and "b" not in index
+
+    fresh = SearchIndex()
+    for doc in (docs["c"], replacement, docs["d"]):
+        fresh.add(doc)
+    query = {"text": "kafka billing checkout", "skills": ["golang", "java"]}
+    assert index.search(**query) == fresh.search(**query)
+    assert load_index(str(tmp_path / "index.bin")).segment.doc_count == 3
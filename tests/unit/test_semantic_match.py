@@ -0,0 +1,42 @@
+from app.v2.alignment import _heuristic_alignment
+from app.v2.semantic_match import get_role_matcher, match_resumes
+from app.v2.types import CanonicalExperience, CanonicalResume, JobRequirements
+
+
+def _resume(bullets: list[str], skills: list[str] | None = None) -> CanonicalResume:
+    return CanonicalResume(
+        experience=[CanonicalExperience(company="Acme", title="Engineer", start_date="2020-01", bullets=bullets)],
+        skills=skills or [],
+    )
+
+
+def test_catalog_roles_resolve_across_spellings():
+    matcher = get_role_matcher()
+    assert {matcher.catalog_role(t) for t in ("Senior Backend Engineer", "Sr. Backend Developer", "backend engineer")} == {"backend_engineer"}
+    assert matcher.catalog_role("SRE") == "devops_engineer"
+    assert matcher.catalog_role("Pastry Chef") is None
+
+
+def test_synonyms_evidence_requirements_and_batch_matches_single():
+    matcher = get_role_matcher()
+    vectors = matcher.profile("DevOps Engineer")
+    strong = _resume(["Migrated 40 services to k8s with Terraform modules", "Built Prometheus alerting and Grafana dashboards for on-call"], ["AWS"])
+    weak = _resume(["Organized the team offsite"])
+
+    batch = match_resumes([strong, weak, _resume([])], vectors)
+    assert batch[0].fit_score > 50 > batch[1].fit_score
+    assert batch[2].fit_score == 0 and not batch[2].matched
+    matched = {m.requirement.text: m.evidence for m in batch[0].matched}
+    assert matched["Kubernetes and Docker"].startswith("Migrated 40 services to k8s")
+    assert [m.fit_score for m in match_resumes([weak], vectors)] == [batch[1].fit_score]
+
+
+def test_heuristic_alignment_reports_missing_requirements():
+    resume = _resume(["Built REST APIs in Python backed by PostgreSQL"], ["Python"])
+    catalog = _heuristic_alignment("Senior Backend Engineer", resume, {})
+    assert any(g.area.startswith("competency:") and "Backend Engineer" in g.detail for g in catalog.gaps)
+    assert any("REST APIs" in s for s in catalog.strength_alignment)
+
+    jd = JobRequirements(required_skills=["Rust"], optional_skills=["Python"], content_hash="test-jd")
+    aligned = _heuristic_alignment("Backend Engineer", resume, {}, jd)
+    assert [(g.area, g.severity) for g in aligned.gaps if g.area.startswith("skill:")] == [("skill:Rust", "medium")]
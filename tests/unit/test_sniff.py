@@ -0,0 +1,55 @@
+import asyncio
+import base64
+import io
+
+import pytest
+
+from app import sniff
+from app.pipeline import UnsupportedFormatError, _extract_text, run_pipeline
+
+
+def _docx_bytes(text: str) -> bytes:
+    docx = pytest.importorskip("docx")
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_sniff_identifies_formats_from_leading_bytes():
+    assert sniff.sniff_file_type(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n") == sniff.PDF
+    assert sniff.sniff_file_type(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 64) == sniff.DOC
+    assert sniff.sniff_file_type(b"{\\rtf1\\ansi Hello}") == sniff.RTF
+    assert sniff.sniff_file_type(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32) == sniff.IMAGE
+    assert sniff.sniff_file_type(b"\xff\xd8\xff\xe0\x00\x10JFIF") == sniff.IMAGE
+    assert sniff.sniff_file_type(b"PK\x03\x04" + b"\x00" * 26 + b"data.csv") == sniff.ZIP
+    assert sniff.sniff_file_type("Jane Doe\nBMW plant engineer — Pune".encode("utf-8")) == sniff.TEXT
+    assert sniff.sniff_file_type(b"\x00\x01\x02\x03\x04" * 20) == sniff.UNKNOWN
+
+
+def test_sniff_only_inspects_a_bounded_window():
+    # Valid text head followed by binary garbage still routes as text.
+    data = b"Summary\nBackend engineer\n" * 200 + b"\x00\xff" * 100_000
+    assert sniff.sniff_file_type(data) == sniff.TEXT
+
+
+def test_extract_text_routes_on_content_not_client_claims():
+    assert _extract_text(_docx_bytes("Senior Engineer at Acme"), None, None) == "Senior Engineer at Acme"
+    assert _extract_text(b"plain resume text", "application/pdf", "resume.pdf") == "plain resume text"
+    rtf = b"{\\rtf1\\ansi{\\fonttbl{\\f0 Arial;}}\\f0 Jane Doe\\par Caf\\'e9 Engineer}"
+    assert _extract_text(rtf, None, "resume.rtf") == "Jane Doe\nCafé Engineer"
+
+
+def test_extract_text_raises_for_unsupported_formats():
+    with pytest.raises(UnsupportedFormatError) as exc:
+        _extract_text(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 64, None, "resume.doc")
+    assert exc.value.kind == sniff.DOC
+
+
+def test_pipeline_returns_structured_result_for_images():
+    png = base64.b64encode(b"\x89PNG\r\n\x1a\n" + b"\x00" * 64).decode("ascii")
+    result = asyncio.run(run_pipeline({"fileBase64": png}))
+    assert result["error"].startswith("Unsupported file format: image/png")
+    assert result["fields"]["fileType"]["value"] == sniff.IMAGE
+    assert result["fields"]["needsOcr"] == {"value": True, "confidence": 1.0, "ocr_status": "not_queued"}
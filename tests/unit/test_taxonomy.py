@@ -0,0 +1,60 @@
+from app.v2.extractors.skills import _heuristic_skills
+from app.v2.search_index import canonical_skill
+from app.v2.taxonomy import compile_taxonomy, get_taxonomy, load_taxonomy
+from app.v2.types import CanonicalExperience, CanonicalResume
+
+SKILLS = [
+    {"name": "Kubernetes", "category": "devops", "aliases": ["k8s"]},
+    {"name": "PostgreSQL", "category": "database", "aliases": ["Postgres"]},
+    {"name": "Google Cloud", "category": "cloud", "aliases": ["GCP"]},
+    {"name": "Go", "category": "language", "case_sensitive": True, "case_sensitive_aliases": ["Golang"]},
+]
+
+
+def test_taxonomy_resolves_aliases_and_prefers_longest_match():
+    taxonomy = get_taxonomy()
+    assert taxonomy.skill_names("Ran k8s clusters on GCP backed by Postgres") == ["Kubernetes", "Google Cloud", "PostgreSQL"]
+    matches = taxonomy.find("Deployed to Google Cloud")
+    assert [(m.name, m.start, m.end) for m in matches] == [("Google Cloud", 12, 24)]
+
+
+def test_compiled_taxonomy_round_trips_through_mmap(tmp_path):
+    path = tmp_path / "skills.bin"
+    path.write_bytes(compile_taxonomy(SKILLS))
+    taxonomy = load_taxonomy(str(path))
+    assert taxonomy.skill_count == len(SKILLS)
+    assert taxonomy.skill_names("Moved k8s jobs to Go") == ["Kubernetes", "Go"]
+    # Case-sensitive names do not match ordinary words.
+    assert taxonomy.skill_names("go to market with postgres") == ["PostgreSQL"]
+
+
+def test_everyday_words_need_a_context_cue_to_count_as_skills():
+    taxonomy = get_taxonomy()
+    assert taxonomy.skill_names("Go to market plan for the Python SDK") == ["Python"]
+    assert taxonomy.skill_names("Go-live readiness reviews") == []
+    assert "Excel" not in taxonomy.skill_names("Excel at stakeholder management")
+    assert taxonomy.skill_names("Rewrote billing services in Go") == ["Go"]
+    assert taxonomy.skill_names("Python, Go, Kafka") == ["Python", "Go", "Kafka"]
+    assert taxonomy.skill_names("Built Excel models for pricing") == ["Excel"]
+    # A skills-section entry or filter is a list of skills already.
+    assert taxonomy.skill_names("Go", listed=True) == ["Go"]
+    assert canonical_skill("Excel") == "excel"
+
+
+def test_heuristic_skills_uses_canonical_names_without_capitalized_noise():
+    canonical = CanonicalResume(
+        experience=[
+            CanonicalExperience(
+                company="Acme",
+                title="Engineer",
+                bullets=["Built k8s operators and Migrated billing to Postgres"],
+            )
+        ],
+        skills=["kubernetes", "Internal Tooling", "Go"],
+    )
+    hard = {s.name: s for s in _heuristic_skills(canonical).hard_skills}
+    assert "Go" in hard
+    assert hard["Kubernetes"].depth == "proficient"
+    assert hard["PostgreSQL"].context == "experience bullets"
+    assert "Internal Tooling" in hard
+    assert not {"Built", "Migrated"} & set(hard)
@@ -0,0 +1,56 @@
+from datetime import date
+
+from app.v2.extractors.red_flags import _heuristic_red_flags
+from app.v2.timeline import build_timeline, format_month, normalize_date
+from app.v2.types import CanonicalExperience, CanonicalResume
+
+TODAY = date(2024, 6, 15)
+
+
+def _role(company: str, start: str, end: str | None = None, **kwargs) -> CanonicalExperience:
+    return CanonicalExperience(company=company, title="Engineer", start_date=start, end_date=end, is_current=end is None, **kwargs)
+
+
+def _canonical(*roles: CanonicalExperience) -> CanonicalResume:
+    return CanonicalResume(experience=list(roles))
+
+
+def test_timeline_finds_non_adjacent_overlaps_and_union_gaps():
+    canonical = _canonical(
+        _role("Long", "2015-01", "2020-12"),
+        _role("Short", "2016-03", "2016-08"),
+        _role("Side", "2019-01", "2019-06"),
+        _role("Next", "2022-01"),
+    )
+    timeline = build_timeline(canonical, TODAY)
+
+    assert [(o.first, o.second, o.months) for o in timeline.overlaps()] == [(0, 1, 6), (0, 2, 6)]
+    assert [(g.after_role, g.before_role, g.months) for g in timeline.gaps()] == [(0, 3, 12)]
+    assert timeline.tenure_months(3) == 30
+    assert timeline.total_months == 72 + 30
+    assert timeline.max_concurrent == 2
+
+
+def test_timeline_reads_year_only_ranges_as_whole_years():
+    canonical = _canonical(
+        _role("A", "2015-01", "2017-01", date_ambiguous=True),
+        _role("B", "2018-01", "2020-01", date_ambiguous=True),
+        _role("Undated", ""),
+    )
+    timeline = build_timeline(canonical, TODAY)
+    assert timeline.gaps() == []
+    assert timeline.undated == [2]
+
+
+def test_red_flags_report_overlapping_employment():
+    canonical = _canonical(_role("NovaApps", "2021-01"), _role("FinLeaf", "2021-06", "2022-12"), _role("PixelNorth", "2018-01", "2020-12"))
+    flags = _heuristic_red_flags(canonical, timeline=build_timeline(canonical, TODAY)).flags
+    assert [(f.type, f.location) for f in flags] == [("overlapping_employment", "experience[1]")]
+    assert "19 months" in flags[0].detail
+
+
+def test_date_helpers_round_trip():
+    assert normalize_date("June 2021") == "2021-06"
+    assert normalize_date("Present") is None
+    assert format_month("2021-06") == "Jun 2021"
+    assert format_month("2021") == "2021"